@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Batch Perforation Gauging
+
+Runs the PerforationMeasurementEngine over every stamp image in a folder
+(sheets, collections) without the GUI. Images are gauged in parallel on a
+process pool, each at the DPI stored in its own metadata, and the results are
+written in bulk to the StampZ data files and to a summary CSV with timings.
+
+Results are cached by image content hash, so re-running over a folder only
+gauges new or changed images.
+
+Usage:
+    python3 batch_perforation_gauge.py /path/to/folder
+    python3 batch_perforation_gauge.py /path/to/folder --recursive --workers 8
+    python3 batch_perforation_gauge.py /path/to/folder --export-txt --csv summary.csv
+"""
+
+import os
+import io
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+
+IMAGE_EXTENSIONS = ['.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp']
+CACHE_FILENAME = ".perforation_gauge_cache.json"
+CACHE_VERSION = 1
+FALLBACK_DPI = 600
+
+SUMMARY_FIELDS = [
+    'file', 'sha1', 'dpi', 'dpi_source', 'method',
+    'overall_gauge', 'catalog_gauge', 'compound', 'compound_description',
+    'quality', 'edges', 'holes',
+    'top_gauge', 'bottom_gauge', 'left_gauge', 'right_gauge',
+    'warnings', 'load_seconds', 'measure_seconds', 'cached', 'error'
+]
+
+
+def file_sha1(filepath: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-1 of the file contents (the cache key)."""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_image_dpi(filepath: Path) -> Tuple[Optional[float], str]:
+    """Read the scan resolution from image metadata.
+
+    Returns:
+        Tuple of (dpi, source); dpi is None when the file has no usable
+        resolution tag.
+    """
+    try:
+        with Image.open(filepath) as img:
+            dpi_info = img.info.get('dpi')
+            if dpi_info:
+                dpi = max(dpi_info) if isinstance(dpi_info, tuple) else dpi_info
+                if float(dpi) >= 50:
+                    return float(dpi), "PIL DPI tag"
+
+            # TIFF XResolution tag, in inches unless ResolutionUnit says cm
+            tags = getattr(img, 'tag_v2', None)
+            if tags is not None and 282 in tags:
+                x_res = float(tags[282])
+                if tags.get(296, 2) == 3:
+                    x_res *= 2.54
+                if x_res >= 50:
+                    return x_res, "TIFF XResolution tag"
+    except Exception as e:
+        print(f"⚠️  Could not read metadata from {filepath.name}: {e}")
+    return None, "none"
+
+
+def default_dpi() -> int:
+    """DPI used when an image carries none: the StampZ preference, else 600."""
+    try:
+        from utils.user_preferences import get_preferences_manager
+        return int(get_preferences_manager().get_default_dpi())
+    except Exception:
+        return FALLBACK_DPI
+
+
+def find_images(folder_path: Path, recursive: bool = False,
+                extensions: Optional[List[str]] = None) -> List[Path]:
+    """List image files in the folder, sorted by path."""
+    extensions = [e.lower() for e in (extensions or IMAGE_EXTENSIONS)]
+    pattern = '**/*' if recursive else '*'
+    return sorted(
+        p for p in folder_path.glob(pattern)
+        if p.is_file() and p.suffix.lower() in extensions and not p.name.startswith('.')
+    )
+
+
+def gauge_image(filepath: str, dpi: float, use_hole_detection: bool = True,
+                verbose: bool = False) -> Dict:
+    """Gauge one image. Runs in a worker process.
+
+    Returns:
+        Dict with the PerforationAnalysis (or an error) and per-stage timings.
+    """
+    import cv2
+    from perforation_measurement_system import PerforationMeasurementEngine
+
+    result = {'file': filepath, 'analysis': None, 'error': '',
+              'load_seconds': 0.0, 'measure_seconds': 0.0}
+    try:
+        start = time.perf_counter()
+        image = cv2.imread(filepath)  # Same loader as the perforation UI
+        result['load_seconds'] = time.perf_counter() - start
+        if image is None:
+            result['error'] = "Could not load image file"
+            return result
+
+        engine = PerforationMeasurementEngine()
+        engine.set_image_dpi(int(round(dpi)))
+        engine.max_workers = 1  # Parallelism comes from the process pool
+
+        start = time.perf_counter()
+        if verbose:
+            analysis = engine.measure_perforation(image, use_hole_detection=use_hole_detection)
+        else:
+            # The engine's debug output is per circle; keep batch logs readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                analysis = engine.measure_perforation(image, use_hole_detection=use_hole_detection)
+        result['measure_seconds'] = time.perf_counter() - start
+        result['analysis'] = analysis
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def summary_row(filepath: Path, sha1: str, dpi: float, dpi_source: str, method: str,
+                result: Dict) -> Dict:
+    """Flatten a gauge result into a summary CSV row."""
+    row = {field: '' for field in SUMMARY_FIELDS}
+    row.update({
+        'file': str(filepath), 'sha1': sha1, 'dpi': f"{dpi:g}", 'dpi_source': dpi_source,
+        'method': method, 'cached': 'no', 'error': result.get('error', ''),
+        'load_seconds': f"{result.get('load_seconds', 0.0):.3f}",
+        'measure_seconds': f"{result.get('measure_seconds', 0.0):.3f}",
+    })
+    analysis = result.get('analysis')
+    if analysis is not None:
+        row.update({
+            'overall_gauge': f"{float(analysis.overall_gauge):.3f}",
+            'catalog_gauge': analysis.catalog_gauge,
+            'compound': 'yes' if analysis.is_compound_perforation else 'no',
+            'compound_description': analysis.compound_description,
+            'quality': analysis.measurement_quality,
+            'edges': len(analysis.edges),
+            'holes': sum(len(e.holes) for e in analysis.edges),
+            'warnings': '; '.join(analysis.warnings),
+        })
+        for edge in analysis.edges:
+            key = f"{edge.edge_type}_gauge"
+            if key in row:
+                row[key] = f"{float(edge.gauge_measurement):.3f}"
+    return row
+
+
+def perforation_log_data(analysis, dpi: float, engine) -> Dict:
+    """Build the UnifiedDataLogger.log_perforation_analysis payload for an analysis."""
+    horizontal = [e.gauge_measurement for e in analysis.edges
+                  if e.edge_type in ('top', 'bottom') and e.gauge_measurement > 0]
+    vertical = [e.gauge_measurement for e in analysis.edges
+                if e.edge_type in ('left', 'right') and e.gauge_measurement > 0]
+    notes = list(analysis.technical_notes) + [f"Warning: {w}" for w in analysis.warnings]
+    return {
+        'perf_type': "Compound" if analysis.is_compound_perforation else "Regular",
+        'gauge': f"{float(analysis.overall_gauge):.3f}",
+        'catalog_format': analysis.catalog_gauge,
+        'horizontal_gauge': (engine.format_gauge_for_catalog(sum(horizontal) / len(horizontal))
+                             if horizontal else "Not measured"),
+        'vertical_gauge': (engine.format_gauge_for_catalog(sum(vertical) / len(vertical))
+                           if vertical else "Not measured"),
+        'dpi_used': f"{dpi:g}",
+        'measurement_method': "Automatic hole detection (batch)",
+        'measurement_tool': "StampZ Batch Perforation Gauge",
+        'regularity': analysis.measurement_quality,
+        'notes': "; ".join(notes) if notes else "None",
+    }
+
+
+def load_cache(cache_path: Path) -> Dict:
+    """Load the hash-keyed result cache (empty when missing or outdated)."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CACHE_VERSION:
+            return data.get('entries', {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_cache(cache_path: Path, entries: Dict):
+    """Write the result cache atomically."""
+    tmp_path = cache_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'entries': entries}, f, indent=1)
+    os.replace(tmp_path, cache_path)
+
+
+def write_results(new_results: List[Tuple[Path, float, Dict]], log_to_data_file: bool = True,
+                  export_reports: bool = False, export_dir: Optional[Path] = None):
+    """Write freshly gauged analyses to the StampZ data files in one pass.
+    
+    Args:
+        new_results: (image path, dpi, gauge_image result) tuples
+        log_to_data_file: Append to each image's unified StampZ data file
+        export_reports: Also write export_to_data_logger reports
+        export_dir: Folder for the reports (default: next to each image)
+    """
+    from perforation_measurement_system import PerforationMeasurementEngine
+    from utils.unified_data_logger import UnifiedDataLogger
+
+    engine = PerforationMeasurementEngine()
+    logged = exported = 0
+    for filepath, dpi, result in new_results:
+        analysis = result.get('analysis')
+        if analysis is None:
+            continue
+        engine.set_image_dpi(int(round(dpi)))
+        if log_to_data_file:
+            if UnifiedDataLogger(filepath).log_perforation_analysis(
+                    perforation_log_data(analysis, dpi, engine)):
+                logged += 1
+        if export_reports:
+            output_dir = export_dir if export_dir is not None else filepath.parent
+            if engine.export_to_data_logger(analysis, str(filepath), str(output_dir)):
+                exported += 1
+
+    if log_to_data_file:
+        print(f"📝 Logged {logged} analyses to StampZ data files")
+    if export_reports:
+        print(f"📄 Exported {exported} perforation reports")
+
+
+def run_batch(images: List[Path], cache_path: Optional[Path], workers: int,
+              fallback_dpi: float, forced_dpi: Optional[float], use_hole_detection: bool,
+              verbose: bool = False) -> Tuple[List[Dict], List[Tuple[Path, float, Dict]]]:
+    """Gauge images, reusing cached rows for unchanged files.
+
+    Returns:
+        Tuple of (summary rows in input order, freshly gauged results).
+    """
+    method = "holes" if use_hole_detection else "lines"
+    cache = load_cache(cache_path) if cache_path else {}
+
+    rows: Dict[Path, Dict] = {}
+    pending = []
+    for filepath in images:
+        sha1 = file_sha1(filepath)
+        if forced_dpi:
+            dpi, dpi_source = forced_dpi, "command line"
+        else:
+            dpi, dpi_source = read_image_dpi(filepath)
+            if dpi is None:
+                dpi, dpi_source = fallback_dpi, "default"
+
+        cache_key = f"{sha1}:{dpi:g}:{method}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            row = dict(cached)
+            row.update({'file': str(filepath), 'cached': 'yes'})
+            rows[filepath] = row
+        else:
+            pending.append((filepath, sha1, dpi, dpi_source, cache_key))
+
+    print(f"🔍 {len(images)} images: {len(images) - len(pending)} cached, {len(pending)} to gauge")
+
+    new_results = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(gauge_image, str(filepath), dpi, use_hole_detection, verbose):
+                    (filepath, sha1, dpi, dpi_source, cache_key)
+                for filepath, sha1, dpi, dpi_source, cache_key in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                filepath, sha1, dpi, dpi_source, cache_key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:  # worker crashed
+                    result = {'file': str(filepath), 'analysis': None, 'error': str(e)}
+
+                row = summary_row(filepath, sha1, dpi, dpi_source, method, result)
+                rows[filepath] = row
+                if not row['error']:
+                    cache[cache_key] = row
+                    new_results.append((filepath, dpi, result))
+
+                status = f"❌ {row['error']}" if row['error'] else f"gauge {row['catalog_gauge']}"
+                print(f"  [{done}/{len(pending)}] {filepath.name}: {status} "
+                      f"({row['measure_seconds']}s)")
+
+        if cache_path:
+            save_cache(cache_path, cache)
+
+    return [rows[p] for p in images], new_results
+
+
+def save_summary(rows: List[Dict], csv_path: Path):
+    """Write the summary CSV."""
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"📊 Summary saved to: {csv_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Batch perforation gauging of stamp images',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s ~/Desktop/stamps
+  %(prog)s ~/Desktop/stamps --recursive --workers 8
+  %(prog)s ~/Desktop/stamps --dpi 1200 --no-cache
+  %(prog)s ~/Desktop/stamps --export-txt --csv ~/Desktop/perfs.csv
+        """
+    )
+
+    parser.add_argument('folder', help='Folder of stamp images')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                       help='Scan subfolders recursively')
+    parser.add_argument('-w', '--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                       help='Worker processes (default: CPU count - 1)')
+    parser.add_argument('--dpi', type=float,
+                       help='Force this DPI for every image instead of reading metadata')
+    parser.add_argument('--default-dpi', type=float,
+                       help='DPI for images without metadata (default: StampZ preference)')
+    parser.add_argument('--lines', action='store_true',
+                       help='Use edge-line detection instead of hole detection')
+    parser.add_argument('--csv', type=str,
+                       help='Summary CSV path (default: <folder>/perforation_summary.csv)')
+    parser.add_argument('--export-txt', nargs='?', const='', default=None, metavar='DIR',
+                       help='Also write per-image perforation reports (default: next to images)')
+    parser.add_argument('--no-data-log', action='store_true',
+                       help='Do not append results to the StampZ data files')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Gauge every image even if unchanged since the last run')
+    parser.add_argument('-e', '--extensions', nargs='+', default=IMAGE_EXTENSIONS,
+                       help='Image extensions to include')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                       help='Show the engine debug output')
+
+    args = parser.parse_args()
+
+    folder_path = Path(args.folder).expanduser().resolve()
+    if not folder_path.is_dir():
+        print(f"❌ Error: Not a directory: {folder_path}")
+        sys.exit(1)
+
+    images = find_images(folder_path, recursive=args.recursive, extensions=args.extensions)
+    if not images:
+        print("\n⚠️  No images found matching criteria.")
+        sys.exit(0)
+
+    started = time.perf_counter()
+    rows, new_results = run_batch(
+        images,
+        cache_path=None if args.no_cache else folder_path / CACHE_FILENAME,
+        workers=max(1, args.workers),
+        fallback_dpi=args.default_dpi or default_dpi(),
+        forced_dpi=args.dpi,
+        use_hole_detection=not args.lines,
+        verbose=args.verbose
+    )
+
+    export_dir = None
+    if args.export_txt:
+        export_dir = Path(args.export_txt).expanduser()
+        export_dir.mkdir(parents=True, exist_ok=True)
+    write_results(new_results,
+                  log_to_data_file=not args.no_data_log,
+                  export_reports=args.export_txt is not None,
+                  export_dir=export_dir)
+
+    save_summary(rows, Path(args.csv).expanduser() if args.csv
+                 else folder_path / "perforation_summary.csv")
+
+    failed = sum(1 for r in rows if r['error'])
+    print(f"\n✅ Gauged {len(new_results)} images in {time.perf_counter() - started:.1f}s"
+          f" ({len(rows) - len(new_results) - failed} cached, {failed} failed)")
+
+
+if __name__ == '__main__':
+    main()
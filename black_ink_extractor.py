@@ -57,9 +57,107 @@ def safe_pil_fromarray(array, mode=None):
 import matplotlib.pyplot as plt
 from pathlib import Path
 import argparse
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def extract_black_ink(img_array, black_threshold=60, saturation_threshold=30, red_offset=40):
+# ---------------------------------------------------------------------------
+# Tiled extraction engine
+#
+# Per-pixel work is done in row strips so that float intermediates never
+# exist for the whole frame at once: peak scratch memory is a few strips per
+# worker regardless of scan size. Outputs (masks and result images) are
+# preallocated uint8/bool frames that each strip writes into in place.
+# ---------------------------------------------------------------------------
+
+# Rows per strip. 256 rows of a 6000px-wide scan is ~6 MB per float32 plane.
+STRIP_ROWS = 256
+
+# Upper bound on strip worker threads (NumPy releases the GIL in ufuncs)
+MAX_STRIP_WORKERS = 4
+
+_strip_scratch = threading.local()
+
+
+def _scratch(name, shape, dtype=np.float32):
+    """Per-thread reusable work buffer, reallocated only when it must grow."""
+    buffers = getattr(_strip_scratch, 'buffers', None)
+    if buffers is None:
+        buffers = _strip_scratch.buffers = {}
+    size = int(np.prod(shape))
+    buf = buffers.get(name)
+    if buf is None or buf.dtype != dtype or buf.size < size:
+        buf = buffers[name] = np.empty(size, dtype=dtype)
+    return buf[:size].reshape(shape)
+
+
+def _run_strips(func, height, strip_rows=STRIP_ROWS, max_workers=None):
+    """Call ``func(y0, y1)`` for every row strip and return results in order.
+
+    Strips run on a thread pool when there is more than one strip and more
+    than one worker; ``func`` must only write to its own rows.
+    """
+    strip_rows = max(1, int(strip_rows))
+    bounds = [(y, min(y + strip_rows, height)) for y in range(0, height, strip_rows)]
+    if max_workers is None:
+        max_workers = min(MAX_STRIP_WORKERS, os.cpu_count() or 1)
+    if max_workers <= 1 or len(bounds) <= 1:
+        return [func(y0, y1) for y0, y1 in bounds]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(bounds))) as pool:
+        return list(pool.map(lambda b: func(*b), bounds))
+
+
+def _channel_median(channel, strip_rows=STRIP_ROWS, max_workers=None):
+    """``np.median`` of one channel, via strip histograms for integer data."""
+    if channel.dtype not in (np.uint8, np.uint16):
+        return np.median(channel)
+    bins = 256 if channel.dtype == np.uint8 else 65536
+    hists = _run_strips(
+        lambda y0, y1: np.bincount(channel[y0:y1].ravel(), minlength=bins),
+        channel.shape[0], strip_rows, max_workers)
+    cumulative = np.cumsum(np.sum(hists, axis=0))
+    n = int(cumulative[-1])
+    lo = int(np.searchsorted(cumulative, (n - 1) // 2, side='right'))
+    hi = int(np.searchsorted(cumulative, n // 2, side='right'))
+    return np.float64(lo + hi) / 2
+
+
+def scale_to_uint8(img_array, divisor, work_dtype=np.float32,
+                   strip_rows=STRIP_ROWS, max_workers=None):
+    """Compute ``(img / divisor * 255).astype(uint8)`` strip by strip.
+
+    Gives the same result as the one-line expression evaluated in
+    ``work_dtype``, without a full-frame float copy of the image.
+    """
+    out = np.empty(img_array.shape, dtype=np.uint8)
+
+    def _strip(y0, y1):
+        buf = _scratch('scale', img_array[y0:y1].shape, work_dtype)
+        np.copyto(buf, img_array[y0:y1], casting='unsafe')
+        buf /= divisor
+        buf *= 255
+        np.copyto(out[y0:y1], buf, casting='unsafe')
+
+    _run_strips(_strip, img_array.shape[0], strip_rows, max_workers)
+    return out
+
+
+def _strip_brightness(rgb, brightness, hi=None, lo=None):
+    """Fill float32 ``brightness`` (and optional max/min channel) for a strip."""
+    np.copyto(brightness, rgb[:, :, 0], casting='unsafe')
+    brightness += rgb[:, :, 1]
+    brightness += rgb[:, :, 2]
+    brightness /= 3
+    if hi is not None:
+        np.maximum(rgb[:, :, 0], rgb[:, :, 1], out=hi, casting='unsafe')
+        np.maximum(hi, rgb[:, :, 2], out=hi, casting='unsafe')
+        np.minimum(rgb[:, :, 0], rgb[:, :, 1], out=lo, casting='unsafe')
+        np.minimum(lo, rgb[:, :, 2], out=lo, casting='unsafe')
+
+
+def extract_black_ink(img_array, black_threshold=60, saturation_threshold=30, red_offset=40,
+                      strip_rows=STRIP_ROWS, max_workers=None):
     """
     Extract black ink (cancellations) from colored stamp images.
     
@@ -68,71 +166,91 @@ def extract_black_ink(img_array, black_threshold=60, saturation_threshold=30, re
         black_threshold: Maximum brightness for black ink detection (0-255)
         saturation_threshold: Maximum color saturation for black ink (0-255)  
         red_offset: How much darker than median red channel to consider black
+        strip_rows: Rows per processing strip (bounds scratch memory)
+        max_workers: Strip worker threads (None = up to MAX_STRIP_WORKERS, 1 = serial)
     
     Returns:
         dict with extracted cancellation images and analysis
     """
+    height, width = img_array.shape[:2]
     
-    # Separate color channels
-    red = img_array[:, :, 0].astype(np.float32)
-    green = img_array[:, :, 1].astype(np.float32)  
-    blue = img_array[:, :, 2].astype(np.float32)
-    
-    # Calculate pixel characteristics
-    max_channel = np.maximum(np.maximum(red, green), blue)
-    min_channel = np.minimum(np.minimum(red, green), blue)
-    brightness = (red + green + blue) / 3
-    color_range = max_channel - min_channel
-    
-    # Method 1: True black ink detection
-    # Black ink should be dark in ALL channels with low color saturation
-    is_truly_black = (brightness < black_threshold) & (color_range < saturation_threshold)
-    
-    # Method 2: Red channel analysis (often best for cancellation visibility)
-    red_channel = img_array[:, :, 0]
-    red_median = np.median(red_channel)
+    # Method 2 threshold: red channel analysis (often best for cancellation
+    # visibility) needs the whole-image median before any strip is classified
+    red_median = _channel_median(img_array[:, :, 0], strip_rows, max_workers)
     red_dark_threshold = max(0, red_median - red_offset)
-    is_dark_in_red = red_channel < red_dark_threshold
     
-    # Combine both detection methods
-    black_ink_mask = is_truly_black | is_dark_in_red
+    black_ink_mask = np.empty((height, width), dtype=bool)
+    pure_black = np.empty((height, width), dtype=np.uint8)
+    grayscale = np.empty((height, width), dtype=np.uint8)
+    inverted = np.empty((height, width), dtype=np.uint8)
+    
+    def _classify(y0, y1):
+        rgb = img_array[y0:y1]
+        shape = rgb.shape[:2]
+        brightness = _scratch('brightness', shape)
+        hi = _scratch('max_channel', shape)
+        lo = _scratch('min_channel', shape)
+        test = _scratch('test', shape, bool)
+        _strip_brightness(rgb, brightness, hi, lo)
+        hi -= lo  # colour range
+        
+        # Method 1: True black ink detection
+        # Black ink should be dark in ALL channels with low color saturation
+        mask = black_ink_mask[y0:y1]
+        np.less(brightness, black_threshold, out=mask)
+        np.less(hi, saturation_threshold, out=test)
+        mask &= test
+        # Combine with method 2 (dark in red)
+        np.less(rgb[:, :, 0], red_dark_threshold, out=test)
+        mask |= test
+        
+        # Pure black on white, its inverse, and grayscale (ink density)
+        np.logical_not(mask, out=test)
+        np.multiply(test, 255, out=pure_black[y0:y1], casting='unsafe')
+        np.subtract(255, pure_black[y0:y1], out=inverted[y0:y1])
+        np.copyto(grayscale[y0:y1], brightness, casting='unsafe')
+        np.copyto(grayscale[y0:y1], 255, where=test)
+        
+        values = brightness[mask]
+        if values.size == 0:
+            return 0, 0.0, None, None
+        return values.size, float(np.sum(values, dtype=np.float64)), values.min(), values.max()
+    
+    strip_stats = _run_strips(_classify, height, strip_rows, max_workers)
+    cancellation_pixels = sum(s[0] for s in strip_stats)
     
     # Create extraction results
-    results = {}
+    results = {
+        'pure_black': pure_black,
+        'grayscale': grayscale,
+        'inverted': inverted,
+        'enhanced': grayscale,
+    }
     
-    # Pure black on white (high contrast for reading)
-    results['pure_black'] = np.where(black_ink_mask, 0, 255).astype(np.uint8)
-    
-    # Grayscale cancellation (preserves ink density variations)
-    results['grayscale'] = np.where(black_ink_mask, brightness.astype(np.uint8), 255)
-    
-    # Inverted version (white text on black background)
-    results['inverted'] = 255 - results['pure_black']
-    
-    # Enhanced contrast version
-    cancellation_values = np.where(black_ink_mask, brightness, 255)
-    # Stretch contrast of cancellation areas
-    if np.any(black_ink_mask):
-        cancel_pixels = cancellation_values[black_ink_mask]
-        if len(cancel_pixels) > 0:
-            min_val, max_val = cancel_pixels.min(), cancel_pixels.max()
-            if max_val > min_val:
-                enhanced = np.where(
-                    black_ink_mask,
-                    ((cancellation_values - min_val) / (max_val - min_val) * 255).astype(np.uint8),
-                    255
-                )
-                results['enhanced'] = enhanced
-            else:
-                results['enhanced'] = results['grayscale']
-        else:
-            results['enhanced'] = results['grayscale']
-    else:
-        results['enhanced'] = results['grayscale']
+    # Enhanced contrast version: stretch the cancellation brightness range
+    if cancellation_pixels > 0:
+        min_val = min(s[2] for s in strip_stats if s[0])
+        max_val = max(s[3] for s in strip_stats if s[0])
+        if max_val > min_val:
+            enhanced = np.empty((height, width), dtype=np.uint8)
+            span = max_val - min_val
+            
+            def _stretch(y0, y1):
+                rgb = img_array[y0:y1]
+                brightness = _scratch('brightness', rgb.shape[:2])
+                _strip_brightness(rgb, brightness)
+                brightness -= min_val
+                brightness /= span
+                brightness *= 255
+                np.copyto(enhanced[y0:y1], 255)
+                np.copyto(enhanced[y0:y1], brightness, casting='unsafe',
+                          where=black_ink_mask[y0:y1])
+            
+            _run_strips(_stretch, height, strip_rows, max_workers)
+            results['enhanced'] = enhanced
     
     # Analysis
     total_pixels = black_ink_mask.size
-    cancellation_pixels = np.sum(black_ink_mask)
     coverage_percentage = (cancellation_pixels / total_pixels) * 100
     
     analysis = {
@@ -143,7 +261,9 @@ def extract_black_ink(img_array, black_threshold=60, saturation_threshold=30, re
         'red_threshold': red_dark_threshold,
         'black_threshold_used': black_threshold,
         'saturation_threshold_used': saturation_threshold,
-        'avg_cancellation_brightness': np.mean(brightness[black_ink_mask]) if np.any(black_ink_mask) else 0
+        'avg_cancellation_brightness': (
+            sum(s[1] for s in strip_stats) / cancellation_pixels if cancellation_pixels else 0
+        )
     }
     
     return results, black_ink_mask, analysis
@@ -192,11 +312,15 @@ def extract_black_stamp_background(img_array, black_threshold=60):
     
     return result, black_mask
 
-def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', color_threshold=40, dark_background_mode=True, strictness=15, black_subtraction=True):
+def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', color_threshold=40, dark_background_mode=True, strictness=15, black_subtraction=True,
+                                          strip_rows=STRIP_ROWS, max_workers=None):
     """
     RGB-only fallback method for colored cancellation extraction.
     
     This method avoids HSV conversion issues by using only RGB channel analysis.
+    Per-pixel colour tests run in row strips (see ``STRIP_ROWS``); only the
+    uint8 mask is ever processed as a whole frame, for the morphology and
+    connected-component filtering.
     """
     print(f"DEBUG: Using RGB-only extraction for {cancellation_color}")
     print(f"DEBUG: Input array dtype: {img_array.dtype}, shape: {img_array.shape}")
@@ -219,8 +343,10 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
         print(f"DEBUG: Converting from {img_array.dtype} to uint8")
         if img_array.dtype in [np.uint16, np.int16, np.int32, np.int64]:
             # Scale down from higher bit depths
-            if img_array.max() > 255:
-                img_array = (img_array.astype(np.float64) / img_array.max() * 255).astype(np.uint8)
+            max_value = img_array.max()
+            if max_value > 255:
+                img_array = scale_to_uint8(img_array, float(max_value), np.float64,
+                                           strip_rows, max_workers)
             else:
                 img_array = img_array.astype(np.uint8)
         elif img_array.dtype in [np.float32, np.float64]:
@@ -233,101 +359,135 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
             # Fallback for any other types
             img_array = np.clip(img_array.astype(np.float64), 0, 255).astype(np.uint8)
     
-    # Ensure values are in valid range
-    img_array = np.clip(img_array, 0, 255)
+    # From here on img_array is uint8, so values are already in 0-255
     print(f"DEBUG: Final array dtype: {img_array.dtype}, range: {img_array.min()}-{img_array.max()}")
     
-    red = img_array[:, :, 0].astype(np.float32)
-    green = img_array[:, :, 1].astype(np.float32)
-    blue = img_array[:, :, 2].astype(np.float32)
+    height, width = img_array.shape[:2]
+    color_mask = np.zeros((height, width), dtype=bool)
+    is_black_stamp = False
+    img_without_black = None
+    
+    def _channels(rgb):
+        """float32 views of a strip's channels in per-thread scratch buffers."""
+        planes = []
+        for ch, name in enumerate(('red', 'green', 'blue')):
+            plane = _scratch(name, rgb.shape[:2])
+            np.copyto(plane, rgb[:, :, ch], casting='unsafe')
+            planes.append(plane)
+        return planes
     
     # Enhanced RGB-based color detection with dark background handling
     if cancellation_color == 'red':
         # Special case: If this is a black stamp (like Penny Black) with red cancellation,
         # ANY red tint should be considered cancellation since the stamp has no red design
-        overall_brightness = (red + green + blue) / 3
-        is_black_stamp = np.mean(overall_brightness) < 100  # Very dark stamp overall
+        channel_sums = _run_strips(
+            lambda y0, y1: int(np.sum(img_array[y0:y1], dtype=np.uint64)),
+            height, strip_rows, max_workers)
+        mean_brightness = sum(channel_sums) / (3.0 * height * width)
+        is_black_stamp = mean_brightness < 100  # Very dark stamp overall
         
         if is_black_stamp and black_subtraction:
             print("DEBUG: Detected black stamp (like Penny Black) - using black subtraction approach")
             
             # Step 1: Remove the black stamp design first
+            # (extract_black_stamp_background, one strip at a time)
             black_threshold_for_removal = min(80, 50 + color_threshold)  # Adjust based on sensitivity
-            img_without_black, removed_black_mask = extract_black_stamp_background(img_array, black_threshold_for_removal)
-            
-            # Step 2: Now detect red in the remaining image (which should mostly be red cancellation)
-            red_remaining = img_without_black[:, :, 0].astype(np.float32)
-            green_remaining = img_without_black[:, :, 1].astype(np.float32)
-            blue_remaining = img_without_black[:, :, 2].astype(np.float32)
+            print(f"DEBUG: Extracting black background with threshold {black_threshold_for_removal}")
+            img_without_black = np.empty_like(img_array)
             
-            # In the remaining image, look for any red tint (since black stamp is removed)
-            # This should be much cleaner now
-            non_white_mask = (red_remaining < 250) | (green_remaining < 250) | (blue_remaining < 250)
-            red_bias = (red_remaining > green_remaining + 5) & (red_remaining > blue_remaining + 5)
-            
-            # Combine: non-white areas that have red bias
-            color_mask = non_white_mask & red_bias
+            def _red_after_black_removal(y0, y1):
+                rgb = img_array[y0:y1]
+                remaining = img_without_black[y0:y1]
+                brightness = np.add.reduce(rgb, axis=2, dtype=np.float64)
+                brightness /= 3
+                black = brightness < black_threshold_for_removal
+                remaining[...] = rgb
+                remaining[black] = 255  # Make black areas white
+                
+                # Step 2: Now detect red in the remaining image (which should mostly be red cancellation)
+                red_remaining, green_remaining, blue_remaining = _channels(remaining)
+                
+                # In the remaining image, look for any red tint (since black stamp is removed)
+                non_white_mask = (red_remaining < 250) | (green_remaining < 250) | (blue_remaining < 250)
+                red_bias = (red_remaining > green_remaining + 5) & (red_remaining > blue_remaining + 5)
+                
+                # Combine: non-white areas that have red bias
+                np.logical_and(non_white_mask, red_bias, out=color_mask[y0:y1])
+                return int(np.count_nonzero(black))
             
+            removed = sum(_run_strips(_red_after_black_removal, height, strip_rows, max_workers))
+            print(f"DEBUG: Removed {removed} black pixels ({removed/(height*width)*100:.1f}%)")
             print(f"DEBUG: After black removal, found {np.sum(color_mask)} red pixels")
             
         elif is_black_stamp:
             print("DEBUG: Detected black stamp - using direct red detection (no black subtraction)")
             # Fall back to the previous direct detection method
             # Calculate background red level
-            background_red = np.percentile(red, 50)
-            background_green = np.percentile(green, 50) 
-            background_blue = np.percentile(blue, 50)
+            background_red = _channel_median(img_array[:, :, 0], strip_rows, max_workers)
+            background_green = _channel_median(img_array[:, :, 1], strip_rows, max_workers)
+            background_blue = _channel_median(img_array[:, :, 2], strip_rows, max_workers)
             
             print(f"DEBUG: Background levels - R:{background_red:.1f}, G:{background_green:.1f}, B:{background_blue:.1f}")
             
             # Look for pixels significantly redder than background
             red_enhancement_threshold = max(8, color_threshold // 3)
-            red_enhanced = red > (background_red + red_enhancement_threshold)
-            
-            # Also ensure red is dominant
-            red_dominance = (red > green + 3) & (red > blue + 3)
             
-            # Combine
-            color_mask = red_enhanced & red_dominance
+            def _direct_red(y0, y1):
+                red, green, blue = _channels(img_array[y0:y1])
+                red_enhanced = red > (background_red + red_enhancement_threshold)
+                # Also ensure red is dominant
+                red_dominance = (red > green + 3) & (red > blue + 3)
+                np.logical_and(red_enhanced, red_dominance, out=color_mask[y0:y1])
             
+            _run_strips(_direct_red, height, strip_rows, max_workers)
             print(f"DEBUG: Direct detection found {np.sum(color_mask)} pixels")
             
         else:
-            # Method 1: Traditional dominance for bright areas (colored stamps)
-            bright_mask = red > 100
-            dominance_mask = (red > green + color_threshold) & (red > blue + color_threshold)
-            traditional_red = bright_mask & dominance_mask
+            # Method 2 sensitivity: in dark areas, look for any red bias, even if subtle
+            red_bias_threshold = max(5, color_threshold // 4)
             
-            if dark_background_mode:
+            def _colored_stamp_red(y0, y1):
+                red, green, blue = _channels(img_array[y0:y1])
+                overall_brightness = _scratch('brightness', red.shape)
+                np.add(red, green, out=overall_brightness)
+                overall_brightness += blue
+                overall_brightness /= 3
+                
+                # Method 1: Traditional dominance for bright areas (colored stamps)
+                bright_mask = red > 100
+                dominance_mask = (red > green + color_threshold) & (red > blue + color_threshold)
+                traditional_red = bright_mask & dominance_mask
+                if not dark_background_mode:
+                    color_mask[y0:y1] = traditional_red
+                    return int(np.count_nonzero(traditional_red)), 0, 0
+                
                 # Method 2: Enhanced detection for dark backgrounds (colored stamps)
                 dark_areas = overall_brightness < 80  # Very dark areas
-                
-                # In dark areas, look for any red bias, even if subtle
-                red_bias_threshold = max(5, color_threshold // 4)  # Much more sensitive
                 red_tint = (red > green + red_bias_threshold) & (red > blue + red_bias_threshold)
-                
                 # Additional check: red should be the strongest channel in dark areas
                 red_strongest_dark = (red >= green) & (red >= blue)
-                
-                # For dark areas, combine red tint with red being strongest channel
                 dark_red = dark_areas & red_tint & red_strongest_dark
                 
                 # Method 3: Relative red enhancement detection
-                if overall_brightness.max() > 0:
-                    red_ratio = red / (overall_brightness + 1)
-                    enhanced_red_areas = red_ratio > 1.1
-                    moderate_dark = (overall_brightness < 120) & (overall_brightness > 30)
-                    relative_red = moderate_dark & enhanced_red_areas
-                else:
-                    relative_red = np.zeros_like(red, dtype=bool)
+                # (an all-black image has no moderate-dark pixels, so this
+                # needs no whole-image brightness check)
+                moderate_dark = (overall_brightness < 120) & (overall_brightness > 30)
+                overall_brightness += 1
+                np.divide(red, overall_brightness, out=overall_brightness)
+                relative_red = moderate_dark & (overall_brightness > 1.1)
                 
                 # Combine all detection methods
-                color_mask = traditional_red | dark_red | relative_red
-                print(f"DEBUG: Red detection - Traditional: {np.sum(traditional_red)}, Dark: {np.sum(dark_red)}, Relative: {np.sum(relative_red)}")
+                mask = color_mask[y0:y1]
+                np.logical_or(traditional_red, dark_red, out=mask)
+                mask |= relative_red
+                return (int(np.count_nonzero(traditional_red)), int(np.count_nonzero(dark_red)),
+                        int(np.count_nonzero(relative_red)))
+            
+            counts = np.sum(_run_strips(_colored_stamp_red, height, strip_rows, max_workers), axis=0)
+            if dark_background_mode:
+                print(f"DEBUG: Red detection - Traditional: {counts[0]}, Dark: {counts[1]}, Relative: {counts[2]}")
             else:
-                # Standard detection only
-                color_mask = traditional_red
-                print(f"DEBUG: Red detection - Traditional only: {np.sum(traditional_red)}")
+                print(f"DEBUG: Red detection - Traditional only: {counts[0]}")
         
         # For black stamps (Penny Black), skip aggressive filtering since any red is cancellation
         if is_black_stamp:
@@ -335,7 +495,7 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
             # Just do basic cleanup
             try:
                 import cv2
-                mask_uint8 = (color_mask * 255).astype(np.uint8)
+                mask_uint8 = color_mask.astype(np.uint8) * np.uint8(255)
                 kernel_small = np.ones((2,2), np.uint8)
                 # Just remove single pixel noise
                 mask_uint8 = cv2.morphologyEx(mask_uint8, cv2.MORPH_OPEN, kernel_small)
@@ -354,7 +514,7 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
                 kernel_small = np.ones((3,3), np.uint8)
                 
                 # Convert to uint8 for morphological operations
-                mask_uint8 = (color_mask * 255).astype(np.uint8)
+                mask_uint8 = color_mask.astype(np.uint8) * np.uint8(255)
                 
                 # Close small gaps in cancellation lines
                 mask_uint8 = cv2.morphologyEx(mask_uint8, cv2.MORPH_CLOSE, kernel_small)
@@ -366,30 +526,35 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
                 # (cancellations are usually lines/text, not large solid areas)
                 num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask_uint8, connectivity=8)
                 
-                filtered_mask = np.zeros_like(mask_uint8)
                 total_image_area = mask_uint8.shape[0] * mask_uint8.shape[1]
                 
-                for i in range(1, num_labels):  # Skip background (label 0)
-                    area = stats[i, cv2.CC_STAT_AREA]
-                    # Remove components that are too large (likely stamp design, not cancellation)
-                    # or too small (likely noise)
-                    if 10 < area < (total_image_area * 0.15):  # Between 10 pixels and 15% of image
-                        filtered_mask[labels == i] = 255
+                # Remove components that are too large (likely stamp design, not cancellation)
+                # or too small (likely noise): keep between 10 pixels and 15% of image.
+                # One lookup over the label image instead of a full-frame pass per label.
+                areas = stats[:, cv2.CC_STAT_AREA]
+                keep = (areas > 10) & (areas < (total_image_area * 0.15))
+                keep[0] = False  # background
                 
-                color_mask = filtered_mask > 0
-    elif cancellation_color == 'blue':
-        # Blue should dominate over red and green  
-        color_mask = (blue > red + color_threshold) & (blue > green + color_threshold)
-        color_mask = color_mask & (blue > 100)
-    elif cancellation_color == 'green':
-        # Green should dominate over red and blue
-        color_mask = (green > red + color_threshold) & (green > blue + color_threshold)
-        color_mask = color_mask & (green > 100)
+                color_mask = keep[labels]
     else:
-        color_mask = np.zeros_like(red, dtype=bool)
+        def _dominant_channel(y0, y1):
+            red, green, blue = _channels(img_array[y0:y1])
+            if cancellation_color == 'blue':
+                # Blue should dominate over red and green
+                target, others = blue, (red, green)
+            else:
+                # Green should dominate over red and blue
+                target, others = green, (red, blue)
+            mask = color_mask[y0:y1]
+            np.greater(target, others[0] + color_threshold, out=mask)
+            mask &= target > others[1] + color_threshold
+            mask &= target > 100
+        
+        if cancellation_color in ('blue', 'green'):
+            _run_strips(_dominant_channel, height, strip_rows, max_workers)
     
     # Convert to uint8 mask
-    mask_uint8 = (color_mask * 255).astype(np.uint8)
+    mask_uint8 = color_mask.astype(np.uint8) * np.uint8(255)
     
     # Clean up the mask if OpenCV is available
     try:
@@ -403,63 +568,62 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
     # Convert back to boolean
     final_mask = mask_uint8 > 127
     
-    # Create extraction results
+    # Create extraction results, one strip at a time
     results = {}
-    gray = np.mean(img_array, axis=2).astype(np.uint8)
+    gray = np.empty((height, width), dtype=np.uint8)
+    color_preserved = np.empty_like(img_array)
+    grayscale = np.empty((height, width), dtype=np.uint8)
+    
+    def _render(y0, y1):
+        rgb = img_array[y0:y1]
+        mask = final_mask[y0:y1]
+        brightness = np.add.reduce(rgb, axis=2, dtype=np.float64)
+        brightness /= 3
+        np.copyto(gray[y0:y1], brightness, casting='unsafe')
+        # Preserve original colors of the cancellation on white
+        color_preserved[y0:y1] = 255
+        np.copyto(color_preserved[y0:y1], rgb, where=mask[:, :, None])
+        # Grayscale version
+        grayscale[y0:y1] = 255
+        np.copyto(grayscale[y0:y1], gray[y0:y1], where=mask)
+        values = gray[y0:y1][mask]
+        if values.size == 0:
+            return 0, 0, None, None
+        return values.size, int(np.sum(values, dtype=np.uint64)), values.min(), values.max()
+    
+    strip_stats = _run_strips(_render, height, strip_rows, max_workers)
+    cancellation_pixels = sum(s[0] for s in strip_stats)
     
     # If we used black subtraction on a black stamp, save the intermediate result
-    if is_black_stamp and black_subtraction and 'img_without_black' in locals():
-        results['black_removed'] = img_without_black.astype(np.uint8)
+    if img_without_black is not None:
+        results['black_removed'] = img_without_black
     
     # 1. Pure colored cancellation on white
     results['pure_colored'] = np.where(final_mask, 0, 255).astype(np.uint8)
     
-    # 2. Preserve original colors of the cancellation
-    try:
-        color_preserved = np.where(
-            np.stack([final_mask, final_mask, final_mask], axis=2),
-            img_array,
-            [255, 255, 255]
-        )
-        # Ensure PIL-compatible dtype
-        if color_preserved.dtype != np.uint8:
-            color_preserved = color_preserved.astype(np.uint8)
-        results['color_preserved'] = color_preserved
-    except Exception as e:
-        print(f"WARNING: Could not create color-preserved result: {e}")
-        # Fallback: create white image with same dimensions
-        results['color_preserved'] = np.full_like(img_array, 255, dtype=np.uint8)
-    
-    # 3. Grayscale version
-    try:
-        grayscale = np.where(final_mask, gray, 255)
-        results['grayscale'] = grayscale.astype(np.uint8)
-    except Exception as e:
-        print(f"WARNING: Could not create grayscale result: {e}")
-        results['grayscale'] = np.full((img_array.shape[0], img_array.shape[1]), 255, dtype=np.uint8)
+    # 2. Color-preserved and 3. grayscale versions
+    results['color_preserved'] = color_preserved
+    results['grayscale'] = grayscale
     
     # 4. Enhanced contrast version
-    if np.any(final_mask):
-        cancellation_values = gray[final_mask]
-        if len(cancellation_values) > 0:
-            min_val, max_val = cancellation_values.min(), cancellation_values.max()
-            if max_val > min_val:
-                enhanced = np.where(
-                    final_mask,
-                    ((gray - min_val) / (max_val - min_val) * 255).astype(np.uint8),
-                    255
-                )
-                results['enhanced'] = enhanced
-            else:
-                results['enhanced'] = results['grayscale']
-        else:
-            results['enhanced'] = results['grayscale']
-    else:
-        results['enhanced'] = results['grayscale']
+    results['enhanced'] = results['grayscale']
+    if cancellation_pixels > 0:
+        min_val = min(s[2] for s in strip_stats if s[0])
+        max_val = max(s[3] for s in strip_stats if s[0])
+        if max_val > min_val:
+            enhanced = np.empty((height, width), dtype=np.uint8)
+            
+            def _stretch(y0, y1):
+                mask = final_mask[y0:y1]
+                out = enhanced[y0:y1]
+                out[...] = 255
+                out[mask] = ((gray[y0:y1][mask] - min_val) / (max_val - min_val) * 255).astype(np.uint8)
+            
+            _run_strips(_stretch, height, strip_rows, max_workers)
+            results['enhanced'] = enhanced
     
     # Analysis
     total_pixels = final_mask.size
-    cancellation_pixels = np.sum(final_mask)
     coverage_percentage = (cancellation_pixels / total_pixels) * 100
     
     analysis = {
@@ -469,7 +633,9 @@ def extract_colored_cancellation_rgb_only(img_array, cancellation_color='red', c
         'cancellation_color': cancellation_color,
         'color_threshold_used': color_threshold,
         'saturation_threshold_used': 'N/A (RGB-only mode)',
-        'avg_cancellation_brightness': np.mean(gray[final_mask]) if cancellation_pixels > 0 else 0,
+        'avg_cancellation_brightness': (
+            sum(s[1] for s in strip_stats) / cancellation_pixels if cancellation_pixels > 0 else 0
+        ),
         'extraction_method': f'RGB-only with dark background mode: {dark_background_mode}',
         'dark_background_mode': dark_background_mode
     }
@@ -629,6 +795,230 @@ def save_analysis_report(analysis, save_path, filename, black_thresh, sat_thresh
         f.write("  - *_detection_mask.png (Detection mask)\n")
         f.write("  - *_comparison.png (Side-by-side comparison)\n")
 
+# ---------------------------------------------------------------------------
+# Parameter sweeps
+#
+# A sweep runs every (black_threshold, saturation_threshold, red_offset)
+# combination over a set of images. Each image is decoded once and its
+# per-pixel planes (brightness, colour range) are computed once; the three
+# threshold tests are then evaluated once per distinct value, so each
+# combination only costs two boolean operations plus its output files.
+# ---------------------------------------------------------------------------
+
+class BlackInkPlanes:
+    """Per-pixel quantities shared by every black-ink parameter combination.
+
+    Attributes:
+        red: Red channel of the source (view, original dtype)
+        brightness: float32 mean of R, G, B (same values as extract_black_ink)
+        color_range: float32 max channel minus min channel
+        red_median: Median of the red channel
+    """
+
+    def __init__(self, img_array, strip_rows=STRIP_ROWS, max_workers=None):
+        height, width = img_array.shape[:2]
+        self.shape = (height, width)
+        self.red = img_array[:, :, 0]
+        self.brightness = np.empty((height, width), dtype=np.float32)
+        self.color_range = np.empty((height, width), dtype=np.float32)
+
+        def _planes(y0, y1):
+            lo = _scratch('min_channel', (y1 - y0, width))
+            _strip_brightness(img_array[y0:y1], self.brightness[y0:y1],
+                              self.color_range[y0:y1], lo)
+            self.color_range[y0:y1] -= lo
+
+        _run_strips(_planes, height, strip_rows, max_workers)
+        self.red_median = _channel_median(self.red, strip_rows, max_workers)
+        self._tests = {}
+
+    def _test(self, kind, value):
+        """Cached boolean plane for one threshold test."""
+        key = (kind, value)
+        if key not in self._tests:
+            if kind == 'black':
+                self._tests[key] = self.brightness < value
+            elif kind == 'saturation':
+                self._tests[key] = self.color_range < value
+            else:
+                self._tests[key] = self.red < max(0, self.red_median - value)
+        return self._tests[key]
+
+    def mask(self, black_threshold, saturation_threshold, red_offset):
+        """Black ink mask for one parameter combination (as extract_black_ink)."""
+        mask = self._test('black', black_threshold) & self._test('saturation', saturation_threshold)
+        mask |= self._test('red', red_offset)
+        return mask
+
+    def sweep_statistics(self, black_thresholds, saturation_thresholds, red_offsets,
+                         strip_rows=STRIP_ROWS, max_workers=None):
+        """Pixel count and brightness sum of the mask for every combination.
+
+        Each threshold test is monotone in its parameter, so a pixel is
+        fully described by how many of the sorted values each test passes
+        for. One pass bins pixels by that triple; every combination is then
+        a selection over the small (nb+1)×(ns+1)×(nr+1) grid of bins.
+
+        Returns:
+            Dict mapping (black, saturation, red_offset) to
+            ``(cancellation_pixels, brightness_sum)``
+        """
+        b_values = np.unique(np.asarray(black_thresholds, dtype=np.float64))
+        s_values = np.unique(np.asarray(saturation_thresholds, dtype=np.float64))
+        r_limits = {ro: max(0, self.red_median - ro) for ro in red_offsets}
+        r_values = np.unique(np.asarray(list(r_limits.values()), dtype=np.float64))
+        grid = (len(b_values) + 1, len(s_values) + 1, len(r_values) + 1)
+        n_bins = int(np.prod(grid))
+
+        def _bin(y0, y1):
+            index = np.searchsorted(b_values, self.brightness[y0:y1].ravel(), side='right')
+            index *= grid[1]
+            index += np.searchsorted(s_values, self.color_range[y0:y1].ravel(), side='right')
+            index *= grid[2]
+            index += np.searchsorted(r_values, self.red[y0:y1].ravel(), side='right')
+            return (np.bincount(index, minlength=n_bins),
+                    np.bincount(index, weights=self.brightness[y0:y1].ravel(), minlength=n_bins))
+
+        binned = _run_strips(_bin, self.shape[0], strip_rows, max_workers)
+        counts = np.sum([b[0] for b in binned], axis=0).reshape(grid)
+        sums = np.sum([b[1] for b in binned], axis=0).reshape(grid)
+        kb, ks, kr = np.indices(grid)
+
+        stats = {}
+        for bt in black_thresholds:
+            i = int(np.searchsorted(b_values, bt))
+            for st in saturation_thresholds:
+                j = int(np.searchsorted(s_values, st))
+                for ro in red_offsets:
+                    k = int(np.searchsorted(r_values, r_limits[ro]))
+                    # test passes for sorted value n iff the pixel's bin <= n
+                    selected = ((kb <= i) & (ks <= j)) | (kr <= k)
+                    stats[(bt, st, ro)] = (int(counts[selected].sum()), float(sums[selected].sum()))
+        return stats
+
+    def analysis(self, black_threshold, saturation_threshold, red_offset,
+                 cancellation_pixels, brightness_sum):
+        """Analysis dict for one combination, with the same keys as extract_black_ink."""
+        total_pixels = self.shape[0] * self.shape[1]
+        return {
+            'coverage_percentage': (cancellation_pixels / total_pixels) * 100,
+            'total_pixels': total_pixels,
+            'cancellation_pixels': cancellation_pixels,
+            'red_median': self.red_median,
+            'red_threshold': max(0, self.red_median - red_offset),
+            'black_threshold_used': black_threshold,
+            'saturation_threshold_used': saturation_threshold,
+            'avg_cancellation_brightness': (
+                brightness_sum / cancellation_pixels if cancellation_pixels else 0
+            ),
+        }
+
+
+def _write_sweep_outputs(mask, analysis, out_dir, prefix, image_name, params):
+    """Write one combination's mask PNG and analysis report."""
+    # Fast zlib level: sweeps write hundreds of masks and they stay lossless
+    Image.fromarray(mask.astype(np.uint8) * np.uint8(255)).save(
+        out_dir / f"{prefix}_detection_mask.png", compress_level=1
+    )
+    save_analysis_report(analysis, out_dir / f"{prefix}_analysis.txt", image_name, *params)
+
+
+def _finish_write(future):
+    """Wait for a queued sweep write, reporting (not raising) failures."""
+    try:
+        future.result()
+    except Exception as e:
+        print(f"✗ Error writing sweep output: {e}")
+
+
+def sweep_black_ink(image_paths, black_thresholds=(60,), saturation_thresholds=(30,),
+                    red_offsets=(40,), output_dir=None, write_outputs=True, max_workers=None):
+    """Run a grid of black ink parameters over many images.
+
+    Args:
+        image_paths: Image files to process
+        black_thresholds: Values swept for ``black_threshold``
+        saturation_thresholds: Values swept for ``saturation_threshold``
+        red_offsets: Values swept for ``red_offset``
+        output_dir: Root output directory; each image gets a subdirectory.
+            Defaults to ``black_ink_sweep`` next to the first image.
+        write_outputs: Write a mask PNG and analysis report per combination
+        max_workers: Threads for plane computation and file writing
+
+    Returns:
+        List of summary dicts, one per (image, combination)
+    """
+    import itertools
+    
+    image_paths = [Path(p) for p in image_paths]
+    combos = list(itertools.product(black_thresholds, saturation_thresholds, red_offsets))
+    if not image_paths or not combos:
+        return []
+    if output_dir is None:
+        output_dir = image_paths[0].parent / "black_ink_sweep"
+    output_dir = Path(output_dir)
+    if max_workers is None:
+        max_workers = min(MAX_STRIP_WORKERS, os.cpu_count() or 1)
+    
+    print(f"Sweeping {len(combos)} parameter combinations over {len(image_paths)} image(s)")
+    summary = []
+    with ThreadPoolExecutor(max_workers=max_workers) as writer:
+        pending = []
+        for image_path in image_paths:
+            try:
+                pil_image = Image.open(image_path)
+                if pil_image.mode != 'RGB':
+                    pil_image = pil_image.convert('RGB')
+                planes = BlackInkPlanes(np.array(pil_image), max_workers=max_workers)
+            except Exception as e:
+                print(f"✗ Error loading {image_path.name}: {e}")
+                continue
+            
+            image_dir = output_dir / image_path.stem
+            if write_outputs:
+                image_dir.mkdir(parents=True, exist_ok=True)
+            
+            stats = planes.sweep_statistics(black_thresholds, saturation_thresholds,
+                                            red_offsets, max_workers=max_workers)
+            for params in combos:
+                analysis = planes.analysis(*params, *stats[params])
+                prefix = "b{}_s{}_r{}".format(*params)
+                if write_outputs:
+                    mask = planes.mask(*params)
+                    # Bound queued masks so a large grid can't pile up in memory
+                    while len(pending) >= 4 * max_workers:
+                        _finish_write(pending.pop(0))
+                    pending.append(writer.submit(
+                        _write_sweep_outputs, mask, analysis, image_dir, prefix,
+                        image_path.name, params,
+                    ))
+                summary.append({
+                    'image': image_path.name,
+                    'black_threshold': params[0],
+                    'saturation_threshold': params[1],
+                    'red_offset': params[2],
+                    'coverage_percentage': analysis['coverage_percentage'],
+                    'cancellation_pixels': analysis['cancellation_pixels'],
+                    'red_median': analysis['red_median'],
+                    'avg_cancellation_brightness': analysis['avg_cancellation_brightness'],
+                })
+            print(f"✓ {image_path.name}: {len(combos)} combinations")
+            del planes  # release this image's planes before decoding the next
+        
+        for future in pending:
+            _finish_write(future)
+    
+    if summary:
+        import csv
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with open(output_dir / "sweep_summary.csv", 'w', newline='') as f:
+            writer_csv = csv.DictWriter(f, fieldnames=list(summary[0].keys()))
+            writer_csv.writeheader()
+            writer_csv.writerows(summary)
+        print(f"Sweep summary saved to: {output_dir / 'sweep_summary.csv'}")
+    
+    return summary
+
 def main():
     """Main command line interface."""
     
@@ -648,6 +1038,11 @@ Examples:
   
   # Custom output directory
   python3 black_ink_extractor.py stamp.tif --output /path/to/results/
+  
+  # Parameter sweep (5x5x5 grid) over a directory of scans
+  python3 black_ink_extractor.py /path/to/stamps/ --batch --sweep \\
+      --black-thresholds 40 50 60 70 80 --saturation-thresholds 20 25 30 35 40 \\
+      --red-offsets 20 30 40 50 60
         """
     )
     
@@ -661,12 +1056,47 @@ Examples:
                        help='Color saturation threshold (0-255, default: 30)')
     parser.add_argument('--red-offset', type=int, default=40,
                        help='Red channel detection offset (default: 40)')
+    parser.add_argument('--sweep', action='store_true',
+                       help='Run a parameter sweep (writes masks, reports and sweep_summary.csv)')
+    parser.add_argument('--black-thresholds', type=int, nargs='+',
+                       help='Sweep values for --black-threshold')
+    parser.add_argument('--saturation-thresholds', type=int, nargs='+',
+                       help='Sweep values for --saturation-threshold')
+    parser.add_argument('--red-offsets', type=int, nargs='+',
+                       help='Sweep values for --red-offset')
+    parser.add_argument('--workers', type=int, default=None,
+                       help=f'Worker threads (default: up to {MAX_STRIP_WORKERS})')
     
     args = parser.parse_args()
     
     input_path = Path(args.input_path)
     
-    if args.batch and input_path.is_dir():
+    if args.sweep:
+        if args.batch and input_path.is_dir():
+            image_extensions = {'.tif', '.tiff', '.jpg', '.jpeg', '.png', '.bmp'}
+            image_files = sorted(f for f in input_path.iterdir()
+                                 if f.suffix.lower() in image_extensions)
+        elif input_path.is_file():
+            image_files = [input_path]
+        else:
+            print(f"Invalid path: {input_path}")
+            parser.print_help()
+            sys.exit(1)
+        
+        if not image_files:
+            print(f"No image files found in {input_path}")
+            sys.exit(1)
+        
+        sweep_black_ink(
+            image_files,
+            black_thresholds=args.black_thresholds or [args.black_threshold],
+            saturation_thresholds=args.saturation_thresholds or [args.saturation_threshold],
+            red_offsets=args.red_offsets or [args.red_offset],
+            output_dir=args.output,
+            max_workers=args.workers,
+        )
+        
+    elif args.batch and input_path.is_dir():
         # Batch processing
         image_extensions = {'.tif', '.tiff', '.jpg', '.jpeg', '.png', '.bmp'}
         image_files = [f for f in input_path.iterdir() 
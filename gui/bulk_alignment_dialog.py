@@ -410,7 +410,8 @@ class BulkAlignmentDialog:
             successful, failed = self.alignment_manager.bulk_align_images(
                 self.selected_files,
                 self.output_directory,
-                progress_callback=self._progress_callback
+                progress_callback=self._progress_callback,
+                use_processes=False  # GUI may be a frozen build; threads are safe everywhere
             )
             
             # Show results
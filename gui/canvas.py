@@ -69,6 +69,8 @@ class CropCanvas(tk.Canvas):
         from utils.live_sample_model import LiveSampleModel
         self.live_model = LiveSampleModel()
         self.live_model.on_change(self._on_live_model_change)
+        # Coalesce HUD redraws to one per frame while markers are dragged
+        self.live_model.set_notify_scheduler(self, interval_ms=16)
         # Track the marker most recently clicked/placed/moved so arrow-key
         # nudging and the right-click menu know which sample to act on.
         self._last_selected_marker_index: Optional[int] = None
@@ -1124,8 +1126,9 @@ class CropCanvas(tk.Canvas):
         """Redraw all (few) markers when the live model changes.
         
         Because every sample's ΔE shifts when the group average shifts, we
-        simply redraw every marker. N ≤ max_samples (typically 6) so this is
-        cheaper than tracking per-marker canvas items.
+        simply redraw every marker. The model coalesces notifications to
+        one per frame (see ``set_notify_scheduler``), so drags with many
+        markers still redraw at most once per frame.
         """
         try:
             for marker in self._coord_markers:
@@ -50,6 +50,9 @@ class LayerSeparatorDialog:
         self._paper_mask = None
         self._result = None        # LayerResult after step 3
         self._separator = None
+        self._shared_separator = None  # reused so the Lab plane is computed once
+        self._proxy_separator = None   # ≤1 MP copy for live threshold previews
+        self._live_engine = None       # TwoTierPreviewEngine, built lazily
         self._current_step = 0     # 0-based
 
         self.root = tk.Toplevel(parent)
@@ -67,6 +70,8 @@ class LayerSeparatorDialog:
         self.root.minsize(720, 580)
 
         self._build_ui()
+        self._bind_live_preview()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.root.after(50, self._fit_to_canvas)
         self._update_step_ui()
 
@@ -403,8 +408,18 @@ class LayerSeparatorDialog:
     # ================================================================== #
 
     def _get_separator(self):
+        """Return the dialog's separator with the current UI thresholds applied.
+
+        A single separator is kept for the lifetime of the dialog so its
+        image-wide Lab plane is converted once; threshold changes only
+        re-run the cheap mask logic.
+        """
         from utils.stamp_layer_separator import StampLayerSeparator
-        sep = StampLayerSeparator(self.original_image)
+        if self._shared_separator is None:
+            # Pixels are scanner-calibrated (when a calibration is active) so
+            # layer colours match calibrated sample measurements
+            self._shared_separator = StampLayerSeparator(self.original_image, calibrate=True)
+        sep = self._shared_separator
         if self._bg_rgb:
             sep.set_background_color(*self._bg_rgb)
         sep.set_thresholds(
@@ -417,8 +432,8 @@ class LayerSeparatorDialog:
         if self._bg_rgb is None:
             messagebox.showinfo("Sample First", "Click on the background area first.")
             return
-        sep = self._get_separator()
-        mask = sep._mask_background()
+        self._get_separator()
+        mask = self._get_live_engine().compute_full(self._live_key())
         self._show_masked(mask, "background")
 
     def _skip_background(self):
@@ -436,7 +451,7 @@ class LayerSeparatorDialog:
             messagebox.showinfo("Sample First", "Click on the background area first.")
             return
         sep = self._get_separator()
-        self._bg_mask = sep._mask_background()
+        self._bg_mask = self._get_live_engine().compute_full(self._live_key())
         self._separator = sep
         n = int(np.sum(self._bg_mask))
         self._current_step = 1
@@ -456,8 +471,7 @@ class LayerSeparatorDialog:
         """Preview what CURRENT thresholds would catch (cyan), plus already-added (magenta)."""
         if self._bg_mask is None:
             return
-        sep = self._get_separator()
-        new_cancel = sep._mask_cancellation(self._bg_mask)
+        new_cancel = self._full_cancel_mask()
         # Exclude already-accumulated pixels from the new detection
         if self._cancel_mask is not None:
             new_cancel = new_cancel & ~self._cancel_mask
@@ -478,8 +492,7 @@ class LayerSeparatorDialog:
         """Add current threshold detection to the accumulated cancel mask."""
         if self._bg_mask is None:
             return
-        sep = self._get_separator()
-        new_cancel = sep._mask_cancellation(self._bg_mask)
+        new_cancel = self._full_cancel_mask()
         if self._cancel_mask is None:
             self._cancel_mask = new_cancel
         else:
@@ -578,8 +591,7 @@ class LayerSeparatorDialog:
             return
         # If nothing was added yet, do a single pass with current thresholds
         if self._cancel_mask is None:
-            sep = self._get_separator()
-            self._cancel_mask = sep._mask_cancellation(self._bg_mask)
+            self._cancel_mask = self._full_cancel_mask()
         self._separator = self._get_separator()
         n = int(np.sum(self._cancel_mask))
         self._current_step = 2
@@ -642,6 +654,101 @@ class LayerSeparatorDialog:
         self._update_step_ui()
         self._show_layer("ink")
 
+    # ================================================================== #
+    # Live threshold preview (proxy + debounced full resolution)
+    # ================================================================== #
+
+    def _bind_live_preview(self):
+        """Re-preview automatically whenever a threshold spinbox changes."""
+        for var in (self.bg_threshold, self.cancel_brightness, self.cancel_saturation):
+            var.trace_add("write", self._on_threshold_changed)
+
+    def _get_live_engine(self):
+        if self._live_engine is None:
+            from utils.two_tier_preview import TwoTierPreviewEngine
+            self._live_engine = TwoTierPreviewEngine(
+                preview_fn=self._compute_proxy_mask,
+                full_fn=self._compute_full_mask,
+                on_result=self._on_live_result,
+                scheduler=self.root,
+            )
+        return self._live_engine
+
+    def _get_proxy_separator(self):
+        if self._proxy_separator is None:
+            self._proxy_separator = self._get_separator().make_proxy()
+        return self._proxy_separator
+
+    def _live_key(self):
+        """Threshold tuple for the current step, or None if nothing to preview.
+
+        Cancellation keys omit the background mask: the cached value is the
+        raw dark-and-neutral mask, and the locked background is removed when
+        it is displayed.
+        """
+        try:
+            if self._current_step == 0 and self._bg_rgb is not None:
+                return ("bg", tuple(self._bg_rgb), float(self.bg_threshold.get()))
+            if self._current_step == 1 and self._bg_mask is not None:
+                return ("cancel", int(self.cancel_brightness.get()),
+                        int(self.cancel_saturation.get()))
+        except (tk.TclError, ValueError):
+            pass  # half-typed spinbox value
+        return None
+
+    def _mask_for_key(self, sep, key):
+        if key[0] == "bg":
+            return sep._mask_background(bg_rgb=key[1], delta_e_threshold=key[2])
+        no_bg = np.zeros(sep._arr.shape[:2], dtype=bool)
+        return sep._mask_cancellation(no_bg, brightness_max=key[1], saturation_max=key[2])
+
+    def _compute_proxy_mask(self, key):
+        from utils.two_tier_preview import upscale_mask
+        mask = self._mask_for_key(self._get_proxy_separator(), key)
+        return upscale_mask(mask, self.original_image.size)
+
+    def _compute_full_mask(self, key):
+        if self._shared_separator is None:
+            self._get_separator()
+        return self._mask_for_key(self._shared_separator, key)
+
+    def _full_cancel_mask(self):
+        """Full-resolution cancellation mask for the current thresholds (cached)."""
+        key = ("cancel", int(self.cancel_brightness.get()), int(self.cancel_saturation.get()))
+        return self._get_live_engine().compute_full(key) & ~self._bg_mask
+
+    def _on_threshold_changed(self, *_):
+        key = self._live_key()
+        if key is not None:
+            self._get_live_engine().request(key)
+
+    def _on_live_result(self, key, mask, is_full):
+        if key != self._live_key():
+            return  # step changed since the request
+        tier = "" if is_full else " (fast preview — refining…)"
+        arr = np.array(self.original_image)
+        if key[0] == "bg":
+            arr[mask] = [255, 255, 255]
+            self.status_label.configure(
+                text=f"Background preview: {int(np.sum(mask)):,} pixels{tier}")
+        else:
+            arr[self._bg_mask] = [255, 255, 255]
+            new_cancel = mask & ~self._bg_mask
+            if self._cancel_mask is not None:
+                new_cancel &= ~self._cancel_mask
+                arr[self._cancel_mask] = [255, 0, 255]
+            arr[new_cancel] = [0, 255, 255]
+            self.status_label.configure(
+                text=f"Preview: {int(np.sum(new_cancel)):,} new (cyan){tier}")
+        # Keep the user's zoom/pan while thresholds are being adjusted
+        self._current_pil = Image.fromarray(arr)
+        self._render()
+
+    def _on_close(self):
+        if self._live_engine is not None:
+            self._live_engine.close()
+        self.root.destroy()
+
     # ================================================================== #
     # Helpers
     # ================================================================== #
@@ -2381,7 +2381,6 @@ class RealtimePlot3DSheet:
             bool: True if merge was successful
         """
         try:
-            import ezodf
             import pandas as pd
             
             logger.info(f"Starting merge operation with existing file: {file_path}")
@@ -2438,17 +2437,27 @@ class RealtimePlot3DSheet:
             shutil.copy2(file_path, backup_path)
             logger.info(f"Created backup: {backup_path}")
             
-            # Open file for editing
-            doc = ezodf.opendoc(file_path)
-            sheet = doc.sheets[0]
+            # Read the sheet once as a grid of values; all changes are queued
+            # and patched into the file in a single pass
+            from utils.ods_reader import read_ods_table
+            from utils.spreadsheet_patcher import patch_workbook
+            target_sheet = selected_sheet or 0
+            table = read_ods_table(file_path, target_sheet)
+            edits = []  # (sheet, row, column, value), 0-based
+            
+            def cell_value_at(row_idx, col_idx):
+                if row_idx < len(table) and col_idx < len(table[row_idx]):
+                    value = table[row_idx][col_idx]
+                    return None if isinstance(value, str) and value == '' else value
+                return None
             
             # Map column names to indices
             coord_columns = {'Xnorm': None, 'Ynorm': None, 'Znorm': None, 'DataID': None}
             
             # Find column indices (assuming row 8 contains headers in Plot_3D format)
             header_row = 7  # Row 8, 0-based
-            for col_idx in range(min(15, sheet.ncols())):  # Check first 15 columns
-                cell_value = str(sheet[header_row, col_idx].value or '').strip()
+            for col_idx in range(15):  # Check first 15 columns
+                cell_value = str(cell_value_at(header_row, col_idx) or '').strip()
                 if cell_value in coord_columns:
                     coord_columns[cell_value] = col_idx
             
@@ -2464,8 +2473,8 @@ class RealtimePlot3DSheet:
             update_count = 0
             data_start_row = 8  # Row 9, 0-based (data starts after header)
             
-            for row_idx in range(data_start_row, sheet.nrows()):
-                existing_dataid = sheet[row_idx, coord_columns['DataID']].value
+            for row_idx in range(data_start_row, len(table)):
+                existing_dataid = cell_value_at(row_idx, coord_columns['DataID'])
                 if existing_dataid and str(existing_dataid).strip() in dataids_to_update:
                     # Find corresponding row in new data
                     new_row = new_df[new_df['DataID'] == str(existing_dataid).strip()]
@@ -2473,9 +2482,8 @@ class RealtimePlot3DSheet:
                         new_row = new_row.iloc[0]
                         
                         # Update only coordinate columns, preserve analysis results
-                        sheet[row_idx, coord_columns['Xnorm']].set_value(float(new_row['Xnorm']))
-                        sheet[row_idx, coord_columns['Ynorm']].set_value(float(new_row['Ynorm']))
-                        sheet[row_idx, coord_columns['Znorm']].set_value(float(new_row['Znorm']))
+                        for col in ('Xnorm', 'Ynorm', 'Znorm'):
+                            edits.append((target_sheet, row_idx, coord_columns[col], float(new_row[col])))
                         # DataID stays the same
                         
                         update_count += 1
@@ -2485,10 +2493,10 @@ class RealtimePlot3DSheet:
             add_count = 0
             if dataids_to_add:
                 # Find next empty row
-                next_empty_row = sheet.nrows()
-                for row_idx in range(data_start_row, sheet.nrows()):
+                next_empty_row = len(table)
+                for row_idx in range(data_start_row, len(table)):
                     # Check if all coordinate columns are empty
-                    if all(not sheet[row_idx, coord_columns[col]].value 
+                    if all(not cell_value_at(row_idx, coord_columns[col])
                           for col in ['Xnorm', 'Ynorm', 'Znorm', 'DataID']):
                         next_empty_row = row_idx
                         break
@@ -2501,10 +2509,9 @@ class RealtimePlot3DSheet:
                         new_row = new_row.iloc[0]
                         
                         # Set coordinate data
-                        sheet[current_row, coord_columns['Xnorm']].set_value(float(new_row['Xnorm']))
-                        sheet[current_row, coord_columns['Ynorm']].set_value(float(new_row['Ynorm']))
-                        sheet[current_row, coord_columns['Znorm']].set_value(float(new_row['Znorm']))
-                        sheet[current_row, coord_columns['DataID']].set_value(str(new_row['DataID']))
+                        for col in ('Xnorm', 'Ynorm', 'Znorm'):
+                            edits.append((target_sheet, current_row, coord_columns[col], float(new_row[col])))
+                        edits.append((target_sheet, current_row, coord_columns['DataID'], str(new_row['DataID'])))
                         
                         # Set default values for analysis columns (will be empty for Plot_3D to fill)
                         # Don't overwrite if they already have values
@@ -2515,7 +2522,7 @@ class RealtimePlot3DSheet:
             
             # Save the merged file
             temp_path = f"{file_path}.temp_merge"
-            doc.saveas(temp_path)
+            patch_workbook(file_path, edits, output_path=temp_path)
             os.replace(temp_path, file_path)
             
             # Clean up backup on success
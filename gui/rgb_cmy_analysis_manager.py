@@ -220,6 +220,9 @@ class RGBCMYAnalysisManager:
         self.parent_frame = parent_frame
         self.image_manager = image_manager
         self.analyzer = RGBCMYAnalyzer()
+        # Match sample-mode colours: correct masked pixels with the active
+        # scanner calibration (no-op when none is loaded)
+        self.analyzer.apply_calibration = True
         self.current_image_path = None
         self.masks = {}
         self.results = []
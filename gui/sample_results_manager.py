@@ -637,9 +637,7 @@ class SampleResultsManager(tk.Frame):
                 to use ``coverage_analyzer.DEFAULT_PAPER_TOLERANCE``.
         """
         try:
-            from utils.coverage_analyzer import (
-                analyze_coverage, DEFAULT_PAPER_TOLERANCE,
-            )
+            from utils.coverage_analyzer import DEFAULT_PAPER_TOLERANCE
         except ImportError as e:
             messagebox.showerror(
                 "Missing Module",
@@ -653,8 +651,7 @@ class SampleResultsManager(tk.Frame):
         try:
             self.config(cursor="watch")
             self.update_idletasks()
-            result = analyze_coverage(
-                self.current_image,
+            result = self._get_coverage_analysis_session().analyze(
                 paper_lab=paper_lab,
                 paper_tolerance=float(paper_tolerance),
             )
@@ -692,6 +689,26 @@ class SampleResultsManager(tk.Frame):
             paper_source_desc=paper_source_desc,
         )
     
+    def _get_coverage_analysis_session(self):
+        """Return the ``CoverageAnalysisSession`` for the current image.
+
+        The session keeps the image's Lab planes and full-resolution
+        results per tolerance, so Recompute and the live tolerance preview
+        don't reconvert the image. A new session is made when the image
+        or the active scanner calibration changes.
+        """
+        from utils.coverage_analyzer import CoverageAnalysisSession
+        from utils.scanner_calibration import get_active_calibration
+        calibration = get_active_calibration()
+        session = getattr(self, '_coverage_analysis_session', None)
+        if (session is None or session.image is not self.current_image
+                or getattr(self, '_coverage_session_calibration', None) is not calibration):
+            # Calibrated pixels are compared with the calibrated paper samples
+            session = CoverageAnalysisSession(self.current_image, calibrate=True)
+            self._coverage_analysis_session = session
+            self._coverage_session_calibration = calibration
+        return session
+    
     def _resolve_paper_lab_for_coverage(self):
         """Return ``(paper_lab, paper_rgb, source_desc, n_samples)``.
         
@@ -1020,9 +1037,10 @@ class SampleResultsManager(tk.Frame):
             f"edge {result.n_edge:,}   paper {result.n_paper:,}   "
             f"of {result.n_visible:,} visible px)"
         )
-        ttk.Label(
+        counts_label = ttk.Label(
             outer, text=counts_text, font=("Arial", 11, "bold"),
-        ).pack(anchor='w', pady=(4, 8))
+        )
+        counts_label.pack(anchor='w', pady=(4, 8))
         
         # --- classification preview ----------------------------------- #
         preview_frame = ttk.LabelFrame(
@@ -1039,18 +1057,18 @@ class SampleResultsManager(tk.Frame):
         # Scale the preview down if it's larger than ~700 px in either axis
         # so the dialog stays usable on a laptop.
         max_w, max_h = 800, 500
-        prev_img = result.classification_image
-        pw, ph = prev_img.size
-        scale = min(1.0, max_w / pw, max_h / ph)
-        if scale < 1.0:
-            prev_img_disp = prev_img.resize(
-                (max(1, int(pw * scale)), max(1, int(ph * scale))),
-                Image.LANCZOS,
-            )
-        else:
-            prev_img_disp = prev_img
         
-        photo = ImageTk.PhotoImage(prev_img_disp)
+        def _fit_preview(prev_img):
+            pw, ph = prev_img.size
+            scale = min(1.0, max_w / pw, max_h / ph)
+            if scale < 1.0:
+                return prev_img.resize(
+                    (max(1, int(pw * scale)), max(1, int(ph * scale))),
+                    Image.LANCZOS,
+                )
+            return prev_img
+        
+        photo = ImageTk.PhotoImage(_fit_preview(result.classification_image))
         prev_label = ttk.Label(preview_frame, image=photo, anchor='center')
         prev_label.image = photo  # keep a reference
         prev_label.pack(fill=tk.BOTH, expand=True)
@@ -1075,6 +1093,44 @@ class SampleResultsManager(tk.Frame):
         )
         tol_spin.pack(side=tk.LEFT, padx=(4, 6))
         
+        # Live tolerance preview: the proxy image updates the preview and
+        # coverage line immediately, then a debounced full-resolution pass
+        # replaces it. 'Recompute' still rebuilds the whole report.
+        from utils.two_tier_preview import TwoTierPreviewEngine
+        coverage_session = self._get_coverage_analysis_session()
+        
+        def _on_live_result(tol, live_result, is_full):
+            live_photo = ImageTk.PhotoImage(
+                _fit_preview(live_result.classification_image))
+            prev_label.configure(image=live_photo)
+            prev_label.image = live_photo
+            tier = "" if is_full else "   [fast preview]"
+            counts_label.configure(text=(
+                f"Coverage ratio: {live_result.coverage_ratio * 100.0:.1f}% "
+                f"at ΔE {tol:.1f}{tier}   (press Recompute to update the report)"
+            ))
+        
+        live_engine = TwoTierPreviewEngine(
+            preview_fn=lambda tol: coverage_session.analyze(
+                result.paper_lab, paper_tolerance=tol, preview=True),
+            full_fn=lambda tol: coverage_session.analyze(
+                result.paper_lab, paper_tolerance=tol),
+            on_result=_on_live_result,
+            scheduler=viewer,
+        )
+        
+        def _on_tol_changed(*_):
+            try:
+                tol = float(tol_var.get())
+            except (tk.TclError, ValueError):
+                return
+            if tol > 0:
+                live_engine.request(tol)
+        
+        tol_var.trace_add("write", _on_tol_changed)
+        viewer.bind("<Destroy>", lambda e: live_engine.close()
+                    if e.widget is viewer else None)
+        
         def on_recompute():
             try:
                 new_tol = float(tol_var.get())
@@ -1582,7 +1638,7 @@ class SampleResultsManager(tk.Frame):
                 try:
                     self.config(cursor="watch")
                     self.update_idletasks()
-                    analyze_kwargs = {'paper_lab': paper_lab}
+                    analyze_kwargs = {'paper_lab': paper_lab, 'calibrate': True}
                     if inherited_tol is not None:
                         analyze_kwargs['paper_tolerance'] = float(inherited_tol)
                     result = analyze_coverage(
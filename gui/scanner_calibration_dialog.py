@@ -214,6 +214,14 @@ class ScannerCalibrationDialog:
         )
         self.export_button.pack(side=tk.LEFT, padx=5)
         
+        self.export_lut_button = ttk.Button(
+            bottom_frame,
+            text="Export 3D LUT (.cube)...",
+            command=self._export_cube_lut,
+            state='disabled'
+        )
+        self.export_lut_button.pack(side=tk.LEFT, padx=5)
+        
         self.reveal_button = ttk.Button(
             bottom_frame,
             text="Show in Finder" if sys.platform == 'darwin' else "Show in Explorer",
@@ -571,6 +579,7 @@ class ScannerCalibrationDialog:
             logger.warning(f"Could not save calibration preference: {e}")
         
         self._update_status()
+        self._update_sharing_buttons()
         
         messagebox.showinfo(
             "Calibration Deactivated",
@@ -750,12 +759,16 @@ class ScannerCalibrationDialog:
         )
 
     def _update_sharing_buttons(self):
-        """Enable or disable the Export / Reveal buttons."""
+        """Enable or disable the Export / Reveal / LUT buttons."""
+        from utils.scanner_calibration import get_active_calibration
         has_profile = (self.active_profile_path
                        and os.path.isfile(self.active_profile_path))
         state = 'normal' if has_profile else 'disabled'
         self.export_button.config(state=state)
         self.reveal_button.config(state=state)
+        active = get_active_calibration()
+        self.export_lut_button.config(
+            state='normal' if active and active.is_valid else 'disabled')
     
     def _export_profile(self):
         """Export (copy) the active calibration profile to a user-chosen location."""
@@ -802,6 +815,48 @@ class ScannerCalibrationDialog:
                 parent=self.root
             )
     
+    def _export_cube_lut(self):
+        """Export the active calibration as a .cube 3D LUT for other tools."""
+        from utils.scanner_calibration import get_active_calibration
+        active = get_active_calibration()
+        if not (active and active.is_valid):
+            messagebox.showwarning(
+                "No Calibration",
+                "No active scanner calibration to export.",
+                parent=self.root
+            )
+            return
+        
+        base_name = os.path.splitext(os.path.basename(self.active_profile_path or ""))[0]
+        dest = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export 3D LUT",
+            initialdir=os.path.join(os.path.expanduser('~'), 'Desktop'),
+            initialfile=f"{base_name or 'scanner_calibration'}.cube",
+            defaultextension=".cube",
+            filetypes=[
+                ("Cube LUTs", "*.cube *.CUBE"),
+                ("All files", "*"),
+            ],
+        )
+        
+        if not dest:
+            return
+        
+        if active.export_cube_lut(dest):
+            messagebox.showinfo(
+                "LUT Exported",
+                f"3D LUT saved to:\n{dest}\n\n"
+                f"Load it in an image editor to preview scans with this calibration.",
+                parent=self.root
+            )
+        else:
+            messagebox.showerror(
+                "Export Error",
+                "Failed to export the 3D LUT. See the log for details.",
+                parent=self.root
+            )
+    
     def _reveal_profile(self):
         """Open the OS file manager with the active profile selected."""
         if not self.active_profile_path or not os.path.isfile(self.active_profile_path):
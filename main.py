@@ -4,6 +4,14 @@
 A image analysis application optimized for philatelic images
 """
 
+import multiprocessing
+
+if __name__ == "__main__":
+    # In a frozen (PyInstaller) build, worker processes started by a process
+    # pool run this same executable; this hands them straight to their task
+    # instead of re-launching StampZ. No-op everywhere else.
+    multiprocessing.freeze_support()
+
 # === EARLY CRASH LOGGING ===
 # This runs before anything else so even very early failures are captured.
 import sys
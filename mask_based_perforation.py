@@ -11,6 +11,8 @@ import numpy as np
 import os
 from typing import List, Tuple, Dict
 
+from perforation_profile import consecutive_spacings, spacing_to_gauge
+
 
 class MaskBasedPerforationDetector:
     """Perforation detection using adaptive mask from black ink extraction."""
@@ -166,21 +168,15 @@ class MaskBasedPerforationDetector:
             return 0.0
         
         # Calculate distances between consecutive centers
-        distances = []
-        for i in range(len(centers) - 1):
-            c1, c2 = centers[i], centers[i + 1]
-            dist = np.sqrt((c2[0] - c1[0])**2 + (c2[1] - c1[1])**2)
-            distances.append(dist)
+        distances = consecutive_spacings(centers)
         
-        if not distances:
+        if len(distances) == 0:
             return 0.0
         
         avg_spacing_pixels = np.mean(distances)
         
         # Convert to gauge
-        pixels_per_mm = self.dpi / 25.4
-        spacing_mm = avg_spacing_pixels / pixels_per_mm
-        gauge = 20.0 / spacing_mm if spacing_mm > 0 else 0.0
+        gauge = spacing_to_gauge(avg_spacing_pixels, self.dpi)
         
         return gauge
 
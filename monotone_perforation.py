@@ -15,6 +15,12 @@ import math
 from typing import List, Tuple, Dict
 from dataclasses import dataclass
 
+from perforation_profile import (
+    profile_from_points, inward_is_larger, window_extrema,
+    suppress_close_points, consecutive_spacings, spacing_to_gauge,
+    estimate_gauge_from_points
+)
+
 
 @dataclass
 class PerforationTic:
@@ -183,6 +189,12 @@ class MonotonePerforationDetector:
             
             print(f"{edge_type}: Found {len(tics)} structural tics")
             
+            # Periodicity of the line itself, independent of tic detection
+            fft_estimate = estimate_gauge_from_points(perforation_line, edge_type, self.dpi)
+            if fft_estimate is not None:
+                print(f"   {edge_type}: FFT gauge estimate {fft_estimate.gauge:.2f} "
+                      f"(confidence {fft_estimate.confidence:.2f})")
+            
             if len(tics) >= 3:
                 gauge = self._calculate_gauge_from_tics(tics)
                 results[edge_type] = {
@@ -191,6 +203,9 @@ class MonotonePerforationDetector:
                     'tic_positions': [(t.x, t.y) for t in tics],
                     'quality_score': self._calculate_quality_score(tics)
                 }
+                if fft_estimate is not None:
+                    results[edge_type]['fft_gauge'] = fft_estimate.gauge
+                    results[edge_type]['fft_confidence'] = fft_estimate.confidence
                 print(f"{edge_type}: Gauge = {gauge:.2f}")
         
         # Select best side from each axis (horizontal and vertical)
@@ -274,95 +289,52 @@ class MonotonePerforationDetector:
         else:
             line_points.sort(key=lambda p: p[1])  # Sort by y
         
-        # Find structural indentations (where line deviates inward)
-        tics = []
-        
-        # Use a sliding window to find local extrema
         window = 6  # Moderate smoothing
         min_tic_distance = max(16, int(self.dpi / 32))  # Moderate minimum distance
         
-        for i in range(window, len(line_points) - window):
-            current_point = line_points[i]
-            
-            # Get local neighborhood
-            neighborhood = line_points[i-window:i+window+1]
-            
-            # Calculate if this is a local extremum (indentation)
-            is_tic = False
-            
-            if edge_type == 'top':
-                # For top edge, tics are local maxima in y (deeper into stamp)
-                current_y = current_point[1]
-                neighbor_ys = [p[1] for p in neighborhood]
-                if current_y == max(neighbor_ys) and current_y > np.mean(neighbor_ys) + 2.5:
-                    is_tic = True
-            elif edge_type == 'bottom':
-                # For bottom edge, tics are local minima in y (higher up into stamp)
-                current_y = current_point[1]
-                neighbor_ys = [p[1] for p in neighborhood]
-                if current_y == min(neighbor_ys) and current_y < np.mean(neighbor_ys) - 2.5:
-                    is_tic = True
-            elif edge_type == 'left':
-                # For left edge, tics are local maxima in x (deeper into stamp)
-                current_x = current_point[0]
-                neighbor_xs = [p[0] for p in neighborhood]
-                if current_x == max(neighbor_xs) and current_x > np.mean(neighbor_xs) + 2.5:
-                    is_tic = True
-            else:  # right
-                # For right edge, tics are local minima in x (deeper into stamp)
-                current_x = current_point[0]
-                neighbor_xs = [p[0] for p in neighborhood]
-                if current_x == min(neighbor_xs) and current_x < np.mean(neighbor_xs) - 2.5:
-                    is_tic = True
-            
-            if is_tic:
-                # Check minimum distance from existing tics
-                too_close = False
-                for existing_tic in tics:
-                    dist = math.sqrt((current_point[0] - existing_tic.x)**2 + (current_point[1] - existing_tic.y)**2)
-                    if dist < min_tic_distance:
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    # Calculate depth of indentation
-                    if edge_type in ['top', 'bottom']:
-                        depth = abs(current_point[1] - np.mean([p[1] for p in neighborhood]))
-                    else:
-                        depth = abs(current_point[0] - np.mean([p[0] for p in neighborhood]))
-                    
-                    tic = PerforationTic(
-                        x=current_point[0],
-                        y=current_point[1], 
-                        depth=depth,
-                        edge_type=edge_type
-                    )
-                    tics.append(tic)
-        
-        return tics
+        return self._profile_tics(line_points, edge_type, window, 2.5, min_tic_distance)
+    
+    def _profile_tics(self, line_points: List[Tuple[int, int]], edge_type: str, window: int,
+                      min_depth: float, min_tic_distance: float) -> List[PerforationTic]:
+        """Find tics as inward window extrema of the edge profile.
+        
+        A point is a tic when it is the deepest point of its ±window
+        neighbourhood and lies more than ``min_depth`` beyond the
+        neighbourhood mean; tics closer than ``min_tic_distance`` to an
+        earlier tic are dropped.
+        """
+        order, position, depth = profile_from_points(line_points, edge_type)
+        idx, depths = window_extrema(depth, window, min_depth, maxima=inward_is_larger(edge_type))
+        if len(idx) == 0:
+            return []
+        
+        # idx indexes the sorted profile; map back to the caller's points
+        source = order[idx]
+        pts = np.asarray(line_points, dtype=np.float64)[source]
+        kept = suppress_close_points(np.column_stack((position[idx], pts)), min_tic_distance)
+        
+        return [
+            PerforationTic(
+                x=line_points[source[k]][0],
+                y=line_points[source[k]][1],
+                depth=float(depths[k]),
+                edge_type=edge_type
+            )
+            for k in kept
+        ]
     
     def _calculate_gauge_from_tics(self, tics: List[PerforationTic]) -> float:
         """Calculate perforation gauge from tic spacing."""
         if len(tics) < 2:
             return 0.0
         
-        # Calculate distances between consecutive tics
-        distances = []
-        for i in range(len(tics) - 1):
-            t1, t2 = tics[i], tics[i + 1]
-            distance = math.sqrt((t2.x - t1.x)**2 + (t2.y - t1.y)**2)
-            distances.append(distance)
-        
-        if not distances:
-            return 0.0
-            
-        # Average spacing
+        # Average spacing between consecutive tics
+        distances = consecutive_spacings([(t.x, t.y) for t in tics])
         avg_spacing_pixels = np.mean(distances)
         
         # Convert to gauge  
-        pixels_per_mm = self.dpi / 25.4  # 25.4 mm per inch
-        spacing_mm = avg_spacing_pixels / pixels_per_mm
-        gauge = 20.0 / spacing_mm if spacing_mm > 0 else 0.0
+        spacing_mm = avg_spacing_pixels / (self.dpi / 25.4)  # 25.4 mm per inch
+        gauge = spacing_to_gauge(avg_spacing_pixels, self.dpi)
         
         print(f"   Gauge calc: {len(tics)} tics, {avg_spacing_pixels:.1f}px spacing = {spacing_mm:.3f}mm = gauge {gauge:.2f}")
         
@@ -555,61 +527,10 @@ class MonotonePerforationDetector:
         else:
             line_points.sort(key=lambda p: p[1])  # Sort by y
             
-        tics = []
         window = 4  # Smaller window for sensitivity
         min_tic_distance = max(12, int(self.dpi / 40))  # Closer spacing allowed
         
-        for i in range(window, len(line_points) - window):
-            current_point = line_points[i]
-            neighborhood = line_points[i-window:i+window+1]
-            
-            is_tic = False
-            
-            if edge_type == 'top':
-                current_y = current_point[1]
-                neighbor_ys = [p[1] for p in neighborhood]
-                if current_y == max(neighbor_ys) and current_y > np.mean(neighbor_ys) + 1.5:  # Lower threshold
-                    is_tic = True
-            elif edge_type == 'bottom':
-                current_y = current_point[1]
-                neighbor_ys = [p[1] for p in neighborhood]
-                if current_y == min(neighbor_ys) and current_y < np.mean(neighbor_ys) - 1.5:
-                    is_tic = True
-            elif edge_type == 'left':
-                current_x = current_point[0]
-                neighbor_xs = [p[0] for p in neighborhood]
-                if current_x == max(neighbor_xs) and current_x > np.mean(neighbor_xs) + 1.5:
-                    is_tic = True
-            else:  # right
-                current_x = current_point[0]
-                neighbor_xs = [p[0] for p in neighborhood]
-                if current_x == min(neighbor_xs) and current_x < np.mean(neighbor_xs) - 1.5:
-                    is_tic = True
-                    
-            if is_tic:
-                # Check minimum distance
-                too_close = False
-                for existing_tic in tics:
-                    dist = math.sqrt((current_point[0] - existing_tic.x)**2 + (current_point[1] - existing_tic.y)**2)
-                    if dist < min_tic_distance:
-                        too_close = True
-                        break
-                        
-                if not too_close:
-                    if edge_type in ['top', 'bottom']:
-                        depth = abs(current_point[1] - np.mean([p[1] for p in neighborhood]))
-                    else:
-                        depth = abs(current_point[0] - np.mean([p[0] for p in neighborhood]))
-                        
-                    tic = PerforationTic(
-                        x=current_point[0],
-                        y=current_point[1],
-                        depth=depth,
-                        edge_type=edge_type
-                    )
-                    tics.append(tic)
-                    
-        return tics
+        return self._profile_tics(line_points, edge_type, window, 1.5, min_tic_distance)  # Lower threshold
         
     def _calculate_adaptive_edge_width(self, enhanced: np.ndarray, base_width: int) -> int:
         """Calculate adaptive edge width based on image characteristics.
@@ -16,6 +16,10 @@ from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 import math
 
+from perforation_profile import (
+    HORIZONTAL_EDGES, local_peak_mask, suppress_close_positions
+)
+
 
 @dataclass
 class PerforationTic:
@@ -40,9 +44,20 @@ class PerforationLine:
 class PerforationLineDetector:
     """Detects perforations using edge line analysis instead of circle detection."""
     
-    def __init__(self, dpi: int = 600, background_color: str = 'black'):
+    def __init__(self, dpi: int = 600, background_color: str = 'black',
+                 indentation_peaks: bool = False):
+        """
+        Args:
+            dpi: Image resolution
+            background_color: Expected background behind the stamp
+            indentation_peaks: Accept tics with the trend-line peak test. The
+                original test compared each point with itself and never
+                accepted a tic, so the default (False) keeps that output;
+                PerforationMeasurementSystem.line_indentation_peaks sets it.
+        """
         self.dpi = dpi
         self.background_color = background_color
+        self.indentation_peaks = indentation_peaks
         
     def detect_perforation_lines(self, image: np.ndarray) -> List[PerforationLine]:
         """Detect perforation lines on all edges of the stamp."""
@@ -288,74 +303,54 @@ class PerforationLineDetector:
         
         # Use a small sliding window to smooth while preserving perforation indentations
         window_size = min(7, len(edge_line) // 3)  # Small window to preserve features
-        smoothed = []
-        
-        for i in range(len(edge_line)):
-            # Get window around current point
-            start = max(0, i - window_size // 2)
-            end = min(len(edge_line), i + window_size // 2 + 1)
-            window_points = edge_line[start:end]
-            
-            # Average the coordinates in the window
-            avg_x = sum(p[0] for p in window_points) / len(window_points)
-            avg_y = sum(p[1] for p in window_points) / len(window_points)
-            
-            smoothed.append((avg_x, avg_y))
-        
-        return smoothed
+        half = window_size // 2
+        
+        # Moving average over the window (truncated at the ends) via cumulative sums
+        pts = np.asarray(edge_line, dtype=np.float64)
+        n = len(pts)
+        csum = np.vstack((np.zeros((1, 2)), np.cumsum(pts, axis=0)))
+        idx = np.arange(n)
+        start = np.maximum(0, idx - half)
+        end = np.minimum(n, idx + half + 1)
+        smoothed = (csum[end] - csum[start]) / (end - start)[:, None]
+        
+        return [(float(x), float(y)) for x, y in smoothed]
     
     def _find_line_indentations(self, line: List[Tuple[float, float]], edge_type: str) -> List[PerforationTic]:
         """Find indentations along the line that indicate perforation locations."""
         if len(line) < 10:
             return []
         
-        tics = []
-        
         # Calculate the general trend line
         trend_line = self._calculate_trend_line(line, edge_type)
+        slope, intercept = trend_line
         
-        # Find points where the actual line deviates significantly inward from trend
-        for i in range(2, len(line) - 2):  # Skip edges
-            point = line[i]
-            
-            # Get expected position on trend line
-            if edge_type in ['top', 'bottom']:
-                expected_y = self._interpolate_trend(trend_line, point[0], 'x')
-                deviation = point[1] - expected_y
-                
-                # For top edge, perforations indent downward (positive deviation)
-                # For bottom edge, perforations indent upward (negative deviation)  
-                if edge_type == 'top' and deviation > 0.5:  # More sensitive threshold
-                    depth = deviation
-                elif edge_type == 'bottom' and deviation < -0.5:  # More sensitive threshold
-                    depth = abs(deviation)
-                else:
-                    continue
-            else:  # left, right edges
-                expected_x = self._interpolate_trend(trend_line, point[1], 'y')
-                deviation = point[0] - expected_x
-                
-                # For left edge, perforations indent rightward (positive deviation)
-                # For right edge, perforations indent leftward (negative deviation)
-                if edge_type == 'left' and deviation > 0.5:  # More sensitive threshold
-                    depth = deviation
-                elif edge_type == 'right' and deviation < -0.5:  # More sensitive threshold
-                    depth = abs(deviation)
-                else:
-                    continue
+        # Signed deviation from the trend, positive when pointing into the stamp:
+        # top/left perforations indent towards larger y/x, bottom/right towards smaller
+        pts = np.asarray(line, dtype=np.float64)
+        if edge_type in HORIZONTAL_EDGES:
+            deviation = pts[:, 1] - (slope * pts[:, 0] + intercept)
+        else:
+            deviation = pts[:, 0] - (slope * pts[:, 1] + intercept)
+        inward = deviation if edge_type in ('top', 'left') else -deviation
+        
+        # Points deviating significantly inward that are the peak of their indentation
+        candidates = (inward > 0.5) & self._indentation_peak_mask(inward)
+        candidates[:2] = False  # Skip edges
+        candidates[-2:] = False
+        
+        tics = []
+        for i in np.nonzero(candidates)[0]:
+            depth = float(inward[i])
+            confidence = min(1.0, depth / 20.0)  # Scale depth to confidence
             
-            # Check if this is a local maximum (peak of indentation)
-            if self._is_local_indentation_peak(line, i, edge_type):
-                confidence = min(1.0, depth / 20.0)  # Scale depth to confidence
-                
-                tic = PerforationTic(
-                    x=point[0],
-                    y=point[1],
-                    depth=depth,
-                    confidence=confidence,
-                    edge_type=edge_type
-                )
-                tics.append(tic)
+            tics.append(PerforationTic(
+                x=line[i][0],
+                y=line[i][1],
+                depth=depth,
+                confidence=confidence,
+                edge_type=edge_type
+            ))
         
         # Filter out tics that are too close together (likely noise)
         filtered_tics = self._filter_close_tics(tics)
@@ -398,30 +393,17 @@ class PerforationLineDetector:
         slope, intercept = trend
         return slope * coord + intercept
     
-    def _is_local_indentation_peak(self, line: List[Tuple[float, float]], index: int, edge_type: str) -> bool:
-        """Check if this point is a local peak of an indentation."""
-        if index < 2 or index >= len(line) - 2:
-            return False
-        
-        # Look at neighboring points to see if this is a peak
-        window = 2
-        center_point = line[index]
-        
-        # Get deviation values for surrounding points
-        deviations = []
-        for i in range(max(0, index - window), min(len(line), index + window + 1)):
-            point = line[i]
-            if edge_type in ['top', 'bottom']:
-                deviation = abs(point[1] - center_point[1])
-            else:
-                deviation = abs(point[0] - center_point[0])
-            deviations.append(deviation)
-        
-        # Check if center point has maximum deviation (is a peak)
-        max_dev = max(deviations)
-        center_dev = deviations[window]  # Center of the window
+    def _indentation_peak_mask(self, inward: np.ndarray) -> np.ndarray:
+        """Mark points that are the peak of an indentation.
         
-        return center_dev == max_dev and center_dev > 0.2  # Very sensitive threshold for real perforations
+        With ``indentation_peaks`` enabled, a peak has the largest inward
+        deviation within two points either side and exceeds a small noise
+        floor. Otherwise no point qualifies, as with the original
+        neighbour-vs-centre test (the centre's deviation from itself is 0).
+        """
+        if not self.indentation_peaks:
+            return np.zeros(len(inward), dtype=bool)
+        return local_peak_mask(inward, 2) & (inward > 0.2)  # Very sensitive threshold for real perforations
     
     def _filter_close_tics(self, tics: List[PerforationTic]) -> List[PerforationTic]:
         """Filter out tics that are too close together (likely noise)."""
@@ -429,35 +411,19 @@ class PerforationLineDetector:
             return tics
         
         # Sort tics by position
-        if tics[0].edge_type in ['top', 'bottom']:
+        if tics[0].edge_type in HORIZONTAL_EDGES:
             tics.sort(key=lambda t: t.x)
+            positions = [t.x for t in tics]
         else:
             tics.sort(key=lambda t: t.y)
-        
-        filtered = [tics[0]]  # Always keep first tic
+            positions = [t.y for t in tics]
         
         min_distance = max(10, int(self.dpi / 30))  # Minimum distance between tics
         
-        for i in range(1, len(tics)):
-            current_tic = tics[i]
-            last_kept = filtered[-1]
-            
-            # Calculate distance
-            if current_tic.edge_type in ['top', 'bottom']:
-                distance = abs(current_tic.x - last_kept.x)
-            else:
-                distance = abs(current_tic.y - last_kept.y)
-            
-            if distance >= min_distance:
-                # Keep this tic if it's far enough from the last kept one
-                # Or if it has higher confidence
-                if distance >= min_distance or current_tic.confidence > last_kept.confidence:
-                    filtered.append(current_tic)
-                elif current_tic.confidence > last_kept.confidence:
-                    # Replace last kept tic with this higher confidence one
-                    filtered[-1] = current_tic
-        
-        return filtered
+        # Keep the first tic, then each tic far enough past the last kept one
+        keep = suppress_close_positions(np.asarray(positions), min_distance)
+        
+        return [tics[i] for i in keep]
     
     def _calculate_gauge_from_tics(self, tics: List[PerforationTic]) -> Tuple[float, float]:
         """Calculate perforation gauge from tic spacing."""
@@ -14,8 +14,23 @@ import numpy as np
 import cv2
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import math
+import logging
+
+from perforation_profile import (
+    PeriodEstimate, estimate_gauge, estimate_gauge_from_points, edge_band_profile,
+    measured_edge_points, HORIZONTAL_EDGES, MIN_PERIOD_CONFIDENCE
+)
+
+try:
+    from scipy.spatial import cKDTree
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class PerforationHole:
@@ -52,11 +67,33 @@ class PerforationAnalysis:
 class PerforationMeasurementEngine:
     """Core engine for measuring stamp perforations."""
     
+    # Hough parameter bands swept over each edge ROI (see detect_perforation_holes)
+    HOUGH_PARAM_SETS = [
+        # Very sensitive for small perforations
+        {'param1': 20, 'param2': 10, 'minRadius': 2, 'maxRadius': 12},
+        # Standard perforation size at 800 DPI
+        {'param1': 30, 'param2': 15, 'minRadius': 4, 'maxRadius': 20},
+        # Slightly larger perforations
+        {'param1': 40, 'param2': 18, 'minRadius': 6, 'maxRadius': 25},
+        # Conservative for well-defined holes
+        {'param1': 50, 'param2': 25, 'minRadius': 8, 'maxRadius': 30},
+        # Very aggressive for faint/damaged perforations
+        {'param1': 15, 'param2': 8, 'minRadius': 3, 'maxRadius': 18},
+    ]
+    
+    # Move the hole search line onto the measured stamp boundary when that
+    # lies at least this many pixels further in (stamp scanned with a margin)
+    SEARCH_LINE_MIN_SHIFT = 10
+    
     def __init__(self):
         self.dpi = 600  # Default DPI for calculations
         self.min_hole_size = 3  # Minimum hole diameter in pixels
         self.max_hole_size = 50  # Maximum hole diameter in pixels
         self.background_color = 'black'  # Expected background color
+        self.max_workers = 4  # Edges analysed concurrently (OpenCV releases the GIL)
+        # Line-based detection: accept tics with the trend-line peak test
+        # (PerforationLineDetector.indentation_peaks); off keeps the old output
+        self.line_indentation_peaks = False
         
     def set_image_dpi(self, dpi: int):
         """Set the DPI of the image for accurate measurements."""
@@ -99,8 +136,14 @@ class PerforationMeasurementEngine:
             print(f"Error detecting stamp edges: {e}")
             return {}
     
-    def detect_perforation_holes(self, image: np.ndarray, edge_points: List[Tuple[int, int]], edge_type: str = 'unknown') -> List[PerforationHole]:
-        """Detect individual perforation holes along an edge."""
+    def detect_perforation_holes(self, image: np.ndarray, edge_points: List[Tuple[int, int]], edge_type: str = 'unknown',
+                                 search_offset: int = 0) -> List[PerforationHole]:
+        """Detect individual perforation holes along an edge.
+        
+        ``search_offset`` is how far ``edge_points`` were moved inward from
+        the default search line (see ``_seed_search_line``); holes may lie
+        that much further from the image border.
+        """
         try:
             holes = []
             gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
@@ -108,10 +151,10 @@ class PerforationMeasurementEngine:
             
             # Create a region of interest around the edge
             if not edge_points:
-                print("DEBUG: No edge points provided, returning empty hole list.")
+                logger.debug("No edge points provided, returning empty hole list.")
                 return holes
                 
-            print(f"DEBUG: Analyzing {len(edge_points)} edge points for hole detection")
+            logger.debug(f"Analyzing {len(edge_points)} edge points for hole detection")
             
             # Determine edge orientation and create ROI
             first_point = edge_points[0]
@@ -136,10 +179,10 @@ class PerforationMeasurementEngine:
             roi = gray[y1:y2, x1:x2]
             
             if roi.size == 0:
-                print("DEBUG: ROI size is 0, no holes detected.")
+                logger.debug("ROI size is 0, no holes detected.")
                 return holes
                 
-            print(f"DEBUG: ROI dimensions: {roi.shape[1]}x{roi.shape[0]} at ({x1},{y1})")
+            logger.debug(f"ROI dimensions: {roi.shape[1]}x{roi.shape[0]} at ({x1},{y1})")
             
             # Apply Gaussian blur to reduce noise
             blurred = cv2.GaussianBlur(roi, (5, 5), 0)
@@ -148,24 +191,13 @@ class PerforationMeasurementEngine:
             # Perforation holes are typically 0.5-1.5mm diameter
             # At 800 DPI: 1mm = ~31.5 pixels, so 0.5mm = ~16 pixels diameter = 8 pixel radius
             expected_hole_radius = max(3, int(self.dpi / 100))  # More conservative estimate
-            print(f"DEBUG: Expected hole radius: {expected_hole_radius} pixels")
-            
-            # Try multiple parameter sets systematically designed for perforation holes
-            param_sets = [
-                # Very sensitive for small perforations
-                {'param1': 20, 'param2': 10, 'minRadius': 2, 'maxRadius': 12},
-                # Standard perforation size at 800 DPI
-                {'param1': 30, 'param2': 15, 'minRadius': 4, 'maxRadius': 20},
-                # Slightly larger perforations
-                {'param1': 40, 'param2': 18, 'minRadius': 6, 'maxRadius': 25},
-                # Conservative for well-defined holes
-                {'param1': 50, 'param2': 25, 'minRadius': 8, 'maxRadius': 30},
-                # Very aggressive for faint/damaged perforations
-                {'param1': 15, 'param2': 8, 'minRadius': 3, 'maxRadius': 18},
-            ]
+            logger.debug(f"Expected hole radius: {expected_hole_radius} pixels")
             
+            # Sweep the radius bands over the same blurred ROI.  OpenCV does
+            # not expose the Hough accumulator, so each band is its own call,
+            # but they share one grayscale conversion and blur.
             all_circles = []
-            for i, params in enumerate(param_sets):
+            for i, params in enumerate(self.HOUGH_PARAM_SETS):
                 circles = cv2.HoughCircles(
                     blurred,
                     cv2.HOUGH_GRADIENT,
@@ -178,35 +210,25 @@ class PerforationMeasurementEngine:
                 )
                 
                 if circles is not None:
-                    print(f"DEBUG: Parameter set {i} detected {len(circles[0])} circles")
-                    all_circles.extend(circles[0, :])
+                    logger.debug(f"Parameter set {i} detected {len(circles[0])} circles")
+                    all_circles.append(circles[0, :])
                 else:
-                    print(f"DEBUG: Parameter set {i} detected 0 circles")
+                    logger.debug(f"Parameter set {i} detected 0 circles")
             
-            print(f"DEBUG: Total circles detected before filtering: {len(all_circles)}")
+            all_circles = np.concatenate(all_circles) if all_circles else np.empty((0, 3))
+            logger.debug(f"Total circles detected before filtering: {len(all_circles)}")
             
             # Remove duplicate circles
-            if all_circles:
-                all_circles = np.array(all_circles)
-                # Filter duplicates (circles that are very close to each other)
-                filtered_circles = []
-                for circle in all_circles:
-                    is_duplicate = False
-                    for existing in filtered_circles:
-                        distance = np.sqrt((circle[0] - existing[0])**2 + (circle[1] - existing[1])**2)
-                        if distance < max(circle[2], existing[2]):  # Circles overlap
-                            is_duplicate = True
-                            break
-                    if not is_duplicate:
-                        filtered_circles.append(circle)
-                
-                circles = np.array(filtered_circles).reshape(1, -1, 3) if filtered_circles else None
-                print(f"DEBUG: Circles after filtering duplicates: {len(filtered_circles)}")
+            if len(all_circles):
+                filtered_circles = self._deduplicate_circles(all_circles)
+                circles = filtered_circles.reshape(1, -1, 3) if len(filtered_circles) else None
+                logger.debug(f"Circles after filtering duplicates: {len(filtered_circles)}")
             else:
                 circles = None
             
             if circles is not None:
                 circles = np.round(circles[0, :]).astype("int")
+                edge_arr = np.asarray(edge_points, dtype=np.float64)
                 
                 for (x, y, r) in circles:
                     # Adjust coordinates back to full image space
@@ -214,10 +236,9 @@ class PerforationMeasurementEngine:
                     full_y = y + y1
                     
                     # Check if this circle is near the edge we're analyzing
-                    min_distance = min(
-                        math.sqrt((full_x - px)**2 + (full_y - py)**2) 
-                        for px, py in edge_points
-                    )
+                    min_distance = float(np.sqrt(np.min(
+                        (edge_arr[:, 0] - full_x) ** 2 + (edge_arr[:, 1] - full_y) ** 2
+                    )))
                     
                     # More lenient distance check - perforation holes can be further from edge line
                     # For cropped images, perforations should be within reasonable distance of search line
@@ -235,11 +256,11 @@ class PerforationMeasurementEngine:
                     # NEW: Check if hole is actually a perforation vs ink spot
                     is_real_perforation = self._validate_perforation_hole(gray, full_x, full_y, r, edge_type)
                     
-                    print(f"DEBUG: {edge_type} edge - Circle at ({full_x},{full_y}) r={r}, min_dist={min_distance:.1f}, edge_prox={edge_proximity:.1f}")
+                    logger.debug(f"{edge_type} edge - Circle at ({full_x},{full_y}) r={r}, min_dist={min_distance:.1f}, edge_prox={edge_proximity:.1f}")
                     
                     # Hole must be within reasonable distance of an image edge AND near the search line AND be a real perforation
                     # Be more lenient for vertical edges which tend to be further from image edges
-                    max_edge_proximity = 50 if edge_type in ['left', 'right'] else 35
+                    max_edge_proximity = (50 if edge_type in ['left', 'right'] else 35) + search_offset
                     if min_distance < max_distance and edge_proximity < max_edge_proximity and is_real_perforation:
                         # Calculate hole quality metrics on full image
                         confidence = self._calculate_hole_confidence(gray, full_x, full_y, r)
@@ -248,7 +269,7 @@ class PerforationMeasurementEngine:
                         # Additional validation: check if hole matches expected background color
                         hole_matches_background = self._check_hole_background_match(gray, full_x, full_y, r)
                         
-                        print(f"DEBUG: Hole confidence={confidence:.3f}, bg_match={hole_matches_background}")
+                        logger.debug(f"Hole confidence={confidence:.3f}, bg_match={hole_matches_background}")
                         
                         # Only accept holes with reasonable confidence OR correct background color (more lenient)
                         if confidence > 0.05 or (confidence > 0.01 and hole_matches_background):
@@ -260,11 +281,11 @@ class PerforationMeasurementEngine:
                                 edge_quality=edge_quality
                             )
                             holes.append(hole)
-                            print(f"DEBUG: Added hole at ({full_x},{full_y}) with confidence {confidence:.3f}")
+                            logger.debug(f"Added hole at ({full_x},{full_y}) with confidence {confidence:.3f}")
                         else:
-                            print(f"DEBUG: Rejected hole at ({full_x},{full_y}) - low confidence or wrong background")
+                            logger.debug(f"Rejected hole at ({full_x},{full_y}) - low confidence or wrong background")
                     else:
-                        print(f"DEBUG: Rejected hole at ({full_x},{full_y}) - too far from edge or center")
+                        logger.debug(f"Rejected hole at ({full_x},{full_y}) - too far from edge or center")
             
             # Sort holes by position (left to right for horizontal edges, top to bottom for vertical)
             if edge_points:
@@ -278,13 +299,47 @@ class PerforationMeasurementEngine:
                     # Vertical edge - sort by y coordinate
                     holes.sort(key=lambda h: h.center_y)
             
-            print(f"DEBUG: Final holes count after all filtering: {len(holes)}")
+            logger.debug(f"Final holes count after all filtering: {len(holes)}")
             return holes
             
         except Exception as e:
             print(f"Error detecting perforation holes: {e}")
             return []
     
+    @staticmethod
+    def _deduplicate_circles(circles: np.ndarray) -> np.ndarray:
+        """Drop circles overlapping an earlier kept circle.
+        
+        Greedy in input order: a circle is a duplicate when its centre is
+        closer than ``max(r_new, r_kept)`` to an already kept circle.
+        Candidate pairs come from a KD-tree radius query (bounded by the
+        largest radius), so this is near-linear instead of O(n²).
+        """
+        circles = np.asarray(circles, dtype=np.float64).reshape(-1, 3)
+        n = len(circles)
+        if n == 0:
+            return circles
+        centers = circles[:, :2]
+        radii = circles[:, 2]
+        max_r = float(radii.max())
+        if HAS_SCIPY:
+            neighbours = cKDTree(centers).query_ball_point(centers, r=max_r)
+        else:
+            d2 = ((centers[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+            neighbours = [np.nonzero(row < max_r * max_r)[0] for row in d2]
+        
+        kept = np.zeros(n, dtype=bool)
+        for i in range(n):
+            duplicate = False
+            for j in neighbours[i]:
+                if j < i and kept[j]:
+                    dist = math.hypot(centers[i, 0] - centers[j, 0], centers[i, 1] - centers[j, 1])
+                    if dist < max(radii[i], radii[j]):
+                        duplicate = True
+                        break
+            kept[i] = not duplicate
+        return circles[kept]
+    
     def _calculate_hole_confidence(self, gray_image: np.ndarray, x: int, y: int, radius: int) -> float:
         """Calculate confidence that this is actually a perforation hole."""
         try:
@@ -379,6 +434,84 @@ class PerforationMeasurementEngine:
             # If check fails, be permissive
             return True
     
+    def locate_stamp_boundary(self, gray: np.ndarray, edge_type: str) -> np.ndarray:
+        """Measured (x, y) stamp boundary along one image edge, searched a third of the way in."""
+        across = gray.shape[0] if edge_type in HORIZONTAL_EDGES else gray.shape[1]
+        return measured_edge_points(gray, edge_type, max(8, across // 3))
+    
+    def estimate_edge_gauge_fft(self, gray: np.ndarray, edge_type: str,
+                                boundary: Optional[np.ndarray] = None) -> Optional[PeriodEstimate]:
+        """Fast gauge estimate for one edge from the periodicity of the stamp boundary.
+        
+        The measured boundary dips inward at every hole wherever the stamp
+        sits in the scan, so its depth profile carries the perforation
+        period. When that profile is not convincingly periodic (e.g. holes
+        reaching the image border on a tight crop), the intensity of a
+        ~1 mm strip centred on the boundary is tried instead. No hole
+        detection is needed; it runs in milliseconds, before the hole search.
+        """
+        if boundary is None:
+            boundary = self.locate_stamp_boundary(gray, edge_type)
+        estimate = estimate_gauge_from_points(boundary, edge_type, self.dpi)
+        if estimate is not None and estimate.confidence >= MIN_PERIOD_CONFIDENCE:
+            return estimate
+        
+        band = max(4, int(round(self.dpi / 25.4)))  # ~1 mm, a typical hole diameter
+        depth = self._boundary_depth(boundary, edge_type, gray.shape)
+        profile = edge_band_profile(gray, edge_type, band, int(round(depth)) - band // 2)
+        band_estimate = estimate_gauge(np.arange(len(profile), dtype=np.float64), profile, self.dpi)
+        if estimate is None or (band_estimate is not None and band_estimate.confidence > estimate.confidence):
+            return band_estimate
+        return estimate
+    
+    @staticmethod
+    def _boundary_depth(points, edge_type: str, shape: Tuple[int, ...]) -> float:
+        """Median distance of an edge line from its image border (0 if empty)."""
+        arr = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(arr) == 0:
+            return 0.0
+        h, w = shape[:2]
+        if edge_type == 'top':
+            depth = arr[:, 1]
+        elif edge_type == 'bottom':
+            depth = h - 1 - arr[:, 1]
+        elif edge_type == 'left':
+            depth = arr[:, 0]
+        else:
+            depth = w - 1 - arr[:, 0]
+        return float(np.median(depth))
+    
+    def _seed_search_line(self, edge_points: List[Tuple[int, int]], edge_type: str,
+                          boundary: np.ndarray, shape: Tuple[int, ...]) -> Tuple[List[Tuple[int, int]], int]:
+        """Move the hole search line inward onto the measured stamp boundary.
+        
+        Returns:
+            Tuple of (search points, inward shift in pixels); the points are
+            returned unchanged when the boundary is not meaningfully deeper.
+        """
+        shift = int(round(self._boundary_depth(boundary, edge_type, shape)
+                          - self._boundary_depth(edge_points, edge_type, shape)))
+        if not edge_points or shift < self.SEARCH_LINE_MIN_SHIFT:
+            return edge_points, 0
+        dx, dy = {'top': (0, shift), 'bottom': (0, -shift),
+                  'left': (shift, 0), 'right': (-shift, 0)}[edge_type]
+        return [(x + dx, y + dy) for x, y in edge_points], shift
+    
+    @staticmethod
+    def _drop_off_line_holes(holes: List[PerforationHole], edge_type: str) -> List[PerforationHole]:
+        """Drop holes lying off the edge's line of holes (e.g. the neighbouring edge's corner holes).
+        
+        A hole is kept when its distance across the edge from the median
+        hole line is at most half the median hole diameter.
+        """
+        if len(holes) < 3:
+            return holes
+        horizontal = edge_type in HORIZONTAL_EDGES
+        across = np.array([h.center_y if horizontal else h.center_x for h in holes])
+        tolerance = 0.5 * float(np.median([h.diameter for h in holes]))
+        keep = np.abs(across - np.median(across)) <= tolerance
+        return [h for h, k in zip(holes, keep) if k]
+    
     def calculate_perforation_gauge(self, holes: List[PerforationHole], edge_length_pixels: float) -> Tuple[float, float]:
         """Calculate perforation gauge from detected holes."""
         if len(holes) < 2:
@@ -633,18 +766,58 @@ class PerforationMeasurementEngine:
                     warnings=["No stamp edges found - check image"]
                 )
             
-            # Detect holes for each edge
-            edges = []
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if len(image.shape) == 3 else image
+            
+            # FFT pre-pass: locate the stamp boundary on each edge and gauge it
+            # from its periodicity. A periodic boundary also moves the hole
+            # search onto the stamp when it was scanned with a margin.
+            fft_estimates = {}
+            edge_items = []
             for edge_type, edge_points in edges_dict.items():
                 if not edge_points:
                     continue
-                    
-                print(f"DEBUG: Processing {edge_type} edge with {len(edge_points)} points")
-                
-                # Detect perforation holes along this edge
-                holes = self.detect_perforation_holes(image, edge_points, edge_type)
+                boundary = self.locate_stamp_boundary(gray, edge_type)
+                estimate = self.estimate_edge_gauge_fft(gray, edge_type, boundary)
+                shift = 0
+                if estimate is not None and estimate.confidence >= MIN_PERIOD_CONFIDENCE:
+                    fft_estimates[edge_type] = estimate
+                    edge_points, shift = self._seed_search_line(edge_points, edge_type, boundary, gray.shape)
+                    logger.debug(f"{edge_type} edge FFT estimate: gauge {estimate.gauge:.2f} "
+                          f"(confidence {estimate.confidence:.2f}), search line moved {shift}px")
+                edge_items.append((edge_type, edge_points, shift))
+            
+            # Detect holes on all edges concurrently; each edge works on its
+            # own ROI and OpenCV releases the GIL.
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+                edge_holes = list(pool.map(
+                    lambda item: self.detect_perforation_holes(gray, item[1], item[0], item[2]),
+                    edge_items))
+            
+            edges = []
+            fft_notes = []
+            fft_warnings = []
+            for (edge_type, edge_points, shift), holes in zip(edge_items, edge_holes):
+                logger.debug(f"Processed {edge_type} edge with {len(edge_points)} points")
+                if shift:
+                    # The seeded line spans the margin corners too
+                    holes = self._drop_off_line_holes(holes, edge_type)
+                fft_estimate = fft_estimates.get(edge_type)
                 
-                if holes:
+                if len(holes) < 2 and fft_estimate is not None:
+                    # Too few holes for a spacing; fall back on the periodicity estimate
+                    edge_length = self._calculate_edge_length(edge_points)
+                    edges.append(PerforationEdge(
+                        edge_type=edge_type,
+                        holes=holes,
+                        total_length_pixels=edge_length,
+                        gauge_measurement=fft_estimate.gauge,
+                        measurement_confidence=fft_estimate.confidence * 0.8,
+                        is_compound=False
+                    ))
+                    fft_notes.append(f"{edge_type.title()} edge gauged from perforation periodicity "
+                                     f"({fft_estimate.gauge:.2f})")
+                    logger.debug(f"{edge_type} edge: {len(holes)} holes, using FFT gauge {fft_estimate.gauge:.2f}")
+                elif holes:
                     # Calculate gauge from holes
                     edge_length = self._calculate_edge_length(edge_points)
                     gauge, confidence = self.calculate_perforation_gauge(holes, edge_length)
@@ -659,9 +832,14 @@ class PerforationMeasurementEngine:
                     )
                     
                     edges.append(edge_analysis)
-                    print(f"DEBUG: {edge_type} edge: {len(holes)} holes, gauge {gauge:.2f}")
+                    logger.debug(f"{edge_type} edge: {len(holes)} holes, gauge {gauge:.2f}")
+                    
+                    if fft_estimate is not None and gauge > 0 and abs(gauge - fft_estimate.gauge) > 0.75:
+                        fft_warnings.append(
+                            f"{edge_type.title()} edge: hole spacing gives {gauge:.2f} but periodicity "
+                            f"suggests {fft_estimate.gauge:.2f} - holes may be missed or spurious")
                 else:
-                    print(f"DEBUG: {edge_type} edge: no holes detected")
+                    logger.debug(f"{edge_type} edge: no holes detected")
             
             if not edges:
                 return PerforationAnalysis(
@@ -685,6 +863,7 @@ class PerforationMeasurementEngine:
             
             # Detect anomalies and potential issues
             warnings = self.detect_perforation_anomalies(overall_gauge, edges)
+            warnings.extend(fft_warnings)
             
             # Assess measurement quality
             avg_confidence = np.mean([e.measurement_confidence for e in edges])
@@ -704,6 +883,7 @@ class PerforationMeasurementEngine:
             technical_notes.append(f"Average measurement confidence: {avg_confidence:.2%}")
             technical_notes.append(f"DPI setting: {self.dpi}")
             technical_notes.append("Used hole-based detection method")
+            technical_notes.extend(fft_notes)
             
             # Add gauge range context
             if overall_gauge > 0:
@@ -817,7 +997,7 @@ class PerforationMeasurementEngine:
                 # For black backgrounds, perforations should be very dark (like background)
                 # Ink spots are usually gray, not black
                 if self.background_color == 'black' and center_intensity > 60:
-                    print(f"DEBUG VALIDATION: Rejected hole at ({x},{y}) - too bright for perforation (intensity={center_intensity:.1f})")
+                    logger.debug(f"Hole validation: Rejected hole at ({x},{y}) - too bright for perforation (intensity={center_intensity:.1f})")
                     return False
             
             # 3. Check for circular uniformity (perforations are more uniform than ink spots)
@@ -836,14 +1016,14 @@ class PerforationMeasurementEngine:
                 
                 # Real perforations should have good contrast (dark center, lighter edges)
                 if contrast_ratio < 0.1:
-                    print(f"DEBUG VALIDATION: Rejected hole at ({x},{y}) - insufficient contrast (ratio={contrast_ratio:.3f})")
+                    logger.debug(f"Hole validation: Rejected hole at ({x},{y}) - insufficient contrast (ratio={contrast_ratio:.3f})")
                     return False
             
-            print(f"DEBUG VALIDATION: Accepted hole at ({x},{y}) as real perforation")
+            logger.debug(f"Hole validation: Accepted hole at ({x},{y}) as real perforation")
             return True
             
         except Exception as e:
-            print(f"DEBUG VALIDATION: Error validating hole at ({x},{y}): {e}")
+            logger.debug(f"Hole validation: Error validating hole at ({x},{y}): {e}")
             return False
     
     def measure_perforation(self, image: np.ndarray, use_hole_detection: bool = True) -> PerforationAnalysis:
@@ -879,7 +1059,8 @@ class PerforationMeasurementEngine:
             # Use the new line-based detection approach
             from perforation_line_detection import PerforationLineDetector
             
-            line_detector = PerforationLineDetector(self.dpi, self.background_color)
+            line_detector = PerforationLineDetector(self.dpi, self.background_color,
+                                                    indentation_peaks=self.line_indentation_peaks)
             perforation_lines = line_detector.detect_perforation_lines(image)
             
             if not perforation_lines:
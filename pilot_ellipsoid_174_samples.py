@@ -34,7 +34,7 @@ from utils.color_ellipsoid import (
     compare_ellipsoids,
     fit_ellipsoid,
     is_member,
-    mahalanobis_distance,
+    mahalanobis_distances,
     membership_probability,
     principal_axes,
 )
@@ -159,8 +159,8 @@ def find_outliers_within_cluster(
     found = False
     for c, fit in sorted(fits.items()):
         sub = samples[(samples["cluster_int"] == c) & (~samples["excluded"])]
-        for _, row in sub.iterrows():
-            d = mahalanobis_distance((row["L"], row["a"], row["b"]), fit)
+        dists = mahalanobis_distances(sub[["L", "a", "b"]].to_numpy(), [fit])[:, 0]
+        for (_, row), d in zip(sub.iterrows(), dists):
             if d > sigma_threshold:
                 tone = cluster_to_tone.get(c, f"cluster {c}")
                 print(f"  cluster {c} ({tone:<12}) {row['DataID']:<10} "
@@ -13,6 +13,8 @@ stamp is processed identically:
 3. Fit one ellipsoid for the whole stamp and one per tone.
 4. Pairwise comparison of whole-stamp ellipsoids → the central
    "is 174 a parallel printing of 170/171/172?" diagnostic.
+5. Every sample scored against every whole-stamp ellipsoid → which
+   stamp's distribution each sample fits best.
 """
 
 from __future__ import annotations
@@ -31,6 +33,7 @@ from utils.color_ellipsoid import (
     compare_ellipsoids,
     fit_ellipsoid,
     mahalanobis_distance,
+    score_membership,
 )
 
 ODS_PATH = os.path.expanduser("~/Desktop/All_Green_Pasteur.ods")
@@ -158,6 +161,35 @@ def report_pairwise(fits: Dict[str, EllipsoidFit]) -> None:
                   f"{cmp_.a_centre_in_b_sigma:6.2f} {cmp_.b_centre_in_a_sigma:6.2f}")
 
 
+def report_sample_matches(
+    samples: pd.DataFrame,
+    fits: Dict[str, EllipsoidFit],
+    sigma: float = 2.0,
+) -> None:
+    """Score every included sample against every whole-stamp ellipsoid.
+
+    Rows are the stamp a sample was recorded under, columns the stamp
+    whose ellipsoid it sits closest to (in σ). Off-diagonal counts are
+    samples that look more like another printing than their own;
+    "none" counts samples outside ``sigma`` of every ellipsoid.
+    """
+    included = samples[~samples["excluded"]]
+    if included.empty or not fits:
+        return
+    scores = score_membership(included[["L", "a", "b"]].to_numpy(), fits, sigma=sigma)
+    best = pd.Series(scores.best_label, index=included.index, dtype=object)
+    best[~scores.is_member.any(axis=1)] = "none"
+    table = pd.crosstab(included["stamp"], best).reindex(
+        columns=[*sorted(fits.keys()), "none"], fill_value=0,
+    )
+
+    print(f"\n=== Best-matching whole-stamp ellipsoid per sample (≤{sigma}σ) ===\n")
+    print(f"{'recorded':<9}" + "".join(f"{c:>7}" for c in table.columns))
+    print("-" * (9 + 7 * len(table.columns)))
+    for stamp, row in table.iterrows():
+        print(f"{stamp:<9}" + "".join(f"{int(v):>7}" for v in row))
+
+
 def report_per_tone(
     fits: Dict[Tuple[str, int], EllipsoidFit],
 ) -> None:
@@ -229,6 +261,7 @@ def main() -> None:
     whole = fit_whole_stamp(samples)
     report_whole_stamp(whole)
     report_pairwise(whole)
+    report_sample_matches(samples, whole)
 
     per_tone = fit_per_tone(samples)
     report_per_tone(per_tone)
@@ -254,6 +287,9 @@ def main() -> None:
     print("• Same-tone comparison strips out the tonal-set differences. If the same")
     print("  conceptual tone (e.g. tone 0 = lightest) is consistent across 170/171/172")
     print("  but offset on 174, that's the cleanest evidence of the parallel shift.")
+    print("• The best-match table shows how separable the printings are: samples")
+    print("  landing off the diagonal fit another stamp's distribution better than")
+    print("  their own.")
 
 
 if __name__ == "__main__":
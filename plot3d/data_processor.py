@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import logging
 
+from .workbook_cache import read_sheet
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
@@ -31,7 +33,7 @@ def load_data(file_path, use_rgb=False, handle_blank_rows=True, sheet_name=None)
         
         # Load the raw data
         if file_extension == 'ods':
-            df = pd.read_excel(file_path, engine='odf', sheet_name=sheet_name or 0)
+            df = read_sheet(file_path, sheet_name=sheet_name or 0, engine='odf')
             print(f"Loaded {len(df)} rows from file")
             if sheet_name:
                 logger.info(f"Loaded sheet '{sheet_name}' from {file_path}")
@@ -40,7 +42,7 @@ def load_data(file_path, use_rgb=False, handle_blank_rows=True, sheet_name=None)
                 print(f"Loaded first sheet (default)")
             print(f"======================\n")
         elif file_extension == 'xlsx':
-            df = pd.read_excel(file_path, engine='openpyxl', sheet_name=sheet_name or 0)
+            df = read_sheet(file_path, sheet_name=sheet_name or 0, engine='openpyxl')
             print(f"Loaded {len(df)} rows from file")
             if sheet_name:
                 logger.info(f"Loaded sheet '{sheet_name}' from {file_path}")
@@ -5,8 +5,9 @@ import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import messagebox
-import ezodf
-from typing import Tuple, Dict, List, Optional
+from typing import Tuple, Dict, List, Optional, Sequence, Union
+
+from .delta_e_core import delta_e_2000, normalized_to_lab, reference_delta_e_table, round_delta_e
 
 class DeltaECalculator:
     """
@@ -77,7 +78,8 @@ class DeltaECalculator:
         try:
             # Determine which engine to use based on file extension
             engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
-            df = pd.read_excel(self.file_path, engine=engine)
+            from .workbook_cache import read_sheet
+            df = read_sheet(self.file_path, engine=engine)
             self.logger.info(f"Loaded data with {len(df)} rows for validation")
         except Exception as e:
             self.logger.error(f"Failed to load data for validation: {e}")
@@ -288,14 +290,15 @@ class DeltaECalculator:
         
         return deltaE
     
-    def validate_data(self, data: pd.DataFrame, row_indices: range, ref_row_idx: int = None) -> None:
+    def validate_data(self, data: pd.DataFrame, row_indices: range,
+                      ref_row_idx: Union[int, Sequence[int], None] = None) -> None:
         """
         Validate data for ΔE calculation.
         
         Args:
             data: DataFrame containing the data
             row_indices: Range of row indices to validate
-            ref_row_idx: Index of the row containing reference centroid values (0-based)
+            ref_row_idx: Index, or list of indices, of the reference row(s) (0-based)
             
         Raises:
             ValueError: If data validation fails
@@ -342,44 +345,50 @@ class DeltaECalculator:
         coordinate_columns = ['Xnorm', 'Ynorm', 'Znorm']
         centroid_columns = ['Centroid_X', 'Centroid_Y', 'Centroid_Z']
         
-        # For each row, only validate if it contains any coordinate data
-        for idx, row in subset.iterrows():
-            # Skip completely blank rows
-            if row[coordinate_columns].isna().all():
-                self.logger.debug(f"Skipping blank row {idx + 2}")
-                continue
-                
-            # If row has any coordinate data, validate all coordinates are present
-            if row[coordinate_columns].notna().any():
-                missing_coords = [col for col in coordinate_columns if pd.isna(row[col])]
-                if missing_coords:
-                    row_num = idx + 2  # Convert to 1-based row number
-                    self.logger.error(f"Row {row_num} has partial coordinate data: missing {missing_coords}")
-                    raise ValueError(f"Row {row_num} has incomplete coordinate data.\n"
-                                   f"If any coordinate is provided, all coordinates (Xnorm, Ynorm, Znorm) must be present.")
-                
-                # Validate coordinate ranges
-                for col in coordinate_columns:
-                    if not (0 <= row[col] <= 1):
-                        row_num = idx + 2
-                        self.logger.error(f"Row {row_num} has {col} value outside 0-1 range: {row[col]}")
-                        raise ValueError(f"Row {row_num} has {col} value outside the valid range.\n"
-                                       f"All coordinate values must be between 0.0 and 1.0.")
-        
-        # Validate reference row if specified
-        if ref_row_idx is not None:
-            if ref_row_idx >= len(data):
-                self.logger.error(f"Reference row index {ref_row_idx} is out of bounds")
-                raise ValueError(f"Reference row {ref_row_idx + 2} is out of bounds")
+        # Rows with some but not all coordinates, or with a coordinate outside
+        # 0-1, are invalid; completely blank rows are skipped. Report the
+        # first offending row, as a row-by-row scan would.
+        coords = subset[coordinate_columns]
+        present = coords.notna().to_numpy()
+        complete = present.all(axis=1)
+        partial = present.any(axis=1) & ~complete
+        outside = ~((coords >= 0) & (coords <= 1)).to_numpy() & complete[:, None]
+        invalid = partial | outside.any(axis=1)
+        if invalid.any():
+            pos = int(np.argmax(invalid))
+            row_num = subset.index[pos] + 2  # Convert to 1-based row number
+            if partial[pos]:
+                missing_coords = [col for col, ok in zip(coordinate_columns, present[pos]) if not ok]
+                self.logger.error(f"Row {row_num} has partial coordinate data: missing {missing_coords}")
+                raise ValueError(f"Row {row_num} has incomplete coordinate data.\n"
+                               f"If any coordinate is provided, all coordinates (Xnorm, Ynorm, Znorm) must be present.")
+            col = coordinate_columns[int(np.argmax(outside[pos]))]
+            value = coords.iloc[pos][col]
+            self.logger.error(f"Row {row_num} has {col} value outside 0-1 range: {value}")
+            raise ValueError(f"Row {row_num} has {col} value outside the valid range.\n"
+                           f"All coordinate values must be between 0.0 and 1.0.")
+        
+        # Validate reference row(s) if specified
+        if ref_row_idx is None:
+            ref_row_indices = []
+        elif isinstance(ref_row_idx, (int, np.integer)):
+            ref_row_indices = [ref_row_idx]
+        else:
+            ref_row_indices = list(ref_row_idx)
+        
+        for ref_idx in ref_row_indices:
+            if ref_idx >= len(data):
+                self.logger.error(f"Reference row index {ref_idx} is out of bounds")
+                raise ValueError(f"Reference row {ref_idx + 2} is out of bounds")
                 
-            ref_row = data.iloc[ref_row_idx]
-            ref_row_num = ref_row_idx + 2
+            ref_row = data.iloc[ref_idx]
+            ref_row_num = ref_idx + 2
             
             # For Reference Point calculation, we only need valid coordinate data in the reference row
             # Skip validation if the reference row is completely blank
             if ref_row[coordinate_columns].isna().all():
                 self.logger.debug(f"Reference row {ref_row_num} is blank, skipping validation")
-                return
+                continue
                 
             # Check for missing coordinate values
             missing_coords = [col for col in coordinate_columns if pd.isna(ref_row[col])]
@@ -395,34 +404,26 @@ class DeltaECalculator:
                     self.logger.error(f"Reference row {ref_row_num} has {col} value outside 0-1 range: {ref_row[col]}")
                     raise ValueError(f"Reference row {ref_row_num} has {col} value outside the valid range.\n"
                                    f"All coordinate values must be between 0.0 and 1.0.")
-        # Check for values outside the normalized 0-1 range
-        # First check coordinate columns in all rows
-        for col in coordinate_columns:
-            out_of_range = ((subset[col] < 0) | (subset[col] > 1)).any()
-            if out_of_range:
-                self.logger.error(f"Column {col} contains values outside the 0-1 normalized range")
-                raise ValueError(f"Column {col} contains values outside the 0-1 normalized range.\n"
-                                f"All coordinate values must be between 0.0 and 1.0.")
-        
-        # Then check centroid columns in reference row only if specified
-        if ref_row_idx is not None:
-            ref_row = data.iloc[ref_row_idx]
+            
+            # Check centroid columns in the reference row
             for col in centroid_columns:
                 if not pd.isna(ref_row[col]) and (ref_row[col] < 0 or ref_row[col] > 1):
-                    ref_row_num = ref_row_idx + 2  # Convert to 1-based for display
                     self.logger.error(f"Reference row {ref_row_num} has {col} value outside the 0-1 normalized range")
                     raise ValueError(f"Reference row {ref_row_num} has {col} value outside the 0-1 normalized range.\n"
                                     f"All centroid values must be between 0.0 and 1.0.")
 
-    def calculate_delta_e(self, start_row: int, end_row: int, ref_row: int = None) -> None:
+    def calculate_delta_e(self, start_row: int, end_row: int,
+                          ref_row: Union[int, Sequence[int], None] = None) -> None:
         """
         Calculate ΔE CIE2000 for the specified row range and update the .ods file.
         
         Args:
             start_row: 1-based start row number
             end_row: 1-based end row number
-            ref_row: 1-based reference row number containing centroid values (optional)
-                     If not specified, each row must have its own centroid values
+            ref_row: 1-based reference row number, or a list of them (optional).
+                     With several reference rows each point gets the ΔE to its
+                     nearest reference. If not specified, each row must have
+                     its own centroid values
         """
         if self.file_path is None:
             self.logger.error("No file path set")
@@ -432,21 +433,25 @@ class DeltaECalculator:
             self.logger.error(f"File not found: {self.file_path}")
             raise ValueError(f"File not found: {self.file_path}")
         
-        # Convert ref_row to 0-based index if specified
-        ref_row_idx = None
-        ref_row_display = "each row's own"
-        
-        if ref_row is not None:
-            ref_row_idx = ref_row - 2  # Convert from 1-based to 0-based
-            ref_row_display = f"row {ref_row}"
+        # Convert ref_row(s) to 0-based indices if specified
+        if ref_row is None:
+            ref_rows = []
+        elif isinstance(ref_row, (int, np.integer)):
+            ref_rows = [int(ref_row)]
+        else:
+            ref_rows = [int(r) for r in ref_row]
+        ref_row_indices = [r - 2 for r in ref_rows]  # Convert from 1-based to 0-based
             
         # Confirm with user
         confirmation_message = (
             f"Calculate ΔE values for rows {start_row}-{end_row}?\n\n"
         )
         
-        if ref_row is not None:
-            confirmation_message += f"Using reference point coordinates from row {ref_row}.\n\n"
+        if len(ref_rows) == 1:
+            confirmation_message += f"Using reference point coordinates from row {ref_rows[0]}.\n\n"
+        elif ref_rows:
+            confirmation_message += (f"Using the nearest of the reference points in rows "
+                                     f"{', '.join(str(r) for r in ref_rows)}.\n\n")
         else:
             confirmation_message += "Using each row's own centroid values.\n\n"
             
@@ -466,7 +471,9 @@ class DeltaECalculator:
             self.logger.info(f"Loading data from {self.file_path}")
             # Determine which engine to use based on file extension
             engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
-            data = pd.read_excel(self.file_path, engine=engine)
+            from .workbook_cache import read_sheet
+            data = read_sheet(self.file_path, engine=engine)
+            file_columns = list(data.columns)  # header as stored, before alias mapping
             
             # Verify required columns exist with alias handling
             required_columns = ['Xnorm', 'Ynorm', 'Znorm', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', '∆E']
@@ -494,36 +501,29 @@ class DeltaECalculator:
             # Get indices for the selected row range
             row_indices = self._get_data_indices(start_row, end_row)
             
-            # Open the .ods file for direct editing
-            ods_doc = ezodf.opendoc(self.file_path)
-            sheet = ods_doc.sheets[0]
+            from .workbook_cache import file_signature, apply_edits
+            signature_before = file_signature(self.file_path)
             
             # Validate data in selected range
             self.logger.info("Validating data in selected range")
             
             # Pass the reference row index to validation if specified
-            self.validate_data(data, row_indices, ref_row_idx)
-            
-            # Get reference point coordinates if using a reference row
-            reference_point = None
-            if ref_row_idx is not None:
-                ref_data = data.iloc[ref_row_idx]
-                reference_point = (ref_data['Xnorm'], ref_data['Ynorm'], ref_data['Znorm'])
-                self.logger.info(f"Using reference point from row {ref_row}: ({reference_point[0]:.4f}, {reference_point[1]:.4f}, {reference_point[2]:.4f})")
-            
-            # Find the ∆E column index
-            header_row = 0  # Header is in row 0 (first row)
-            delta_e_col_idx = None
-            
-            for col_idx in range(len(sheet.row(header_row))):
-                cell_value = sheet[header_row, col_idx].value
-                if cell_value == '∆E':
-                    delta_e_col_idx = col_idx
-                    break
-                    
-            if delta_e_col_idx is None:
+            self.validate_data(data, row_indices, ref_row_indices)
+            
+            # Get reference point coordinates if using reference rows
+            reference_points = {}
+            for row_num, ref_idx in zip(ref_rows, ref_row_indices):
+                ref_data = data.iloc[ref_idx]
+                reference_points[row_num] = (ref_data['Xnorm'], ref_data['Ynorm'], ref_data['Znorm'])
+                self.logger.info(f"Using reference point from row {row_num}: ({reference_points[row_num][0]:.4f}, {reference_points[row_num][1]:.4f}, {reference_points[row_num][2]:.4f})")
+            
+            # Find the ∆E column index (aliases were mapped above, so the
+            # position in `data` is the position in the sheet)
+            if '∆E' not in data.columns:
                 self.logger.error("∆E column not found in spreadsheet")
                 raise ValueError("∆E column not found in spreadsheet")
+            delta_e_col_idx = data.columns.get_loc('∆E')
+            delta_e_header = file_columns[delta_e_col_idx]
                 
             self.logger.info(f"Found ∆E column at index {delta_e_col_idx}")
             
@@ -533,76 +533,40 @@ class DeltaECalculator:
             
             # Track successful updates
             updates = []
-            
-            # Process each row
-            for i, (idx, row) in enumerate(subset.iterrows()):
-                try:
-                    # Skip completely blank rows
-                    if row[['Xnorm', 'Ynorm', 'Znorm']].isna().all():
-                        self.logger.debug(f"Skipping blank row {idx+2}")
-                        continue
-                        
-                    # Skip rows with missing coordinate data
-                    if row[['Xnorm', 'Ynorm', 'Znorm']].isna().any():
-                        self.logger.debug(f"Skipping row {idx+2} due to missing coordinates")
-                        continue
-                    
-                    # Get point coordinates
-                    point_xyz = (row['Xnorm'], row['Ynorm'], row['Znorm'])
-                    
-                    # Get second point coordinates - either from reference row or centroid values
-                    if ref_row_idx is not None:
-                        # Use reference point coordinates directly
-                        if reference_point is None:
-                            self.logger.error("Reference point coordinates are missing")
-                            raise ValueError(f"Reference row {ref_row} is missing coordinate values")
-                        second_point = reference_point
-                    else:
-                        # Use this row's own centroid values
-                        if row[['Centroid_X', 'Centroid_Y', 'Centroid_Z']].isna().any():
-                            self.logger.debug(f"Skipping row {idx+2} due to missing centroid values")
-                            continue
-                        second_point = (row['Centroid_X'], row['Centroid_Y'], row['Centroid_Z'])
-                    
-                    # Data is already in L*a*b* space (normalized 0-1)
-                    # Based on plot_utils.py axis labels: X=L*, Y=a*, Z=b*
-                    # Denormalize to standard L*a*b* ranges:
-                    # - L*: 0-100 (from X)
-                    # - a*: -128 to +127 (from Y)
-                    # - b*: -128 to +127 (from Z)
-                    point_lab = (
-                        point_xyz[0] * 100,           # L* (X)
-                        point_xyz[1] * 255 - 128,     # a* (Y)
-                        point_xyz[2] * 255 - 128      # b* (Z)
-                    )
-                    second_point_lab = (
-                        second_point[0] * 100,        # L* (X)
-                        second_point[1] * 255 - 128,  # a* (Y)
-                        second_point[2] * 255 - 128   # b* (Z)
-                    )
-                    
-                    # Calculate ∆E CIE2000 directly with Lab values
-                    delta_e = self.calculate_delta_e_2000(point_lab, second_point_lab)
-                    
-                    # Round to 2 decimal places
-                    delta_e = round(delta_e, 2)
-                    
-                    # Update the ∆E column in the spreadsheet (1-based row indexing)
-                    sheet_row_idx = idx + 2  # Add 2 to convert from 0-based DataFrame index to 1-based sheet row
-                    
-                    # Update ∆E cell
-                    cell = sheet[sheet_row_idx, delta_e_col_idx]
-                    cell.set_value(delta_e)
-                    
-                    updates.append(sheet_row_idx)
-                    
-                    # Log progress every 10 rows
-                    if (i + 1) % 10 == 0 or i == len(subset) - 1:
-                        self.logger.info(f"Processed {i + 1}/{len(subset)} rows")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error processing row {idx + 2}: {e}")
-                    # Continue with the next row
+            cell_edits = []  # (sheet, row, column, value) for the patch engine
+            cache_edits = []  # (row, column, value) mirrored into the workbook cache
+            
+            # Data is already in L*a*b* space (normalized 0-1); based on
+            # plot_utils.py axis labels X=L*, Y=a*, Z=b*, denormalized to
+            # L* 0-100 and a*/b* -128 to +127
+            if reference_points:
+                # Every point against every reference in one pass; with several
+                # references each point gets the ΔE to the nearest one
+                table = reference_delta_e_table(data, row_indices, reference_points)
+                delta_e = table['Nearest ∆E']
+                if len(reference_points) > 1:
+                    counts = table['Nearest'].value_counts().to_dict()
+                    self.logger.info(f"Nearest reference row counts: {counts}")
+            else:
+                # Each row against its own centroid values
+                points = subset[['Xnorm', 'Ynorm', 'Znorm']].to_numpy(dtype=np.float64)
+                centroids = subset[['Centroid_X', 'Centroid_Y', 'Centroid_Z']].to_numpy(dtype=np.float64)
+                complete = ~(np.isnan(points).any(axis=1) | np.isnan(centroids).any(axis=1))
+                values = np.full(len(subset), np.nan)
+                values[complete] = round_delta_e(delta_e_2000(normalized_to_lab(points[complete]),
+                                                              normalized_to_lab(centroids[complete])))
+                delta_e = pd.Series(values, index=subset.index)
+            
+            # Blank rows and rows missing coordinates (or centroid values) are skipped
+            delta_e = delta_e.dropna()
+            
+            # Queue the ∆E cells; sheet row 0 is the header, so the 0-based
+            # sheet row is the DataFrame index + 1
+            for idx, value in zip(delta_e.index.tolist(), delta_e.tolist()):
+                cell_edits.append((None, idx + 1, delta_e_col_idx, value))
+                updates.append(idx + 1)
+                cache_edits.append((idx, delta_e_header, value))
+            self.logger.info(f"Calculated ∆E for {len(updates)}/{len(subset)} rows")
             
             # Save the updated file
             if updates:
@@ -615,15 +579,14 @@ class DeltaECalculator:
                     import shutil
                     shutil.copy2(self.file_path, backup_path)
                     
-                    # Save to a temporary file first
+                    # Patch all ∆E cells into a temporary file first
+                    from utils.spreadsheet_patcher import patch_workbook
                     temp_path = f"{self.file_path}.new"
-                    ods_doc.saveas(temp_path)
-                    
-                    # Close document
-                    del ods_doc
+                    patch_workbook(self.file_path, cell_edits, output_path=temp_path)
                     
                     # Replace original with new file
                     os.replace(temp_path, self.file_path)
+                    apply_edits(self.file_path, None, cache_edits, signature_before)
                     
                     # Clean up backup file
                     if os.path.exists(backup_path):
@@ -687,7 +650,7 @@ class DeltaECalculator:
         
         # Reference row input
         tk.Label(control_frame, text="Ref Row:", font=("Arial", 9, "normal")).pack(side=tk.LEFT, padx=(5,0))
-        self.ref_row_entry = tk.Entry(control_frame, width=3)
+        self.ref_row_entry = tk.Entry(control_frame, width=6)
         self.ref_row_entry.pack(side=tk.LEFT, padx=1)
         
         # Calculate button
@@ -729,10 +692,12 @@ class DeltaECalculator:
                 start_row = int(self.start_row_entry.get())
                 end_row = int(self.end_row_entry.get())
                 
-                # Get reference row if provided
+                # Get reference row(s) if provided, e.g. "5" or "5, 12, 20"
                 ref_row = None
-                if self.ref_row_entry.get().strip():
-                    ref_row = int(self.ref_row_entry.get())
+                ref_text = self.ref_row_entry.get().strip()
+                if ref_text:
+                    ref_rows = [int(r) for r in ref_text.split(',') if r.strip()]
+                    ref_row = ref_rows[0] if len(ref_rows) == 1 else ref_rows
             except ValueError:
                 messagebox.showerror("Invalid Input", "Row values must be integers.")
                 return
@@ -759,8 +724,10 @@ class DeltaECalculator:
             "and their cluster centroids using the ΔE CIE2000 formula.\n\n"
             "Usage:\n"
             "1. Enter the row range to process (first data row is 2)\n"
-            "2. Optional: Enter a reference row number to use its centroid values\n"
-            "   (leave empty to use each row's own centroid values)\n"
+            "2. Optional: Enter a reference row number to use its coordinates\n"
+            "   (leave empty to use each row's own centroid values).\n"
+            "   Several rows separated by commas (e.g. 5, 12, 20) give each\n"
+            "   point the ΔE to its nearest reference\n"
             "3. Click 'Calculate' to compute ΔE values\n"
             "4. Values will be saved to the '∆E' column\n\n"
             "Requirements:\n"
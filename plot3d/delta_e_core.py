@@ -0,0 +1,306 @@
+"""
+Array-based ΔE CIE2000 core for the Plot_3D ΔE tools.
+
+The per-point helpers on DeltaEManager (``rgb_to_lab``,
+``calculate_delta_e_2000``) convert and compare one colour at a time; the
+functions here do the same arithmetic on whole NumPy arrays so a selected
+row range is denormalized, converted and compared against its cluster
+centroids in a handful of array operations. The same functions give the
+N x R matrix of every point against a set of reference rows, used by the
+reference-point tools.
+
+Results match the scalar implementations to floating-point precision and
+are rounded the same way (Python ``round(x, 2)``).
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# D65 white point for sRGB conversion (same as DeltaEManager)
+D65_WHITE = np.array([0.95047, 1.00000, 1.08883])
+
+# Linear sRGB -> XYZ
+SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+
+# CIE Lab constants as used throughout Plot_3D
+LAB_EPSILON = 0.008856
+LAB_KAPPA = 903.3
+
+_25_POW_7 = 25.0 ** 7
+
+
+def _lab_f(t: np.ndarray) -> np.ndarray:
+    return np.where(t > LAB_EPSILON,
+                    np.power(np.maximum(t, LAB_EPSILON), 1 / 3),
+                    (LAB_KAPPA * t + 16) / 116)
+
+
+def xyz_to_lab(xyz: np.ndarray, white: Sequence[float] = (1.0, 1.0, 1.0)) -> np.ndarray:
+    """Convert normalized XYZ values (..., 3) to L*a*b*.
+
+    Matches the calculators' ``xyz_to_lab``: inputs are clipped to 0-1 and
+    scaled by ``white`` (1, 1, 1 for normalized data).
+    """
+    xyz = np.clip(np.asarray(xyz, dtype=np.float64), 0.0, 1.0) / np.asarray(white, dtype=np.float64)
+    fx, fy, fz = _lab_f(xyz[..., 0]), _lab_f(xyz[..., 1]), _lab_f(xyz[..., 2])
+    L = np.clip(116 * fy - 16, 0.0, 100.0)
+    return np.stack([L, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert normalized sRGB values (..., 3) in 0-1 to L*a*b* (D65)."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92,
+                      np.power(np.maximum(rgb + 0.055, 0) / 1.055, 2.4))
+    xyz = linear @ SRGB_TO_XYZ.T / D65_WHITE
+    fx, fy, fz = _lab_f(xyz[..., 0]), _lab_f(xyz[..., 1]), _lab_f(xyz[..., 2])
+    L = np.clip(116 * fy - 16, 0.0, 100.0)
+    return np.stack([L, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def normalized_to_lab(values: np.ndarray, color_space: str = 'LAB') -> np.ndarray:
+    """Denormalize Plot_3D coordinates (..., 3) to L*a*b*.
+
+    Args:
+        values: Xnorm/Ynorm/Znorm triples in 0-1
+        color_space: 'LAB' (X=L*, Y=a*, Z=b*), 'RGB', 'CMY' or 'XYZ'
+
+    Raises:
+        ValueError: For an unknown colour space
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if color_space == 'LAB':
+        # L*: 0-100 (from X), a*/b*: -128 to +127 (from Y/Z)
+        return np.stack([values[..., 0] * 100,
+                         values[..., 1] * 255 - 128,
+                         values[..., 2] * 255 - 128], axis=-1)
+    if color_space == 'CMY':
+        # RGB = 1 - CMY
+        return rgb_to_lab(1 - values)
+    if color_space == 'RGB':
+        return rgb_to_lab(values)
+    if color_space == 'XYZ':
+        return xyz_to_lab(values)
+    raise ValueError(f"Unknown color space: {color_space}")
+
+
+def _hue_prime(ap: np.ndarray, b: np.ndarray) -> np.ndarray:
+    h = np.degrees(np.arctan2(b, ap))
+    h = np.where(h < 0, h + 360, h)
+    return np.where((ap == 0) & (b == 0), 0.0, h)
+
+
+def delta_e_2000(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """ΔE CIE2000 between L*a*b* arrays (..., 3); the arrays broadcast."""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C1 = np.sqrt(a1 ** 2 + b1 ** 2)
+    C2 = np.sqrt(a2 ** 2 + b2 ** 2)
+    Cab7 = ((C1 + C2) / 2) ** 7
+    G = 0.5 * (1 - np.sqrt(Cab7 / (Cab7 + _25_POW_7)))
+
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.sqrt(a1p ** 2 + b1 ** 2)
+    C2p = np.sqrt(a2p ** 2 + b2 ** 2)
+    h1p = _hue_prime(a1p, b1)
+    h2p = _hue_prime(a2p, b2)
+
+    deltaLp = L2 - L1
+    deltaCp = C2p - C1p
+
+    chroma_product = C1p * C2p
+    achromatic = chroma_product == 0
+    dhp = h2p - h1p
+    dhp = np.where(achromatic, 0.0,
+                   np.where(np.abs(dhp) <= 180, dhp,
+                            np.where(dhp > 180, dhp - 360, dhp + 360)))
+    deltaHp = 2 * np.sqrt(chroma_product) * np.sin(np.radians(dhp / 2))
+
+    Lp = (L1 + L2) / 2
+    Cp = (C1p + C2p) / 2
+    hue_sum = h1p + h2p
+    hp = np.where(achromatic, hue_sum,
+                  np.where(np.abs(h1p - h2p) <= 180, hue_sum / 2,
+                           np.where(hue_sum < 360, (hue_sum + 360) / 2, (hue_sum - 360) / 2)))
+
+    T = (1
+         - 0.17 * np.cos(np.radians(hp - 30))
+         + 0.24 * np.cos(np.radians(2 * hp))
+         + 0.32 * np.cos(np.radians(3 * hp + 6))
+         - 0.20 * np.cos(np.radians(4 * hp - 63)))
+
+    deltaTheta = 30 * np.exp(-((hp - 275) / 25) ** 2)
+    Cp7 = Cp ** 7
+    RT = -np.sin(np.radians(2 * deltaTheta)) * 2 * np.sqrt(Cp7 / (Cp7 + _25_POW_7))
+
+    SL = 1 + ((0.015 * (Lp - 50) ** 2) / np.sqrt(20 + (Lp - 50) ** 2))
+    SC = 1 + 0.045 * Cp
+    SH = 1 + 0.015 * Cp * T
+
+    return np.sqrt((deltaLp / SL) ** 2
+                   + (deltaCp / SC) ** 2
+                   + (deltaHp / SH) ** 2
+                   + RT * (deltaCp / SC) * (deltaHp / SH))
+
+
+def round_delta_e(values: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals exactly as ``round(value, 2)`` does for each value."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.array([round(v, 2) for v in values.ravel().tolist()],
+                    dtype=np.float64).reshape(values.shape)
+
+
+def delta_e_matrix(points_lab: np.ndarray, references_lab: np.ndarray) -> np.ndarray:
+    """Rounded ΔE CIE2000 of every point (N, 3) against every reference (R, 3).
+
+    Returns:
+        (N, R) array
+    """
+    points_lab = np.asarray(points_lab, dtype=np.float64).reshape(-1, 3)
+    references_lab = np.asarray(references_lab, dtype=np.float64).reshape(-1, 3)
+    return round_delta_e(delta_e_2000(points_lab[:, None, :], references_lab[None, :, :]))
+
+
+def nearest_reference(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Closest reference for each row of a ΔE matrix.
+
+    NaN entries are ignored; ties go to the first reference.
+
+    Returns:
+        (column index or -1 where the row has no values, ΔE to that reference)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    valid = ~np.isnan(matrix)
+    has_value = valid.any(axis=1)
+    nearest = np.where(valid, matrix, np.inf).argmin(axis=1)
+    nearest_delta_e = matrix[np.arange(len(matrix)), nearest]
+    return (np.where(has_value, nearest, -1),
+            np.where(has_value, nearest_delta_e, np.nan))
+
+
+def cluster_centroids(df: pd.DataFrame, cluster_col: str = 'Cluster',
+                      centroid_cols: Sequence[str] = ('Centroid_X', 'Centroid_Y', 'Centroid_Z')
+                      ) -> Dict[int, Tuple[float, float, float]]:
+    """Centroid of each cluster, taken from the first row that has all three values.
+
+    Returns:
+        {cluster number: (Centroid_X, Centroid_Y, Centroid_Z)}
+    """
+    clusters = pd.to_numeric(df[cluster_col], errors='coerce')
+    values = df[list(centroid_cols)].apply(pd.to_numeric, errors='coerce')
+    valid = clusters.notna() & values.notna().all(axis=1)
+    if not valid.any():
+        return {}
+    first = values[valid].groupby(clusters[valid].astype(np.int64).to_numpy(), sort=False).first()
+    return {int(cluster): tuple(float(v) for v in row)
+            for cluster, row in zip(first.index, first.to_numpy())}
+
+
+def delta_e_column_patch(df: pd.DataFrame, row_indices: Iterable[int],
+                         centroids: Dict[int, Tuple[float, float, float]],
+                         color_space: str = 'LAB',
+                         point_cols: Sequence[str] = ('Xnorm', 'Ynorm', 'Znorm'),
+                         cluster_col: str = 'Cluster',
+                         exclude_col: Optional[str] = None,
+                         name: str = '∆E') -> pd.Series:
+    """ΔE of each selected row to its cluster centroid, as a column patch.
+
+    Rows without a cluster, without a known centroid, with incomplete
+    coordinates or flagged in ``exclude_col`` get NaN.
+
+    Args:
+        df: Plot_3D data
+        row_indices: Positional rows to compute
+        centroids: From ``cluster_centroids()``
+        color_space: Colour space of the coordinates ('LAB', 'RGB', 'CMY')
+        exclude_col: Optional column; any non-blank value excludes the row
+
+    Returns:
+        Series of rounded ΔE values indexed by the selected rows' labels
+    """
+    positions = np.asarray(list(row_indices), dtype=np.int64)
+    subset = df.iloc[positions]
+    result = np.full(len(positions), np.nan)
+    if not len(positions) or not centroids:
+        return pd.Series(result, index=subset.index, name=name)
+
+    points = subset[list(point_cols)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    clusters = pd.to_numeric(subset[cluster_col], errors='coerce').to_numpy(dtype=np.float64)
+
+    # Look up each row's centroid in a sorted table of cluster ids
+    cluster_ids = np.array(sorted(centroids), dtype=np.int64)
+    centroid_table = np.array([centroids[c] for c in cluster_ids], dtype=np.float64)
+    has_cluster = ~np.isnan(clusters)
+    row_ids = np.where(has_cluster, clusters, 0).astype(np.int64)
+    slot = np.clip(np.searchsorted(cluster_ids, row_ids), 0, len(cluster_ids) - 1)
+
+    ok = (has_cluster & (cluster_ids[slot] == row_ids)
+          & ~np.isnan(points).any(axis=1) & ~np.isnan(centroid_table[slot]).any(axis=1))
+    if exclude_col is not None and exclude_col in subset.columns:
+        flags = subset[exclude_col]
+        ok &= ~(flags.notna() & flags.astype(str).str.strip().ne('')).to_numpy()
+
+    if ok.any():
+        centroid_lab = normalized_to_lab(centroid_table, color_space)
+        delta_e = round_delta_e(delta_e_2000(normalized_to_lab(points[ok], color_space),
+                                             centroid_lab[slot[ok]]))
+        # Negative or NaN results are not stored
+        delta_e[~(delta_e >= 0)] = np.nan
+        result[ok] = delta_e
+
+    return pd.Series(result, index=subset.index, name=name)
+
+
+def reference_delta_e_table(df: pd.DataFrame, row_indices: Iterable[int],
+                            references: Dict[Any, Sequence[float]],
+                            color_space: str = 'LAB',
+                            point_cols: Sequence[str] = ('Xnorm', 'Ynorm', 'Znorm')
+                            ) -> pd.DataFrame:
+    """ΔE of each selected row against one or more reference points.
+
+    Args:
+        df: Plot_3D data
+        row_indices: Positional rows to compute
+        references: {label: normalized (x, y, z)}, e.g. keyed by sheet row
+        color_space: How coordinates map to L*a*b* (see ``normalized_to_lab()``)
+
+    Returns:
+        DataFrame indexed by the selected rows' labels with one column of
+        rounded ΔE per reference (in ``references`` order), then ``Nearest``
+        (label of the closest reference, None if the row has no
+        coordinates) and ``Nearest ∆E``
+    """
+    positions = np.asarray(list(row_indices), dtype=np.int64)
+    subset = df.iloc[positions]
+    labels = list(references)
+    matrix = np.full((len(positions), len(labels)), np.nan)
+
+    if len(positions) and labels:
+        points = subset[list(point_cols)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+        complete = ~np.isnan(points).any(axis=1)
+        if complete.any():
+            reference_lab = normalized_to_lab(np.array([references[k] for k in labels],
+                                                       dtype=np.float64), color_space)
+            matrix[complete] = delta_e_matrix(normalized_to_lab(points[complete], color_space),
+                                              reference_lab)
+
+    table = pd.DataFrame(matrix, index=subset.index, columns=labels)
+    nearest, nearest_delta_e = nearest_reference(matrix) if labels else (
+        np.full(len(positions), -1), np.full(len(positions), np.nan))
+    label_array = np.array(labels + [None], dtype=object)
+    table['Nearest'] = label_array[nearest]
+    table['Nearest ∆E'] = nearest_delta_e
+    return table
@@ -7,10 +7,11 @@ from tkinter import messagebox
 import time
 import fcntl
 import errno
-import ezodf
 import math
 from typing import Optional, Dict, List, Tuple, Any, Union
 
+from .delta_e_core import cluster_centroids, delta_e_column_patch
+
 
 class DeltaEManager:
     """
@@ -271,11 +272,8 @@ class DeltaEManager:
             sheet_end = end - 1      # Display row 36 = sheet row 35
             
             # Find DataFrame indices where _original_sheet_row is in our range
-            matching_indices = []
-            for df_idx, row in self.data.iterrows():
-                orig_sheet_row = row.get('_original_sheet_row')
-                if pd.notna(orig_sheet_row) and sheet_start <= orig_sheet_row <= sheet_end:
-                    matching_indices.append(df_idx)
+            orig_sheet_rows = pd.to_numeric(self.data['_original_sheet_row'], errors='coerce')
+            matching_indices = self.data.index[orig_sheet_rows.between(sheet_start, sheet_end)].tolist()
             
             self.logger.info(f"🔍 Found {len(matching_indices)} DataFrame indices for display rows {start}-{end}: {matching_indices[:5]}{'...' if len(matching_indices) > 5 else ''}")
             
@@ -601,67 +599,10 @@ class DeltaEManager:
             self.logger.error("Centroid columns exist but contain only null values")
             return centroids
             
-        # Process each cluster to extract its centroid
-        for cluster in clusters:
-            try:
-                self.logger.info(f"🔍 Processing cluster: {cluster} (type: {type(cluster)})")
-                if not pd.isna(cluster):
-                    cluster_int = int(cluster)
-                    self.logger.info(f"🔍 Converted to cluster_int: {cluster_int}")
-                    
-                    # Get all points belonging to this cluster
-                    # Use numeric comparison to handle both int and float cluster values
-                    cluster_points = df[df[cluster_col] == cluster]
-                    self.logger.info(f"🔍 Found {len(cluster_points)} points for cluster {cluster_int}")
-                    
-                    if not cluster_points.empty:
-                        # Log how many points are in this cluster
-                        self.logger.info(f"Cluster {cluster_int} has {len(cluster_points)} points")
-                        
-                        # DEBUG: Show sample data for this cluster
-                        sample_row = cluster_points.iloc[0]
-                        self.logger.info(f"  Sample row for cluster {cluster_int}: Centroid_X={sample_row.get(centroid_x_col)}, Centroid_Y={sample_row.get(centroid_y_col)}, Centroid_Z={sample_row.get(centroid_z_col)}")
-                        
-                        # Check if centroid columns have values for this cluster
-                        valid_centroid_rows = cluster_points[
-                            cluster_points[centroid_x_col].notna() & 
-                            cluster_points[centroid_y_col].notna() & 
-                            cluster_points[centroid_z_col].notna()
-                        ]
-                        
-                        # Log how many valid centroid rows we found
-                        if not valid_centroid_rows.empty:
-                            self.logger.info(f"Found {len(valid_centroid_rows)} rows with valid centroid data in cluster {cluster_int}")
-                            
-                            # Debug: print sample values to check data types and formats
-                            sample_row = valid_centroid_rows.iloc[0]
-                            
-                            # Use simple string concatenation to avoid formatting issues
-                            self.logger.info("Sample centroid values for cluster " + str(cluster_int) + ":")
-                            
-                            for col, desc in [
-                                (centroid_x_col, "X"),
-                                (centroid_y_col, "Y"),
-                                (centroid_z_col, "Z")
-                            ]:
-                                try:
-                                    value = float(sample_row[col])
-                                    self.logger.info("  Centroid_{0}: {1:.4f} (type: {2})".format(
-                                        desc, value, type(value).__name__
-                                    ))
-                                except Exception as e:
-                                    self.logger.warning("  Failed to format Centroid_{0} value: {1}".format(desc, str(e)))
-                            
-                            # Get the centroid coordinates
-                            centroid_x = float(sample_row[centroid_x_col])
-                            centroid_y = float(sample_row[centroid_y_col])
-                            centroid_z = float(sample_row[centroid_z_col])
-                            
-                            # Store the centroid for this cluster
-                            centroids[cluster_int] = (centroid_x, centroid_y, centroid_z)
-                            self.logger.info(f"Found centroid for cluster {cluster_int}: ({centroid_x:.6f}, {centroid_y:.6f}, {centroid_z:.6f})")
-            except Exception as e:
-                self.logger.error(f"Error processing cluster {cluster}: {str(e)}")
+        # First complete centroid row of each cluster, in one group-by
+        centroids = cluster_centroids(df, cluster_col, (centroid_x_col, centroid_y_col, centroid_z_col))
+        for cluster_int, (centroid_x, centroid_y, centroid_z) in centroids.items():
+            self.logger.info(f"Found centroid for cluster {cluster_int}: ({centroid_x:.6f}, {centroid_y:.6f}, {centroid_z:.6f})")
         
         # Final status report
         if centroids:
@@ -754,10 +695,6 @@ class DeltaEManager:
                 self.logger.error(f"❌ Check that K-means was run on the same row range: {start_row}-{end_row}")
                 raise ValueError(f"No cluster assignments found for rows {start_row}-{end_row}")
                 
-            # Calculate ΔE values
-            delta_e_values = []
-            successful_calculations = 0
-            
             self.logger.info(f"Calculating ΔE for {len(valid_clusters)} points with cluster assignments")
             
             # First, build a lookup table of centroids from the centroid rows
@@ -767,94 +704,17 @@ class DeltaEManager:
                 raise ValueError("No cluster centroids found. Please run K-means clustering and save results first.")
             
             self.logger.info(f"📍 Found centroids for clusters: {list(centroids.keys())}")
-            for cluster_id, (cx, cy, cz) in centroids.items():
-                self.logger.info(f"  Cluster {cluster_id}: ({cx:.4f}, {cy:.4f}, {cz:.4f})")
             
-            for idx_in_subset, row_idx in enumerate(row_indices):
-                row = self.data.iloc[row_idx]
-                
-                # Check if row is marked for exclusion
-                exclude_value = row.get('Exclude')
-                if pd.notna(exclude_value) and str(exclude_value).strip() != '':
-                    self.data.at[row_idx, '∆E'] = None  # Clear any existing ∆E value
-                    continue  # Skip excluded rows
-                
-                cluster = row.get('Cluster')
-                
-                if pd.notna(cluster):
-                    # Get the point's coordinates
-                    point_x = row.get('Xnorm')
-                    point_y = row.get('Ynorm') 
-                    point_z = row.get('Znorm')
-                    
-                    # Look up the centroid coordinates from the centroids table
-                    cluster_int = int(cluster)
-                    if cluster_int in centroids:
-                        centroid_x, centroid_y, centroid_z = centroids[cluster_int]
-                    else:
-                        self.logger.warning(f"🔍 No centroid found for cluster {cluster_int} in row {row_idx}")
-                        centroid_x = centroid_y = centroid_z = None
-                    
-                    if all(pd.notna(val) for val in [point_x, point_y, point_z, centroid_x, centroid_y, centroid_z]):
-                        try:
-                            # Data is already in L*a*b* space (normalized 0-1)
-                            # Based on plot_utils.py axis labels: X=L*, Y=a*, Z=b*
-                            # Denormalize to standard L*a*b* ranges:
-                            # - L*: 0-100 (from X)
-                            # - a*: -128 to +127 (from Y)
-                            # - b*: -128 to +127 (from Z)
-                            point_lab = (
-                                point_x * 100,              # L* (X)
-                                point_y * 255 - 128,        # a* (Y)
-                                point_z * 255 - 128         # b* (Z)
-                            )
-                            centroid_lab = (
-                                centroid_x * 100,           # L* (X)
-                                centroid_y * 255 - 128,     # a* (Y)
-                                centroid_z * 255 - 128      # b* (Z)
-                            )
-                            
-                            # DEBUG: Print first calculation
-                            if successful_calculations == 0:
-                                self.logger.info(f"🔍 FIRST POINT DEBUG:")
-                                self.logger.info(f"  Normalized: point=({point_x:.4f}, {point_y:.4f}, {point_z:.4f}), centroid=({centroid_x:.4f}, {centroid_y:.4f}, {centroid_z:.4f})")
-                                self.logger.info(f"  Denormalized Lab: point={point_lab}, centroid={centroid_lab}")
-                            
-                            # Calculate ΔE CIE2000 directly with Lab values
-                            delta_e = self.calculate_delta_e_2000(point_lab, centroid_lab)
-                            
-                            # DEBUG: Print first result
-                            if successful_calculations == 0:
-                                self.logger.info(f"  Calculated ΔE: {delta_e:.4f}")
-                            
-                            # Round to 2 decimal places
-                            delta_e = round(delta_e, 2)
-                            
-                            # Update the DataFrame
-                            self.data.at[row_idx, '∆E'] = delta_e
-                            successful_calculations += 1
-                            
-                            if successful_calculations <= 5:  # Debug first 5 successful calculations
-                                self.logger.info(f"✅ CALCULATED ΔE for row {row_idx}: {delta_e:.4f}")
-                            
-                        except Exception as e:
-                            self.logger.warning(f"Failed to calculate ΔE for row {row_idx}: {e}")
-                            self.data.at[row_idx, '∆E'] = None
-                    else:
-                        # Enhanced debugging for missing data
-                        if idx_in_subset < 10:  # Only debug first 10 missing cases
-                            missing_parts = []
-                            if pd.isna(point_x): missing_parts.append("Xnorm")
-                            if pd.isna(point_y): missing_parts.append("Ynorm") 
-                            if pd.isna(point_z): missing_parts.append("Znorm")
-                            if pd.isna(centroid_x): missing_parts.append("Centroid_X")
-                            if pd.isna(centroid_y): missing_parts.append("Centroid_Y")
-                            if pd.isna(centroid_z): missing_parts.append("Centroid_Z")
-                            self.logger.warning(f"🔍 Row {row_idx} missing: {missing_parts} (point: {point_x}, {point_y}, {point_z}, centroid: {centroid_x}, {centroid_y}, {centroid_z})")
-                        self.data.at[row_idx, '∆E'] = None
-                else:
-                    self.logger.debug(f"No cluster assignment for row {row_idx}")
-                    self.data.at[row_idx, '∆E'] = None
+            # ΔE for the whole range at once; excluded rows, rows without a
+            # cluster/centroid and incomplete points come back empty
+            patch = delta_e_column_patch(self.data, row_indices, centroids,
+                                         color_space=self.color_space, exclude_col='Exclude')
+            self.data.loc[patch.index, '∆E'] = patch.to_numpy()
+            successful_calculations = int(patch.notna().sum())
+            
+            if successful_calculations:
+                first = patch.first_valid_index()
+                self.logger.info(f"🔍 FIRST POINT: row {first}, ΔE {patch[first]:.4f}")
             
             # Trigger the callback to update Plot_3D and internal worksheet
             if self.on_data_update:
@@ -896,7 +756,8 @@ class DeltaEManager:
                 # Use correct engine based on file format
                 engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
                 # IMPORTANT: Use the correct sheet for multi-sheet files
-                updated_data = pd.read_excel(self.file_path, engine=engine, sheet_name=self.sheet_name or 0)
+                from .workbook_cache import read_sheet
+                updated_data = read_sheet(self.file_path, sheet_name=self.sheet_name or 0, engine=engine)
                 
                 # For Excel files, ensure Cluster column is integer type (not float)
                 if self.file_path.endswith('.xlsx') and 'Cluster' in updated_data.columns:
@@ -1115,7 +976,8 @@ class DeltaEManager:
                         # Determine which engine to use based on file extension
                         engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
                         # IMPORTANT: Use the correct sheet for multi-sheet files
-                        df = pd.read_excel(self.file_path, engine=engine, sheet_name=self.sheet_name or 0)
+                        from .workbook_cache import read_sheet
+                        df = read_sheet(self.file_path, sheet_name=self.sheet_name or 0, engine=engine)
                         
                         # Check if required columns exist
                         required_columns = ['∆E', 'Centroid_X', 'Centroid_Y', 'Centroid_Z']
@@ -1167,165 +1029,23 @@ class DeltaEManager:
                         self.logger.info(f"Using the following centroids for Delta E calculation:")
                         for cluster, centroid in centroids.items():
                             self.logger.info(f"Cluster {cluster}: ({centroid[0]:.6f}, {centroid[1]:.6f}, {centroid[2]:.6f})")
-                        # Store delta_e values for each row
-                        delta_e_values = []
+                        # Calculate ΔE CIE2000 for the whole range in one pass. The
+                        # colour space comes from Plot_3D's label_type: L*a*b* data is
+                        # denormalized directly, RGB/CMY is converted to L*a*b* first.
+                        self.logger.info(f"Calculating ΔE for {len(subset_data)} rows ({self.color_space} data)")
+                        patch = delta_e_column_patch(self.data, row_indices, centroids,
+                                                     color_space=self.color_space)
+                        delta_e_values = [(i, None if pd.isna(value) else value)
+                                          for i, value in patch.items()]
                         
-                        # Track progress
-                        processed_count = 0
-                        success_count = 0
+                        # Delta E 2000 is already in an appropriate scale (0-100):
+                        # 0-1 not perceptible, 1-2 close observation, 2-10 at a glance,
+                        # 10-50 more similar than opposite, 50+ very different
+                        large_count = int((patch > 100).sum())
+                        if large_count:
+                            # Still used, as they could be valid for very different colors
+                            self.logger.warning(f"Unusually large Delta E values (> 100) calculated for {large_count} points")
                         
-                        # Process each row in the specified range
-                        for i, row in subset_data.iterrows():
-                            processed_count += 1
-                            self.logger.info(f"Processing row {i+1} ({processed_count}/{len(subset_data)})")
-                            
-                            cluster = row['Cluster']
-                            if pd.isna(cluster):
-                                # Skip rows without cluster assignment
-                                self.logger.warning(f"Row {i+1}: No cluster assignment, skipping")
-                                delta_e_values.append((i, None))
-                                continue
-                                
-                            cluster_int = int(cluster)
-                            if cluster_int not in centroids:
-                                self.logger.warning(f"Row {i+1}: No centroid found for cluster {cluster_int}")
-                                delta_e_values.append((i, None))
-                                continue
-                            # Get point coordinates (normalized values)
-                            point_xyz = (row['Xnorm'], row['Ynorm'], row['Znorm'])
-                            
-                            # Check for invalid point coordinates
-                            if any(pd.isna(val) for val in point_xyz):
-                                self.logger.warning(f"Invalid point coordinates at index {i}, DataID: {row.get('DataID', f'Row {i}')}")
-                                delta_e_values.append((i, None))
-                                continue
-                            
-                            # Get centroid coordinates
-                            centroid_xyz = centroids[cluster_int]
-                            
-                            # Validate centroid once more
-                            if any(pd.isna(val) for val in centroid_xyz):
-                                self.logger.error(f"Invalid centroid for cluster {cluster_int}: {centroid_xyz}")
-                                delta_e_values.append((i, None))
-                                continue
-                                
-                            # Log the point and centroid for debugging
-                            self.logger.debug(f"Point {row.get('DataID', f'Row {i}')} - Cluster {cluster_int}")
-                            self.logger.debug(f"  Point XYZ: ({point_xyz[0]:.4f}, {point_xyz[1]:.4f}, {point_xyz[2]:.4f})")
-                            self.logger.debug(f"  Centroid XYZ: ({centroid_xyz[0]:.4f}, {centroid_xyz[1]:.4f}, {centroid_xyz[2]:.4f})")
-                            
-                            # Check color space and calculate appropriate difference metric
-                            try:
-                                # Color space is automatically detected from Plot_3D label_type
-                                # and passed to DeltaEManager during initialization
-                                color_space = self.color_space  # 'LAB', 'RGB', or 'CMY'
-                                
-                                # Distance calculation method:
-                                #   False - Use CIEDE2000 (perceptually accurate, recommended)
-                                #   True  - Use simple Euclidean distance (faster, backward compatible)
-                                use_simple_distance = False
-                                
-                                if color_space == 'LAB':
-                                    # Data is in L*a*b* space (normalized 0-1)
-                                    # Based on plot_utils.py: X=L*, Y=a*, Z=b*
-                                    # Denormalize to standard L*a*b* ranges for ΔE CIE2000
-                                    point_lab = (
-                                        point_xyz[0] * 100,           # L* (X)
-                                        point_xyz[1] * 255 - 128,     # a* (Y)
-                                        point_xyz[2] * 255 - 128      # b* (Z)
-                                    )
-                                    centroid_lab = (
-                                        centroid_xyz[0] * 100,        # L* (X)
-                                        centroid_xyz[1] * 255 - 128,  # a* (Y)
-                                        centroid_xyz[2] * 255 - 128   # b* (Z)
-                                    )
-                                    
-                                    if processed_count == 1:
-                                        self.logger.info(f"🔍 FIRST POINT (L*a*b*): normalized={point_xyz}")
-                                        self.logger.info(f"  Denormalized Lab: point={point_lab}, centroid={centroid_lab}")
-                                        
-                                elif color_space in ['RGB', 'CMY']:
-                                    if use_simple_distance:
-                                        # Use simple Euclidean distance (backward compatibility)
-                                        point_lab = point_xyz  # Keep normalized for distance calc
-                                        centroid_lab = centroid_xyz
-                                        
-                                        if processed_count == 1:
-                                            self.logger.info(f"🔍 FIRST POINT ({color_space} - Euclidean): point={point_xyz}")
-                                    else:
-                                        # Convert RGB/CMY to L*a*b* for accurate ΔE CIE2000
-                                        if color_space == 'CMY':
-                                            # Convert CMY to RGB first: RGB = 1 - CMY
-                                            point_rgb = (1 - point_xyz[0], 1 - point_xyz[1], 1 - point_xyz[2])
-                                            centroid_rgb = (1 - centroid_xyz[0], 1 - centroid_xyz[1], 1 - centroid_xyz[2])
-                                        else:
-                                            point_rgb = point_xyz
-                                            centroid_rgb = centroid_xyz
-                                        
-                                        # Convert sRGB to L*a*b*
-                                        point_lab = self.rgb_to_lab(*point_rgb)
-                                        centroid_lab = self.rgb_to_lab(*centroid_rgb)
-                                        
-                                        if processed_count == 1:
-                                            self.logger.info(f"🔍 FIRST POINT ({color_space}→Lab): normalized={point_xyz}")
-                                            self.logger.info(f"  Converted Lab: point={point_lab}, centroid={centroid_lab}")
-                                else:
-                                    raise ValueError(f"Unknown color space: {color_space}")
-                                    
-                            except Exception as e:
-                                self.logger.error(f"Error preparing color values: {str(e)}")
-                                delta_e_values.append((i, None))
-                                continue
-                            
-                            # Calculate difference metric
-                            try:
-                                if use_simple_distance and color_space in ['RGB', 'CMY']:
-                                    # Calculate simple Euclidean distance for RGB/CMY
-                                    # Scale by 100 to match typical ΔE ranges
-                                    delta_e = math.sqrt(
-                                        (point_xyz[0] - centroid_xyz[0])**2 +
-                                        (point_xyz[1] - centroid_xyz[1])**2 +
-                                        (point_xyz[2] - centroid_xyz[2])**2
-                                    ) * 100
-                                else:
-                                    # Calculate ΔE CIE2000 (works for Lab or converted RGB/CMY)
-                                    delta_e = self.calculate_delta_e_2000(point_lab, centroid_lab)
-                                
-                                # DEBUG first result
-                                if processed_count == 1:
-                                    self.logger.info(f"  Calculated ΔE: {delta_e:.4f}")
-                                
-                                # Delta E 2000 is already in an appropriate scale, no need to multiply by 100
-                                # The scale is typically 0-100 where:
-                                # 0-1: Not perceptible by human eyes
-                                # 1-2: Perceptible through close observation
-                                # 2-10: Perceptible at a glance
-                                # 10-50: Colors are more similar than opposite
-                                # 50+: Colors are very different
-                                
-                                # Round to 2 decimal places
-                                delta_e = round(delta_e, 2)
-                                
-                                # Validate the calculated value
-                                if pd.isna(delta_e) or delta_e < 0:
-                                    self.logger.warning(f"Invalid Delta E value calculated: {delta_e} for point at index {i}")
-                                    delta_e_values.append((i, None))
-                                    continue
-                                
-                                # Additional validation - if Delta E is unreasonably large, log a warning
-                                if delta_e > 100:
-                                    self.logger.warning(f"Unusually large Delta E value calculated: {delta_e} for point at index {i}")
-                                    # But still use the value as it could be valid for very different colors
-                                    
-                                self.logger.debug(f"  Calculated Delta E: {delta_e}")
-                                
-                            except Exception as e:
-                                self.logger.error(f"Error calculating Delta E: {str(e)}")
-                                delta_e_values.append((i, None))
-                                continue
-                            
-                            delta_e_values.append((i, delta_e))
-                            
                         # Prepare updates
                         # Note: idx is DataFrame index (0-based), sheet rows are 1-based with row 1 as header
                         # So sheet_row_idx = idx + 2 (add 1 for header, add 1 for 1-based indexing)
@@ -1343,65 +1063,29 @@ class DeltaEManager:
                             try:
                                 # Open and update - use appropriate library based on file format
                                 self.logger.info(f"Opening {self.file_path} for updating")
-                                
-                                if self.file_path.endswith('.xlsx'):
-                                    # Excel format
-                                    from openpyxl import load_workbook
-                                    wb = load_workbook(self.file_path)
-                                    ws = wb.active
-                                    use_excel = True
-                                    self.logger.info("Using openpyxl for Excel file")
-                                else:
-                                    # ODS format
-                                    ods_doc = ezodf.opendoc(self.file_path)
-                                    use_excel = False
-                                    
-                                    # Find the correct sheet by name (for multi-sheet files)
-                                    if self.sheet_name:
-                                        sheet = None
-                                        for i, s in enumerate(ods_doc.sheets):
-                                            if s.name == self.sheet_name:
-                                                sheet = s
-                                                self.logger.info(f"Found sheet '{self.sheet_name}' at index {i}")
-                                                break
-                                        if sheet is None:
-                                            self.logger.error(f"Sheet '{self.sheet_name}' not found in ODS file")
-                                            raise ValueError(f"Sheet '{self.sheet_name}' not found")
-                                    else:
-                                        sheet = ods_doc.sheets[0]
-                                        self.logger.info(f"Using first sheet: {sheet.name}")
-                                    
-                                    self.logger.info(f"Using ezodf for ODS file, sheet: {sheet.name}")
-                                    self.logger.info(f"ODS sheet dimensions: {sheet.nrows()} rows x {sheet.ncols()} cols")
-                                    
-                                    # DEBUG: Log header row to verify column positions
-                                    header_values = []
-                                    for col_idx in range(min(15, sheet.ncols())):
-                                        val = sheet[0, col_idx].value
-                                        header_values.append(f"{col_idx}:'{val}'")
-                                    self.logger.info(f"ODS Header row (row 1, index 0): {', '.join(header_values)}")
-                                    
-                                    # Verify the ∆E column index matches between pandas and ODS
-                                    ods_header_delta_e = sheet[0, delta_e_col_idx].value
-                                    self.logger.info(f"Pandas says ∆E is at column index {delta_e_col_idx}, ODS header at that index: '{ods_header_delta_e}'")
+                                from .workbook_cache import file_signature, apply_edits, invalidate
+                                signature_before = file_signature(self.file_path)
+                                cache_edits = []  # (row, column, value) mirrored into the workbook cache
+                                cell_edits = []  # (sheet, row, column, value) for the patch engine
+                                columns_added = False
+                                use_excel = self.file_path.endswith('.xlsx')
+                                sheet = self.sheet_name
+                                self.logger.info(f"Pandas says ∆E is at column index {delta_e_col_idx}, header: '{df.columns[delta_e_col_idx]}'")
                                 
                                 # Check if we need to add centroid columns (ODS only - Excel columns should already exist)
                                 if not use_excel:
                                     header_row = 0  # Header row index (row 1 in spreadsheet)
-                                    num_cols = sheet.ncols()
+                                    num_cols = len(df.columns)
                                     
                                     # Create centroid columns if they don't exist
                                     for col_name in ['Centroid_X', 'Centroid_Y', 'Centroid_Z']:
                                         if col_name not in col_indices:
-                                            # Add column to the right of the spreadsheet
+                                            # Add column to the right of the data
                                             col_idx = num_cols
                                             num_cols += 1
-                                            
-                                            # Set header
-                                            cell = sheet[header_row, col_idx]
-                                            cell.set_value(col_name)
-                                            # Removed cell.value_type assignment that was causing errors
+                                            cell_edits.append((sheet, header_row, col_idx, col_name))
                                             centroid_col_indices[col_name] = col_idx
+                                            columns_added = True
                                             self.logger.info(f"Created new column '{col_name}' at index {col_idx}")
                                         else:
                                             centroid_col_indices[col_name] = col_indices[col_name]
@@ -1419,40 +1103,14 @@ class DeltaEManager:
                                     for i, (row, val) in enumerate(updates[:3]):
                                         self.logger.info(f"  Row {row}: ∆E = {val}")
                                 
-                                # Apply ONLY ΔE updates - do not touch any other columns
-                                update_count = 0
+                                # Queue ONLY ΔE updates - do not touch any other columns.
+                                # row_idx is the 1-based sheet row; the patch engine is 0-based.
                                 for row_idx, value in updates:
-                                    try:
-                                        # Update ONLY the ΔE value
-                                        if use_excel:
-                                            # Excel: row_idx is 1-based sheet row, openpyxl columns are also 1-based
-                                            # delta_e_col_idx is 0-based from pandas, so add 1 for openpyxl
-                                            ws.cell(row=row_idx, column=delta_e_col_idx + 1, value=round(value, 2))
-                                            update_count += 1
-                                            self.logger.info(f"Updated ∆E at Excel row {row_idx} to {value}")
-                                        else:
-                                            # ODS: ezodf uses 0-based indexing for both rows and columns
-                                            # row_idx is 1-based (from our Excel-compatible format), so subtract 1 for ODS
-                                            ods_row_idx = row_idx - 1
-                                            cell = sheet[ods_row_idx, delta_e_col_idx]
-                                            
-                                            # DEBUG: Log cell state before write
-                                            old_value = cell.value
-                                            
-                                            # Use numeric value directly (not string) for proper spreadsheet handling
-                                            numeric_value = round(value, 2)
-                                            cell.set_value(numeric_value)
-                                            
-                                            # DEBUG: Read back immediately to verify write
-                                            new_value = cell.value
-                                            
-                                            update_count += 1
-                                            self.logger.info(f"ODS cell[{ods_row_idx},{delta_e_col_idx}]: old='{old_value}' -> set({numeric_value}) -> read='{new_value}'")
-                                    except Exception as cell_error:
-                                        self.logger.warning(f"Failed to update cell at row {row_idx}: {str(cell_error)}")
+                                    numeric_value = round(value, 2)
+                                    cell_edits.append((sheet, row_idx - 1, delta_e_col_idx, numeric_value))
+                                    cache_edits.append((row_idx - 2, df.columns[delta_e_col_idx], numeric_value))
                                 
-                                # Log total updates for both Excel and ODS
-                                self.logger.info(f"Total ∆E updates written: {update_count}/{len(updates)}")
+                                self.logger.info(f"Total ∆E updates queued: {len(updates)}")
                                 
                                 # Create a file backup before saving
                                 pre_save_backup = f"{self.file_path}.presave"
@@ -1466,17 +1124,19 @@ class DeltaEManager:
                                 temp_path = f"{self.file_path}.new"
                                 self.logger.info(f"Saving to temporary file: {temp_path}")
                                 try:
-                                    if use_excel:
-                                        wb.save(temp_path)
-                                        self.logger.info("Excel file saved to temporary location")
-                                    else:
-                                        ods_doc.saveas(temp_path)
-                                        # Close document
-                                        del ods_doc
+                                    from utils.spreadsheet_patcher import patch_workbook
+                                    patch_workbook(self.file_path, cell_edits, output_path=temp_path)
                                     
                                     # Replace original with new file
                                     self.logger.info("Replacing original file with updated version (∆E column only)")
                                     os.replace(temp_path, self.file_path)
+                                    
+                                    # Keep the workbook cache in step with the file. New
+                                    # columns change the sheet layout, so re-parse then.
+                                    if columns_added:
+                                        invalidate(self.file_path)
+                                    else:
+                                        apply_edits(self.file_path, self.sheet_name, cache_edits, signature_before)
                                 except Exception as save_error:
                                     self.logger.error(f"Failed to save file: {str(save_error)}")
                                     # Try to restore from pre-save backup
@@ -1488,35 +1148,27 @@ class DeltaEManager:
                                         except Exception as restore_error:
                                             self.logger.error(f"Failed to restore from backup: {str(restore_error)}")
                                     raise save_error
-                                # Verify the save (ODS only - Excel verification would require openpyxl again)
+                                # Verify the save (ODS only)
                                 try:
                                     if not use_excel:
                                         self.logger.info("Verifying save operation")
-                                        verify_doc = ezodf.opendoc(self.file_path)
+                                        from utils.ods_reader import read_ods_table
+                                        verify_table = read_ods_table(self.file_path, self.sheet_name or 0)
                                         
-                                        # Find the correct sheet for verification
-                                        if self.sheet_name:
-                                            verify_sheet = None
-                                            for s in verify_doc.sheets:
-                                                if s.name == self.sheet_name:
-                                                    verify_sheet = s
-                                                    break
-                                            if verify_sheet is None:
-                                                verify_sheet = verify_doc.sheets[0]
-                                        else:
-                                            verify_sheet = verify_doc.sheets[0]
+                                        def verify_value(ods_row_idx, col_idx):
+                                            """Saved cell value (None if blank); indices are 0-based."""
+                                            if ods_row_idx < len(verify_table) and col_idx < len(verify_table[ods_row_idx]):
+                                                value = verify_table[ods_row_idx][col_idx]
+                                                return None if isinstance(value, str) and value == '' else value
+                                            return None
                                         
                                         # Check updates
                                         for row_idx, value in updates[:min(3, len(updates))]:
                                             # Verify ∆E value was saved correctly
                                             try:
-                                                # ezodf uses 0-based indexing, row_idx is 1-based
-                                                ods_row_idx = row_idx - 1
-                                                delta_e_cell = verify_sheet[ods_row_idx, delta_e_col_idx]
-                                                
-                                                # Get cell value, handling empty or non-numeric values
-                                                cell_value = delta_e_cell.value
-                                                if cell_value is None or cell_value == '':
+                                                # row_idx is 1-based
+                                                cell_value = verify_value(row_idx - 1, delta_e_col_idx)
+                                                if cell_value is None:
                                                     self.logger.warning(f"Empty ∆E value found at row {row_idx}")
                                                     continue
                                                     
@@ -1534,34 +1186,25 @@ class DeltaEManager:
                                             for col_name, col_idx in centroid_col_indices.items():
                                                 if col_idx is not None:
                                                     for row_idx, _ in updates[:min(3, len(updates))]:
-                                                        # ezodf uses 0-based indexing, row_idx is 1-based
-                                                        ods_row_idx = row_idx - 1
-                                                        centroid_cell = verify_sheet[ods_row_idx, col_idx]
-                                                        if centroid_cell.value is None:
+                                                        centroid_value = verify_value(row_idx - 1, col_idx)
+                                                        if centroid_value is None:
                                                             self.logger.warning(f"Centroid data may have been lost for {col_name} at row {row_idx}")
                                                             centroid_preserved = False
                                                         else:
-                                                            self.logger.debug(f"Verified {col_name} at row {row_idx}: {centroid_cell.value}")
+                                                            self.logger.debug(f"Verified {col_name} at row {row_idx}: {centroid_value}")
                                             
                                             if not centroid_preserved:
                                                 self.logger.warning("Some centroid data verification failed - keeping backup file")
                                         except Exception as verify_error:
                                             self.logger.warning(f"Error verifying centroid data: {str(verify_error)}")
                                             centroid_preserved = False
-                                        
-                                        # Clean up verification document
-                                        del verify_doc
                                     else:
-                                        # Excel: verification would require loading workbook again, skip for now
+                                        # Excel: only the ∆E cells were patched
                                         self.logger.info("Excel file - skipping verification (updates were logged during save)")
                                         centroid_preserved = True  # Assume preserved since we didn't modify those columns
                                 
                                 except Exception as verify_exception:
                                     self.logger.error(f"Save verification failed: {str(verify_exception)}")
-                                    # If verification doc was created, clean it up
-                                    if 'verify_doc' in locals():
-                                        if not use_excel:
-                                            del verify_doc
                                     centroid_preserved = True  # Assume success to avoid blocking the save
                                 # Remove backup if everything succeeded
                                 # For Excel, skip backup cleanup since verification was skipped
@@ -1618,14 +1261,6 @@ class DeltaEManager:
                                             os.remove(path)
                                     except Exception:
                                         pass
-                                    
-                                # Clean up document objects
-                                for doc_name in ['ods_doc', 'verify_doc']:
-                                    try:
-                                        if doc_name in locals():
-                                            del locals()[doc_name]
-                                    except Exception:
-                                        pass
                     except Exception as e:
                         self.logger.error(f"Error in Delta E calculation: {str(e)}")
                         raise
@@ -10,6 +10,10 @@ stamp present in the worksheet:
   stamp. Stamps with no populated ``Cluster`` are skipped in this
   mode (only whole-stamp is meaningful for them).
 
+All shells of one colour are drawn as a single batched surface
+collection (see :mod:`plot3d.mesh_batch`), with a coarse copy shown
+while the view is rotated.
+
 The manager intentionally **does not auto-cluster**. Tone counts vary
 per stamp and the philatelic decision of how many tones a stamp has
 belongs in StampZ's existing k-means manager, not here.
@@ -17,18 +21,27 @@ belongs in StampZ's existing k-means manager, not here.
 
 from __future__ import annotations
 
+import hashlib
 import logging
 from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from mpl_toolkits.mplot3d import art3d
+
 from utils.color_ellipsoid import (
     EllipsoidFit,
+    MembershipScores,
     ellipsoid_mesh,
+    ellipsoid_transform,
     fit_ellipsoid,
     principal_axes,
+    score_membership,
 )
+from utils.mesh_templates import ellipsoid_points, quad_polygons
+
+from .mesh_batch import COARSE_MESH, RotationLOD, add_surface_batch
 
 
 # Default rendering parameters (translucent surfaces, no wireframe).
@@ -44,6 +57,16 @@ DEFAULT_ALPHA_OUTER = 0.07
 # stays readable even when the ellipsoid is dense or viewed end-on.
 DEFAULT_AXIS_EXTENT = 3.0
 
+# Mesh resolution (n_u, n_v) of the rendered outer shell.
+OUTER_MESH = (22, 12)
+
+# Worksheet columns the fits (and their colours) are derived from. A
+# refresh where none of these changed reuses the previous fits as-is.
+_FIT_INPUT_COLUMNS = (
+    "DataID", "Xnorm", "Ynorm", "Znorm", "Exclude",
+    "Cluster", "Color", "Sphere", "Centroid_X",
+)
+
 # Distinct colours for stamps. Cycled deterministically by sort order
 # so the same stamp always gets the same colour across renders.
 _STAMP_COLOUR_CYCLE = [
@@ -79,6 +102,8 @@ class EllipsoidManager:
 
         # Render state.
         self._artists: List = []                                      # mpl objects to clear on next render
+        self._lod = RotationLOD()                                     # coarse shells while rotating
+        self._lod.attach(ax, canvas)
         self._mode: str = self.MODE_WHOLE
         self._master_visible: bool = False                            # off by default
         self.visibility_states: Dict[str, bool] = {}                  # per-stamp on/off
@@ -86,6 +111,14 @@ class EllipsoidManager:
         # Cached fits (lazy, invalidated by update_references()).
         self._fits_whole: Optional[Dict[str, EllipsoidFit]] = None
         self._fits_tone: Optional[Dict[Tuple[str, int], EllipsoidFit]] = None
+        # Content hash of the fit inputs and the fits built from them, so an
+        # invalidation with unchanged data costs one hash instead of a refit.
+        self._fit_signature: Optional[bytes] = None
+        self._last_fits: Optional[Tuple[Dict, Dict, Dict]] = None
+        # Per-group memo: ("whole", stamp) / ("tone", stamp, cluster) →
+        # (hash of the included points, fit). Only groups whose rows
+        # changed are refit.
+        self._fit_memo: Dict[Tuple, Tuple[bytes, EllipsoidFit]] = {}
         # Per-tone sphere colour, harvested from the data rows' Color
         # column at fit time. None when no explicit colour is set in the
         # worksheet — callers fall back to the per-stamp cycling colour.
@@ -102,6 +135,7 @@ class EllipsoidManager:
         self.ax = ax
         self.canvas = canvas
         self.data_df = data_df
+        self._lod.attach(ax, canvas)
         self._invalidate()
         # Stamps may have changed — preserve previous toggle state where possible.
         for stamp in self._discover_stamps():
@@ -145,6 +179,31 @@ class EllipsoidManager:
             return {}
         return {s: f.n_samples for s, f in self._fits_whole.items()}
 
+    def score_samples(self, points, mode: Optional[str] = None,
+                      sigma: float = DEFAULT_SIGMA_OUTER) -> MembershipScores:
+        """Score sample points against every fitted ellipsoid at once.
+
+        Points must be in the same normalized (Xnorm/Ynorm/Znorm) space the
+        ellipsoids are fitted in. Visibility toggles are ignored — every
+        fit takes part, so a sample's best match doesn't depend on what is
+        currently shown.
+
+        Args:
+            points: (N, 3) array of normalized coordinates
+            mode:   MODE_WHOLE (labels are stamps) or MODE_TONE (labels are
+                    (stamp, cluster) tuples); defaults to the current mode
+            sigma:  Membership threshold, default the outer-shell sigma
+
+        Returns:
+            MembershipScores (see :func:`utils.color_ellipsoid.score_membership`)
+        """
+        mode = mode or self._mode
+        if mode not in (self.MODE_WHOLE, self.MODE_TONE):
+            raise ValueError(f"Unknown ellipsoid mode: {mode!r}")
+        self._ensure_fits()
+        fits = self._fits_whole if mode == self.MODE_WHOLE else self._fits_tone
+        return score_membership(points, dict(sorted((fits or {}).items())), sigma=sigma)
+
     def get_render_traces(self) -> List[Dict]:
         """Return serializable trace specs for the currently visible ellipsoids.
 
@@ -199,7 +258,7 @@ class EllipsoidManager:
         with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
             Xi, Yi, Zi = ellipsoid_mesh(fit, sigma=DEFAULT_SIGMA_INNER)
             Xo, Yo, Zo = ellipsoid_mesh(
-                fit, sigma=DEFAULT_SIGMA_OUTER, n_u=22, n_v=12,
+                fit, sigma=DEFAULT_SIGMA_OUTER, n_u=OUTER_MESH[0], n_v=OUTER_MESH[1],
             )
             vals, vecs = principal_axes(fit)
             major = vecs[:, 0]
@@ -228,6 +287,7 @@ class EllipsoidManager:
             except Exception:
                 pass
         self._artists = []
+        self._lod.clear()
 
     def render(self) -> None:
         """Draw all visible ellipsoids on the current axis."""
@@ -256,8 +316,54 @@ class EllipsoidManager:
         self._tone_colour = {}
 
     def _ensure_fits(self) -> None:
-        if self._fits_whole is None or self._fits_tone is None:
-            self._fit_all()
+        if self._fits_whole is not None and self._fits_tone is not None:
+            return
+        signature = self._data_signature()
+        if signature is not None and signature == self._fit_signature and self._last_fits:
+            # Same inputs as the last fit (e.g. a plain plot refresh)
+            fits_whole, fits_tone, tone_colour = self._last_fits
+            self._fits_whole = dict(fits_whole)
+            self._fits_tone = dict(fits_tone)
+            self._tone_colour = dict(tone_colour)
+            return
+        self._fit_all()
+        self._fit_signature = signature
+        self._last_fits = (dict(self._fits_whole), dict(self._fits_tone), dict(self._tone_colour))
+
+    def _data_signature(self) -> Optional[bytes]:
+        """Hash of the columns the fits depend on; None if it can't be computed."""
+        df = self.data_df
+        if df is None:
+            return None
+        cols = [c for c in _FIT_INPUT_COLUMNS if c in df.columns]
+        try:
+            row_hashes = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+        except Exception as e:
+            self.logger.debug("Could not hash ellipsoid inputs: %s", e)
+            return None
+        digest = hashlib.blake2b(repr(cols).encode("utf-8"), digest_size=16)
+        digest.update(row_hashes.tobytes())
+        return digest.digest()
+
+    def _memo_fit(self, key: Tuple, pts: np.ndarray, prior_variance: float,
+                  memo: Dict[Tuple, Tuple[bytes, EllipsoidFit]]) -> EllipsoidFit:
+        """Fit ``pts``, reusing the previous fit for ``key`` if its points are unchanged."""
+        pts = np.ascontiguousarray(pts, dtype=float)
+        digest = hashlib.blake2b(pts.tobytes(), digest_size=16)
+        digest.update(repr((pts.shape, prior_variance)).encode("utf-8"))
+        digest = digest.digest()
+        cached = self._fit_memo.get(key)
+        if cached is not None and cached[0] == digest:
+            fit = cached[1]
+        else:
+            fit = fit_ellipsoid(pts, prior_variance=prior_variance)
+        memo[key] = (digest, fit)
+        return fit
+
+    @staticmethod
+    def _stamp_prefixes(ids: pd.Series) -> pd.Series:
+        """Stamp prefix of each DataID ("170-001" → "170")."""
+        return ids.astype(str).str.partition("-")[0].str.strip()
 
     def _discover_stamps(self) -> List[str]:
         """Stamp identifiers present in data_df (parsed from DataID prefix).
@@ -272,7 +378,7 @@ class EllipsoidManager:
         if ids.empty:
             return []
         # Try hyphen-based grouping first
-        prefixes = ids.str.split("-", n=1).str[0].str.strip()
+        prefixes = self._stamp_prefixes(ids)
         stamps = prefixes.unique().tolist()
         stamps = sorted(s for s in stamps if s)
         # Use "all" grouping when this looks like averaged/combined data
@@ -283,23 +389,20 @@ class EllipsoidManager:
         # per-stamp ellipsoids (most of which would have only 1 point).
         valid_count = len(ids)
         if valid_count >= 2:
-            freq = ids.str.split("-", n=1).str[0].str.strip().value_counts()
+            freq = prefixes.value_counts()
             if freq.iloc[0] <= 3:          # max count of any single stamp prefix
                 return ["all"]
         return stamps
 
-    @staticmethod
-    def _is_excluded(val) -> bool:
-        if val is None:
-            return False
-        if isinstance(val, float) and np.isnan(val):
-            return False
-        return str(val).strip() != ""
-
     def _fit_all(self) -> None:
-        """Build whole-stamp and per-tone fits from data_df."""
+        """Build whole-stamp and per-tone fits from data_df.
+
+        Groups whose included points are unchanged since the last call reuse
+        their previous fit (see ``_memo_fit``).
+        """
         self._fits_whole = {}
         self._fits_tone = {}
+        memo: Dict[Tuple, Tuple[bytes, EllipsoidFit]] = {}
 
         df = self.data_df
         if df is None or len(df) == 0:
@@ -325,14 +428,16 @@ class EllipsoidManager:
         # Parse stamp prefix from DataID; use "all" for averaged/combined
         # data (no prefix appears more than 3 times) so per-cluster ellipsoids
         # span the whole dataset, matching what _discover_stamps() returns.
-        prefixes = sub["DataID"].astype(str).str.split("-", n=1).str[0].str.strip()
+        prefixes = self._stamp_prefixes(sub["DataID"])
         max_freq = prefixes.value_counts().iloc[0] if len(prefixes) > 0 else 0
         if max_freq <= 3 and len(prefixes) >= 2:
             sub["_stamp"] = "all"
         else:
             sub["_stamp"] = prefixes
+        # Any non-blank Exclude value excludes the row
         if "Exclude" in sub.columns:
-            sub["_excluded"] = sub["Exclude"].apply(self._is_excluded)
+            exclude = sub["Exclude"]
+            sub["_excluded"] = exclude.notna() & exclude.astype(str).str.strip().ne("")
         else:
             sub["_excluded"] = False
         included = sub[~sub["_excluded"]]
@@ -362,22 +467,22 @@ class EllipsoidManager:
                 & df["Sphere"].notna()
                 & df["Xnorm"].isna()      # centroid rows have no norm coords
             )
-            for _, crow in df[cen_mask].iterrows():
-                try:
-                    c_id = int(float(crow["Cluster"]))
-                    sph = str(crow["Sphere"]).strip()
-                    if sph:
-                        centroid_sphere_map[c_id] = sph
-                except (TypeError, ValueError):
-                    pass
+            cen = df.loc[cen_mask, ["Cluster", "Sphere"]]
+            c_ids = pd.to_numeric(cen["Cluster"], errors="coerce")
+            spheres = cen["Sphere"].astype(str).str.strip()
+            usable = np.isfinite(c_ids) & spheres.ne("")
+            # Later rows win, as with a row-by-row scan
+            centroid_sphere_map = dict(zip(
+                c_ids[usable].astype(int).tolist(), spheres[usable].tolist(),
+            ))
 
         for stamp, group in included.groupby("_stamp"):
             pts = group[["Xnorm", "Ynorm", "Znorm"]].to_numpy(dtype=float)
             if pts.shape[0] < 2:
                 continue
             try:
-                self._fits_whole[stamp] = fit_ellipsoid(
-                    pts, prior_variance=norm_prior_variance,
+                self._fits_whole[stamp] = self._memo_fit(
+                    ("whole", stamp), pts, norm_prior_variance, memo,
                 )
             except Exception as e:
                 self.logger.warning("Whole-stamp fit failed for %s: %s", stamp, e)
@@ -398,8 +503,8 @@ class EllipsoidManager:
                     except (TypeError, ValueError):
                         c_int = hash(str(cluster_val)) & 0xFFFF
                     try:
-                        self._fits_tone[(stamp, c_int)] = fit_ellipsoid(
-                            cpts, prior_variance=norm_prior_variance,
+                        self._fits_tone[(stamp, c_int)] = self._memo_fit(
+                            ("tone", stamp, c_int), cpts, norm_prior_variance, memo,
                         )
                         # Primary: use the Sphere colour the user set on the
                         # centroid row for this cluster.  Fall back to the
@@ -432,6 +537,9 @@ class EllipsoidManager:
                             stamp, cluster_val, e,
                         )
 
+        # Keep only the groups that still exist
+        self._fit_memo = memo
+
     # ----------------------------------------------------------------- #
     # Internals: rendering
     # ----------------------------------------------------------------- #
@@ -445,12 +553,15 @@ class EllipsoidManager:
         return _STAMP_COLOUR_CYCLE[idx % len(_STAMP_COLOUR_CYCLE)]
 
     def _render_whole(self) -> None:
+        items = []
         for stamp, fit in (self._fits_whole or {}).items():
             if not self.visibility_states.get(stamp, True):
                 continue
-            self._draw_one(fit, self._stamp_colour(stamp))
+            items.append((fit, self._stamp_colour(stamp)))
+        self._draw_batch(items)
 
     def _render_tone(self) -> None:
+        items = []
         for (stamp, cluster), fit in (self._fits_tone or {}).items():
             if not self.visibility_states.get(stamp, True):
                 continue
@@ -465,9 +576,20 @@ class EllipsoidManager:
                 except Exception:
                     pass
             colour = raw_colour or self._stamp_colour(stamp)
-            self._draw_one(fit, colour)
+            items.append((fit, colour))
+        self._draw_batch(items)
 
     def _draw_one(self, fit: EllipsoidFit, colour: str) -> None:
+        self._draw_batch([(fit, colour)])
+
+    def _draw_batch(self, items: List[Tuple[EllipsoidFit, str]]) -> None:
+        """Draw shells, centroid markers and major-axis lines for many fits.
+
+        Shells of the same colour share one surface collection; all markers
+        are one scatter and all axis lines one line collection.
+        """
+        if not items:
+            return
         # Suppress matplotlib's divide/overflow warnings on near-degenerate
         # ellipsoids; render output is correct, the warnings are cosmetic.
         #
@@ -478,48 +600,75 @@ class EllipsoidManager:
         # A single semi-transparent 2σ shell conveys the cluster extent
         # clearly; the major-axis line below shows the elongation direction.
         with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            shells: Dict[str, List[Tuple[np.ndarray, np.ndarray]]] = {}
+            centres, segments, colours = [], [], []
+            for fit, colour in items:
+                try:
+                    shells.setdefault(colour, []).append(
+                        (fit.centroid, ellipsoid_transform(fit, DEFAULT_SIGMA_OUTER))
+                    )
+                except Exception as e:
+                    self.logger.warning("Outer ellipsoid render failed: %s", e)
+
+                # Major-axis line: short segment through the centroid along the
+                # ellipsoid's longest principal eigenvector, length controlled
+                # by ``DEFAULT_AXIS_EXTENT`` (sigmas). With the default of 3σ
+                # the line extends past the 2σ outer surface so the
+                # elongation direction stays readable from any view angle.
+                try:
+                    vals, vecs = principal_axes(fit)
+                    major = vecs[:, 0]
+                    half = DEFAULT_AXIS_EXTENT * float(np.sqrt(max(vals[0], 0.0)))
+                    centre = fit.centroid
+                    segments.append((centre - half * major, centre + half * major))
+                    centres.append(fit.centroid_lab)  # named for Lab but works for any 3D space
+                    colours.append(colour)
+                except Exception as e:
+                    self.logger.warning("Major-axis line failed: %s", e)
+
+            for colour, shapes in shells.items():
+                try:
+                    centroids = np.array([c for c, _ in shapes])
+                    transforms = np.array([t for _, t in shapes])
+                    collections = []
+                    for n_u, n_v in (OUTER_MESH, COARSE_MESH):
+                        polygons = quad_polygons(
+                            ellipsoid_points(centroids, transforms, n_u, n_v), n_u, n_v,
+                        )
+                        collections.append(add_surface_batch(
+                            self.ax, polygons, colour,
+                            DEFAULT_ALPHA_INNER,  # use inner alpha — slightly more opaque
+                        ))
+                    self._artists.extend(collections)
+                    self._lod.add(*collections)
+                except Exception as e:
+                    self.logger.warning("Outer ellipsoid render failed: %s", e)
+
+            if not centres:
+                return
+
+            # Centroid X markers — the mean coordinate ("middle tone" of each group).
             try:
-                Xo, Yo, Zo = ellipsoid_mesh(fit, sigma=DEFAULT_SIGMA_OUTER, n_u=22, n_v=12)
-                outer = self.ax.plot_surface(
-                    Xo, Yo, Zo,
-                    color=colour, alpha=DEFAULT_ALPHA_INNER,  # use inner alpha — slightly more opaque
-                    linewidth=0, antialiased=True,
-                )
-                self._artists.append(outer)
-            except Exception as e:
-                self.logger.warning("Outer ellipsoid render failed: %s", e)
-
-            # Centroid X marker — the mean coordinate ("middle tone" of the group).
-            try:
-                cx, cy, cz = fit.centroid_lab  # named for Lab but works for any 3D space
+                xs, ys, zs = np.array(centres).T
                 marker = self.ax.scatter(
-                    [cx], [cy], [cz],
-                    c=colour, s=90, marker="X",
-                    edgecolors="black", linewidths=0.8, depthshade=True,
+                    xs, ys, zs,
+                    c=colours, s=90, marker="X",
+                    # No depth shading: each marker keeps its full colour, as
+                    # a single-point scatter per ellipsoid used to
+                    edgecolors="black", linewidths=0.8, depthshade=False,
                     zorder=40,
                 )
                 self._artists.append(marker)
             except Exception as e:
                 self.logger.warning("Centroid marker failed: %s", e)
 
-            # Major-axis line: short segment through the centroid along the
-            # ellipsoid's longest principal eigenvector, length controlled
-            # by ``DEFAULT_AXIS_EXTENT`` (sigmas). With the default of 3σ
-            # the line extends past the 2σ outer surface so the
-            # elongation direction stays readable from any view angle.
             try:
-                vals, vecs = principal_axes(fit)
-                major = vecs[:, 0]
-                half = DEFAULT_AXIS_EXTENT * float(np.sqrt(max(vals[0], 0.0)))
-                centre = fit.centroid
-                p0 = centre - half * major
-                p1 = centre + half * major
-                axis_line, = self.ax.plot3D(
-                    [p0[0], p1[0]], [p0[1], p1[1]], [p0[2], p1[2]],
-                    color=colour, linewidth=1.4, alpha=0.85,
-                    solid_capstyle="round", zorder=35,
+                axis_lines = art3d.Line3DCollection(
+                    np.array(segments), colors=colours,
+                    linewidths=1.4, alpha=0.85, capstyle="round", zorder=35,
                 )
-                self._artists.append(axis_line)
+                self.ax.add_collection3d(axis_lines)
+                self._artists.append(axis_lines)
             except Exception as e:
                 self.logger.warning("Major-axis line failed: %s", e)
 
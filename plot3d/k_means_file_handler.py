@@ -16,7 +16,6 @@ if sys.platform != 'win32':
     import fcntl
 else:
     fcntl = None
-from copy import deepcopy
 import pandas as pd
 from tkinter import messagebox
 import logging
@@ -68,7 +67,7 @@ class KMeansFileHandler:
     def _save_to_xlsx(self, start: int, end: int, row_indices) -> bool:
         """Save cluster assignments to an Excel (.xlsx) file."""
         try:
-            from openpyxl import load_workbook
+            from utils.spreadsheet_patcher import patch_workbook
             
             # Inform user of the process
             msg = (f"Saving cluster assignments for rows {start}-{end}:\\n\\n"
@@ -85,46 +84,40 @@ class KMeansFileHandler:
             shutil.copy2(self.file_path, backup_path)
             
             try:
-                # Load the Excel file
-                wb = load_workbook(self.file_path)
-                # Use specified sheet or default to active
-                if self.sheet_name and self.sheet_name in wb.sheetnames:
-                    ws = wb[self.sheet_name]
-                    self.logger.info(f"Using specified sheet: {self.sheet_name}")
-                else:
-                    ws = wb.active
-                    if self.sheet_name:
-                        self.logger.warning(f"Sheet '{self.sheet_name}' not found, using active sheet: {ws.title}")
-                self.logger.info(f"Opened Excel sheet: {ws.title}")
+                # Locate the target sheet and its header row; read-only mode
+                # streams just the first row instead of loading the workbook
+                from openpyxl import load_workbook
+                from .workbook_cache import file_signature, apply_edits
+                wb = load_workbook(self.file_path, read_only=True)
+                try:
+                    # Use specified sheet or default to active
+                    if self.sheet_name and self.sheet_name in wb.sheetnames:
+                        ws = wb[self.sheet_name]
+                        self.logger.info(f"Using specified sheet: {self.sheet_name}")
+                    else:
+                        ws = wb.active
+                        if self.sheet_name:
+                            self.logger.warning(f"Sheet '{self.sheet_name}' not found, using active sheet: {ws.title}")
+                    sheet_title = ws.title
+                    header = [cell.value for cell in next(ws.iter_rows(min_row=1, max_row=1), ())]
+                finally:
+                    wb.close()
+                self.logger.info(f"Opened Excel sheet: {sheet_title}")
                 
                 # Get cluster assignments
                 clusters = self.data.iloc[row_indices]['Cluster']
                 valid_clusters = clusters[clusters.notna()]
                 
                 if not valid_clusters.empty:
-                    # Find column indices
-                    cluster_col = None
-                    centroid_x_col = None
-                    centroid_y_col = None
-                    centroid_z_col = None
-                    
-                    for col_idx, cell in enumerate(ws[1], 1):
-                        if cell.value == 'Cluster':
-                            cluster_col = col_idx
-                        elif cell.value == 'Centroid_X':
-                            centroid_x_col = col_idx
-                        elif cell.value == 'Centroid_Y':
-                            centroid_y_col = col_idx
-                        elif cell.value == 'Centroid_Z':
-                            centroid_z_col = col_idx
-                    
-                    if not all([cluster_col, centroid_x_col, centroid_y_col, centroid_z_col]):
-                        missing = []
-                        if not cluster_col: missing.append('Cluster')
-                        if not centroid_x_col: missing.append('Centroid_X')
-                        if not centroid_y_col: missing.append('Centroid_Y')
-                        if not centroid_z_col: missing.append('Centroid_Z')
+                    # Find column indices (0-based)
+                    required_columns = ['Cluster', 'Centroid_X', 'Centroid_Y', 'Centroid_Z']
+                    # A repeated header resolves to its last column
+                    column_of = {name: i for i, name in enumerate(header)}
+                    missing = [col for col in required_columns if col not in column_of]
+                    if missing:
                         raise ValueError(f"Required columns not found: {', '.join(missing)}")
+                    cluster_col, centroid_x_col, centroid_y_col, centroid_z_col = (
+                        column_of[col] for col in required_columns)
                     
                     self.logger.info(f"Found columns - Cluster: {cluster_col}, Centroid_X: {centroid_x_col}, Centroid_Y: {centroid_y_col}, Centroid_Z: {centroid_z_col}")
                     
@@ -133,34 +126,42 @@ class KMeansFileHandler:
                     
                     # Write cluster assignments to data rows
                     # Note: row_indices are 0-based DataFrame indices
-                    # Sheet rows: row 1 = header, row 2+ = data (DataFrame indices 0+)
-                    cluster_write_count = 0
+                    # Sheet rows (0-based): row 0 = header, row 1+ = data (DataFrame indices 0+)
+                    signature_before = file_signature(self.file_path)
+                    cell_edits = []  # (sheet, row, column, value) for the patch engine
+                    cache_edits = []  # (row, column, value) mirrored into the workbook cache
                     for i, idx in enumerate(row_indices):
                         cluster_value = clusters.iloc[i]
                         if pd.notna(cluster_value):
-                            # Map DataFrame index to sheet row: index 0 -> row 2, index 1 -> row 3, etc.
-                            sheet_row = idx + 2
-                            cell = ws.cell(row=sheet_row, column=cluster_col)
-                            cell.value = int(cluster_value)
-                            cluster_write_count += 1
-                            self.logger.info(f"Wrote cluster {int(cluster_value)} to data point at sheet row {sheet_row} (DataFrame index {idx})")
-                    self.logger.info(f"Total cluster assignments written to data rows: {cluster_write_count}")
+                            cell_edits.append((sheet_title, idx + 1, cluster_col, int(cluster_value)))
+                            cache_edits.append((idx, 'Cluster', int(cluster_value)))
+                    self.logger.info(f"Total cluster assignments written to data rows: {len(cell_edits)}")
                     
                     # Write centroid data to fixed rows
-                    # Row 2-7 are reserved for cluster 0-5 centroid data
+                    # Rows 2-7 (1-based) are reserved for cluster 0-5 centroid data
                     for cluster_num, centroid in cluster_centroids.items():
-                        excel_row = int(cluster_num) + 2  # Row 2 for cluster 0, row 3 for cluster 1, etc.
+                        sheet_row = int(cluster_num) + 1
                         # Always write the cluster number for identification
-                        ws.cell(row=excel_row, column=cluster_col, value=int(cluster_num))
-                        # Write centroid coordinates
-                        ws.cell(row=excel_row, column=centroid_x_col, value=round(centroid[0], 4))
-                        ws.cell(row=excel_row, column=centroid_y_col, value=round(centroid[1], 4))
-                        ws.cell(row=excel_row, column=centroid_z_col, value=round(centroid[2], 4))
-                        self.logger.info(f"Updated Excel row {excel_row} with cluster {int(cluster_num)} and centroid coordinates")
-                    
-                    # Save the workbook
-                    wb.save(self.file_path)
+                        centroid_values = {
+                            cluster_col: ('Cluster', int(cluster_num)),
+                            centroid_x_col: ('Centroid_X', round(centroid[0], 4)),
+                            centroid_y_col: ('Centroid_Y', round(centroid[1], 4)),
+                            centroid_z_col: ('Centroid_Z', round(centroid[2], 4)),
+                        }
+                        for col_idx, (col_name, value) in centroid_values.items():
+                            cell_edits.append((sheet_title, sheet_row, col_idx, value))
+                            cache_edits.append((sheet_row - 1, col_name, value))
+                        self.logger.info(f"Updated Excel row {sheet_row + 1} with cluster {int(cluster_num)} and centroid coordinates")
+                    
+                    # Patch the cells in place; unlike an openpyxl round trip this
+                    # keeps cached formula results, charts and validation intact
+                    patch_workbook(self.file_path, cell_edits)
                     self.logger.info("Excel file saved successfully")
+                    if len(set(header)) != len(header):
+                        # pandas renames repeated headers, so the cached frame's
+                        # columns don't line up with the cells written; re-read
+                        signature_before = None
+                    apply_edits(self.file_path, sheet_title, cache_edits, signature_before)
                     
                     # Display success message
                     cluster_counts = valid_clusters.value_counts().to_dict()
@@ -201,181 +202,15 @@ class KMeansFileHandler:
     def _save_to_ods(self, start: int, end: int, row_indices) -> bool:
         """Save cluster assignments to an ODS (.ods) file using direct XML manipulation.
         
-        Uses zipfile + lxml to modify content.xml directly, preserving all formatting
-        and data validation.
+        All cell changes are applied in one batch by the spreadsheet patcher,
+        which edits content.xml directly, preserving all formatting and data
+        validation.
         """
-        import zipfile
-        from lxml import etree
-        
-        # ODS namespaces
-        NS = {
-            'office': 'urn:oasis:names:tc:opendocument:xmlns:office:1.0',
-            'table': 'urn:oasis:names:tc:opendocument:xmlns:table:1.0',
-            'text': 'urn:oasis:names:tc:opendocument:xmlns:text:1.0',
-        }
-        OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
-        TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
-        TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+        from utils.spreadsheet_patcher import patch_workbook
         
         lockfile = None
         lock_path = f"{self.file_path}.lock"
         
-        def set_cell_value(cell, value):
-            """Set a cell's value while preserving its structure."""
-            # Remove old text content
-            for p in cell.findall(f'{TEXT_NS}p'):
-                cell.remove(p)
-            # Remove attributes that conflict with a numeric cell.
-            # office:string-value is written when a cell was previously stored
-            # as text (e.g. via a pandas/ezodf export using str() values). If
-            # it survives alongside office:value-type="float", LibreOffice Calc
-            # intermittently displays the cell with a leading apostrophe
-            # (its forced-text marker), causing formula errors downstream.
-            for stale_attr in (
-                f'{OFFICE_NS}string-value',
-                f'{TABLE_NS}formula',
-            ):
-                if stale_attr in cell.attrib:
-                    del cell.attrib[stale_attr]
-            # Set value attributes
-            cell.set(f'{OFFICE_NS}value-type', 'float')
-            cell.set(f'{OFFICE_NS}value', str(value))
-            # Add text for display
-            p = etree.SubElement(cell, f'{TEXT_NS}p')
-            p.text = str(value)
-        
-        def get_cell_at_column(row, col_idx):
-            """Get the cell at a specific column, splitting repeated cells if needed.
-            
-            If the target column is within a repeated cell span, splits the repeated
-            cell into individual cells so we can modify just one column.
-            """
-            cells = list(row.findall(f'{TABLE_NS}table-cell'))
-            current_col = 0
-            
-            for cell in cells:
-                repeat = cell.get(f'{TABLE_NS}number-columns-repeated')
-                repeat_count = int(repeat) if repeat else 1
-                
-                if current_col <= col_idx < current_col + repeat_count:
-                    # Found the cell containing our target column
-                    if repeat_count == 1:
-                        return cell
-                    
-                    # Need to split the repeated cell
-                    offset = col_idx - current_col
-                    
-                    # Remove repeat attribute from original
-                    if f'{TABLE_NS}number-columns-repeated' in cell.attrib:
-                        del cell.attrib[f'{TABLE_NS}number-columns-repeated']
-                    
-                    # Get cell's position in row
-                    cell_pos = list(row).index(cell)
-                    
-                    # Copy style if present
-                    style = cell.get(f'{TABLE_NS}style-name')
-                    
-                    # Create cells BEFORE target (if offset > 0)
-                    if offset > 0:
-                        before_cell = etree.Element(f'{TABLE_NS}table-cell')
-                        if style:
-                            before_cell.set(f'{TABLE_NS}style-name', style)
-                        if offset > 1:
-                            before_cell.set(f'{TABLE_NS}number-columns-repeated', str(offset))
-                        row.insert(cell_pos, before_cell)
-                        cell_pos += 1  # Original cell shifted right
-                    
-                    # Create cells AFTER target (if any remain)
-                    after_count = repeat_count - offset - 1
-                    if after_count > 0:
-                        after_cell = etree.Element(f'{TABLE_NS}table-cell')
-                        if style:
-                            after_cell.set(f'{TABLE_NS}style-name', style)
-                        if after_count > 1:
-                            after_cell.set(f'{TABLE_NS}number-columns-repeated', str(after_count))
-                        row.insert(cell_pos + 1, after_cell)
-                    
-                    return cell
-                
-                current_col += repeat_count
-            
-            return None
-        
-        def total_visual_rows(table):
-            """Count the total visual rows in a table, accounting for table:number-rows-repeated.
-            
-            ODS often compresses runs of identical/blank rows into a single
-            <table:table-row> element with a number-rows-repeated attribute. The
-            visual row count is the sum of those repeats.
-            """
-            total = 0
-            for row in table.findall(f'{TABLE_NS}table-row'):
-                repeat = row.get(f'{TABLE_NS}number-rows-repeated')
-                total += int(repeat) if repeat else 1
-            return total
-        
-        def get_row_at_index(table, target_row_idx):
-            """Get the row element at a specific visual row index, splitting repeated rows if needed.
-            
-            ODS files often compress runs of identical or blank rows into a single
-            <table:table-row> element with table:number-rows-repeated="N". A naive
-            rows[idx] lookup against table.findall(...) would silently miss this and
-            cause writes to land on the wrong visual row (or splatter across many
-            rows when the element is later expanded). This helper mirrors
-            get_cell_at_column for rows: it walks the row sequence, tracks visual
-            row position via the repeat count, and when the target falls inside a
-            repeated span, splits it into (before, target, after) so we can modify
-            exactly one visual row without affecting the others.
-            
-            Returns the row element corresponding to target_row_idx, or None if
-            target_row_idx is past the end of the table.
-            """
-            current_row = 0
-            for row in list(table.findall(f'{TABLE_NS}table-row')):
-                repeat = row.get(f'{TABLE_NS}number-rows-repeated')
-                repeat_count = int(repeat) if repeat else 1
-                
-                if current_row <= target_row_idx < current_row + repeat_count:
-                    if repeat_count == 1:
-                        return row
-                    
-                    # Split the repeated row into [before] [target] [after]
-                    offset = target_row_idx - current_row
-                    
-                    # The original element will become the single target row.
-                    if f'{TABLE_NS}number-rows-repeated' in row.attrib:
-                        del row.attrib[f'{TABLE_NS}number-rows-repeated']
-                    
-                    row_pos = list(table).index(row)
-                    style = row.get(f'{TABLE_NS}style-name')
-                    
-                    # Build a row with the same cell structure as the original.
-                    def make_sibling(repeats):
-                        sibling = etree.Element(f'{TABLE_NS}table-row')
-                        if style:
-                            sibling.set(f'{TABLE_NS}style-name', style)
-                        if repeats > 1:
-                            sibling.set(f'{TABLE_NS}number-rows-repeated', str(repeats))
-                        for child in row:
-                            sibling.append(deepcopy(child))
-                        return sibling
-                    
-                    if offset > 0:
-                        before_row = make_sibling(offset)
-                        table.insert(row_pos, before_row)
-                        row_pos += 1  # original (target) shifted right
-                    
-                    after_count = repeat_count - offset - 1
-                    if after_count > 0:
-                        after_row = make_sibling(after_count)
-                        table.insert(row_pos + 1, after_row)
-                    
-                    return row
-                
-                current_row += repeat_count
-            
-            return None
-        
         try:
             # Inform user of the process
             msg = (f"Saving cluster assignments for rows {start}-{end}:\\n\\n"
@@ -443,7 +278,8 @@ class KMeansFileHandler:
                     
                     # Get column indices using pandas
                     self.logger.info("Reading column structure with pandas")
-                    df = pd.read_excel(self.file_path, engine='odf', sheet_name=self.sheet_name)
+                    from .workbook_cache import read_sheet
+                    df = read_sheet(self.file_path, sheet_name=self.sheet_name, engine='odf')
                     
                     # Verify required columns
                     required_columns = ['Cluster', 'Centroid_X', 'Centroid_Y', 'Centroid_Z']
@@ -461,137 +297,57 @@ class KMeansFileHandler:
                     # Calculate centroids
                     cluster_centroids = self._calculate_centroids()
                     
-                    # Read ODS as ZIP and parse content.xml
-                    self.logger.info("Reading ODS file as ZIP archive")
-                    
-                    # Read all files from the ODS archive
-                    ods_files = {}
-                    with zipfile.ZipFile(self.file_path, 'r') as zf:
-                        for name in zf.namelist():
-                            ods_files[name] = zf.read(name)
-                    
-                    # Parse content.xml
-                    content_xml = ods_files['content.xml']
-                    tree = etree.fromstring(content_xml)
-                    
-                    # Find the correct table (sheet)
-                    tables = tree.xpath('//table:table', namespaces=NS)
-                    if not tables:
-                        raise ValueError("No tables found in ODS file")
-                    
-                    # Use specified sheet or default to first
-                    table = None
-                    if self.sheet_name:
-                        for t in tables:
-                            table_name = t.get(f'{TABLE_NS}name')
-                            if table_name == self.sheet_name:
-                                table = t
-                                self.logger.info(f"Using specified ODS sheet: {self.sheet_name}")
-                                break
-                        if table is None:
-                            self.logger.warning(f"Sheet '{self.sheet_name}' not found, using first sheet")
-                            table = tables[0]
-                    else:
-                        table = tables[0]
-                    
-                    # Account for ODS table:number-rows-repeated when computing
-                    # the visual row count and when looking up rows by visual index.
-                    # findall() returns one element per <table:table-row>, but a single
-                    # element can represent many visual rows.
-                    rows = table.findall(f'{TABLE_NS}table-row')
-                    visual_row_count = total_visual_rows(table)
-                    self.logger.info(
-                        f"Found {len(rows)} <table-row> elements representing "
-                        f"{visual_row_count} visual rows in table"
-                    )
+                    from .workbook_cache import file_signature, apply_edits
+                    signature_before = file_signature(self.file_path)
+                    cache_edits = []  # (row, column, value) mirrored into the workbook cache
+                    cell_edits = []  # (sheet, row, column, value) for the patch engine
+                    sheet = self.sheet_name
                     
                     # Update cluster assignments in data rows.
                     # Rows with a valid cluster get their value written;
                     # rows where the cluster is NaN (blanks / gaps) get their
                     # Cluster and Centroid cells cleared so stale data from a
                     # previous K-means run doesn't persist in the file.
-                    def clear_cell(cell):
-                        """Remove value attributes and text, leaving an empty cell."""
-                        for attr in [f'{OFFICE_NS}value-type', f'{OFFICE_NS}value']:
-                            if attr in cell.attrib:
-                                del cell.attrib[attr]
-                        for p in cell.findall(f'{TEXT_NS}p'):
-                            cell.remove(p)
-
+                    # Sheet row = DataFrame index + 1 (header is sheet row 0).
                     successful_writes = 0
                     cleared_writes = 0
                     for i, idx in enumerate(row_indices):
                         cluster_value = clusters.iloc[i]
                         ods_row_idx = idx + 1  # +1 for header
-                        if ods_row_idx >= visual_row_count:
-                            continue
-                        row = get_row_at_index(table, ods_row_idx)
-                        if row is None:
-                            self.logger.warning(
-                                f"Could not resolve visual row {ods_row_idx} "
-                                f"(past end of table)"
-                            )
-                            continue
-
                         if pd.notna(cluster_value):
-                            cell = get_cell_at_column(row, cluster_col_idx)
-                            if cell is not None:
-                                set_cell_value(cell, int(cluster_value))
-                                successful_writes += 1
-                                self.logger.debug(f"✓ Updated ODS row {ods_row_idx} with cluster {int(cluster_value)}")
+                            cell_edits.append((sheet, ods_row_idx, cluster_col_idx, int(cluster_value)))
+                            cache_edits.append((idx, 'Cluster', int(cluster_value)))
+                            successful_writes += 1
                         else:
                             # Gap / blank row — clear stale Cluster and Centroid cells
                             for col_idx in [cluster_col_idx, centroid_x_idx, centroid_y_idx, centroid_z_idx]:
-                                cell = get_cell_at_column(row, col_idx)
-                                if cell is not None:
-                                    clear_cell(cell)
+                                cell_edits.append((sheet, ods_row_idx, col_idx, None))
+                                cache_edits.append((idx, df.columns[col_idx], None))
                             cleared_writes += 1
-                            self.logger.debug(f"✓ Cleared stale data from ODS row {ods_row_idx} (gap row)")
                     
-                    self.logger.info(f"Cluster assignment update summary: {successful_writes} rows updated")
+                    self.logger.info(f"Cluster assignment update summary: {successful_writes} rows updated, "
+                                     f"{cleared_writes} gap rows cleared")
                     
                     # Update centroid rows (rows 1, 2, 3 in ODS for clusters 0, 1, 2)
                     for cluster_num, centroid in cluster_centroids.items():
                         ods_row_idx = int(cluster_num) + 1  # +1 for header
-                        if ods_row_idx < visual_row_count:
-                            row = get_row_at_index(table, ods_row_idx)
-                            if row is None:
-                                self.logger.warning(
-                                    f"Could not resolve visual row {ods_row_idx} "
-                                    f"for centroid summary (past end of table)"
-                                )
-                                continue
-                            
-                            # Set cluster number
-                            cell = get_cell_at_column(row, cluster_col_idx)
-                            if cell is not None:
-                                set_cell_value(cell, int(cluster_num))
-                            
-                            # Set centroid coordinates
-                            cell_x = get_cell_at_column(row, centroid_x_idx)
-                            if cell_x is not None:
-                                set_cell_value(cell_x, round(centroid[0], 4))
-                            
-                            cell_y = get_cell_at_column(row, centroid_y_idx)
-                            if cell_y is not None:
-                                set_cell_value(cell_y, round(centroid[1], 4))
-                            
-                            cell_z = get_cell_at_column(row, centroid_z_idx)
-                            if cell_z is not None:
-                                set_cell_value(cell_z, round(centroid[2], 4))
-                            
-                            self.logger.info(f"Updated centroid for cluster {cluster_num} at ODS row {ods_row_idx}")
-                    
-                    # Serialize modified XML and repackage ODS
+                        df_row = ods_row_idx - 1
+                        centroid_values = {
+                            cluster_col_idx: ('Cluster', int(cluster_num)),
+                            centroid_x_idx: ('Centroid_X', round(centroid[0], 4)),
+                            centroid_y_idx: ('Centroid_Y', round(centroid[1], 4)),
+                            centroid_z_idx: ('Centroid_Z', round(centroid[2], 4)),
+                        }
+                        for col_idx, (col_name, value) in centroid_values.items():
+                            cell_edits.append((sheet, ods_row_idx, col_idx, value))
+                            cache_edits.append((df_row, col_name, value))
+                        self.logger.info(f"Updated centroid for cluster {cluster_num} at ODS row {ods_row_idx}")
+                    
+                    # Patch all cells in one pass; other archive members
+                    # (styles.xml, settings, thumbnails) are copied unchanged
                     self.logger.info("Repackaging ODS file")
-                    modified_content = etree.tostring(tree, xml_declaration=True, encoding='UTF-8')
-                    ods_files['content.xml'] = modified_content
-                    
-                    # Write new ODS file (preserving all other files like styles.xml)
                     temp_path = f"{self.file_path}.tmp"
-                    with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                        for name, data in ods_files.items():
-                            zf.writestr(name, data)
+                    patch_workbook(self.file_path, cell_edits, output_path=temp_path)
                     
                     # Replace original with updated file.
                     # On macOS, newer LibreOffice versions hold an advisory
@@ -635,6 +391,10 @@ class KMeansFileHandler:
                         raise RuntimeError("Failed to write ODS file after all retry attempts")
                     self.logger.info("File saved successfully")
                     
+                    # Mirror the edits into the workbook cache so the ΔE step
+                    # and the plot refresh don't re-parse the file we just wrote
+                    apply_edits(self.file_path, self.sheet_name, cache_edits, signature_before)
+                    
                     # Clean up backup
                     try:
                         if os.path.exists(backup_path):
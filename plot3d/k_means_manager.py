@@ -1278,12 +1278,12 @@ class KmeansManager:
             if self.file_path and self.data is not None:
                 try:
                     engine = 'openpyxl' if self._is_xlsx_mode() else 'odf'
-                    fresh = pd.read_excel(
+                    from .workbook_cache import read_sheet
+                    fresh = read_sheet(
                         self.file_path,
-                        engine=engine,
                         sheet_name=self.sheet_name or 0,
-                        usecols=['Exclude']
-                    )
+                        engine=engine,
+                    )[['Exclude']]
                     if 'Exclude' in fresh.columns and len(fresh) == len(self.data):
                         self.data['Exclude'] = fresh['Exclude'].values
                         self.logger.info("Refreshed Exclude column from disk before K-means")
@@ -1368,7 +1368,8 @@ class KmeansManager:
             
             # Try to open the file to verify access
             # Try to open the file to verify access
-            pd.read_excel(abs_path, engine='odf')
+            from .workbook_cache import read_sheet
+            read_sheet(abs_path, engine='odf')
             return True
             
         except Exception as e:
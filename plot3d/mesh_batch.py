@@ -0,0 +1,141 @@
+"""Batched surface rendering for Plot_3D spheres and ellipsoids.
+
+One ``plot_surface`` call per sphere/ellipsoid means one artist per
+surface, and with dozens of clusters every frame of a view rotation
+re-sorts and re-draws each of them separately. Surfaces of the same
+colour and transparency are instead merged here into a single
+``Poly3DCollection``, built from the cached unit-sphere templates in
+:mod:`utils.mesh_templates`.
+
+``RotationLOD`` keeps a coarse copy of each collection and shows it
+instead of the detailed one while the user drags the 3D view, switching
+back when the mouse button is released.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+from matplotlib import colors as mcolors
+from mpl_toolkits.mplot3d import art3d
+
+# Mesh resolution (n_u, n_v) used while the view is being rotated
+COARSE_MESH = (10, 6)
+
+
+def add_surface_batch(ax, polygons: np.ndarray, color, alpha: float,
+                      zorder: Optional[float] = None) -> art3d.Poly3DCollection:
+    """Add many surface quads to a 3D axis as one shaded collection.
+
+    Drawn the way ``plot_surface(..., color=color, alpha=alpha, linewidth=0)``
+    draws a single surface, so batched output looks the same. Quads with
+    non-finite corners (degenerate fits) are dropped, as plot_surface does.
+
+    Args:
+        ax: matplotlib 3D axis
+        polygons: (F, 4, 3) quads, e.g. from ``utils.mesh_templates.quad_polygons``
+        color: Any matplotlib colour
+        alpha: Surface transparency
+
+    Returns:
+        The added Poly3DCollection
+    """
+    polygons = np.asarray(polygons, dtype=float)
+    polygons = polygons[np.isfinite(polygons).all(axis=(1, 2))]
+    collection = art3d.Poly3DCollection(
+        polygons,
+        facecolors=np.array(mcolors.to_rgba(color)),
+        shade=True,
+        alpha=alpha,
+        linewidth=0,
+        antialiased=True,
+    )
+    if zorder is not None:
+        collection.set_zorder(zorder)
+    ax.add_collection3d(collection)
+    return collection
+
+
+class RotationLOD:
+    """Show coarse surface collections while the 3D view is being dragged.
+
+    Owners register (detailed, coarse) pairs after rendering; the coarse
+    collection starts hidden. On a mouse press inside the axis the pairs
+    are swapped, and on release the detailed surfaces come back. A redraw
+    is only requested if the view actually moved in between.
+    """
+
+    def __init__(self):
+        self.ax = None
+        self.canvas = None
+        self._pairs: List[Tuple] = []
+        self._connection_ids: List[int] = []
+        self._coarse_shown = False
+        self._moved = False
+        self.logger = logging.getLogger(__name__)
+
+    def attach(self, ax, canvas) -> None:
+        """Follow a (possibly new) axis and canvas."""
+        self.ax = ax
+        if canvas is self.canvas:
+            return
+        self.detach()
+        self.canvas = canvas
+        if canvas is None:
+            return
+        try:
+            self._connection_ids = [
+                canvas.mpl_connect('button_press_event', self._on_press),
+                canvas.mpl_connect('motion_notify_event', self._on_motion),
+                canvas.mpl_connect('button_release_event', self._on_release),
+            ]
+        except Exception as e:
+            self.logger.debug(f"RotationLOD could not connect to canvas: {e}")
+            self._connection_ids = []
+
+    def detach(self) -> None:
+        """Disconnect from the current canvas."""
+        for cid in self._connection_ids:
+            try:
+                self.canvas.mpl_disconnect(cid)
+            except Exception:
+                pass
+        self._connection_ids = []
+        self.canvas = None
+
+    def add(self, detailed, coarse) -> None:
+        """Register a detailed collection and its coarse stand-in."""
+        coarse.set_visible(self._coarse_shown)
+        detailed.set_visible(not self._coarse_shown)
+        self._pairs.append((detailed, coarse))
+
+    def clear(self) -> None:
+        """Forget all pairs (their artists are removed by the owner)."""
+        self._pairs = []
+        self._coarse_shown = False
+
+    def _show_coarse(self, coarse: bool) -> None:
+        for detailed, low in self._pairs:
+            detailed.set_visible(not coarse)
+            low.set_visible(coarse)
+        self._coarse_shown = coarse
+
+    def _on_press(self, event) -> None:
+        if not self._pairs or self.ax is None or event.inaxes is not self.ax:
+            return
+        if event.button not in getattr(self.ax, '_rotate_btn', [1]):
+            return
+        self._moved = False
+        self._show_coarse(True)
+
+    def _on_motion(self, event) -> None:
+        if self._coarse_shown:
+            self._moved = True
+
+    def _on_release(self, event) -> None:
+        if not self._coarse_shown:
+            return
+        self._show_coarse(False)
+        if self._moved and self.canvas is not None:
+            self.canvas.draw_idle()
+        self._moved = False
@@ -236,8 +236,9 @@ class PairwiseDeltaEManager:
         # Reload from file if available to ensure freshness
         if self.file_path and os.path.exists(self.file_path):
             engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
-            self.data = pd.read_excel(self.file_path, engine=engine,
-                                      sheet_name=self.sheet_name or 0)
+            from .workbook_cache import read_sheet
+            self.data = read_sheet(self.file_path, sheet_name=self.sheet_name or 0,
+                                   engine=engine)
             self.logger.info(f"Reloaded data from {self.file_path}")
 
         indices = self._get_row_indices(start_row, end_row)
@@ -594,16 +595,22 @@ class PairwiseDeltaEViewer:
         ws.cell(row=summary_row + 4, column=2, value=f"{s['pct_within']}%")
 
         wb.save(self.file_path)
+        from .workbook_cache import invalidate
+        invalidate(self.file_path)
 
     def _export_ods(self):
         import ezodf
 
+        from .workbook_cache import file_signature, apply_edits
+        signature_before = file_signature(self.file_path)
         doc = ezodf.opendoc(self.file_path)
 
         # Remove existing sheet if present
+        removed_index = None
         for i, sheet in enumerate(doc.sheets):
             if sheet.name == 'Pairwise ΔE':
                 del doc.sheets[i]
+                removed_index = i
                 break
 
         n = self.n
@@ -634,3 +641,10 @@ class PairwiseDeltaEViewer:
         new_sheet[sr + 3, 1].set_value(f"{s['pairs_above']}/{s['total_pairs']}")
 
         doc.save()
+        # The data sheet is untouched (the matrix sheet is appended), so the
+        # cached copy stays valid unless "first sheet" now means another one
+        if removed_index == 0 and not self.sheet_name:
+            from .workbook_cache import invalidate
+            invalidate(self.file_path)
+        else:
+            apply_edits(self.file_path, self.sheet_name, [], signature_before)
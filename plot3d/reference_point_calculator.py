@@ -13,7 +13,12 @@ import shutil
 import tempfile
 import traceback
 from contextlib import contextmanager
-from typing import Optional, Dict, List, Tuple, Any, Union, Generator
+from typing import Optional, Dict, List, Tuple, Any, Union, Generator, Sequence
+
+from .delta_e_core import reference_delta_e_table
+
+# Column that receives the nearest reference row when several references are used
+NEAREST_COLUMN = 'Nearest'
 
 class ReferencePointCalculator:
     """
@@ -22,7 +27,9 @@ class ReferencePointCalculator:
     
     This calculator uses the same CIE2000 formula as the DeltaECalculator but doesn't 
     rely on K-means clustering. Instead, it uses a single reference point specified by row number
-    and calculates Delta E values against this reference point.
+    and calculates Delta E values against this reference point. Several reference
+    rows can be given; each point is then compared with all of them and gets the
+    Delta E to its nearest reference.
     """
     
     # Define expected column structure
@@ -80,6 +87,7 @@ class ReferencePointCalculator:
         # Reference point data
         self.reference_point_row = 2  # Default to row 2 (first data row)
         self.reference_coordinates = None
+        self.reference_points = {}  # {row number: (Centroid_X, Centroid_Y, Centroid_Z)}
         
         # File state tracking
         self.last_backup_path = None
@@ -681,38 +689,52 @@ class ReferencePointCalculator:
         Returns:
             bool: True if successful, False if reference point is invalid
         """
+        return self.set_reference_point_rows([row_num])
+    
+    def set_reference_point_rows(self, row_nums: Sequence[int]) -> bool:
+        """
+        Set one or more reference point rows.
+        
+        Args:
+            row_nums: 1-based row numbers to use as reference points
+            
+        Returns:
+            bool: True if successful, False if any reference point is invalid
+        """
         if self.data is None:
             self.logger.error("No data loaded. Call load_data() first.")
             return False
         
-        # Convert 1-based row number to 0-based index
-        index = row_num - 2  # Row 2 (first data row) corresponds to index 0
-        
-        if index < 0 or index >= len(self.data):
-            self.logger.error(f"Invalid row number {row_num}, must be between 2 and {len(self.data) + 1}")
+        if not row_nums:
+            self.logger.error("No reference rows given")
             return False
         
-        # Check if the reference row has valid centroid data
         centroid_cols = ['Centroid_X', 'Centroid_Y', 'Centroid_Z']
-        row = self.data.iloc[index]
-        
-        if any(pd.isna(row[col]) for col in centroid_cols):
-            self.logger.error(f"Reference row {row_num} missing centroid data")
-            return False
-        
-        # Store the reference point row number
-        self.reference_point_row = row_num
-        self.logger.info(f"Set reference point to row {row_num}")
-        
-        # Update reference coordinates
-        self.reference_coordinates = (
-            float(row['Centroid_X']),
-            float(row['Centroid_Y']),
-            float(row['Centroid_Z'])
-        )
+        reference_points = {}
+        for row_num in row_nums:
+            # Convert 1-based row number to 0-based index
+            index = row_num - 2  # Row 2 (first data row) corresponds to index 0
+            
+            if index < 0 or index >= len(self.data):
+                self.logger.error(f"Invalid row number {row_num}, must be between 2 and {len(self.data) + 1}")
+                return False
+            
+            # Check if the reference row has valid centroid data
+            row = self.data.iloc[index]
+            if any(pd.isna(row[col]) for col in centroid_cols):
+                self.logger.error(f"Reference row {row_num} missing centroid data")
+                return False
+            
+            reference_points[row_num] = tuple(float(row[col]) for col in centroid_cols)
+            self.logger.info(f"Reference row {row_num} coordinates: ({reference_points[row_num][0]:.4f}, "
+                            f"{reference_points[row_num][1]:.4f}, {reference_points[row_num][2]:.4f})")
         
-        self.logger.info(f"Reference coordinates: ({self.reference_coordinates[0]:.4f}, "
-                        f"{self.reference_coordinates[1]:.4f}, {self.reference_coordinates[2]:.4f})")
+        # Store the reference points; the first one is also the "current"
+        # single reference point
+        self.reference_points = reference_points
+        self.reference_point_row = row_nums[0]
+        self.reference_coordinates = reference_points[row_nums[0]]
+        self.logger.info(f"Set reference point(s) to row(s) {list(reference_points)}")
         
         return True
     
@@ -969,6 +991,30 @@ class ReferencePointCalculator:
         
         return deltaE
 
+    def calculate_reference_delta_e(self, start_row: int, end_row: int) -> pd.DataFrame:
+        """
+        ΔE of every row in the range against every reference point.
+        
+        Args:
+            start_row: 1-based start row number (where 2 is the first data row)
+            end_row: 1-based end row number
+            
+        Returns:
+            DataFrame indexed like ``self.data`` with one ΔE column per reference
+            row number, then ``Nearest`` (closest reference row) and ``Nearest ∆E``.
+            Rows without complete coordinates are NaN / None.
+        """
+        reference_points = self.reference_points
+        if not reference_points:
+            if self.reference_coordinates is None:
+                self.logger.error("Reference point coordinates not available")
+                raise ValueError("Reference point coordinates not available. Please set a valid reference point.")
+            reference_points = {self.reference_point_row: self.reference_coordinates}
+        
+        row_indices = self._get_row_indices(start_row, end_row)
+        # Points and references are treated as normalized XYZ (see xyz_to_lab)
+        return reference_delta_e_table(self.data, row_indices, reference_points, color_space='XYZ')
+    
     def create_gui(self, parent):
         """Create the Reference Point ΔE calculation control panel."""
         if parent is None:
@@ -988,7 +1034,7 @@ class ReferencePointCalculator:
             
             # Reference point row input
             tk.Label(control_frame, text="Ref Row:", font=("Arial", 9)).pack(side=tk.LEFT)
-            self.reference_row = tk.Entry(control_frame, width=3)
+            self.reference_row = tk.Entry(control_frame, width=6)
             self.reference_row.insert(0, "2")  # Default to first data row
             self.reference_row.pack(side=tk.LEFT, padx=1)
             
@@ -1040,11 +1086,13 @@ class ReferencePointCalculator:
             self.calculate_button.config(text="Working...")
             self.calculate_button.update()
             
-            # Get reference row
+            # Get reference row(s), e.g. "2" or "2, 15, 31"
             try:
-                ref_row = int(self.reference_row.get())
+                ref_rows = [int(r) for r in self.reference_row.get().split(',') if r.strip()]
+                if not ref_rows:
+                    raise ValueError("no reference row")
             except ValueError:
-                messagebox.showerror("Invalid Input", "Reference row must be an integer.")
+                messagebox.showerror("Invalid Input", "Reference row must be an integer (or integers separated by commas).")
                 return
             finally:
                 # Restore button state
@@ -1062,19 +1110,20 @@ class ReferencePointCalculator:
             if self.file_path and os.path.exists(self.file_path):
                 try:
                     engine = 'odf' if self.file_path.endswith('.ods') else 'openpyxl'
-                    refreshed = pd.read_excel(self.file_path, engine=engine,
-                                              sheet_name=self.sheet_name or 0)
+                    from .workbook_cache import read_sheet
+                    refreshed = read_sheet(self.file_path, sheet_name=self.sheet_name or 0,
+                                           engine=engine)
                     self.load_data(refreshed)
                     self.logger.info("Reloaded data from file before reference point check")
                 except Exception as e:
                     self.logger.warning(f"Could not reload data from file: {e}")
             
-            # Set the reference point
-            if not self.set_reference_point_row(ref_row):
+            # Set the reference point(s)
+            if not self.set_reference_point_rows(ref_rows):
                 messagebox.showerror(
                     "Invalid Reference Row", 
-                    f"Row {ref_row} does not have valid centroid data.\n\n"
-                    "Please select a row with valid Centroid_X/Y/Z values."
+                    f"Row(s) {', '.join(str(r) for r in ref_rows)} do not all have valid centroid data.\n\n"
+                    "Please select rows with valid Centroid_X/Y/Z values."
                 )
                 return
             
@@ -1096,10 +1145,13 @@ class ReferencePointCalculator:
             "This tool calculates the perceived color difference between points "
             "and a single reference point using the ΔE CIE2000 formula.\n\n"
             "Usage:\n"
-            "1. Enter the row number for the reference point (must have valid Centroid_X/Y/Z data)\n"
+            "1. Enter the row number for the reference point (must have valid Centroid_X/Y/Z data).\n"
+            "   Several rows separated by commas (e.g. 2, 15, 31) give each point\n"
+            "   the ΔE to its nearest reference\n"
             "2. Enter the row range to process (first data row is 2)\n"
             "3. Click 'Calculate' to compute ΔE values\n"
-            "4. Values will be saved to the '∆E' column\n\n"
+            "4. Values will be saved to the '∆E' column; with several references the\n"
+            "   nearest reference row is saved to a 'Nearest' column (added if missing)\n\n"
             "Requirements:\n"
             "• Data must be normalized (0.0-1.0 range)\n"
             "• Required columns: Xnorm, Ynorm, Znorm, Centroid_X/Y/Z, ∆E\n"
@@ -1136,11 +1188,19 @@ class ReferencePointCalculator:
             self.logger.error("Reference point coordinates not available")
             raise ValueError("Reference point coordinates not available. Please set a valid reference point.")
         
+        reference_points = self.reference_points or {self.reference_point_row: self.reference_coordinates}
+        if len(reference_points) > 1:
+            reference_text = f"the nearest of reference rows {', '.join(str(r) for r in reference_points)}"
+            columns_text = f"ONLY the ΔE and {NEAREST_COLUMN} columns will be updated"
+        else:
+            reference_text = f"reference row {self.reference_point_row}"
+            columns_text = "ONLY the ΔE column will be updated"
+        
         # Confirm with user
         confirmation = messagebox.askokcancel(
             "Calculate ΔE", 
-            f"Calculate ΔE values for rows {start_row}-{end_row} using reference row {self.reference_point_row}?\n\n"
-            "ONLY the ΔE column will be updated, all other data will be preserved."
+            f"Calculate ΔE values for rows {start_row}-{end_row} using {reference_text}?\n\n"
+            f"{columns_text}, all other data will be preserved."
         )
         
         if not confirmation:
@@ -1149,8 +1209,6 @@ class ReferencePointCalculator:
         
         lockfile = None
         lock_path = f"{self.file_path}.lock"
-        ods_doc = None
-        sheet = None
         
         try:
             # Create and acquire lock file to prevent concurrent access
@@ -1245,31 +1303,17 @@ class ReferencePointCalculator:
             shutil.copy2(self.file_path, backup_path)
             self.logger.info(f"Backup created successfully")
             
-            # Open the .ods file for editing
-            self.logger.info("Opening .ods file for editing")
-            ods_doc = ezodf.opendoc(self.file_path)
-            # Find the correct sheet by name (for multi-sheet files)
-            if self.sheet_name:
-                sheet = None
-                for i, s in enumerate(ods_doc.sheets):
-                    if s.name == self.sheet_name:
-                        sheet = s
-                        self.logger.info(f"Found sheet '{self.sheet_name}' at index {i}")
-                        break
-                if sheet is None:
-                    self.logger.error(f"Sheet '{self.sheet_name}' not found")
-                    raise ValueError(f"Sheet '{self.sheet_name}' not found in file")
-            else:
-                sheet = ods_doc.sheets[0]
-                self.logger.info(f"Using first sheet: {sheet.name}")
+            # Read the header of the target sheet (raises if the sheet is missing)
+            from .workbook_cache import read_sheet, file_signature, apply_edits
+            signature_before = file_signature(self.file_path)
+            header = list(read_sheet(self.file_path, sheet_name=self.sheet_name or 0).columns)
+            self.logger.info(f"Using sheet: {self.sheet_name or 'first sheet'}")
             
             # Find the ∆E column index - header is in row 1 (zero-based index 0)
-            header_row = 0  # Zero-based index for header row
             delta_e_col_idx = None
             
             delta_e_aliases = {'∆E', '∆ E', 'DeltaE', 'Delta E', 'Delta_E', 'deltae', 'delta_e'}
-            for col_idx in range(len(sheet.row(header_row))):
-                cell_value = sheet[header_row, col_idx].value
+            for col_idx, cell_value in enumerate(header):
                 if cell_value and (cell_value in delta_e_aliases or str(cell_value).strip().lower() in {a.lower() for a in delta_e_aliases}):
                     delta_e_col_idx = col_idx
                     self.logger.info(f"Matched ΔE column header '{cell_value}' at index {col_idx}")
@@ -1281,98 +1325,77 @@ class ReferencePointCalculator:
             
             self.logger.info(f"Found ∆E column at index {delta_e_col_idx}")
             
-            # Get reference point coordinates
-            ref_x, ref_y, ref_z = self.reference_coordinates
-            self.logger.info(f"Using reference coordinates: ({ref_x:.4f}, {ref_y:.4f}, {ref_z:.4f})")
-            
-            # Convert reference coordinates to Lab
-            # Convert reference coordinates to Lab
-            ref_lab = self.xyz_to_lab(ref_x, ref_y, ref_z)
-            self.logger.info(f"Reference Lab: L={ref_lab[0]:.2f}, a={ref_lab[1]:.2f}, b={ref_lab[2]:.2f}")
-            
-            # Calculate ∆E for each row and update the spreadsheet
+            # With several references the nearest reference row is written too,
+            # into an existing Nearest column or a new one after the last column
+            nearest_col_idx = None
+            nearest_header_added = False
+            if len(reference_points) > 1:
+                if NEAREST_COLUMN in header:
+                    nearest_col_idx = header.index(NEAREST_COLUMN)
+                else:
+                    nearest_col_idx = len(header)
+                    nearest_header_added = True
+                self.logger.info(f"Writing nearest reference rows to column index {nearest_col_idx}")
+            
+            # Calculate ∆E for every row against every reference point in one pass
+            for row_num, (ref_x, ref_y, ref_z) in reference_points.items():
+                self.logger.info(f"Using reference row {row_num} coordinates: ({ref_x:.4f}, {ref_y:.4f}, {ref_z:.4f})")
             self.logger.info(f"Calculating ∆E for {len(subset_data)} rows")
             self.logger.info(f"Processing rows: Start={start_row}, End={end_row}")
+            table = self.calculate_reference_delta_e(start_row, end_row)
+            nearest_counts = table['Nearest'].value_counts().to_dict()
+            if len(reference_points) > 1:
+                self.logger.info(f"Nearest reference row counts: {nearest_counts}")
             
             # Track successful updates
             updates = []
-            
-            # Process each row
-            for i, (idx, row) in enumerate(subset_data.iterrows()):
-                try:
-                    # Check for blank row
-                    if pd.isna(row['Xnorm']) and pd.isna(row['Ynorm']) and pd.isna(row['Znorm']):
-                        continue
-                        
-                    # Get point coordinates
-                    point_xyz = (row['Xnorm'], row['Ynorm'], row['Znorm'])
-                    
-                    # Check for invalid coordinates
-                    if any(pd.isna(coord) for coord in point_xyz):
-                        self.logger.warning(f"Row {idx+2}: Invalid coordinates, skipping")
-                        continue
-                    
-                    # Convert to Lab
-                    point_lab = self.xyz_to_lab(*point_xyz)
-                    
-                    # Calculate ∆E CIE2000
-                    delta_e = self.calculate_delta_e_2000(point_lab, ref_lab)
-                    
-                    # Round to 2 decimal places
-                    delta_e = round(delta_e, 2)
-                    
-                    # Log key information
-                    self.logger.info(f"Row {idx+2}: Delta E = {delta_e:.2f}")
-                    
-                    # Calculate sheet row - use simple formula
-                    sheet_row_idx = start_row + i - 1  # Adjust for zero-based indexing
-                    
-                    # Update ∆E cell
-                    try:
-                        sheet[sheet_row_idx, delta_e_col_idx].set_value(delta_e)
-                        updates.append((sheet_row_idx, delta_e))
-                    except Exception as cell_error:
-                        self.logger.error(f"Error writing to cell at row {sheet_row_idx}: {cell_error}")
-                        continue
-                    
-                    # Log progress every 10 rows
-                    if (i + 1) % 10 == 0 or i == len(subset_data) - 1:
-                        self.logger.info(f"Processed {i + 1}/{len(subset_data)} rows")
-                
-                except Exception as e:
-                    self.logger.error(f"Error processing row {idx + 2}: {e}")
-                    # Continue with the next row
+            cell_edits = []  # (sheet, row, column, value) for the patch engine
+            cache_edits = []  # (row, column, value) mirrored into the workbook cache
+            delta_e_header = header[delta_e_col_idx]
+            if nearest_header_added:
+                cell_edits.append((self.sheet_name, 0, nearest_col_idx, NEAREST_COLUMN))
+            
+            # Blank rows and rows with invalid coordinates have no ∆E and are skipped.
+            # The sheet row follows the row's position in the range (zero-based,
+            # header is sheet row 0).
+            for i, (delta_e, nearest) in enumerate(zip(table['Nearest ∆E'].tolist(),
+                                                       table['Nearest'].tolist())):
+                if pd.isna(delta_e):
+                    continue
+                sheet_row_idx = start_row + i - 1
+                cell_edits.append((self.sheet_name, sheet_row_idx, delta_e_col_idx, delta_e))
+                updates.append((sheet_row_idx, delta_e))
+                # sheet row 0 is the header, so DataFrame row = sheet row - 1
+                cache_edits.append((sheet_row_idx - 1, delta_e_header, delta_e))
+                if nearest_col_idx is not None:
+                    cell_edits.append((self.sheet_name, sheet_row_idx, nearest_col_idx, int(nearest)))
+                    cache_edits.append((sheet_row_idx - 1, NEAREST_COLUMN, int(nearest)))
+            self.logger.info(f"Calculated ∆E for {len(updates)}/{len(subset_data)} rows")
 
             # Save the updated document
             if updates:
                 self.logger.info(f"Saving updates for {len(updates)} rows")
                 try:
-                    # Save via temp file + atomic replace (proven pattern)
+                    # Patch all ∆E cells into a temp file + atomic replace (proven pattern)
+                    from utils.spreadsheet_patcher import patch_workbook
                     temp_path = f"{self.file_path}.new"
                     self.logger.info(f"Saving to temp file: {temp_path}")
-                    ods_doc.saveas(temp_path)
-                    del ods_doc
-                    ods_doc = None
+                    patch_workbook(self.file_path, cell_edits, output_path=temp_path)
                     os.replace(temp_path, self.file_path)
                     self.logger.info("Document saved successfully via atomic replace")
+                    # A new column changes the sheet shape; let the next read re-parse
+                    apply_edits(self.file_path, self.sheet_name, cache_edits,
+                                None if nearest_header_added else signature_before)
                     
                     # Verify the save worked
-                    verify_doc = None
                     try:
                         self.logger.info("Performing save verification")
-                        verify_doc = ezodf.opendoc(self.file_path)
-                        # Use the named sheet (same as the save), NOT sheets[0].
-                        # For multi-sheet files sheets[0] is usually the first
+                        # Use the named sheet (same as the save), NOT sheet 0.
+                        # For multi-sheet files sheet 0 is usually the first
                         # (often empty) sheet, causing spurious "cell is empty"
                         # verification failures even when the save succeeded.
-                        if self.sheet_name:
-                            verify_sheet = next(
-                                (s for s in verify_doc.sheets
-                                 if s.name == self.sheet_name),
-                                verify_doc.sheets[0]
-                            )
-                        else:
-                            verify_sheet = verify_doc.sheets[0]
+                        from utils.ods_reader import read_ods_table
+                        verify_table = read_ods_table(self.file_path, self.sheet_name or 0)
                         
                         # Check first few updates
                         check_count = min(5, len(updates))
@@ -1380,9 +1403,11 @@ class ReferencePointCalculator:
                         
                         verification_passed = True
                         for i, (row_idx, expected_value) in enumerate(updates[:check_count]):
-                            actual = verify_sheet[row_idx, delta_e_col_idx].value
+                            actual = None
+                            if row_idx < len(verify_table) and delta_e_col_idx < len(verify_table[row_idx]):
+                                actual = verify_table[row_idx][delta_e_col_idx]
                             
-                            if actual is None:
+                            if actual is None or (isinstance(actual, str) and actual == ''):
                                 self.logger.error(f"Verification failed - cell at row {row_idx} is empty")
                                 verification_passed = False
                                 break
@@ -1404,15 +1429,16 @@ class ReferencePointCalculator:
                                 "There may have been an issue saving some values.\nA backup has been kept for safety.")
                     except Exception as verify_error:
                         self.logger.error(f"Save verification failed: {verify_error}")
-                    finally:
-                        # Release verification document
-                        if verify_doc is not None:
-                            del verify_doc
                     
                     # Show success message
+                    if len(reference_points) > 1:
+                        reference_summary = "Nearest reference: " + ", ".join(
+                            f"row {r} ({nearest_counts.get(r, 0)})" for r in reference_points) + "\n"
+                    else:
+                        reference_summary = f"Using reference point from row {self.reference_point_row}.\n"
                     messagebox.showinfo("Success", 
                                       f"Successfully calculated and updated ΔE values for {len(updates)} rows.\n\n"
-                                      f"Using reference point from row {self.reference_point_row}.\n"
+                                      f"{reference_summary}"
                                       f"Row range: {start_row}-{end_row}")
                     # Trigger a plot refresh so ΔE values appear immediately
                     # without the user needing to click Refresh manually.
@@ -1437,10 +1463,6 @@ class ReferencePointCalculator:
                                            f"Failed to save updates: {e}\n\nRestored file from backup.")
                         except Exception as restore_error:
                             self.logger.error(f"Failed to restore from backup: {restore_error}")
-                finally:
-                    # Release document if still held
-                    if 'ods_doc' in locals() and ods_doc is not None:
-                        del ods_doc
             else:
                 self.logger.warning("No updates made")
                 messagebox.showinfo("No Updates", "No ΔE values were calculated or updated.")
@@ -7,6 +7,12 @@ from mpl_toolkits.mplot3d import Axes3D
 import logging
 from typing import Dict, List, Optional, Tuple, Any, Union
 
+from utils.mesh_templates import mesh_grids, quad_polygons, sphere_points
+from .mesh_batch import COARSE_MESH, RotationLOD, add_surface_batch
+
+# Sphere mesh resolution (n_u, n_v)
+SPHERE_MESH = (20, 10)
+
 class SphereManager:
     """
     Manager class for rendering spheres at centroid coordinates in 3D space.
@@ -14,7 +20,8 @@ class SphereManager:
     This class manages the creation and visualization of translucent spheres at
     Centroid_X/Y/Z coordinates. Spheres are only rendered if valid coordinate data exists.
     The colors are taken from the "Sphere" column of the dataframe, with a default of gray
-    if no color is specified.
+    if no color is specified. All spheres of one color are drawn as a single batched
+    surface collection.
     """
     
     def __init__(self, ax, canvas, data_df: pd.DataFrame):
@@ -30,6 +37,8 @@ class SphereManager:
         self.canvas = canvas
         self.data_df = data_df
         self.sphere_objects = []  # Store references to sphere objects for later removal
+        self.lod = RotationLOD()  # Coarse spheres while the view is rotated
+        self.lod.attach(ax, canvas)
         
         # Constants for sphere rendering
         self.ALPHA = 0.15  # Fixed transparency
@@ -74,6 +83,7 @@ class SphereManager:
             
             # Clear the list of sphere objects
             self.sphere_objects = []
+            self.lod.clear()
             self.logger.info(f"Cleared {count} sphere/circle objects from plot")
         except Exception as e:
             self.logger.error(f"Error clearing spheres: {str(e)}")
@@ -94,6 +104,7 @@ class SphereManager:
             self.ax = ax
             self.canvas = canvas
             self.data_df = data_df
+            self.lod.attach(ax, canvas)
             
             # Clear existing spheres
             self.clear_spheres()
@@ -180,15 +191,9 @@ class SphereManager:
         Returns:
             Tuple of (x, y, z) mesh grids for the sphere surface
         """
-        # Create sphere mesh - use enough points for a smooth sphere but not too many for performance
-        u = np.linspace(0, 2 * np.pi, 20)
-        v = np.linspace(0, np.pi, 10)
-        
-        x = radius * np.outer(np.cos(u), np.sin(v)) + center[0]
-        y = radius * np.outer(np.sin(u), np.sin(v)) + center[1]
-        z = radius * np.outer(np.ones(np.size(u)), np.cos(v)) + center[2]
-        
-        return x, y, z
+        # Scale and move the cached unit-sphere template
+        n_u, n_v = SPHERE_MESH
+        return mesh_grids(sphere_points([center], [radius], n_u, n_v)[0], n_u, n_v)
     
     def _get_color(self, color_name: str) -> str:
         """
@@ -260,55 +265,41 @@ class SphereManager:
                 print("DEBUG: No valid centroid data found for sphere rendering")
                 return
             
-            # Process each point with valid centroid coordinates
+            # Color of each sphere; skip colors that are toggled off
+            sphere_names = centroid_data.get('Sphere', pd.Series(np.nan, index=centroid_data.index))
+            colors = np.array([self._get_color(str(c) if pd.notna(c) else 'gray') for c in sphere_names],
+                              dtype=object)
+            visible = np.array([self.visibility_states.get(c, True) for c in colors], dtype=bool)
+            
+            # Radius from the Radius column, default where missing or not positive
+            if 'Radius' in centroid_data.columns:
+                radii = pd.to_numeric(centroid_data['Radius'], errors='coerce').to_numpy(dtype=float, copy=True)
+            else:
+                radii = np.full(len(centroid_data), self.DEFAULT_RADIUS)
+            invalid = ~(radii > 0)
+            if invalid.any():
+                bad = centroid_data.index[invalid].tolist()
+                self.logger.warning(f"Invalid radius value at index {bad[:10]}{'...' if len(bad) > 10 else ''}, using default")
+                radii[invalid] = self.DEFAULT_RADIUS
+            
+            centers = centroid_data[['Centroid_X', 'Centroid_Y', 'Centroid_Z']].apply(
+                pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+            
+            # One surface collection per color (plus a coarse copy for rotation)
             sphere_count = 0
-            for idx, row in centroid_data.iterrows():
+            for color in dict.fromkeys(colors[visible]):
+                members = visible & (colors == color)
                 try:
-                    # Get color and check visibility
-                    color_name = row.get('Sphere')
-                    color = self._get_color(str(color_name) if pd.notna(color_name) else 'gray')
-                    
-                    # Skip if sphere color is not visible
-                    if not self.visibility_states.get(color, True):
-                        continue
-                        
-                    # Get radius from Radius column or use default
-                    radius = row.get('Radius', self.DEFAULT_RADIUS)
-                    try:
-                        radius = float(radius)
-                        # Ensure radius is positive, use default if not
-                        if not (radius > 0):
-                            self.logger.warning(f"Invalid radius value {radius} at index {idx}, using default")
-                            radius = self.DEFAULT_RADIUS
-                    except (ValueError, TypeError):
-                        self.logger.warning(f"Invalid radius value at index {idx}, using default")
-                        radius = self.DEFAULT_RADIUS
-                    
-                    # Get coordinates
-                    center = (
-                        float(row['Centroid_X']), 
-                        float(row['Centroid_Y']), 
-                        float(row['Centroid_Z'])
-                    )
-                    
-                    # Create sphere mesh with variable radius
-                    x, y, z = self._create_sphere_mesh(center, radius)
-                    
-                    # Render the sphere
-                    sphere = self.ax.plot_surface(
-                        x, y, z,
-                        color=color,
-                        alpha=self.ALPHA,
-                        linewidth=0,
-                        antialiased=True
-                    )
-                    
-                    # Add to list of objects for later removal
-                    self.sphere_objects.append(sphere)
-                    sphere_count += 1
-                    
+                    collections = []
+                    for n_u, n_v in (SPHERE_MESH, COARSE_MESH):
+                        polygons = quad_polygons(
+                            sphere_points(centers[members], radii[members], n_u, n_v), n_u, n_v)
+                        collections.append(add_surface_batch(self.ax, polygons, color, self.ALPHA))
+                    self.sphere_objects.extend(collections)
+                    self.lod.add(*collections)
+                    sphere_count += int(members.sum())
                 except Exception as e:
-                    self.logger.warning(f"Error rendering sphere at index {idx}: {str(e)}")
+                    self.logger.warning(f"Error rendering {color} spheres: {str(e)}")
                     continue
             
             self.logger.info(f"Successfully rendered {sphere_count} visible spheres")
@@ -10,6 +10,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.patches import Rectangle, Circle
 
 from utils.data_file_manager import get_data_file_manager, DataFormat
+from plot3d.workbook_cache import read_sheet
 
 
 class TernaryPlotWindow:
@@ -387,9 +388,9 @@ class TernaryPlotWindow:
         try:
             # Read using pandas directly with sheet support, then let DataFileManager standardize
             if path.endswith('.ods'):
-                src_df = pd.read_excel(path, engine='odf', sheet_name=sheet_name or 0)
+                src_df = read_sheet(path, sheet_name=sheet_name or 0, engine='odf')
             elif path.endswith(('.xlsx', '.xls')):
-                src_df = pd.read_excel(path, engine='openpyxl', sheet_name=sheet_name or 0)
+                src_df = read_sheet(path, sheet_name=sheet_name or 0, engine='openpyxl')
             elif path.endswith('.csv'):
                 src_df = pd.read_csv(path)
             else:
@@ -544,9 +545,9 @@ class TernaryPlotWindow:
             
             # Read file
             if path.endswith('.ods'):
-                src_df = pd.read_excel(path, engine='odf', sheet_name=sheet_name or 0)
+                src_df = read_sheet(path, sheet_name=sheet_name or 0, engine='odf')
             elif path.endswith(('.xlsx', '.xls')):
-                src_df = pd.read_excel(path, engine='openpyxl', sheet_name=sheet_name or 0)
+                src_df = read_sheet(path, sheet_name=sheet_name or 0, engine='openpyxl')
             elif path.endswith('.csv'):
                 src_df = pd.read_csv(path)
             else:
@@ -0,0 +1,183 @@
+"""
+Process-wide cache of parsed spreadsheet sheets for the Plot_3D managers.
+
+Plot_3D, the K-means / ΔE managers and the reference-point calculator all
+re-read the workbook before acting so that edits made in LibreOffice or
+Excel are picked up. Parsing an .ods with odfpy is slow, and one
+K-means → ΔE → refresh cycle used to parse the same file several times.
+
+Sheets are cached by (absolute path, sheet) and validated against the
+file's (mtime, size) on every read, so an external edit always causes a
+re-parse. Callers get their own copy of the DataFrame and may modify it
+freely. .ods sheets are parsed with the streaming reader in
+``utils.ods_reader``, which returns the same frame as pandas' odf engine.
+
+Writers in this process record what they changed with ``apply_edits()``
+right after saving, which patches the cached frame and re-stamps it with
+the new file signature, so the next read does not re-parse a file this
+process has just written.
+"""
+
+import os
+import threading
+import logging
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Parsed sheets kept in memory (least recently used are evicted first)
+MAX_CACHED_SHEETS = 16
+
+_cache: "OrderedDict[Tuple[str, Any], Tuple[Tuple[int, int], pd.DataFrame]]" = OrderedDict()
+_lock = threading.RLock()
+
+
+def engine_for(file_path: str) -> str:
+    """pandas engine used for a workbook path ('odf' for .ods, else 'openpyxl')."""
+    return 'odf' if file_path.lower().endswith('.ods') else 'openpyxl'
+
+
+def file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for ``file_path``, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _key(file_path: str, sheet_name) -> Tuple[str, Any]:
+    # pandas treats None as "all sheets"; every caller here means the first
+    return (os.path.abspath(file_path), sheet_name if sheet_name is not None else 0)
+
+
+def read_sheet(file_path: str, sheet_name=None, engine: Optional[str] = None) -> pd.DataFrame:
+    """Read one sheet like ``pd.read_excel``, parsing only when the file changed.
+
+    Args:
+        file_path: Path to the .ods / .xlsx file
+        sheet_name: Sheet name or index; None means the first sheet
+        engine: pandas engine; defaults to ``engine_for(file_path)``
+
+    Returns:
+        A DataFrame owned by the caller
+    """
+    key = _key(file_path, sheet_name)
+    signature = file_signature(file_path)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and signature is not None and entry[0] == signature:
+            _cache.move_to_end(key)
+            logger.debug(f"Workbook cache hit: {key}")
+            return entry[1].copy()
+
+    engine = engine or engine_for(file_path)
+    if engine == 'odf':
+        from utils.ods_reader import read_ods
+        df = read_ods(file_path, sheet_name=key[1])
+    else:
+        df = pd.read_excel(file_path, engine=engine, sheet_name=key[1])
+    logger.debug(f"Workbook cache parsed: {key}")
+
+    # Only cache if the file did not change while it was being parsed
+    if signature is not None and file_signature(file_path) == signature:
+        with _lock:
+            _cache[key] = (signature, df)
+            _cache.move_to_end(key)
+            while len(_cache) > MAX_CACHED_SHEETS:
+                _cache.popitem(last=False)
+        return df.copy()
+    return df
+
+
+def invalidate(file_path: Optional[str] = None) -> None:
+    """Drop cached sheets for ``file_path`` (or everything when None)."""
+    with _lock:
+        if file_path is None:
+            _cache.clear()
+            return
+        path = os.path.abspath(file_path)
+        for key in [k for k in _cache if k[0] == path]:
+            del _cache[key]
+
+
+def _set_cell(df: pd.DataFrame, row, column, value) -> bool:
+    """Set one cell the way re-reading the file would; False if not representable."""
+    if row not in df.index or column not in df.columns:
+        return False
+    series = df[column]
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        value = np.nan
+    elif isinstance(value, str):
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+            return False
+    if pd.api.types.is_integer_dtype(series.dtype) and not (
+            isinstance(value, (int, np.integer)) and not isinstance(value, bool)):
+        df[column] = series.astype(np.float64)
+    df.at[row, column] = value
+    return True
+
+
+def _normalize_numeric(df: pd.DataFrame, column) -> None:
+    """Mirror read_excel typing: all-integral numeric columns without blanks are int64."""
+    series = df[column]
+    if not pd.api.types.is_float_dtype(series.dtype):
+        return
+    values = series.to_numpy()
+    if len(values) and np.all(np.isfinite(values)) and np.all(values == np.floor(values)):
+        df[column] = series.astype(np.int64)
+
+
+def apply_edits(file_path: str, sheet_name, edits: Iterable[Tuple[Any, Any, Any]],
+                signature_before: Optional[Tuple[int, int]]) -> bool:
+    """Record cell edits this process has just saved to ``file_path``.
+
+    If the cached sheet still described the file as it was before the write,
+    the edits are applied to it and it is re-stamped with the new file
+    signature. Otherwise (or if an edit can't be represented exactly) the
+    file's entries are dropped and the next read re-parses.
+
+    Args:
+        file_path: Workbook that was written
+        sheet_name: Sheet the edits apply to (None = first sheet)
+        edits: ``(row_index, column_name, value)`` in DataFrame coordinates
+            (row 0 is the first row under the header); None clears a cell
+        signature_before: ``file_signature(file_path)`` taken before writing
+
+    Returns:
+        True if the cache was updated in place
+    """
+    key = _key(file_path, sheet_name)
+    signature_after = file_signature(file_path)
+    with _lock:
+        entry = _cache.get(key)
+        # Other sheets of this file are not re-validated here; drop them
+        for other in [k for k in _cache if k[0] == key[0] and k != key]:
+            del _cache[other]
+        if entry is None or signature_before is None or signature_after is None \
+                or entry[0] != signature_before:
+            _cache.pop(key, None)
+            return False
+
+        df = entry[1].copy()
+        touched = set()
+        for row, column, value in edits:
+            if not _set_cell(df, row, column, value):
+                logger.debug(f"Workbook cache: edit at ({row}, {column!r}) not patchable, invalidating")
+                del _cache[key]
+                return False
+            touched.add(column)
+        for column in touched:
+            _normalize_numeric(df, column)
+        # read_excel trims trailing blank rows; let a re-parse handle that case
+        if len(df) and df.iloc[-1].isna().all():
+            del _cache[key]
+            return False
+
+        _cache[key] = (signature_after, df)
+        _cache.move_to_end(key)
+        return True
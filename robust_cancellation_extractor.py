@@ -31,9 +31,10 @@ def load_48bit_tiff(image_path):
         # Handle different bit depths
         if img_array.dtype == np.uint16:
             # 16-bit per channel - scale to 8-bit for processing
-            # but keep precision by using float32 intermediate
-            img_float = img_array.astype(np.float32) / 65535.0  # Normalize to 0-1
-            img_8bit = (img_float * 255).astype(np.uint8)
+            # but keep precision by using float32 intermediate, converted in
+            # row strips so no full-frame float copy of the scan is made
+            from black_ink_extractor import scale_to_uint8
+            img_8bit = scale_to_uint8(img_array, 65535.0)
             print(f"Converted to 8-bit: {img_8bit.min()} - {img_8bit.max()}")
         else:
             # Already 8-bit or other format
@@ -565,6 +565,56 @@ class ColorAnalysisDB:
             print(f"Error retrieving measurements: {e}")
             return []
     
+    # Columns returned by get_measurements_frame(), in order
+    EXPORT_COLUMNS = (
+        'id', 'image_name', 'measurement_date', 'coordinate_point',
+        'x_position', 'y_position', 'l_value', 'a_value', 'b_value',
+        'rgb_r', 'rgb_g', 'rgb_b', 'sample_type', 'sample_size', 'sample_anchor',
+        'notes', 'is_averaged', 'source_samples_count', 'source_sample_ids',
+    )
+
+    def get_measurements_frame(self):
+        """Get the export columns of all measurements as a pandas DataFrame.
+
+        Columnar counterpart of get_all_measurements() for bulk readers: one
+        query, no per-row dicts. Databases without the averaged-measurement
+        columns report is_averaged=False and NULL source fields.
+
+        Returns:
+            DataFrame with EXPORT_COLUMNS, ordered by measurement id
+            (empty on error)
+        """
+        import pandas as pd
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute("PRAGMA table_info(color_measurements)")
+                columns = [row[1] for row in cursor.fetchall()]
+                if all(col in columns for col in ['is_averaged', 'source_samples_count', 'source_sample_ids']):
+                    averaged_select = "m.is_averaged, m.source_samples_count, m.source_sample_ids"
+                else:
+                    averaged_select = "0, NULL, NULL"
+
+                rows = conn.execute(f"""
+                    SELECT
+                        m.id, s.image_name, m.measurement_date, m.coordinate_point,
+                        m.x_position, m.y_position,
+                        m.l_value, m.a_value, m.b_value,
+                        m.rgb_r, m.rgb_g, m.rgb_b,
+                        m.sample_type, m.sample_size, m.sample_anchor,
+                        m.notes, {averaged_select}
+                    FROM color_measurements m
+                    JOIN measurement_sets s ON m.set_id = s.set_id
+                    ORDER BY m.id
+                """).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error retrieving measurements: {e}")
+            rows = []
+
+        frame = pd.DataFrame.from_records(rows, columns=list(self.EXPORT_COLUMNS))
+        frame['is_averaged'] = frame['is_averaged'].fillna(0).astype(bool)
+        return frame
+
     def get_measurements_for_image(self, image_name: str) -> List[dict]:
         """Get all measurements for a specific image.
         
@@ -51,6 +51,7 @@ except ImportError:  # pragma: no cover — scipy ships with scikit-learn
     HAS_SCIPY = False
 
 from .lab_difference import lab_to_lch
+from .mesh_templates import unit_sphere
 
 
 # --------------------------------------------------------------------------- #
@@ -218,6 +219,154 @@ def is_member(
     return mahalanobis_distance(lab_point, ellipsoid) <= sigma
 
 
+# --------------------------------------------------------------------------- #
+# Batched membership (many points × many ellipsoids)
+# --------------------------------------------------------------------------- #
+
+@dataclass
+class MembershipScores:
+    """Scores of N points against K ellipsoids, from ``score_membership``.
+
+    Attributes:
+        labels:         The K ellipsoid labels, in column order.
+        distances:      (N, K) Mahalanobis distances in σ units.
+        probabilities:  (N, K) chi-squared membership probabilities.
+        best_index:     (N,) column of the nearest ellipsoid (smallest σ),
+                        -1 for points that could not be scored (NaN input
+                        or no ellipsoids).
+        sigma:          Threshold used for ``is_member``.
+    """
+    labels: List
+    distances: np.ndarray
+    probabilities: np.ndarray
+    best_index: np.ndarray
+    sigma: float = 2.0
+
+    @property
+    def best_label(self) -> List:
+        """Label of the nearest ellipsoid per point (None if unscored)."""
+        return [self.labels[i] if i >= 0 else None for i in self.best_index]
+
+    @property
+    def best_distance(self) -> np.ndarray:
+        """(N,) distance to the nearest ellipsoid (NaN if unscored)."""
+        return self._pick(self.distances)
+
+    @property
+    def best_probability(self) -> np.ndarray:
+        """(N,) membership probability for the nearest ellipsoid (NaN if unscored)."""
+        return self._pick(self.probabilities)
+
+    @property
+    def is_member(self) -> np.ndarray:
+        """(N, K) boolean: point within ``sigma`` of each ellipsoid's centre."""
+        return self.distances <= self.sigma
+
+    def _pick(self, values: np.ndarray) -> np.ndarray:
+        out = np.full(len(self.best_index), np.nan)
+        ok = self.best_index >= 0
+        out[ok] = values[np.flatnonzero(ok), self.best_index[ok]]
+        return out
+
+
+def _as_point_array(lab_points) -> np.ndarray:
+    arr = np.asarray(lab_points, dtype=float)
+    if arr.ndim == 1 and arr.shape[0] == 3:
+        arr = arr.reshape(1, 3)
+    if arr.ndim != 2 or arr.shape[1] != 3:
+        raise ValueError("lab_points must be shape (N, 3); got %r" % (arr.shape,))
+    return arr
+
+
+def _chi2_survival(d2: np.ndarray) -> np.ndarray:
+    """Array counterpart of the survival function in ``membership_probability``."""
+    if HAS_SCIPY:
+        return chi2.sf(d2, df=3)
+    return np.exp(-0.5 * d2)
+
+
+def mahalanobis_distances(
+    lab_points,
+    ellipsoids: Sequence[EllipsoidFit],
+) -> np.ndarray:
+    """Mahalanobis distances of N points to K ellipsoids in one pass.
+
+    Same value as ``mahalanobis_distance`` for every (point, ellipsoid)
+    pair, computed with a single einsum over the stored precision
+    matrices.
+
+    Args:
+        lab_points: (N, 3) array or sequence of Lab tuples.
+        ellipsoids: K fitted ellipsoids.
+
+    Returns:
+        (N, K) array. Rows for points containing NaN are NaN.
+    """
+    pts = _as_point_array(lab_points)
+    if len(ellipsoids) == 0:
+        return np.empty((pts.shape[0], 0))
+    centroids = np.stack([e.centroid for e in ellipsoids]).astype(float)
+    precisions = np.stack([e.inv_covariance for e in ellipsoids]).astype(float)
+    diff = pts[:, None, :] - centroids[None, :, :]
+    d2 = np.einsum('nki,kij,nkj->nk', diff, precisions, diff)
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+def membership_probabilities(
+    lab_points,
+    ellipsoids: Sequence[EllipsoidFit],
+) -> np.ndarray:
+    """Array counterpart of ``membership_probability``: (N, K) probabilities."""
+    d = mahalanobis_distances(lab_points, ellipsoids)
+    return _chi2_survival(d ** 2)
+
+
+def score_membership(
+    lab_points,
+    ellipsoids,
+    sigma: float = 2.0,
+) -> MembershipScores:
+    """Score a batch of points against a set of ellipsoids.
+
+    Intended for classifying many new measurements against every stamp's
+    ellipsoid at once — e.g. flagging which printing each sample most
+    likely belongs to. The "best" ellipsoid is the one the point sits
+    fewest standard deviations from; ties go to the first ellipsoid.
+
+    Args:
+        lab_points: (N, 3) array or sequence of Lab tuples.
+        ellipsoids: Mapping of label → EllipsoidFit, or a sequence of fits
+                    (labelled 0..K-1).
+        sigma:      Membership threshold for ``MembershipScores.is_member``.
+
+    Returns:
+        MembershipScores.
+    """
+    if hasattr(ellipsoids, "items"):
+        labels = list(ellipsoids.keys())
+        fits = list(ellipsoids.values())
+    else:
+        fits = list(ellipsoids)
+        labels = list(range(len(fits)))
+
+    distances = mahalanobis_distances(lab_points, fits)
+    probabilities = _chi2_survival(distances ** 2)
+
+    scored = np.isfinite(distances).any(axis=1) if distances.shape[1] else \
+        np.zeros(distances.shape[0], dtype=bool)
+    best_index = np.full(distances.shape[0], -1, dtype=int)
+    if scored.any():
+        best_index[scored] = np.nanargmin(distances[scored], axis=1)
+
+    return MembershipScores(
+        labels=labels,
+        distances=distances,
+        probabilities=probabilities,
+        best_index=best_index,
+        sigma=sigma,
+    )
+
+
 # --------------------------------------------------------------------------- #
 # Shape / orientation
 # --------------------------------------------------------------------------- #
@@ -253,6 +402,21 @@ def axis_alignment(ellipsoid: EllipsoidFit) -> Dict[str, float]:
     }
 
 
+def ellipsoid_transform(ellipsoid: EllipsoidFit, sigma: float = 1.0) -> np.ndarray:
+    """Linear map taking the unit sphere to the ``sigma``-σ contour.
+
+    Covariance = vecs · diag(vals) · vecs.T, so stretching a unit sphere by
+    sqrt(vals) along each eigenvector gives the 1σ ellipsoid; multiplying by
+    ``sigma`` rescales to other contours.
+
+    Returns:
+        3x3 matrix ``vecs * radii`` (eigenvectors scaled column-wise).
+    """
+    vals, vecs = np.linalg.eigh(ellipsoid.covariance)
+    radii = sigma * np.sqrt(np.maximum(vals, 0.0))
+    return vecs * radii
+
+
 def ellipsoid_mesh(
     ellipsoid: EllipsoidFit,
     *,
@@ -276,27 +440,13 @@ def ellipsoid_mesh(
         (X, Y, Z) each of shape (n_u, n_v) in the same Lab coordinate frame
         as the ellipsoid's centroid.
     """
-    # Eigendecomposition: covariance = vecs · diag(vals) · vecs.T
-    # Stretching a unit sphere by sqrt(vals) along each eigenvector gives
-    # the 1σ ellipsoid; multiplying by ``sigma`` rescales to other contours.
-    vals, vecs = np.linalg.eigh(ellipsoid.covariance)
-    radii = sigma * np.sqrt(np.maximum(vals, 0.0))
-
-    u = np.linspace(0.0, 2.0 * np.pi, n_u)
-    v = np.linspace(0.0, np.pi, n_v)
-    # Unit-sphere parametric mesh
-    xu = np.outer(np.cos(u), np.sin(v))
-    yu = np.outer(np.sin(u), np.sin(v))
-    zu = np.outer(np.ones_like(u), np.cos(v))
-
-    # Stack into (3, n_u*n_v), scale by radii, rotate by eigenvectors,
-    # then reshape back to mesh form and translate to the centroid.
-    pts = np.stack([xu.ravel(), yu.ravel(), zu.ravel()], axis=0)
-    pts = (vecs * radii) @ pts                       # (3, N)
+    # Stretch/rotate the cached unit-sphere template (3, n_u*n_v), then
+    # translate to the centroid and reshape back to mesh form.
+    pts = ellipsoid_transform(ellipsoid, sigma) @ unit_sphere(n_u, n_v)
     pts = pts + ellipsoid.centroid.reshape(3, 1)
-    X = pts[0].reshape(xu.shape)
-    Y = pts[1].reshape(yu.shape)
-    Z = pts[2].reshape(zu.shape)
+    X = pts[0].reshape(n_u, n_v)
+    Y = pts[1].reshape(n_u, n_v)
+    Z = pts[2].reshape(n_u, n_v)
     return X, Y, Z
 
 
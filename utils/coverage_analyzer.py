@@ -226,6 +226,7 @@ def analyze_coverage(
     dark_l_threshold: float = DEFAULT_DARK_L_THRESHOLD,
     dark_c_threshold: float = DEFAULT_DARK_C_THRESHOLD,
     alpha_threshold: int = DEFAULT_ALPHA_THRESHOLD,
+    calibrate: bool = False,
 ) -> CoverageResult:
     """Classify every pixel of ``image`` against ``paper_lab`` and report.
 
@@ -249,6 +250,9 @@ def analyze_coverage(
             cancellation class. Both L\\* and C\\* gates must be satisfied.
         alpha_threshold: For RGBA inputs, pixels with α below this are
             considered invisible and excluded from every count.
+        calibrate: Apply the active scanner calibration to the pixels
+            before classification, matching how sample averages (and so
+            ``paper_lab``) are corrected.
 
     Returns:
         A ``CoverageResult`` with per-class pixel counts, paper/ink/
@@ -259,11 +263,22 @@ def analyze_coverage(
         ValueError: ``image`` is empty, has no visible pixels, or
             ``paper_lab`` is malformed.
     """
+    rgb, visible = _prepare_pixels(image, alpha_threshold, calibrate)
+    lab = _rgb_to_lab_array(rgb)  # (H, W, 3) float64
+    return _classify_pixels(
+        rgb, visible, lab, paper_lab,
+        paper_tolerance=paper_tolerance,
+        edge_band_factor=edge_band_factor,
+        dark_l_threshold=dark_l_threshold,
+        dark_c_threshold=dark_c_threshold,
+    )
+
+
+def _prepare_pixels(image: Image.Image, alpha_threshold: int,
+                    calibrate: bool = False):
+    """Return ``(rgb, visible)`` arrays for ``image``, validating it."""
     if image is None or image.size[0] == 0 or image.size[1] == 0:
         raise ValueError("analyze_coverage: image is empty")
-    paper_lab_t = tuple(float(c) for c in paper_lab)
-    if len(paper_lab_t) != 3:
-        raise ValueError("analyze_coverage: paper_lab must be (L, a, b)")
 
     # ---- normalise input mode + extract alpha ---------------------------- #
     if image.mode == "RGBA":
@@ -283,14 +298,33 @@ def analyze_coverage(
         alpha = rgba[..., 3]
         visible = alpha >= alpha_threshold
 
-    n_total = rgb.shape[0] * rgb.shape[1]
-    n_visible = int(visible.sum())
-    if n_visible == 0:
+    if not visible.any():
         raise ValueError("analyze_coverage: image has no visible pixels "
                          "(alpha mask hides everything)")
+    if calibrate:
+        from utils.scanner_calibration import apply_calibration_to_array
+        rgb = apply_calibration_to_array(rgb)  # 256-entry LUT per channel
+    return rgb, visible
+
+
+def _classify_pixels(
+    rgb: np.ndarray,
+    visible: np.ndarray,
+    lab: np.ndarray,
+    paper_lab: Sequence[float],
+    paper_tolerance: float,
+    edge_band_factor: float,
+    dark_l_threshold: float,
+    dark_c_threshold: float,
+) -> CoverageResult:
+    """Classification core shared by ``analyze_coverage`` and sessions."""
+    paper_lab_t = tuple(float(c) for c in paper_lab)
+    if len(paper_lab_t) != 3:
+        raise ValueError("analyze_coverage: paper_lab must be (L, a, b)")
+
+    n_total = rgb.shape[0] * rgb.shape[1]
+    n_visible = int(visible.sum())
 
-    # ---- vectorised RGB → Lab -------------------------------------------- #
-    lab = _rgb_to_lab_array(rgb)  # (H, W, 3) float64
     L, a, b = lab[..., 0], lab[..., 1], lab[..., 2]
     chroma = np.sqrt(a * a + b * b)
 
@@ -397,3 +431,99 @@ def analyze_coverage(
         dark_l_threshold=float(dark_l_threshold),
         dark_c_threshold=float(dark_c_threshold),
     )
+
+
+# --------------------------------------------------------------------------- #
+# Interactive sessions (proxy previews + cached full-resolution results)
+# --------------------------------------------------------------------------- #
+
+class CoverageAnalysisSession:
+    """Repeated coverage analysis of one image with different thresholds.
+
+    The RGB → Lab conversion is done once per tier and kept, so changing a
+    tolerance only re-runs the classification. ``preview=True`` analyses a
+    downsampled proxy (≤ ``proxy_max_pixels``) for instant feedback while a
+    control is being adjusted; full-resolution results are cached per
+    threshold tuple so returning to an earlier setting is free.
+
+    Safe to call from a worker thread: each tier's planes are built under
+    their own lock, so a proxy preview never waits for the full-resolution
+    conversion, and the result cache has a separate lock.
+    """
+
+    def __init__(
+        self,
+        image: Image.Image,
+        alpha_threshold: int = DEFAULT_ALPHA_THRESHOLD,
+        proxy_max_pixels: int = 1_000_000,
+        cache_size: int = 16,
+        calibrate: bool = False,
+    ):
+        import threading
+        from collections import OrderedDict
+
+        self.image = image
+        self.alpha_threshold = int(alpha_threshold)
+        self.proxy_max_pixels = int(proxy_max_pixels)
+        self.cache_size = int(cache_size)
+        self.calibrate = bool(calibrate)
+        self._planes = {}  # 'full' / 'proxy' -> (rgb, visible, lab)
+        self._cache: "OrderedDict[tuple, CoverageResult]" = OrderedDict()
+        self._lock = threading.Lock()  # result cache
+        self._plane_locks = {'full': threading.Lock(), 'proxy': threading.Lock()}
+
+    def _get_planes(self, preview: bool):
+        tier = 'proxy' if preview else 'full'
+        planes = self._planes.get(tier)
+        if planes is None:
+            with self._plane_locks[tier]:
+                planes = self._planes.get(tier)
+                if planes is None:
+                    image = self.image
+                    if preview:
+                        from utils.two_tier_preview import make_proxy_image
+                        image, _ = make_proxy_image(image, self.proxy_max_pixels)
+                    rgb, visible = _prepare_pixels(image, self.alpha_threshold,
+                                                   self.calibrate)
+                    planes = (rgb, visible, _rgb_to_lab_array(rgb))
+                    self._planes[tier] = planes
+        return planes
+
+    def analyze(
+        self,
+        paper_lab: Sequence[float],
+        paper_tolerance: float = DEFAULT_PAPER_TOLERANCE,
+        edge_band_factor: float = DEFAULT_EDGE_BAND_FACTOR,
+        dark_l_threshold: float = DEFAULT_DARK_L_THRESHOLD,
+        dark_c_threshold: float = DEFAULT_DARK_C_THRESHOLD,
+        preview: bool = False,
+    ) -> CoverageResult:
+        """Same contract as :func:`analyze_coverage`, reusing cached planes.
+
+        With ``preview=True`` the counts and classification image describe
+        the proxy, not the original resolution.
+        """
+        key = (
+            tuple(float(c) for c in paper_lab), float(paper_tolerance),
+            float(edge_band_factor), float(dark_l_threshold), float(dark_c_threshold),
+        )
+        if not preview:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+
+        rgb, visible, lab = self._get_planes(preview)
+        result = _classify_pixels(
+            rgb, visible, lab, key[0],
+            paper_tolerance=key[1],
+            edge_band_factor=key[2],
+            dark_l_threshold=key[3],
+            dark_c_threshold=key[4],
+        )
+        if not preview:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
@@ -657,8 +657,8 @@ class DataFileManager:
     def _read_ods_file(self, file_path: str) -> Optional[pd.DataFrame]:
         """Read ODS file."""
         try:
-            # Try pandas first (requires odfpy)
-            return pd.read_excel(file_path, engine='odf')
+            from utils.ods_reader import read_ods
+            return read_ods(file_path)
         except Exception as e:
             logger.error(f"Error reading ODS file: {e}")
             return None
@@ -113,15 +113,15 @@ class ExternalDataImporter:
         
         try:
             if file_format == 'ods':
-                # For ODS files, use ExcelFile with odf engine
-                xl_file = pd.ExcelFile(file_path, engine='odf')
+                # For ODS files, only scan the table names
+                from utils.ods_reader import ods_sheet_names
+                sheet_names = ods_sheet_names(file_path)
             elif file_format == 'xlsx':
                 # For Excel files, use default engine
-                xl_file = pd.ExcelFile(file_path)
+                sheet_names = pd.ExcelFile(file_path).sheet_names
             else:
                 return []
             
-            sheet_names = xl_file.sheet_names
             logger.info(f"Found {len(sheet_names)} sheets in {file_path}: {sheet_names}")
             return sheet_names
             
@@ -161,7 +161,8 @@ class ExternalDataImporter:
                     
             elif file_format == 'ods':
                 # Use sheet_name parameter if provided, otherwise default to first sheet
-                df = pd.read_excel(file_path, engine='odf', sheet_name=sheet_name or 0)
+                from utils.ods_reader import read_ods
+                df = read_ods(file_path, sheet_name=sheet_name or 0)
                 if sheet_name:
                     warnings.append(f"Reading sheet: {sheet_name}")
                 
@@ -11,7 +11,194 @@ import cv2
 from PIL import Image
 from typing import Optional, Tuple, Dict, Any
 import pickle
+import hashlib
 import os
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+# ORB detector parameters optimized for stamps (shared with bulk worker processes)
+ORB_PARAMS = dict(
+    nfeatures=500,  # Detect up to 500 features
+    scaleFactor=1.2,  # Scale pyramid factor
+    nlevels=8,  # Number of pyramid levels
+    edgeThreshold=15,  # Border pixels to ignore
+    firstLevel=0,
+    WTA_K=2,
+    scoreType=cv2.ORB_HARRIS_SCORE,  # Use Harris corner detector score
+    patchSize=31,
+    fastThreshold=20
+)
+
+# Longest side of the coarse pyramid level used by bulk alignment
+PYRAMID_MAX_SIDE = 1000
+
+# FLANN LSH index over binary ORB descriptors
+FLANN_INDEX_LSH = 6
+LSH_INDEX_PARAMS = dict(algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1)
+LSH_RATIO = 0.8  # Lowe ratio test for LSH matches
+
+# Bump when the cached descriptor format or detector settings change
+DESCRIPTOR_CACHE_VERSION = 1
+
+
+def _keypoints_to_array(keypoints) -> np.ndarray:
+    """Pack cv2.KeyPoints as float32 rows (x, y, size, angle, response, octave, class_id)."""
+    return np.array([(kp.pt[0], kp.pt[1], kp.size, kp.angle, kp.response, kp.octave, kp.class_id)
+                     for kp in keypoints], dtype=np.float32).reshape(-1, 7)
+
+
+def _keypoints_from_array(arr: np.ndarray) -> list:
+    """Inverse of _keypoints_to_array."""
+    return [cv2.KeyPoint(x=float(r[0]), y=float(r[1]), size=float(r[2]), angle=float(r[3]),
+                         response=float(r[4]), octave=int(r[5]), class_id=int(r[6]))
+            for r in arr]
+
+
+def _estimate_transform(new_pts: np.ndarray, ref_pts: np.ndarray, mode: str,
+                        ransac_threshold: float) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """RANSAC fit of the alignment model mapping new_pts onto ref_pts."""
+    if mode == 'similarity':
+        # Similarity transform: rotation, translation, uniform scale (no shear/perspective)
+        return cv2.estimateAffinePartial2D(new_pts, ref_pts, method=cv2.RANSAC,
+                                           ransacReprojThreshold=ransac_threshold)
+    elif mode == 'affine':
+        # Affine transform: rotation, translation, scale, shear (no perspective)
+        return cv2.estimateAffine2D(new_pts, ref_pts, method=cv2.RANSAC,
+                                    ransacReprojThreshold=ransac_threshold)
+    # Full perspective homography (allows perspective warping)
+    return cv2.findHomography(new_pts, ref_pts, cv2.RANSAC, ransac_threshold)
+
+
+def _as_homography(M: np.ndarray) -> np.ndarray:
+    """Promote a 2x3 affine matrix to 3x3."""
+    if M.shape == (3, 3):
+        return M
+    return np.vstack([M, [0.0, 0.0, 1.0]])
+
+
+def _pyramid_level(gray: np.ndarray, max_side: int = PYRAMID_MAX_SIDE) -> Tuple[np.ndarray, float]:
+    """Downscale so the longest side is at most max_side; returns (image, scale)."""
+    h, w = gray.shape[:2]
+    scale = min(1.0, max_side / float(max(h, w)))
+    if scale >= 1.0:
+        return gray, 1.0
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA), scale
+
+
+# Reference features for bulk worker processes (set by _init_alignment_worker).
+# Only used in pool processes; thread pools pass the reference to each task.
+_worker_reference = None
+
+# ORB detector and matcher per thread; cv2 objects are not safe to share
+_thread_tools = threading.local()
+
+
+def _init_alignment_worker(reference: Dict[str, Any]):
+    """Process pool initializer: keep the reference features for this worker process."""
+    global _worker_reference
+    _worker_reference = reference
+
+
+def _thread_detector():
+    """(ORB detector, cross-checked matcher) owned by the calling thread."""
+    tools = getattr(_thread_tools, 'tools', None)
+    if tools is None:
+        tools = (cv2.ORB_create(**ORB_PARAMS), cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True))
+        _thread_tools.tools = tools
+    return tools
+
+
+def _match_points(matcher, ref_desc, ref_pts, keypoints, descriptors):
+    """Cross-checked matches as (ref_pts, new_pts) float32 arrays."""
+    matches = matcher.match(ref_desc, descriptors)
+    if not matches:
+        empty = np.empty((0, 2), np.float32)
+        return empty, empty
+    query = np.fromiter((m.queryIdx for m in matches), dtype=np.intp, count=len(matches))
+    train = np.fromiter((m.trainIdx for m in matches), dtype=np.intp, count=len(matches))
+    new_pts = np.float32([keypoints[i].pt for i in train])
+    return ref_pts[query], new_pts
+
+
+def _estimate_alignment_worker(gray: np.ndarray, reference: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Estimate the transform for one grayscale image, coarse-to-fine.
+    
+    ``reference`` is the dict from ``_worker_reference_data``; pool processes
+    omit it and use the one stored by ``_init_alignment_worker``.
+    
+    The image is first matched against the reference on a downscaled pyramid
+    level; that coarse transform then gates the full-resolution matches to
+    those landing near their predicted reference position before the final
+    RANSAC fit. Falls back to the coarse transform when the refinement has
+    too few inliers.
+    """
+    ref = reference if reference is not None else _worker_reference
+    orb, matcher = _thread_detector()
+    mode, min_matches, ransac = ref['mode'], ref['min_matches'], ref['ransac_threshold']
+    result = {'success': False, 'num_matches': 0, 'transform_matrix': None, 'message': ''}
+
+    # Coarse level
+    coarse_H = None
+    coarse_inliers = 0
+    if ref.get('coarse_descriptors') is not None:
+        small, scale = _pyramid_level(gray)
+        kp_s, desc_s = orb.detectAndCompute(small, None)
+        if desc_s is not None and len(kp_s) >= min_matches:
+            ref_c, new_c = _match_points(matcher, ref['coarse_descriptors'], ref['coarse_pts'], kp_s, desc_s)
+            if len(ref_c) >= min_matches:
+                M, mask = _estimate_transform(new_c, ref_c, mode, max(1.0, ransac * scale))
+                if M is not None and mask is not None and int(mask.sum()) >= min_matches:
+                    coarse_inliers = int(mask.sum())
+                    # Coarse transform back to full-resolution coordinates
+                    to_ref = np.diag([1.0 / ref['coarse_scale'], 1.0 / ref['coarse_scale'], 1.0])
+                    from_img = np.diag([scale, scale, 1.0])
+                    coarse_H = to_ref @ _as_homography(M) @ from_img
+
+    # Full-resolution refinement
+    keypoints, descriptors = orb.detectAndCompute(gray, None)
+    if descriptors is None or len(keypoints) < min_matches:
+        if coarse_H is None:
+            result['message'] = f"Not enough features detected ({len(keypoints) if keypoints else 0})"
+            return result
+        ref_pts = new_pts = np.empty((0, 2), np.float32)
+    else:
+        ref_pts, new_pts = _match_points(matcher, ref['descriptors'], ref['pts'], keypoints, descriptors)
+
+    if coarse_H is not None and len(new_pts):
+        # Keep matches consistent with the coarse transform
+        projected = cv2.perspectiveTransform(new_pts.reshape(-1, 1, 2), coarse_H).reshape(-1, 2)
+        gate = max(4.0 * ransac, 0.01 * max(ref['size']))
+        keep = np.linalg.norm(projected - ref_pts, axis=1) <= gate
+        ref_pts, new_pts = ref_pts[keep], new_pts[keep]
+
+    M = None
+    inliers = 0
+    if len(new_pts) >= min_matches:
+        M, mask = _estimate_transform(new_pts, ref_pts, mode, ransac)
+        inliers = int(mask.sum()) if M is not None and mask is not None else 0
+
+    if (M is None or inliers < min_matches) and coarse_H is not None:
+        M = coarse_H if mode == 'perspective' else coarse_H[:2, :]
+        inliers = coarse_inliers
+        result['message'] = f"Aligned on coarse pyramid level ({inliers} matches)"
+    elif M is None:
+        result['message'] = (f"Not enough matches ({len(new_pts)} < {min_matches})"
+                             if len(new_pts) < min_matches else "Could not calculate transformation")
+        result['num_matches'] = len(new_pts)
+        return result
+    elif inliers < min_matches:
+        result['message'] = f"Not enough inlier matches ({inliers})"
+        result['num_matches'] = inliers
+        return result
+    else:
+        result['message'] = f"Successfully aligned using {inliers} feature matches"
+
+    result.update(success=True, num_matches=inliers, transform_matrix=np.asarray(M, dtype=np.float64))
+    return result
 
 
 class ImageAlignmentManager:
@@ -44,21 +231,18 @@ class ImageAlignmentManager:
         self.auto_crop_enabled = True  # Enable automatic content detection and cropping
         
         # ORB detector with optimized parameters for stamps
-        self.orb = cv2.ORB_create(
-            nfeatures=500,  # Detect up to 500 features
-            scaleFactor=1.2,  # Scale pyramid factor
-            nlevels=8,  # Number of pyramid levels
-            edgeThreshold=15,  # Border pixels to ignore
-            firstLevel=0,
-            WTA_K=2,
-            scoreType=cv2.ORB_HARRIS_SCORE,  # Use Harris corner detector score
-            patchSize=31,
-            fastThreshold=20
-        )
+        self.orb = cv2.ORB_create(**ORB_PARAMS)
         
         # Matcher for features
         self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
         
+        # FLANN LSH index over the reference descriptors (built when a reference is set)
+        self.use_flann = True
+        self.reference_index = None
+        
+        # On-disk descriptor cache keyed by reference content hash
+        self.descriptor_cache_enabled = True
+        
         # Quality thresholds
         self.min_matches = 10  # Minimum matches needed for alignment
         self.ransac_threshold = 5.0  # RANSAC outlier threshold
@@ -140,6 +324,22 @@ class ImageAlignmentManager:
             True if successful, False otherwise
         """
         try:
+            cache_key = self._reference_cache_key(pil_image) if self.descriptor_cache_enabled else None
+            cached = self._load_descriptor_cache(cache_key) if cache_key else None
+            
+            if cached is not None:
+                # Reuse the stored crop box and features
+                keypoints, descriptors, crop_box = cached
+                self.reference_crop_box = crop_box
+                if crop_box != (0, 0, pil_image.width, pil_image.height):
+                    pil_image = self._crop_to_box(pil_image, crop_box)
+                self.reference_image = pil_image.copy()
+                self.reference_size = pil_image.size
+                self.reference_keypoints, self.reference_descriptors = keypoints, descriptors
+                self._build_reference_index()
+                print(f"✓ Reference set from descriptor cache: {len(keypoints)} features")
+                return True
+            
             # Auto-crop reference image if enabled
             if self.auto_crop_enabled:
                 print("Auto-cropping reference image...")
@@ -161,6 +361,10 @@ class ImageAlignmentManager:
                 print(f"Warning: Only detected {len(self.reference_keypoints) if self.reference_keypoints else 0} features")
                 return False
             
+            self._build_reference_index()
+            if cache_key:
+                self._save_descriptor_cache(cache_key)
+            
             print(f"✓ Reference set: detected {len(self.reference_keypoints)} features")
             return True
             
@@ -168,6 +372,102 @@ class ImageAlignmentManager:
             print(f"Error setting reference image: {e}")
             return False
     
+    def _crop_to_box(self, pil_image: Image.Image, crop_box: Tuple[int, int, int, int]) -> Image.Image:
+        """Crop to a known box, keeping attached 16-bit data in step."""
+        x_min, y_min, x_max, y_max = crop_box
+        cropped = pil_image.crop(crop_box)
+        if hasattr(pil_image, '_stampz_16bit_data'):
+            cropped._stampz_16bit_data = pil_image._stampz_16bit_data[y_min:y_max, x_min:x_max]
+        return cropped
+    
+    def _reference_cache_key(self, pil_image: Image.Image) -> Optional[str]:
+        """Content hash of a reference image plus the settings that shape its features."""
+        try:
+            digest = hashlib.sha1()
+            digest.update(f"v{DESCRIPTOR_CACHE_VERSION}|{pil_image.mode}|{pil_image.size}|"
+                          f"{self.auto_crop_enabled}|{sorted(ORB_PARAMS.items())}".encode())
+            digest.update(np.ascontiguousarray(np.asarray(pil_image)).tobytes())
+            return digest.hexdigest()
+        except Exception as e:
+            print(f"Warning: Could not hash reference image: {e}")
+            return None
+    
+    def _descriptor_cache_path(self, cache_key: str) -> str:
+        from utils.path_utils import get_alignment_cache_dir
+        return os.path.join(get_alignment_cache_dir(), f"{cache_key}.npz")
+    
+    def _load_descriptor_cache(self, cache_key: str):
+        """Return (keypoints, descriptors, crop_box) from the cache, or None."""
+        path = self._descriptor_cache_path(cache_key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                keypoints = _keypoints_from_array(data['keypoints'])
+                descriptors = data['descriptors']
+                crop_box = tuple(int(v) for v in data['crop_box'])
+            if len(keypoints) < self.min_matches:
+                return None
+            return keypoints, descriptors, crop_box
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable descriptor cache {path}: {e}")
+            return None
+    
+    def _save_descriptor_cache(self, cache_key: str):
+        """Store the current reference features under cache_key."""
+        try:
+            path = self._descriptor_cache_path(cache_key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp.npz'
+            np.savez_compressed(
+                tmp_path,
+                keypoints=_keypoints_to_array(self.reference_keypoints),
+                descriptors=self.reference_descriptors,
+                crop_box=np.array(self.reference_crop_box, dtype=np.int64)
+            )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Warning: Could not write descriptor cache: {e}")
+    
+    def _build_reference_index(self):
+        """Build the FLANN LSH index over the reference descriptors."""
+        self.reference_index = None
+        if not self.use_flann or self.reference_descriptors is None:
+            return
+        try:
+            index = cv2.FlannBasedMatcher(LSH_INDEX_PARAMS, dict(checks=50))
+            index.add([self.reference_descriptors])
+            index.train()
+            self.reference_index = index
+        except Exception as e:
+            print(f"Warning: FLANN index unavailable, using brute-force matching: {e}")
+    
+    def _match_to_reference(self, descriptors: np.ndarray) -> list:
+        """Match image descriptors to the reference.
+        
+        Uses the LSH index (ratio test, then one match per reference feature)
+        when available, else brute-force cross-checked matching. Matches
+        always have queryIdx = reference feature, trainIdx = image feature.
+        """
+        if self.reference_index is not None:
+            try:
+                best = {}
+                for pair in self.reference_index.knnMatch(descriptors, k=2):
+                    if not pair:
+                        continue
+                    m = pair[0]
+                    if len(pair) > 1 and m.distance >= LSH_RATIO * pair[1].distance:
+                        continue
+                    # m: query = image feature, train = reference feature
+                    if m.trainIdx not in best or m.distance < best[m.trainIdx].distance:
+                        best[m.trainIdx] = m
+                matches = [cv2.DMatch(ref_idx, m.queryIdx, m.distance) for ref_idx, m in best.items()]
+                if len(matches) >= self.min_matches:
+                    return matches
+            except Exception as e:
+                print(f"Warning: FLANN matching failed, using brute force: {e}")
+        return self.matcher.match(self.reference_descriptors, descriptors)
+    
     def has_reference(self) -> bool:
         """Check if a reference image is set."""
         return self.reference_image is not None and self.reference_descriptors is not None
@@ -219,7 +519,7 @@ class ImageAlignmentManager:
                 return None, info
             
             # Match features
-            matches = self.matcher.match(self.reference_descriptors, descriptors)
+            matches = self._match_to_reference(descriptors)
             
             if len(matches) < self.min_matches:
                 info['message'] = f"Not enough matches ({len(matches)} < {self.min_matches})"
@@ -234,17 +534,7 @@ class ImageAlignmentManager:
             new_pts = np.float32([keypoints[m.trainIdx].pt for m in matches])
             
             # Calculate transformation matrix using RANSAC
-            if self.alignment_mode == 'similarity':
-                # Similarity transform: rotation, translation, uniform scale (no shear/perspective)
-                M, mask = cv2.estimateAffinePartial2D(new_pts, ref_pts, method=cv2.RANSAC, 
-                                                       ransacReprojThreshold=self.ransac_threshold)
-            elif self.alignment_mode == 'affine':
-                # Affine transform: rotation, translation, scale, shear (no perspective)
-                M, mask = cv2.estimateAffine2D(new_pts, ref_pts, method=cv2.RANSAC, 
-                                                ransacReprojThreshold=self.ransac_threshold)
-            else:
-                # Full perspective homography (allows perspective warping)
-                M, mask = cv2.findHomography(new_pts, ref_pts, cv2.RANSAC, self.ransac_threshold)
+            M, mask = _estimate_transform(new_pts, ref_pts, self.alignment_mode, self.ransac_threshold)
             
             if M is None:
                 info['message'] = "Could not calculate transformation"
@@ -259,35 +549,7 @@ class ImageAlignmentManager:
                 info['num_matches'] = inliers
                 return None, info
             
-            # Check if we have 16-bit data to preserve
-            has_16bit = hasattr(pil_image, '_stampz_16bit_data')
-            print(f"DEBUG align_image: input has _stampz_16bit_data: {has_16bit}")
-            
-            # Warp image to align with reference
-            if has_16bit:
-                # Use the 16-bit data directly for alignment
-                img_array = pil_image._stampz_16bit_data
-                print(f"DEBUG align_image: using 16-bit data, dtype: {img_array.dtype}")
-            else:
-                img_array = np.array(pil_image)
-            
-            if self.alignment_mode in ['similarity', 'affine']:
-                # Use warpAffine for 2x3 similarity/affine matrix
-                aligned_array = cv2.warpAffine(img_array, M, self.reference_size)
-            else:
-                # Use warpPerspective for 3x3 homography
-                aligned_array = cv2.warpPerspective(img_array, M, self.reference_size)
-            
-            # Convert back to PIL, preserving 16-bit if present
-            if has_16bit:
-                # Create 8-bit display version
-                aligned_8bit = (aligned_array / 256).astype(np.uint8)
-                aligned_pil = Image.fromarray(aligned_8bit)
-                # Attach the 16-bit aligned data
-                aligned_pil._stampz_16bit_data = aligned_array
-                print(f"DEBUG align_image: preserved 16-bit data, shape: {aligned_array.shape}")
-            else:
-                aligned_pil = Image.fromarray(aligned_array)
+            aligned_pil = self._warp_to_reference(pil_image, M)
             
             # Success!
             info['success'] = True
@@ -313,6 +575,39 @@ class ImageAlignmentManager:
             traceback.print_exc()
             return None, info
     
+    def _warp_to_reference(self, pil_image: Image.Image, M: np.ndarray) -> Image.Image:
+        """Warp an image onto the reference frame, preserving 16-bit data if present."""
+        # Check if we have 16-bit data to preserve
+        has_16bit = hasattr(pil_image, '_stampz_16bit_data')
+        print(f"DEBUG align_image: input has _stampz_16bit_data: {has_16bit}")
+        
+        # Warp image to align with reference
+        if has_16bit:
+            # Use the 16-bit data directly for alignment
+            img_array = pil_image._stampz_16bit_data
+            print(f"DEBUG align_image: using 16-bit data, dtype: {img_array.dtype}")
+        else:
+            img_array = np.array(pil_image)
+        
+        if M.shape == (2, 3):
+            # Use warpAffine for 2x3 similarity/affine matrix
+            aligned_array = cv2.warpAffine(img_array, M, self.reference_size)
+        else:
+            # Use warpPerspective for 3x3 homography
+            aligned_array = cv2.warpPerspective(img_array, M, self.reference_size)
+        
+        # Convert back to PIL, preserving 16-bit if present
+        if has_16bit:
+            # Create 8-bit display version
+            aligned_8bit = (aligned_array / 256).astype(np.uint8)
+            aligned_pil = Image.fromarray(aligned_8bit)
+            # Attach the 16-bit aligned data
+            aligned_pil._stampz_16bit_data = aligned_array
+            print(f"DEBUG align_image: preserved 16-bit data, shape: {aligned_array.shape}")
+        else:
+            aligned_pil = Image.fromarray(aligned_array)
+        return aligned_pil
+    
     def save_reference(self, filepath: str) -> bool:
         """
         Save reference template to file.
@@ -334,7 +629,8 @@ class ImageAlignmentManager:
             data = {
                 'keypoints': kp_data,
                 'descriptors': self.reference_descriptors,
-                'size': self.reference_size
+                'size': self.reference_size,
+                'crop_box': self.reference_crop_box
             }
             
             # Save reference image separately
@@ -376,7 +672,9 @@ class ImageAlignmentManager:
             
             self.reference_descriptors = data['descriptors']
             self.reference_size = tuple(data['size'])
+            self.reference_crop_box = tuple(data['crop_box']) if data.get('crop_box') else None
             self.reference_filepath = filepath  # Store filepath
+            self._build_reference_index()
             
             # Load reference image
             image_path = filepath.replace('.pkl', '_reference.png')
@@ -443,6 +741,7 @@ class ImageAlignmentManager:
         self.reference_size = None
         self.reference_filepath = None
         self.reference_crop_box = None
+        self.reference_index = None
         print("Reference cleared")
     
     def set_auto_crop(self, enabled: bool):
@@ -454,16 +753,50 @@ class ImageAlignmentManager:
         """Check if auto-crop is enabled."""
         return self.auto_crop_enabled
     
+    def _worker_reference_data(self) -> Dict[str, Any]:
+        """Picklable reference features (full resolution and coarse pyramid level)."""
+        data = {
+            'pts': np.float32([kp.pt for kp in self.reference_keypoints]),
+            'descriptors': self.reference_descriptors,
+            'size': tuple(self.reference_size),
+            'mode': self.alignment_mode,
+            'min_matches': self.min_matches,
+            'ransac_threshold': self.ransac_threshold,
+            'coarse_pts': None,
+            'coarse_descriptors': None,
+            'coarse_scale': 1.0,
+        }
+        if self.reference_image is not None:
+            ref_gray = np.array(self.reference_image.convert('L'))
+            small, scale = _pyramid_level(ref_gray)
+            keypoints, descriptors = self.orb.detectAndCompute(small, None)
+            if descriptors is not None and len(keypoints) >= self.min_matches:
+                data['coarse_pts'] = np.float32([kp.pt for kp in keypoints])
+                data['coarse_descriptors'] = descriptors
+                data['coarse_scale'] = scale
+        return data
+    
     def bulk_align_images(self, image_paths: list, output_dir: str, 
-                         progress_callback=None) -> Tuple[list, list]:
+                         progress_callback=None, max_workers: Optional[int] = None,
+                         use_processes: Optional[bool] = None) -> Tuple[list, list]:
         """
         Align multiple images in batch and save to output directory.
         
+        Runs as a pipeline: a reader thread loads (and auto-crops) images, a
+        process pool estimates each transform coarse-to-fine on a downscaled
+        pyramid level before refining at full resolution, and a writer
+        thread warps (16-bit data directly when present) and saves.
+        Progress callbacks are made from the calling thread.
+        
         Args:
         image_paths: List of file paths to images to align
             output_dir: Directory to save aligned images
             progress_callback: Optional callback function(current, total, filename, status)
                              called for each image processed
+            max_workers: Worker processes for feature matching (default: CPU count - 1)
+            use_processes: Use a process pool rather than threads. Default
+                           (None) uses processes except in frozen builds,
+                           where spawned workers would re-run the app.
         
         Returns:
             Tuple of (successful_files, failed_files)
@@ -476,35 +809,63 @@ class ImageAlignmentManager:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
-        successful = []
-        failed = []
         total = len(image_paths)
+        if total == 0:
+            return [], []
+        workers = max(1, max_workers or (os.cpu_count() or 2) - 1)
+        reference = self._worker_reference_data()
         
-        for idx, image_path in enumerate(image_paths, 1):
-            try:
-                # Notify progress
+        load_queue = queue.Queue(maxsize=workers * 2)
+        write_queue = queue.Queue(maxsize=workers * 2)
+        events = queue.Queue()  # (idx, filename, status) for progress_callback
+        results = {}  # idx -> ('ok', output_path) | ('fail', message)
+        stop = threading.Event()
+        
+        def put_loaded(item) -> bool:
+            # Bounded wait so the reader exits if the consumer loop has stopped
+            while not stop.is_set():
+                try:
+                    load_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def reader():
+            from utils.image_processor import load_image
+            for idx, image_path in enumerate(image_paths, 1):
+                if stop.is_set():
+                    break
                 filename = os.path.basename(image_path)
-                if progress_callback:
-                    progress_callback(idx, total, filename, "Processing...")
-                
-                # Load image using load_image to preserve 16-bit data
-                from utils.image_processor import load_image
-                pil_image, metadata = load_image(image_path)
-                print(f"DEBUG bulk_align: loaded {filename}, has _stampz_16bit_data: {hasattr(pil_image, '_stampz_16bit_data')}")
-                
-                # Align image
-                aligned_image, info = self.align_image(pil_image)
-                
-                if info['success']:
-                    # Generate output filename
-                    base_name = os.path.splitext(filename)[0]
-                    ext = os.path.splitext(filename)[1]
-                    output_filename = f"{base_name}_aligned{ext}"
-                    output_path = os.path.join(output_dir, output_filename)
+                try:
+                    # Load image using load_image to preserve 16-bit data
+                    pil_image, metadata = load_image(image_path)
+                    if self.auto_crop_enabled:
+                        pil_image, _ = self._auto_crop_content(pil_image)
+                    gray = np.array(pil_image.convert('L'))
+                    loaded = put_loaded((idx, image_path, pil_image, gray))
+                except Exception as e:
+                    loaded = put_loaded((idx, image_path, None, str(e)))
+                if not loaded:
+                    return
+                events.put((idx, filename, "Processing..."))
+            put_loaded(None)
+        
+        def writer():
+            from utils.save_as import SaveManager, SaveOptions, SaveFormat
+            save_manager = SaveManager()
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    break
+                idx, image_path, pil_image, info = item
+                filename = os.path.basename(image_path)
+                try:
+                    aligned_image = self._warp_to_reference(pil_image, info['transform_matrix'])
                     
-                    # Save aligned image - use SaveManager to preserve 16-bit if present
-                    from utils.save_as import SaveManager, SaveOptions, SaveFormat
-                    save_manager = SaveManager()
+                    # Generate output filename
+                    base_name, ext = os.path.splitext(filename)
+                    output_path = os.path.join(output_dir, f"{base_name}_aligned{ext}")
                     
                     # Determine format from extension
                     if ext.lower() in ['.tif', '.tiff']:
@@ -515,21 +876,99 @@ class ImageAlignmentManager:
                         save_format = SaveFormat.TIFF  # Default to TIFF
                         output_path = output_path.replace(ext, '.tif')
                     
-                    save_options = SaveOptions(format=save_format, optimize=True)
-                    save_manager.save_image(aligned_image, output_path, save_options)
-                    
-                    successful.append((image_path, output_path))
-                    if progress_callback:
-                        progress_callback(idx, total, filename, f"✓ Aligned ({info['num_matches']} matches)")
-                else:
-                    failed.append((image_path, info['message']))
-                    if progress_callback:
-                        progress_callback(idx, total, filename, f"✗ Failed: {info['message']}")
-                
-            except Exception as e:
-                error_msg = str(e)
-                failed.append((image_path, error_msg))
+                    save_manager.save_image(aligned_image, output_path,
+                                            SaveOptions(format=save_format, optimize=True))
+                    results[idx] = ('ok', output_path)
+                    events.put((idx, filename, f"✓ Aligned ({info['num_matches']} matches)"))
+                except Exception as e:
+                    results[idx] = ('fail', str(e))
+                    events.put((idx, filename, f"✗ Error: {e}"))
+        
+        def drain_events(block: bool = False):
+            while True:
+                try:
+                    idx, filename, status = events.get(timeout=0.05) if block else events.get_nowait()
+                except queue.Empty:
+                    return
+                block = False
                 if progress_callback:
-                    progress_callback(idx, total, filename, f"✗ Error: {error_msg}")
+                    progress_callback(idx, total, filename, status)
+        
+        def make_pool():
+            processes = use_processes
+            if processes is None:
+                processes = not getattr(sys, 'frozen', False)
+            if processes and workers > 1:
+                try:
+                    return ProcessPoolExecutor(max_workers=workers, initializer=_init_alignment_worker,
+                                               initargs=(reference,))
+                except (OSError, ValueError, NotImplementedError) as e:
+                    print(f"Process pool unavailable ({e}), using threads")
+            # Threads share this process; cv2 releases the GIL during detection/matching.
+            # Each task gets the reference directly and each thread its own detector.
+            return ThreadPoolExecutor(max_workers=workers)
         
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        writer_thread = threading.Thread(target=writer, daemon=True)
+        reader_thread.start()
+        writer_thread.start()
+        
+        pool = make_pool()
+        in_flight = {}  # future -> (idx, image_path, pil_image)
+        reading = True
+        try:
+            while reading or in_flight:
+                # Keep the pool fed without holding more than 2x workers images in memory
+                while reading and len(in_flight) < workers * 2:
+                    try:
+                        item = load_queue.get(timeout=0.05 if not in_flight else 0)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        reading = False
+                        break
+                    idx, image_path, pil_image, gray = item
+                    if pil_image is None:
+                        results[idx] = ('fail', gray)
+                        events.put((idx, os.path.basename(image_path), f"✗ Error: {gray}"))
+                        continue
+                    if isinstance(pool, ProcessPoolExecutor):
+                        future = pool.submit(_estimate_alignment_worker, gray)
+                    else:
+                        future = pool.submit(_estimate_alignment_worker, gray, reference)
+                    in_flight[future] = (idx, image_path, pil_image)
+                
+                if in_flight:
+                    done, _ = wait(list(in_flight), timeout=0.05, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idx, image_path, pil_image = in_flight.pop(future)
+                        filename = os.path.basename(image_path)
+                        try:
+                            info = future.result()
+                        except Exception as e:
+                            info = {'success': False, 'message': f"Alignment error: {e}"}
+                        if info['success']:
+                            write_queue.put((idx, image_path, pil_image, info))
+                        else:
+                            results[idx] = ('fail', info['message'])
+                            events.put((idx, filename, f"✗ Failed: {info['message']}"))
+                drain_events()
+        finally:
+            stop.set()
+            reader_thread.join()
+            pool.shutdown(wait=True)
+            write_queue.put(None)
+            while writer_thread.is_alive():
+                writer_thread.join(timeout=0.05)
+                drain_events()
+            drain_events()
+        
+        successful = []
+        failed = []
+        for idx, image_path in enumerate(image_paths, 1):
+            status, value = results.get(idx, ('fail', "Not processed"))
+            if status == 'ok':
+                successful.append((image_path, value))
+            else:
+                failed.append((image_path, value))
         return successful, failed
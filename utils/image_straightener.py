@@ -13,6 +13,9 @@ import cv2
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Longest side of the subsampled view used to find content before a fused rotate-and-crop
+CONTENT_SCAN_MAX_SIDE = 2000
+
 class ImageStraightener:
     """Handles image straightening and skew correction."""
     
@@ -167,6 +170,13 @@ class ImageStraightener:
             Rotated PIL Image with 16-bit precision preserved
         """
         try:
+            if expand and auto_crop:
+                # Warp straight into the final crop window, no padded full canvas
+                fused = ImageStraightener._rotate_and_crop_16bit(img_array, angle_degrees, background_color)
+                if fused is not None:
+                    return fused
+                logger.debug("Fused rotate-and-crop unavailable, using expanded canvas")
+            
             height, width = img_array.shape[:2]
             center = (width / 2, height / 2)
             
@@ -267,6 +277,123 @@ class ImageStraightener:
             pil_img = Image.fromarray(img_array)
             return ImageStraightener.rotate_image(pil_img, angle_degrees, background_color, expand, auto_crop)
     
+    @staticmethod
+    def _border_value(img_array: np.ndarray, background_color: str) -> tuple:
+        """Fill value for areas outside the source image."""
+        max_value = 65535 if img_array.dtype == np.uint16 else 255
+        if background_color.lower() == 'black':
+            return (0, 0, 0, 0)
+        return (max_value, max_value, max_value, max_value)  # white (default)
+    
+    @staticmethod
+    def _content_hull_points(img_array: np.ndarray, background_color: str = 'white') -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Find the outline of the non-background content in a (16- or 8-bit) source image.
+        
+        Works on a strided subsample so no full-size temporaries are made.
+        
+        Returns:
+            Tuple of (convex hull points in source pixel coordinates, subsample step),
+            or None when no content is found.
+        """
+        height, width = img_array.shape[:2]
+        step = max(1, int(math.ceil(max(height, width) / CONTENT_SCAN_MAX_SIDE)))
+        view = img_array[::step, ::step]
+        if view.dtype == np.uint16:
+            view = (view >> 8).astype(np.uint8)
+        elif view.dtype != np.uint8:
+            view = np.clip(view, 0, 255).astype(np.uint8)
+        
+        bg = 0 if background_color.lower() == 'black' else 255
+        if view.ndim == 2:
+            mask = np.abs(view.astype(np.int16) - bg) > 15
+        else:
+            mask = np.any(np.abs(view[:, :, :3].astype(np.int16) - bg) > 15, axis=2)
+            if view.shape[2] == 4:
+                mask &= view[:, :, 3] > 0  # Ignore transparent pixels
+        
+        # Remove isolated noise pixels, as the padding crop does
+        mask = cv2.morphologyEx(mask.astype(np.uint8), cv2.MORPH_OPEN, np.ones((3, 3), np.uint8))
+        points = cv2.findNonZero(mask)
+        if points is None:
+            return None
+        hull = cv2.convexHull(points).reshape(-1, 2).astype(np.float64)
+        # Centre of each subsampled cell, in source coordinates
+        return hull * step + (step - 1) / 2.0, step
+    
+    @staticmethod
+    def _rotate_and_crop_16bit(
+        img_array: np.ndarray,
+        angle_degrees: float,
+        background_color: str = 'white'
+    ) -> Optional[Image.Image]:
+        """
+        Rotate and crop away the background padding in one warp.
+        
+        The crop rectangle is computed analytically by rotating the outline
+        of the source content, and cv2.warpAffine renders only that window.
+        The 8-bit display image is derived from the 16-bit result.
+        
+        Returns:
+            Rotated, cropped PIL Image with 16-bit data attached, or None if no
+            content could be located (caller falls back to the expanded canvas).
+        """
+        found = ImageStraightener._content_hull_points(img_array, background_color)
+        if found is None:
+            return None
+        hull, step = found
+        
+        height, width = img_array.shape[:2]
+        opencv_angle = -angle_degrees  # OpenCV: positive = clockwise
+        angle_rad = math.radians(abs(opencv_angle))
+        new_width = int(abs(height * math.sin(angle_rad)) + abs(width * math.cos(angle_rad)))
+        new_height = int(abs(height * math.cos(angle_rad)) + abs(width * math.sin(angle_rad)))
+        
+        # Same expanded-canvas transform as the non-fused path
+        rotation_matrix = cv2.getRotationMatrix2D((width / 2, height / 2), opencv_angle, 1.0)
+        rotation_matrix[0, 2] += (new_width - width) / 2
+        rotation_matrix[1, 2] += (new_height - height) / 2
+        
+        # Bounding box of the rotated content outline, with the padding crop's
+        # dilation + margin and half a subsample cell of slack
+        rotated_hull = hull @ rotation_matrix[:, :2].T + rotation_matrix[:, 2]
+        pad = 4 + step
+        left = max(0, int(math.floor(rotated_hull[:, 0].min())) - pad)
+        top = max(0, int(math.floor(rotated_hull[:, 1].min())) - pad)
+        right = min(new_width - 1, int(math.ceil(rotated_hull[:, 0].max())) + pad)
+        bottom = min(new_height - 1, int(math.ceil(rotated_hull[:, 1].max())) + pad)
+        if right <= left or bottom <= top:
+            return None
+        
+        # Shift the transform so the crop window starts at the output origin
+        window_matrix = rotation_matrix.copy()
+        window_matrix[0, 2] -= left
+        window_matrix[1, 2] -= top
+        channels = 1 if img_array.ndim == 2 else img_array.shape[2]
+        border_value = ImageStraightener._border_value(img_array, background_color)[:max(channels, 1)]
+        
+        rotated_array = cv2.warpAffine(
+            img_array,
+            window_matrix,
+            (right - left + 1, bottom - top + 1),
+            flags=cv2.INTER_CUBIC,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=border_value
+        )
+        
+        # 8-bit display image from the 16-bit result (no second rotation)
+        if rotated_array.ndim == 2:
+            rotated_pil = Image.fromarray(rotated_array)
+        elif rotated_array.dtype == np.uint16:
+            rotated_pil = Image.fromarray((rotated_array >> 8).astype(np.uint8))
+        else:
+            rotated_pil = Image.fromarray(rotated_array.astype(np.uint8))
+        rotated_pil._stampz_16bit_data = rotated_array
+        
+        logger.debug(f"Fused rotate-and-crop by {angle_degrees} degrees: window "
+                     f"({left}, {top}, {right}, {bottom}) of {new_width}x{new_height} canvas")
+        return rotated_pil
+    
     @staticmethod
     def get_image_center(image: Image.Image) -> Tuple[float, float]:
         """
@@ -20,8 +20,9 @@ Usage:
 from __future__ import annotations
 
 import math
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+import numpy as np
 from PIL import Image
 
 
@@ -89,12 +90,29 @@ class LiveSampleModel:
         # Cached analyzer; created lazily so importing this module doesn't
         # drag in color_analyzer's optional deps up front.
         self._analyzer = None
+        # RGBA array of the current image for the vectorised position
+        # search; built on first optimise and dropped when the image changes.
+        self._sampling_array = None
+
+        # Running sums per role over enabled, sampled markers, so moving
+        # one marker updates the group mean in O(1). Rebuilt from scratch
+        # by _recompute_average_and_delta_e.
+        self._role_sums: Dict[bool, dict] = {
+            False: self._empty_role_sums(), True: self._empty_role_sums(),
+        }
+
+        # Optional notification coalescing (see set_notify_scheduler)
+        self._notify_scheduler = None
+        self._notify_interval_ms = 16
+        self._notify_after_id = None
+        self._pending_changed: Set[int] = set()
 
     # ----- lifecycle ----- #
 
     def set_image(self, image: Optional[Image.Image]) -> None:
         """Swap the PIL image. Samples are kept (caller may clear)."""
         self._image = image
+        self._sampling_array = None
         # Existing samples are stale against the new image; re-sample each.
         reindexed = list(self._samples.keys())
         for i in reindexed:
@@ -110,6 +128,9 @@ class LiveSampleModel:
         self._samples.clear()
         self._avg_lab_by_role = {False: None, True: None}
         self._avg_rgb_by_role = {False: None, True: None}
+        self._role_sums = {
+            False: self._empty_role_sums(), True: self._empty_role_sums(),
+        }
         self._notify(removed)
 
     def has_image(self) -> bool:
@@ -131,7 +152,46 @@ class LiveSampleModel:
                 pass
         return _unsub
 
+    def set_notify_scheduler(self, scheduler, interval_ms: int = 16) -> None:
+        """Coalesce change notifications to one per ``interval_ms``.
+
+        ``scheduler`` is any object with Tk-style ``after`` / ``after_cancel``
+        (e.g. the canvas). While dragging, every motion event updates the
+        model but listeners run at most once per frame with the union of
+        changed indices. Pass ``None`` to notify synchronously again.
+        """
+        self.flush_notifications()
+        self._notify_scheduler = scheduler
+        self._notify_interval_ms = max(0, int(interval_ms))
+
+    def flush_notifications(self) -> None:
+        """Deliver any coalesced notification now."""
+        if self._notify_after_id is not None and self._notify_scheduler is not None:
+            try:
+                self._notify_scheduler.after_cancel(self._notify_after_id)
+            except Exception:
+                pass
+        self._notify_after_id = None
+        if self._pending_changed:
+            changed = sorted(self._pending_changed)
+            self._pending_changed.clear()
+            self._dispatch(changed)
+
     def _notify(self, changed: List[int]) -> None:
+        if self._notify_scheduler is None:
+            self._dispatch(changed)
+            return
+        self._pending_changed.update(changed)
+        if self._notify_after_id is None:
+            try:
+                self._notify_after_id = self._notify_scheduler.after(
+                    self._notify_interval_ms, self.flush_notifications)
+            except Exception:
+                # Scheduler gone (window closing) — fall back to sync
+                self._notify_after_id = None
+                self.flush_notifications()
+
+    def _dispatch(self, changed: List[int]) -> None:
         # Defensive copy so listeners can't mutate during iteration
         for cb in list(self._listeners):
             try:
@@ -154,6 +214,8 @@ class LiveSampleModel:
         prev = self._samples.get(index)
         enabled = prev.get("enabled", True) if prev else True
         is_paper = bool(prev.get("is_paper", False)) if prev else False
+        if prev:
+            self._apply_contribution(prev, -1)
 
         self._samples[index] = {
             "index": index,
@@ -169,23 +231,28 @@ class LiveSampleModel:
             "delta_e": None,
         }
         self._resample_one(index)
-        self._recompute_average_and_delta_e()
+        self._apply_contribution(self._samples[index], +1)
+        self._refresh_group_stats()
         # All samples' delta_e may shift when the group average shifts, so
-        # signal all indices as changed — cheap for N ≤ 6.
+        # signal all indices as changed (coalesced per frame if a
+        # scheduler is set).
         self._notify(list(self._samples.keys()))
 
     def remove_sample(self, index: int) -> None:
         if index in self._samples:
+            self._apply_contribution(self._samples[index], -1)
             del self._samples[index]
-            self._recompute_average_and_delta_e()
+            self._refresh_group_stats()
             self._notify(list(self._samples.keys()) + [index])
 
     def set_enabled(self, index: int, enabled: bool) -> None:
         s = self._samples.get(index)
         if not s or s.get("enabled") == enabled:
             return
+        self._apply_contribution(s, -1)
         s["enabled"] = enabled
-        self._recompute_average_and_delta_e()
+        self._apply_contribution(s, +1)
+        self._refresh_group_stats()
         self._notify(list(self._samples.keys()))
 
     def set_paper(self, index: int, is_paper: bool) -> None:
@@ -202,8 +269,10 @@ class LiveSampleModel:
         new_val = bool(is_paper)
         if bool(s.get("is_paper", False)) == new_val:
             return
+        self._apply_contribution(s, -1)
         s["is_paper"] = new_val
-        self._recompute_average_and_delta_e()
+        self._apply_contribution(s, +1)
+        self._refresh_group_stats()
         self._notify(list(self._samples.keys()))
 
     # ----- accessors ----- #
@@ -296,15 +365,57 @@ class LiveSampleModel:
         step = max(1, int(step_px))
 
         x0, y0 = sample["image_pos"]
-        best_xy = (x0, y0)
-        best_de = float("inf")
         analyzer = self._get_analyzer()
+        try:
+            best_xy = self._optimize_position_vectorized(
+                sample, target_lab, effective_radius, step, analyzer,
+            )
+        except Exception as e:
+            print(f"LiveSampleModel: vectorised search failed, "
+                  f"falling back to per-offset sampling: {e}")
+            best_xy = self._optimize_position_scan(
+                sample, target_lab, effective_radius, step, analyzer,
+            )
+        if best_xy is None:
+            best_xy = (x0, y0)
+
+        # Commit the best position
+        if best_xy != (x0, y0):
+            self._apply_contribution(sample, -1)
+            sample["image_pos"] = best_xy
+            self._resample_one(index)
+            self._apply_contribution(sample, +1)
+            self._refresh_group_stats()
+            self._notify(list(self._samples.keys()))
+        return best_xy
+
+    def _optimize_position_vectorized(
+        self, sample, target_lab, radius, step, analyzer,
+    ) -> Optional[Tuple[float, float]]:
+        """Score every candidate offset at once (summed-area / disk-mask means)."""
+        from utils.sample_window_search import (
+            image_to_sampling_array, optimize_window_position,
+        )
+        if self._sampling_array is None:
+            self._sampling_array = image_to_sampling_array(self._image)
+        best_xy, _ = optimize_window_position(
+            self._sampling_array, sample, target_lab, radius, step, analyzer,
+        )
+        return best_xy
+
+    def _optimize_position_scan(
+        self, sample, target_lab, radius, step, analyzer,
+    ) -> Optional[Tuple[float, float]]:
+        """Reference search: re-sample each offset through the analyzer."""
+        x0, y0 = sample["image_pos"]
+        best_xy = None
+        best_de = float("inf")
 
         # Build a mutable copy of the marker dict we can re-point each iter
         probe_marker = dict(sample)
 
-        for dy in range(-effective_radius, effective_radius + 1, step):
-            for dx in range(-effective_radius, effective_radius + 1, step):
+        for dy in range(-radius, radius + 1, step):
+            for dx in range(-radius, radius + 1, step):
                 probe_marker["image_pos"] = (x0 + dx, y0 + dy)
                 rgb_lab = self._sample_marker_rgb_lab(probe_marker, analyzer)
                 if rgb_lab is None:
@@ -314,13 +425,6 @@ class LiveSampleModel:
                 if de < best_de:
                     best_de = de
                     best_xy = (x0 + dx, y0 + dy)
-
-        # Commit the best position
-        if best_xy != (x0, y0):
-            sample["image_pos"] = best_xy
-            self._resample_one(index)
-            self._recompute_average_and_delta_e()
-            self._notify(list(self._samples.keys()))
         return best_xy
 
     # ----- internals ----- #
@@ -349,29 +453,84 @@ class LiveSampleModel:
             print(f"LiveSampleModel._sample_marker_rgb_lab failed: {e}")
             return None
 
+    def _sample_marker_rgb_lab_fast(self, marker: dict, analyzer):
+        """Same result as `_sample_marker_rgb_lab` via a single-window array mean."""
+        from utils.sample_window_search import (
+            _apply_calibration_rows, image_to_sampling_array, rgbs_to_lab,
+            window_mean_rgbs,
+        )
+        if self._sampling_array is None:
+            self._sampling_array = image_to_sampling_array(self._image)
+        means, counts = window_mean_rgbs(
+            self._sampling_array, [marker["image_pos"]],
+            sample_type=marker.get("sample_type", "rectangle"),
+            width=marker.get("sample_width", 10),
+            height=marker.get("sample_height", 10),
+            anchor=marker.get("anchor", "center"),
+        )
+        if counts[0] == 0:
+            return None
+        rgb = _apply_calibration_rows(means)
+        lab = rgbs_to_lab(rgb, analyzer)[0]
+        return tuple(float(c) for c in rgb[0]), tuple(float(c) for c in lab)
+
     def _resample_one(self, index: int) -> None:
         s = self._samples.get(index)
         if not s or self._image is None:
             return
         analyzer = self._get_analyzer()
-        rgb_lab = self._sample_marker_rgb_lab(s, analyzer)
+        try:
+            rgb_lab = self._sample_marker_rgb_lab_fast(s, analyzer)
+        except Exception as e:
+            print(f"LiveSampleModel: fast resample failed, using analyzer: {e}")
+            rgb_lab = self._sample_marker_rgb_lab(s, analyzer)
         if rgb_lab is None:
             s["rgb"] = None
             s["lab"] = None
             return
         s["rgb"], s["lab"] = rgb_lab
 
+    # ΔE outlier threshold of ColorAnalyzer._calculate_quality_controlled_average
+    QC_DELTA_E_THRESHOLD = 6.0
+
+    @staticmethod
+    def _empty_role_sums() -> dict:
+        return {"n": 0, "lab": np.zeros(3), "n_rgb": 0, "rgb": np.zeros(3)}
+
+    def _apply_contribution(self, s: dict, sign: int) -> None:
+        """Add (+1) or remove (-1) one sample's terms from its role's sums."""
+        if not s.get("enabled") or s.get("lab") is None:
+            return
+        sums = self._role_sums[bool(s.get("is_paper", False))]
+        sums["n"] += sign
+        sums["lab"] += sign * np.asarray(s["lab"], dtype=np.float64)
+        if s.get("rgb") is not None:
+            sums["n_rgb"] += sign
+            sums["rgb"] += sign * np.asarray(s["rgb"], dtype=np.float64)
+
     def _recompute_average_and_delta_e(self) -> None:
-        """Recompute per-role QC means and per-sample ΔE.
+        """Rebuild the per-role running sums from scratch, then refresh stats."""
+        self._role_sums = {
+            False: self._empty_role_sums(), True: self._empty_role_sums(),
+        }
+        for s in self._samples.values():
+            self._apply_contribution(s, +1)
+        self._refresh_group_stats()
+
+    def _refresh_group_stats(self) -> None:
+        """Recompute per-role QC means and per-sample ΔE from the running sums.
         
         Splits enabled samples into ink (``is_paper=False``) and paper
-        (``is_paper=True``) groups, then — for each group with at
-        least 2 enabled samples — runs the analyzer's
-        ``_calculate_quality_controlled_average`` (the same outlier
-        rule the Results panel uses) to get the group mean. Each
-        sample's ΔE is its distance from *its own* group's QC mean.
-        Groups with <2 enabled samples produce ``delta_e=None`` for
-        their members (ΔE isn't meaningful with one or zero peers).
+        (``is_paper=True``) groups. For each group with at least 2
+        enabled samples the group mean follows the analyzer's
+        ``_calculate_quality_controlled_average`` rule (the same outlier
+        rule the Results panel uses): the initial mean comes straight
+        from the running sums, members more than
+        ``QC_DELTA_E_THRESHOLD`` from it are subtracted back out, and all
+        ΔE values are computed in one vectorised call. Each sample's ΔE
+        is its distance from *its own* group's QC mean. Groups with <2
+        enabled samples produce ``delta_e=None`` for their members (ΔE
+        isn't meaningful with one or zero peers).
         
         This guarantees the canvas HUD and the Results panel agree
         sample-for-sample, and that ink samples don't pollute the
@@ -384,47 +543,41 @@ class LiveSampleModel:
                 continue
             by_role[bool(s.get("is_paper", False))].append(s)
         
-        analyzer = self._get_analyzer()
         # Reset role caches; populate per group below.
         self._avg_lab_by_role = {False: None, True: None}
         self._avg_rgb_by_role = {False: None, True: None}
         
         for role, group_samples in by_role.items():
-            if len(group_samples) < 2:
+            sums = self._role_sums[role]
+            n = sums["n"]
+            if n < 2:
                 continue
-            labs = [s["lab"] for s in group_samples]
-            rgbs = [
-                s["rgb"] for s in group_samples if s.get("rgb") is not None
-            ]
-            # Need matching length pairs for the QC helper. If RGB is
-            # missing for any sample (shouldn't happen in practice but
-            # defensive), fall back to a plain mean of the labs.
-            if len(rgbs) == len(labs):
+            lab_sum = sums["lab"].copy()
+            rgb_sum = sums["rgb"].copy()
+            n_keep = n
+            # QC needs matching RGB for every sample; otherwise (shouldn't
+            # happen in practice) use a plain mean like the old path did.
+            if sums["n_rgb"] == n:
                 try:
-                    qc = analyzer._calculate_quality_controlled_average(
-                        labs, rgbs,
-                    )
-                    self._avg_lab_by_role[role] = qc["avg_lab"]
-                    self._avg_rgb_by_role[role] = qc["avg_rgb"]
-                    continue
+                    labs = np.array([s["lab"] for s in group_samples], dtype=np.float64)
+                    outliers = self._batch_delta_e(labs, lab_sum / n) > self.QC_DELTA_E_THRESHOLD
+                    n_out = int(np.count_nonzero(outliers))
+                    if 0 < n_out < n:
+                        rgbs = np.array([s["rgb"] for s in group_samples], dtype=np.float64)
+                        lab_sum -= labs[outliers].sum(axis=0)
+                        rgb_sum -= rgbs[outliers].sum(axis=0)
+                        n_keep = n - n_out
                 except Exception as e:
                     print(
                         f"LiveSampleModel: QC averaging failed for "
                         f"role={'paper' if role else 'ink'}: {e}"
                     )
-            n = len(labs)
-            self._avg_lab_by_role[role] = (
-                sum(l[0] for l in labs) / n,
-                sum(l[1] for l in labs) / n,
-                sum(l[2] for l in labs) / n,
-            )
-            if rgbs:
-                m = len(rgbs)
-                self._avg_rgb_by_role[role] = (
-                    sum(r[0] for r in rgbs) / m,
-                    sum(r[1] for r in rgbs) / m,
-                    sum(r[2] for r in rgbs) / m,
-                )
+            self._avg_lab_by_role[role] = tuple(float(c) for c in lab_sum / n_keep)
+            if sums["n_rgb"] == n:
+                self._avg_rgb_by_role[role] = tuple(float(c) for c in rgb_sum / n_keep)
+            elif sums["n_rgb"] > 0:
+                self._avg_rgb_by_role[role] = tuple(
+                    float(c) for c in sums["rgb"] / sums["n_rgb"])
         
         # Per-sample ΔE vs. its own group's QC mean. We also stash the
         # ΔL/ΔC/ΔH decomposition so the canvas HUD and Results panel
@@ -433,17 +586,16 @@ class LiveSampleModel:
         # often misleading.
         from utils.lab_difference import lab_difference_components
         for s in self._samples.values():
-            if s.get("lab") is None or not s.get("enabled"):
-                s["delta_e"] = None
-                s["delta_components"] = None
-                continue
-            role = bool(s.get("is_paper", False))
+            s["delta_e"] = None
+            s["delta_components"] = None
+        for role, group_samples in by_role.items():
             group_mean = self._avg_lab_by_role.get(role)
             if group_mean is None:
-                s["delta_e"] = None
-                s["delta_components"] = None
-            else:
-                s["delta_e"] = self._delta_e(s["lab"], group_mean, analyzer)
+                continue
+            labs = np.array([s["lab"] for s in group_samples], dtype=np.float64)
+            des = self._batch_delta_e(labs, group_mean)
+            for s, de in zip(group_samples, des):
+                s["delta_e"] = float(de)
                 try:
                     s["delta_components"] = lab_difference_components(
                         s["lab"], group_mean,
@@ -455,6 +607,15 @@ class LiveSampleModel:
                     )
                     s["delta_components"] = None
 
+    def _batch_delta_e(self, labs: np.ndarray, target) -> np.ndarray:
+        """ΔE of each Lab row to ``target`` with the analyzer's metric."""
+        try:
+            from utils.sample_window_search import delta_e_to_target
+            return np.atleast_1d(delta_e_to_target(labs, target))
+        except Exception:
+            analyzer = self._get_analyzer()
+            return np.array([self._delta_e(l, target, analyzer) for l in labs])
+
     @staticmethod
     def _delta_e(lab1, lab2, analyzer) -> float:
         try:
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Cached unit-sphere mesh templates for sphere and ellipsoid surfaces.
+
+Plot_3D draws every sphere and ellipsoid as the same parametric
+(u, v) grid, only moved and stretched. The grid for a given resolution
+is built once here; a surface is then a single matrix multiply plus an
+offset applied to the template:
+
+* sphere:    centre + radius * unit
+* ellipsoid: centroid + (vecs * radii) @ unit
+
+``quad_faces`` gives the corner indices of each grid cell so many
+surfaces can be turned into one set of polygons for a single
+``Poly3DCollection``.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+
+@lru_cache(maxsize=16)
+def unit_sphere(n_u: int, n_v: int) -> np.ndarray:
+    """Unit-sphere grid points, shape (3, n_u * n_v), read-only.
+
+    Same parametrisation as the per-surface meshes it replaces:
+    ``u`` spans 0..2π over ``n_u`` steps and ``v`` spans 0..π over ``n_v``.
+    Reshaping a row to (n_u, n_v) gives the mesh grid for that axis.
+    """
+    u = np.linspace(0.0, 2.0 * np.pi, n_u)
+    v = np.linspace(0.0, np.pi, n_v)
+    points = np.stack([
+        np.outer(np.cos(u), np.sin(v)).ravel(),
+        np.outer(np.sin(u), np.sin(v)).ravel(),
+        np.outer(np.ones_like(u), np.cos(v)).ravel(),
+    ])
+    points.setflags(write=False)
+    return points
+
+
+@lru_cache(maxsize=16)
+def quad_faces(n_u: int, n_v: int) -> np.ndarray:
+    """Corner indices into ``unit_sphere(n_u, n_v)`` for each grid cell.
+
+    Returns:
+        Array of shape ((n_u - 1) * (n_v - 1), 4), corners in perimeter
+        order, one quad per cell as ``plot_surface`` draws at stride 1.
+    """
+    i = np.arange(n_u - 1)[:, None]
+    j = np.arange(n_v - 1)[None, :]
+    corner = i * n_v + j
+    faces = np.stack([corner, corner + 1, corner + n_v + 1, corner + n_v], axis=-1)
+    faces = faces.reshape(-1, 4)
+    faces.setflags(write=False)
+    return faces
+
+
+def sphere_points(centers: np.ndarray, radii: np.ndarray,
+                  n_u: int, n_v: int) -> np.ndarray:
+    """Grid points of K spheres at once.
+
+    Args:
+        centers: (K, 3) sphere centres
+        radii:   (K,) sphere radii
+
+    Returns:
+        (K, n_u * n_v, 3) points
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=float).reshape(-1)
+    return centers[:, None, :] + radii[:, None, None] * unit_sphere(n_u, n_v).T[None, :, :]
+
+
+def ellipsoid_points(centroids: np.ndarray, transforms: np.ndarray,
+                     n_u: int, n_v: int) -> np.ndarray:
+    """Grid points of K ellipsoids at once.
+
+    Args:
+        centroids:  (K, 3) centres
+        transforms: (K, 3, 3) linear maps from the unit sphere, i.e.
+                    eigenvectors scaled column-wise by the axis radii
+
+    Returns:
+        (K, n_u * n_v, 3) points
+    """
+    centroids = np.asarray(centroids, dtype=float).reshape(-1, 3)
+    transforms = np.asarray(transforms, dtype=float).reshape(-1, 3, 3)
+    return np.einsum('kij,jn->kni', transforms, unit_sphere(n_u, n_v)) + centroids[:, None, :]
+
+
+def mesh_grids(points: np.ndarray, n_u: int, n_v: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split one surface's (n_u * n_v, 3) points into (X, Y, Z) mesh grids."""
+    return tuple(points[:, axis].reshape(n_u, n_v) for axis in range(3))
+
+
+def quad_polygons(points: np.ndarray, n_u: int, n_v: int) -> np.ndarray:
+    """Quads of K surfaces as one polygon array.
+
+    Args:
+        points: (K, n_u * n_v, 3) from ``sphere_points`` / ``ellipsoid_points``
+
+    Returns:
+        (K * (n_u - 1) * (n_v - 1), 4, 3) polygon vertices
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, n_u * n_v, 3)
+    return points[:, quad_faces(n_u, n_v), :].reshape(-1, 4, 3)
@@ -6,11 +6,16 @@ Creates .ods files that can be opened in LibreOffice Calc on Mac.
 
 import sqlite3
 import os
+import importlib.util
 import subprocess
-import csv
 from datetime import datetime
 from typing import List, Tuple, Optional
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .streaming_spreadsheet import write_csv, write_ods, write_xlsx, column_widths
 
 try:
     from odf.opendocument import OpenDocumentSpreadsheet
@@ -22,6 +27,19 @@ try:
 except ImportError:
     ODF_AVAILABLE = False
 
+# Sample set databases read concurrently by get_color_measurements()
+MAX_EXPORT_WORKERS = 8
+
+
+def _column_values(series) -> list:
+    """A DataFrame column as a list of Python values, with None for missing entries."""
+    values = series.tolist()
+    if series.hasnans:
+        missing = series.isna().tolist()
+        values = [None if m else v for v, m in zip(values, missing)]
+    return values
+
+
 @dataclass
 class ColorMeasurement:
     """Represents a single color measurement for export."""
@@ -85,8 +103,11 @@ class ODSExporter:
                                 include_paper=None) -> List[ColorMeasurement]:
         """Retrieve all color measurements from separate sample set databases.
         
+        Databases are read in parallel (see ``_read_sample_set_measurements``).
+        
         Args:
             deduplicate: If True, removes duplicates by keeping only the most recent measurement
+                        for each (image, coordinate point)
                         If False, returns all measurements for accumulation in spreadsheet
             include_paper: Whether to include paper-tagged measurements
                 (image_name ending in '-p').
@@ -158,216 +179,32 @@ class ODSExporter:
             
             print(f"DEBUG ODSExporter: Processing {len(sample_sets)} sample sets")
             
-            sample_set_counter = 1
-            for sample_set_name in sample_sets:
-                try:
-                    # Create color analysis DB for this sample set
-                    color_db = ColorAnalysisDB(sample_set_name)
-                    
-                    # Get all measurements for this sample set
-                    all_measurements = color_db.get_all_measurements()
-                    
-                    # Drop paper-tagged measurements (image_name ending '-p')
-                    # unless the caller explicitly wants them. Paper sits in
-                    # its own measurement set inside the same DB, so it'd
-                    # otherwise be pulled in here and pollute K-means / ΔE.
-                    if not include_paper:
-                        from utils.measurement_filters import is_paper_image_name
-                        before = len(all_measurements)
-                        all_measurements = [
-                            m for m in all_measurements
-                            if not is_paper_image_name(m.get('image_name'))
-                        ]
-                        excluded = before - len(all_measurements)
-                        if excluded:
-                            print(
-                                f"DEBUG ODSExporter: Excluded {excluded} "
-                                f"paper-tagged measurement(s) from "
-                                f"'{sample_set_name}'"
-                            )
-                    
-                    # Separate individual measurements from averaged measurements
-                    individual_measurements = [m for m in all_measurements if not m.get('is_averaged', False)]
-                    averaged_measurements = [m for m in all_measurements if m.get('is_averaged', False)]
-                    
-                    # For Plot_3D export, handle both individual and averaged measurements
-                    # If this is an averages database (_averages suffix), include Point 999 measurements
-                    if sample_set_name.endswith('_averages'):
-                        # Keep Point 999 measurements for averages databases
-                        print(f"DEBUG ODSExporter: Averages database detected, keeping Point 999 entries")
-                        print(f"DEBUG ODSExporter: Have {len(individual_measurements)} individual + {len(averaged_measurements)} averaged measurements")
-                    else:
-                        # Filter out Point 999 measurements for regular databases
-                        individual_measurements = [m for m in individual_measurements if m.get('coordinate_point', 0) != 999]
-                        print(f"DEBUG ODSExporter: Filtered out Point 999 entries, now have {len(individual_measurements)} individual measurements")
-                    
-                    print(f"DEBUG ODSExporter: Found {len(individual_measurements)} individual + {len(averaged_measurements)} averaged measurements")
-                    
-                    # Calculate averaged values for this sample set (if any exist)
-                    averaged_values = {}
-                    if averaged_measurements:
-                        # Use the most recent averaged measurement for each image
-                        latest_averages = {}
-                        for avg_m in averaged_measurements:
-                            image_name = avg_m['image_name']
-                            if image_name not in latest_averages or avg_m['measurement_date'] > latest_averages[image_name]['measurement_date']:
-                                latest_averages[image_name] = avg_m
-                        
-                        # Store averaged values by image name
-                        for image_name, avg_m in latest_averages.items():
-                            averaged_values[image_name] = {
-                                'l_avg': avg_m['l_value'],
-                                'a_avg': avg_m['a_value'], 
-                                'b_avg': avg_m['b_value'],
-                                'r_avg': avg_m['rgb_r'],
-                                'g_avg': avg_m['rgb_g'],
-                                'b_avg': avg_m['rgb_b']
-                            }
-                    
-                    # Process measurements - for _averages databases, use averaged measurements as if they were individual measurements
-                    if sample_set_name.endswith('_averages'):
-                        # For averages databases, treat averaged measurements as individual measurements
-                        print(f"DEBUG ODSExporter: Processing {len(averaged_measurements)} averaged measurements as individual measurements")
-                        measurements_to_process = averaged_measurements
-                    else:
-                        # Process individual measurements for regular databases
-                        if deduplicate:
-                            # Remove duplicates by keeping only the most recent measurement for each coordinate point
-                            # Sort by measurement_date to ensure we get the latest one
-                            sorted_measurements = sorted(individual_measurements, key=lambda x: x['measurement_date'])
-                            
-                            unique_measurements = {}
-                            for measurement in sorted_measurements:
-                                coord_point = measurement['coordinate_point']
-                                # Always keep the latest measurement (due to sorting, later ones overwrite earlier)
-                                unique_measurements[coord_point] = measurement
-                            
-                            measurements_to_process = unique_measurements.values()
-                        else:
-                            # Return all individual measurements for accumulation (no averaged rows)
-                            measurements_to_process = individual_measurements
-                    
-                    # Get coordinate template information for this sample set
-                    coordinate_info = self._get_coordinate_info(sample_set_name)
-                    
-                    # Track which images have already shown their averaged values
-                    images_with_averages_shown = set()
-                    
-                    # Sort measurements by image name and coordinate point to ensure consistent ordering
-                    measurements_to_process = sorted(measurements_to_process, 
-                                                    key=lambda x: (x['image_name'], x['coordinate_point']))
-                    
-                    # Convert to our ColorMeasurement objects and add averaged values
-                    for measurement in measurements_to_process:
-                        # Create data_id from image filename + timestamp + sample number
-                        image_basename = os.path.splitext(os.path.basename(measurement['image_name']))[0]
-                        
-                        # Extract timestamp from measurement_date and format it
-                        # measurement_date format is usually "2025-07-21 17:36:02"
+            # Read the databases on a thread pool: SQLite releases the GIL
+            # while it runs a query, so several sample sets load at once
+            results = []
+            workers = min(len(sample_sets), os.cpu_count() or 1, MAX_EXPORT_WORKERS)
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(self._read_sample_set_measurements,
+                                           name, deduplicate, include_paper)
+                               for name in sample_sets]
+                    for name, future in zip(sample_sets, futures):
                         try:
-                            from datetime import datetime
-                            # Parse the measurement date
-                            date_obj = datetime.strptime(measurement['measurement_date'], '%Y-%m-%d %H:%M:%S')
-                            # Format as compact timestamp: YYYYMMDD_HHMMSS
-                            timestamp = date_obj.strftime('%Y%m%d_%H%M%S')
-                        except:
-                            # Fallback if date parsing fails
-                            timestamp = measurement['measurement_date'].replace(' ', '_').replace(':', '').replace('-', '')
-                        
-                        data_id = f"{image_basename}_{timestamp}_sample{measurement['coordinate_point']}"
-                        
-                        # Get coordinate details - FIRST try from the measurement itself (has actual values)
-                        coord_point = measurement['coordinate_point']
-                        
-                        # Try to get sample info from the measurement data itself
-                        sample_size_raw = measurement.get('sample_size', '20')
-                        # Handle both "20x20" format and single "20" format
-                        if sample_size_raw and 'x' in str(sample_size_raw):
-                            # Format like "20x20" - use just the first dimension for display
-                            size_parts = str(sample_size_raw).split('x')
-                            formatted_size = size_parts[0] if size_parts else '20'
-                        else:
-                            # Single dimension or fallback
-                            formatted_size = str(sample_size_raw) if sample_size_raw else '20'
-                        
-                        coord_details = {
-                            'shape': measurement.get('sample_type', 'circle'),  # Default to circle if None
-                            'size': formatted_size,      # Properly formatted size
-                            'anchor': measurement.get('sample_anchor', 'center') # Default anchor if None
-                        }
-                        
-                        # If we still don't have sample info, fall back to coordinate template
-                        if coord_details['shape'] in ['unknown', None, ''] or not coord_details['shape']:
-                            template_details = coordinate_info.get(coord_point, {})
-                            if template_details:
-                                coord_details = {
-                                    'shape': template_details.get('shape', 'circle'),
-                                    'size': template_details.get('size', '20'),
-                                    'anchor': template_details.get('anchor', 'center')
-                                }
-                        
-                        # Get the averaged values for this image (if they exist)
-                        image_name = measurement['image_name']
-                        avg_values = averaged_values.get(image_name, {})
-                        
-                        # Only show averaged values on the first sample (coordinate_point 1) for each image
-                        show_averages = (image_name not in images_with_averages_shown and 
-                                       measurement['coordinate_point'] == 1 and 
-                                       avg_values)
-                        
-                        if show_averages:
-                            images_with_averages_shown.add(image_name)
-                        
-                        # Create ColorMeasurement with averaged values stored as additional attributes
-                        color_measurement = ColorMeasurement(
-                            data_id=data_id,
-                            sample_set_number=sample_set_counter,
-                            coordinate_point=measurement['coordinate_point'],
-                            l_value=measurement['l_value'],
-                            a_value=measurement['a_value'],
-                            b_value=measurement['b_value'],
-                            rgb_r=measurement['rgb_r'],
-                            rgb_g=measurement['rgb_g'],
-                            rgb_b=measurement['rgb_b'],
-                            x_position=measurement['x_position'],
-                            y_position=measurement['y_position'],
-                            sample_shape=coord_details['shape'],
-                            sample_size=coord_details['size'],
-                            sample_anchor=coord_details['anchor'],
-                            measurement_date=measurement['measurement_date'],
-                            notes=measurement['notes'],
-                            is_averaged=measurement.get('is_averaged', False),
-                            source_samples_count=measurement.get('source_samples_count'),
-                            source_sample_ids=measurement.get('source_sample_ids')
-                        )
-                        
-                        # Add averaged values as attributes for export formatting (only on first sample for each image)
-                        if show_averages:
-                            color_measurement.l_avg = avg_values.get('l_avg', '')
-                            color_measurement.a_avg = avg_values.get('a_avg', '')
-                            color_measurement.b_avg = avg_values.get('b_avg', '')
-                            color_measurement.r_avg = avg_values.get('r_avg', '')
-                            color_measurement.g_avg = avg_values.get('g_avg', '')
-                            color_measurement.rgb_b_avg = avg_values.get('b_avg', '')  # This is the blue channel average
-                            # Create DataID for averaged data (filename_timestamp without sample suffix)
-                            color_measurement.avg_data_id = f"{image_basename}_{timestamp}"
-                        else:
-                            # Leave averaged values empty for subsequent samples of the same image
-                            color_measurement.l_avg = ''
-                            color_measurement.a_avg = ''
-                            color_measurement.b_avg = ''
-                            color_measurement.r_avg = ''
-                            color_measurement.g_avg = ''
-                            color_measurement.rgb_b_avg = ''
-                            color_measurement.avg_data_id = ''
-                        
-                        measurements.append(color_measurement)
-                    
-                    sample_set_counter += 1
-                    
-                except Exception as e:
-                    print(f"Error reading color data for sample set '{sample_set_name}': {e}")
-                    continue
+                            results.append(future.result())
+                        except Exception as e:
+                            print(f"Error reading color data for sample set '{name}': {e}")
+            else:
+                for name in sample_sets:
+                    try:
+                        results.append(self._read_sample_set_measurements(name, deduplicate, include_paper))
+                    except Exception as e:
+                        print(f"Error reading color data for sample set '{name}': {e}")
+            
+            # Number the sample sets that were read, in database order
+            for sample_set_counter, set_measurements in enumerate(results, 1):
+                for color_measurement in set_measurements:
+                    color_measurement.sample_set_number = sample_set_counter
+                measurements.extend(set_measurements)
                     
         except ImportError as e:
             print(f"Import error: {e}")
@@ -376,6 +213,209 @@ class ODSExporter:
             
         return measurements
     
+    def _read_sample_set_measurements(self, sample_set_name: str, deduplicate: bool,
+                                      include_paper: bool) -> List[ColorMeasurement]:
+        """Read one sample set database as export rows.
+        
+        Filtering, deduplication and ordering are done column-wise on the
+        set's measurement frame; only the rows that survive become
+        ColorMeasurement objects. ``sample_set_number`` is left at 0 for the
+        caller to assign.
+        
+        Args:
+            sample_set_name: Sample set (database) name
+            deduplicate: Keep only the latest measurement per (image, point)
+            include_paper: Keep paper-tagged measurements
+        """
+        from utils.color_analysis_db import ColorAnalysisDB
+        
+        # Get all measurements for this sample set
+        frame = ColorAnalysisDB(sample_set_name).get_measurements_frame()
+        
+        # Drop paper-tagged measurements (image_name ending '-p')
+        # unless the caller explicitly wants them. Paper sits in
+        # its own measurement set inside the same DB, so it'd
+        # otherwise be pulled in here and pollute K-means / ΔE.
+        if not include_paper and len(frame):
+            from utils.measurement_filters import is_paper_image_name
+            paper_names = [n for n in frame['image_name'].unique() if is_paper_image_name(n)]
+            is_paper = frame['image_name'].isin(paper_names)
+            excluded = int(is_paper.sum())
+            if excluded:
+                frame = frame[~is_paper]
+                print(
+                    f"DEBUG ODSExporter: Excluded {excluded} "
+                    f"paper-tagged measurement(s) from "
+                    f"'{sample_set_name}'"
+                )
+        
+        # Separate individual measurements from averaged measurements
+        is_averages_db = sample_set_name.endswith('_averages')
+        averaged = frame[frame['is_averaged']]
+        individual = frame[~frame['is_averaged']]
+        
+        # For Plot_3D export, handle both individual and averaged measurements
+        # If this is an averages database (_averages suffix), include Point 999 measurements
+        if not is_averages_db:
+            # Filter out Point 999 measurements for regular databases
+            individual = individual[individual['coordinate_point'] != 999]
+        
+        print(f"DEBUG ODSExporter: Found {len(individual)} individual + {len(averaged)} averaged measurements in '{sample_set_name}'")
+        
+        # Most recent averaged measurement per image (the earliest row wins a tie)
+        averaged_values = {}
+        if len(averaged):
+            latest_averages = (averaged.sort_values('measurement_date', ascending=False, kind='stable')
+                               .drop_duplicates('image_name', keep='first'))
+            for avg_m in latest_averages.itertuples(index=False):
+                averaged_values[avg_m.image_name] = {
+                    'l_avg': avg_m.l_value,
+                    'a_avg': avg_m.a_value,
+                    'b_avg': avg_m.b_value,
+                    'r_avg': avg_m.rgb_r,
+                    'g_avg': avg_m.rgb_g,
+                    'b_avg': avg_m.rgb_b
+                }
+        
+        # Process measurements - for _averages databases, use averaged measurements as if they were individual measurements
+        if is_averages_db:
+            to_process = averaged
+        elif deduplicate:
+            # Keep only the most recent measurement for each (image, coordinate point);
+            # a stable sort keeps the last-saved row when dates tie
+            to_process = (individual.sort_values('measurement_date', kind='stable')
+                          .drop_duplicates(['image_name', 'coordinate_point'], keep='last'))
+        else:
+            # Return all individual measurements for accumulation (no averaged rows)
+            to_process = individual
+        
+        if not len(to_process):
+            return []
+        
+        # Sort measurements by image name and coordinate point to ensure consistent ordering
+        to_process = to_process.sort_values(['image_name', 'coordinate_point'], kind='stable')
+        
+        # Compact timestamps (YYYYMMDD_HHMMSS) from measurement_date ("2025-07-21 17:36:02").
+        # For zero-padded dates dropping the separators is the same as
+        # strptime/strftime, so only irregular dates are parsed one by one
+        dates = to_process['measurement_date'].astype(object).where(to_process['measurement_date'].notna(), '').astype(str)
+        timestamps = dates.str.replace(' ', '_').str.replace(':', '').str.replace('-', '').tolist()
+        irregular = ~dates.str.fullmatch(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}')
+        for i in np.flatnonzero(irregular.to_numpy()):
+            try:
+                date_obj = datetime.strptime(dates.iat[i], '%Y-%m-%d %H:%M:%S')
+                timestamps[i] = date_obj.strftime('%Y%m%d_%H%M%S')
+            except ValueError:
+                pass  # Keep the fallback form
+        
+        # Columns as plain Python values (None for SQL NULLs)
+        columns = {name: _column_values(to_process[name]) for name in to_process.columns}
+        records = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        
+        coordinate_info = None
+        image_basenames = {}
+        images_with_averages_shown = set()
+        set_measurements = []
+        
+        # Convert to our ColorMeasurement objects and add averaged values
+        for measurement, timestamp in zip(records, timestamps):
+            image_name = measurement['image_name']
+            
+            # Create data_id from image filename + timestamp + sample number
+            image_basename = image_basenames.get(image_name)
+            if image_basename is None:
+                image_basename = os.path.splitext(os.path.basename(image_name))[0]
+                image_basenames[image_name] = image_basename
+            
+            coord_point = measurement['coordinate_point']
+            data_id = f"{image_basename}_{timestamp}_sample{coord_point}"
+            
+            # Get coordinate details - FIRST try from the measurement itself (has actual values)
+            sample_size_raw = measurement['sample_size']
+            # Handle both "20x20" format and single "20" format
+            if sample_size_raw and 'x' in str(sample_size_raw):
+                # Format like "20x20" - use just the first dimension for display
+                size_parts = str(sample_size_raw).split('x')
+                formatted_size = size_parts[0] if size_parts else '20'
+            else:
+                # Single dimension or fallback
+                formatted_size = str(sample_size_raw) if sample_size_raw else '20'
+            
+            coord_details = {
+                'shape': measurement['sample_type'],
+                'size': formatted_size,      # Properly formatted size
+                'anchor': measurement['sample_anchor']
+            }
+            
+            # If we still don't have sample info, fall back to coordinate template
+            if coord_details['shape'] in ['unknown', None, ''] or not coord_details['shape']:
+                if coordinate_info is None:
+                    coordinate_info = self._get_coordinate_info(sample_set_name)
+                template_details = coordinate_info.get(coord_point, {})
+                if template_details:
+                    coord_details = {
+                        'shape': template_details.get('shape', 'circle'),
+                        'size': template_details.get('size', '20'),
+                        'anchor': template_details.get('anchor', 'center')
+                    }
+            
+            # Get the averaged values for this image (if they exist)
+            avg_values = averaged_values.get(image_name, {})
+            
+            # Only show averaged values on the first sample (coordinate_point 1) for each image
+            show_averages = (image_name not in images_with_averages_shown and 
+                           coord_point == 1 and 
+                           avg_values)
+            
+            if show_averages:
+                images_with_averages_shown.add(image_name)
+            
+            color_measurement = ColorMeasurement(
+                data_id=data_id,
+                sample_set_number=0,
+                coordinate_point=coord_point,
+                l_value=measurement['l_value'],
+                a_value=measurement['a_value'],
+                b_value=measurement['b_value'],
+                rgb_r=measurement['rgb_r'],
+                rgb_g=measurement['rgb_g'],
+                rgb_b=measurement['rgb_b'],
+                x_position=measurement['x_position'],
+                y_position=measurement['y_position'],
+                sample_shape=coord_details['shape'],
+                sample_size=coord_details['size'],
+                sample_anchor=coord_details['anchor'],
+                measurement_date=measurement['measurement_date'],
+                notes=measurement['notes'],
+                is_averaged=measurement['is_averaged'],
+                source_samples_count=measurement['source_samples_count'],
+                source_sample_ids=measurement['source_sample_ids']
+            )
+            
+            # Add averaged values as attributes for export formatting (only on first sample for each image)
+            if show_averages:
+                color_measurement.l_avg = avg_values.get('l_avg', '')
+                color_measurement.a_avg = avg_values.get('a_avg', '')
+                color_measurement.b_avg = avg_values.get('b_avg', '')
+                color_measurement.r_avg = avg_values.get('r_avg', '')
+                color_measurement.g_avg = avg_values.get('g_avg', '')
+                color_measurement.rgb_b_avg = avg_values.get('b_avg', '')  # This is the blue channel average
+                # Create DataID for averaged data (filename_timestamp without sample suffix)
+                color_measurement.avg_data_id = f"{image_basename}_{timestamp}"
+            else:
+                # Leave averaged values empty for subsequent samples of the same image
+                color_measurement.l_avg = ''
+                color_measurement.a_avg = ''
+                color_measurement.b_avg = ''
+                color_measurement.r_avg = ''
+                color_measurement.g_avg = ''
+                color_measurement.rgb_b_avg = ''
+                color_measurement.avg_data_id = ''
+            
+            set_measurements.append(color_measurement)
+        
+        return set_measurements
+    
     def _get_coordinate_info(self, sample_set_name: str) -> dict:
         """Get coordinate template information for a sample set.
         
@@ -580,6 +620,53 @@ class ODSExporter:
         
         return row_data
     
+    def _get_numeric_export_columns(self) -> set:
+        """Indices of the numeric columns in the individual measurement export.
+        
+        L*, a*, b*, X, Y, R, G, B (positions depend on Lab/RGB preferences).
+        """
+        include_rgb = True
+        include_lab = True
+        if self.prefs_manager:
+            include_rgb = self.prefs_manager.get_export_include_rgb()
+            include_lab = self.prefs_manager.get_export_include_lab()
+        
+        numeric_columns = set()
+        col_index = 0
+        
+        # L*a*b* columns (0,1,2)
+        if include_lab:
+            numeric_columns.update([col_index, col_index+1, col_index+2])
+            col_index += 3
+        
+        # Skip DataID column
+        col_index += 1
+        
+        # X, Y columns
+        numeric_columns.update([col_index, col_index+1])
+        col_index += 2
+        
+        # Skip Shape, Size, Anchor columns
+        col_index += 3
+        
+        # RGB columns
+        if include_rgb:
+            numeric_columns.update([col_index, col_index+1, col_index+2])
+        
+        return numeric_columns
+    
+    def _use_normalized_export(self, label: str = "") -> bool:
+        """Whether the normalized (0.0-1.0) export format is enabled."""
+        use_normalized = False
+        if self.prefs_manager:
+            use_normalized = self.prefs_manager.get_export_normalized_values()
+            suffix = f" for {label}" if label else ""
+            if use_normalized:
+                print(f"DEBUG: Using normalized export format (0.0-1.0 range){suffix}")
+            else:
+                print(f"DEBUG: Using standard export format{suffix}")
+        return use_normalized
+    
     def create_ods_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
         """Create an ODS document with the color measurements."""
         if not ODF_AVAILABLE:
@@ -611,6 +698,8 @@ class ODSExporter:
         
         table.addElement(header_row)
         
+        numeric_columns = self._get_numeric_export_columns()
+        
         # Add data rows
         for measurement in measurements:
             row = TableRow()
@@ -618,37 +707,6 @@ class ODSExporter:
             # Create cells for each column using normalized or standard formatting
             data = self._format_measurement_values(measurement, use_normalized)
             
-            # Define which columns contain numeric data based on new clean structure
-            # L*, a*, b*, X, Y, R, G, B (positions depend on Lab/RGB preferences)
-            numeric_columns = []
-            col_index = 0
-            
-            # Get preferences for dynamic column mapping
-            include_rgb = True
-            include_lab = True
-            if self.prefs_manager:
-                include_rgb = self.prefs_manager.get_export_include_rgb()
-                include_lab = self.prefs_manager.get_export_include_lab()
-            
-            # L*a*b* columns (0,1,2)
-            if include_lab:
-                numeric_columns.extend([col_index, col_index+1, col_index+2])
-                col_index += 3
-            
-            # Skip DataID column
-            col_index += 1
-            
-            # X, Y columns
-            numeric_columns.extend([col_index, col_index+1])
-            col_index += 2
-            
-            # Skip Shape, Size, Anchor columns
-            col_index += 3
-            
-            # RGB columns
-            if include_rgb:
-                numeric_columns.extend([col_index, col_index+1, col_index+2])
-            
             for i, value in enumerate(data):
                 cell = TableCell()
                 
@@ -679,6 +737,9 @@ class ODSExporter:
     def export_to_ods(self, output_path: str) -> bool:
         """Export color analysis data to an ODS file.
         For accumulation mode, includes ALL measurements from database (no deduplication).
+        
+        Rows are streamed into the file, so memory use does not grow with the
+        number of measurements.
         """
         try:
             # Get ALL measurements from database (no deduplication for accumulation)
@@ -691,14 +752,16 @@ class ODSExporter:
             # Sort measurements by date for chronological order in spreadsheet
             measurements.sort(key=lambda x: x.measurement_date)
             
-            # Create ODS document
-            doc = self.create_ods_document(measurements)
+            use_normalized = self._use_normalized_export()
+            headers = self._get_export_headers(use_normalized)
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Save document
-            doc.save(output_path)
+            # Stream rows into the document
+            write_ods(output_path, "Color Analysis Data", [headers],
+                      (self._format_measurement_values(m, use_normalized) for m in measurements),
+                      self._get_numeric_export_columns())
             
             print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
             return True
@@ -708,15 +771,15 @@ class ODSExporter:
             return False
     
     def export_to_xlsx(self, output_path: str) -> bool:
-        """Export color analysis data to an Excel (.xlsx) file using pandas.
+        """Export color analysis data to an Excel (.xlsx) file.
         For accumulation mode, includes ALL measurements from database (no deduplication).
+        
+        Uses an openpyxl write-only workbook so rows are streamed to disk.
         """
         try:
-            # Check if pandas is available
-            try:
-                import pandas as pd
-            except ImportError:
-                print("Error: pandas library not available. Install with: pip install pandas")
+            # Check if openpyxl is available (write_xlsx imports it)
+            if importlib.util.find_spec('openpyxl') is None:
+                print("Error: openpyxl library not available. Install with: pip install openpyxl")
                 return False
             
             # Get ALL measurements from database (no deduplication for accumulation)
@@ -729,53 +792,20 @@ class ODSExporter:
             # Sort measurements by date for chronological order in spreadsheet
             measurements.sort(key=lambda x: x.measurement_date)
             
-            # Check if normalized export is enabled
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-                if use_normalized:
-                    print("DEBUG: Using normalized export format (0.0-1.0 range) for XLSX")
-                else:
-                    print("DEBUG: Using standard export format for XLSX")
-            
-            # Convert measurements to DataFrame using clean header structure
-            data = []
-            for measurement in measurements:
-                # Create row using same format as cleaned headers
-                formatted_data = self._format_measurement_values(measurement, use_normalized)
-                headers = self._get_export_headers(use_normalized)
-                
-                row_dict = {}
-                for header, value in zip(headers, formatted_data):
-                    row_dict[header] = value
-                
-                data.append(row_dict)
+            use_normalized = self._use_normalized_export("XLSX")
+            headers = self._get_export_headers(use_normalized)
             
-            df = pd.DataFrame(data)
+            def rows():
+                for measurement in measurements:
+                    yield self._format_measurement_values(measurement, use_normalized)
             
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Save to Excel with proper formatting
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Color Analysis Data', index=False)
-                
-                # Get the workbook and worksheet to apply formatting
-                workbook = writer.book
-                worksheet = writer.sheets['Color Analysis Data']
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            # Write-only sheets need column widths before the first row, so
+            # auto-fit in a first pass and stream the rows in a second
+            write_xlsx(output_path, 'Color Analysis Data', headers, rows(),
+                       widths=column_widths(headers, rows()))
             
             print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
             return True
@@ -802,29 +832,14 @@ class ODSExporter:
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
-            # Check if normalized export is enabled
-            use_normalized = False
-            if self.prefs_manager:
-                use_normalized = self.prefs_manager.get_export_normalized_values()
-                if use_normalized:
-                    print("DEBUG: Using normalized export format (0.0-1.0 range) for CSV")
-                else:
-                    print("DEBUG: Using standard export format for CSV")
+            use_normalized = self._use_normalized_export("CSV")
             
             # Define headers based on normalization preference
             headers = self._get_export_headers(use_normalized)
             
-            # Write CSV file
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header row
-                writer.writerow(headers)
-                
-                # Write data rows
-                for measurement in measurements:
-                    row = self._format_measurement_values(measurement, use_normalized)
-                    writer.writerow(row)
+            # Write CSV file through a buffered writer
+            write_csv(output_path, headers,
+                      (self._format_measurement_values(m, use_normalized) for m in measurements))
             
             print(f"Successfully exported {len(measurements)} measurements to: {output_path}")
             return True
@@ -1111,17 +1126,13 @@ class ODSExporter:
                     current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
                     output_path = os.path.join(current_dir, "exports", f"{base_filename}{extension}")
             
-            # Create the document
-            doc = self._create_averaged_document(color_measurements)
-            
             # Ensure output directory exists
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Export using the appropriate method
             success = False
             if format_type == "ods":
-                doc.save(output_path)
-                success = True
+                success = self._export_averaged_to_ods(color_measurements, output_path)
             elif format_type == "xlsx":
                 success = self._export_averaged_to_xlsx(color_measurements, output_path)
             elif format_type == "csv":
@@ -1286,12 +1297,24 @@ class ODSExporter:
         
         return row_data
     
+    def _export_averaged_to_ods(self, measurements: List[ColorMeasurement], output_path: str) -> bool:
+        """Export averaged measurements to ODS format (streamed)."""
+        use_normalized = False
+        if self.prefs_manager:
+            use_normalized = self.prefs_manager.get_export_normalized_values()
+        
+        headers = self._get_averaged_export_headers(use_normalized)
+        
+        # L*, a*, b*, R, G, B are the first 6 columns
+        write_ods(output_path, "Averaged Color Analysis", [headers],
+                  (self._format_averaged_measurement_values(m, use_normalized) for m in measurements),
+                  range(6))
+        return True
+    
     def _export_averaged_to_xlsx(self, measurements: List[ColorMeasurement], output_path: str) -> bool:
         """Export averaged measurements to Excel format."""
-        try:
-            import pandas as pd
-        except ImportError:
-            print("Error: pandas library not available for XLSX export")
+        if importlib.util.find_spec('openpyxl') is None:
+            print("Error: openpyxl library not available for XLSX export")
             return False
         
         try:
@@ -1299,37 +1322,15 @@ class ODSExporter:
             if self.prefs_manager:
                 use_normalized = self.prefs_manager.get_export_normalized_values()
             
-            # Convert measurements to DataFrame
-            data = []
-            for measurement in measurements:
-                row_dict = {}
-                formatted_data = self._format_averaged_measurement_values(measurement, use_normalized)
-                headers = self._get_averaged_export_headers(use_normalized)
-                
-                for header, value in zip(headers, formatted_data):
-                    row_dict[header] = value
-                
-                data.append(row_dict)
+            headers = self._get_averaged_export_headers(use_normalized)
             
-            df = pd.DataFrame(data)
+            def rows():
+                for measurement in measurements:
+                    yield self._format_averaged_measurement_values(measurement, use_normalized)
             
-            # Save to Excel
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Averaged Color Analysis', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Averaged Color Analysis']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+            # Auto-fit widths in a first pass, stream the rows in a second
+            write_xlsx(output_path, 'Averaged Color Analysis', headers, rows(),
+                       widths=column_widths(headers, rows()))
             
             return True
         except Exception as e:
@@ -1345,13 +1346,8 @@ class ODSExporter:
             
             headers = self._get_averaged_export_headers(use_normalized)
             
-            with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                
-                for measurement in measurements:
-                    row = self._format_averaged_measurement_values(measurement, use_normalized)
-                    writer.writerow(row)
+            write_csv(output_path, headers,
+                      (self._format_averaged_measurement_values(m, use_normalized) for m in measurements))
             
             return True
         except Exception as e:
@@ -1458,11 +1454,10 @@ class ODSExporter:
                 filename = f"{base_name}_Plot3D.ods"
                 output_path = os.path.join(export_dir, filename)
             
-            # Create Plot_3D compatible ODS document
-            doc = self._create_plot3d_document(measurements)
-            
-            # Save document
-            doc.save(output_path)
+            # Stream the Plot_3D compatible ODS document (first 3 columns are numeric)
+            write_ods(output_path, "Plot_3D Data", self._get_plot3d_header_rows(),
+                      (self._format_plot3d_values(m) for m in measurements),
+                      range(3))
             
             print(f"Successfully exported {len(measurements)} measurements for Plot_3D: {output_path}")
             return True, output_path
@@ -1474,6 +1469,45 @@ class ODSExporter:
             traceback.print_exc()
             return False, error_msg
     
+    def _get_plot3d_header_rows(self) -> List[List[str]]:
+        """Rows 1-8 of the Plot_3D rigid format: 7 metadata rows, then the column headers."""
+        # Plot_3D expected columns - includes Radius column which is required
+        headers = ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker', 
+                   'Color', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', 'Sphere', 'Radius']
+        
+        # Rows 1-7: Metadata and instructions (rigid format requirement)
+        metadata_rows = [
+            ["Plot_3D Data Template", "", "", "", "", "", "", "", "", "", "", "", "Instructions"],
+            [f"Sample Set: {self.sample_set_name or 'StampZ_Export'}", "", "", "", "", "", "", "", "", "", "", "", "Data starts at row 9"],
+            ["Created by StampZ-III", "", "", "", "", "", "", "", "", "", "", "", "Use dropdowns where applicable"],
+            ["Rigid format for Plot_3D compatibility", "", "", "", "", "", "", "", "", "", "", "", "Do NOT modify row structure"],
+            ["IMPORTANT: This format is required for Plot_3D", "", "", "", "", "", "", "", "", "", "", "", "Highlight functions depend on this"],
+            ["K-means expects exact column order", "", "", "", "", "", "", "", "", "", "", "", "Save before Refresh Data"],
+            ["ΔE calculations depend on structure", "", "", "", "", "", "", "", "", "", "", "", ""]
+        ]
+        
+        return metadata_rows + [headers]
+    
+    def _format_plot3d_values(self, measurement: ColorMeasurement) -> List[str]:
+        """Values of one Plot_3D data row, in the rigid format's column order."""
+        # Create all the values for Plot_3D in the correct column order
+        values = [
+            self._normalize_lab_l(measurement.l_value),    # Xnorm (L* normalized)
+            self._normalize_lab_ab(measurement.a_value),   # Ynorm (a* normalized)
+            self._normalize_lab_ab(measurement.b_value),   # Znorm (b* normalized)
+            measurement.data_id,                           # DataID
+            "",                                           # Cluster (empty, will be filled by K-means)
+            "",                                           # ∆E (empty, will be calculated by Plot_3D)
+            ".",                                          # Marker (default dot marker)
+            "black",                                      # Color (default color)
+            "",                                           # Centroid_X (empty, will be filled by K-means)
+            "",                                           # Centroid_Y (empty, will be filled by K-means)
+            "",                                           # Centroid_Z (empty, will be filled by K-means)
+            "",                                           # Sphere (empty, for user use)
+            ""                                            # Radius (empty, for user use)
+        ]
+        return values
+    
     def _create_plot3d_document(self, measurements: List[ColorMeasurement]) -> OpenDocumentSpreadsheet:
         """Create an ODS document formatted specifically for Plot_3D using rigid format.
         
@@ -1494,23 +1528,8 @@ class ODSExporter:
         # Create table
         table = Table(name="Plot_3D Data")
         
-        # Plot_3D expected columns - includes Radius column which is required
-        headers = ['Xnorm', 'Ynorm', 'Znorm', 'DataID', 'Cluster', '∆E', 'Marker', 
-                   'Color', 'Centroid_X', 'Centroid_Y', 'Centroid_Z', 'Sphere', 'Radius']
-        
-        # Rows 1-7: Metadata and instructions (rigid format requirement)
-        metadata_rows = [
-            ["Plot_3D Data Template", "", "", "", "", "", "", "", "", "", "", "", "Instructions"],
-            [f"Sample Set: {self.sample_set_name or 'StampZ_Export'}", "", "", "", "", "", "", "", "", "", "", "", "Data starts at row 9"],
-            ["Created by StampZ-III", "", "", "", "", "", "", "", "", "", "", "", "Use dropdowns where applicable"],
-            ["Rigid format for Plot_3D compatibility", "", "", "", "", "", "", "", "", "", "", "", "Do NOT modify row structure"],
-            ["IMPORTANT: This format is required for Plot_3D", "", "", "", "", "", "", "", "", "", "", "", "Highlight functions depend on this"],
-            ["K-means expects exact column order", "", "", "", "", "", "", "", "", "", "", "", "Save before Refresh Data"],
-            ["ΔE calculations depend on structure", "", "", "", "", "", "", "", "", "", "", "", ""]
-        ]
-        
-        # Add metadata rows (rows 1-7)
-        for row_values in metadata_rows:
+        # Rows 1-8: Metadata and column headers
+        for row_values in self._get_plot3d_header_rows():
             meta_row = TableRow()
             for value in row_values:
                 cell = TableCell()
@@ -1518,34 +1537,10 @@ class ODSExporter:
                 meta_row.addElement(cell)
             table.addElement(meta_row)
         
-        # Row 8: Column headers
-        header_row = TableRow()
-        for header in headers:
-            cell = TableCell()
-            cell.addElement(P(text=header))
-            header_row.addElement(cell)
-        table.addElement(header_row)
-        
         # Rows 9+: Data rows
         for measurement in measurements:
             row = TableRow()
-            
-            # Create all the values for Plot_3D in the correct column order
-            values = [
-                self._normalize_lab_l(measurement.l_value),    # Xnorm (L* normalized)
-                self._normalize_lab_ab(measurement.a_value),   # Ynorm (a* normalized)
-                self._normalize_lab_ab(measurement.b_value),   # Znorm (b* normalized)
-                measurement.data_id,                           # DataID
-                "",                                           # Cluster (empty, will be filled by K-means)
-                "",                                           # ∆E (empty, will be calculated by Plot_3D)
-                ".",                                          # Marker (default dot marker)
-                "black",                                      # Color (default color)
-                "",                                           # Centroid_X (empty, will be filled by K-means)
-                "",                                           # Centroid_Y (empty, will be filled by K-means)
-                "",                                           # Centroid_Z (empty, will be filled by K-means)
-                "",                                           # Sphere (empty, for user use)
-                ""                                            # Radius (empty, for user use)
-            ]
+            values = self._format_plot3d_values(measurement)
             
             for i, value in enumerate(values):
                 cell = TableCell()
@@ -10,21 +10,15 @@ import re
 from datetime import datetime
 from typing import List, Dict, Optional
 
-try:
-    from odf.opendocument import load
-    from odf.table import Table, TableRow, TableCell
-    from odf.text import P
-    ODF_AVAILABLE = True
-except ImportError:
-    ODF_AVAILABLE = False
+from utils.ods_reader import read_ods_table, LXML_AVAILABLE
 
 class ODSImporter:
     """Import corrected ODS data back into StampZ database format."""
     
     def __init__(self):
         """Initialize the ODS importer."""
-        if not ODF_AVAILABLE:
-            raise ImportError("odfpy library not available. Install with: pip install odfpy==1.4.1")
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml library not available. Install with: pip install lxml")
     
     def parse_ods_file(self, ods_path: str) -> List[Dict]:
         """Parse ODS file and extract measurement data.
@@ -38,16 +32,8 @@ class ODSImporter:
         measurements = []
         
         try:
-            # Load the ODS document
-            doc = load(ods_path)
-            
-            # Get the first table
-            tables = doc.getElementsByType(Table)
-            if not tables:
-                raise ValueError("No tables found in ODS file")
-            
-            table = tables[0]
-            rows = table.getElementsByType(TableRow)
+            # Stream the first table as displayed text (repeated cells/rows expanded)
+            rows = read_ods_table(ods_path, 0, as_text=True)
             
             if len(rows) < 2:
                 raise ValueError("ODS file must have at least a header row and one data row")
@@ -55,15 +41,7 @@ class ODSImporter:
             print(f"Found {len(rows)-1} data rows in ODS file")
             
             # Parse header row to understand column positions
-            header_row = rows[0]
-            header_cells = header_row.getElementsByType(TableCell)
-            headers = []
-            for cell in header_cells:
-                text_elements = cell.getElementsByType(P)
-                if text_elements:
-                    headers.append(str(text_elements[0]).strip())
-                else:
-                    headers.append("")
+            headers = rows[0]
             
             print(f"Headers: {headers}")
             
@@ -75,19 +53,7 @@ class ODSImporter:
             }
             
             # Process data rows
-            for row_idx, row in enumerate(rows[1:], 1):  # Skip header row
-                cells = row.getElementsByType(TableCell)
-                row_data = []
-                
-                # Extract text from each cell
-                for cell in cells:
-                    text_elements = cell.getElementsByType(P)
-                    if text_elements:
-                        cell_text = str(text_elements[0]).strip()
-                        row_data.append(cell_text)
-                    else:
-                        row_data.append("")
-                
+            for row_idx, row_data in enumerate(rows[1:], 1):  # Skip header row
                 # Skip empty rows
                 if not any(row_data):
                     continue
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Streaming ODS table reader for StampZ.
+
+``pd.read_excel(..., engine='odf')`` loads the whole document into an odfpy
+DOM before it looks at a single cell, which makes a 5k-row Plot_3D sheet take
+seconds to open. This module stream-parses ``content.xml`` straight out of
+the zip with ``lxml.etree.iterparse``:
+
+- rows and cells are released as soon as they have been read
+- ``number-columns-repeated`` / ``number-rows-repeated`` runs of blank cells
+  and rows are counted, never expanded
+- parsing stops as soon as the requested sheet has been read
+
+Cell values follow pandas' odf reader exactly, so ``read_ods()`` returns the
+same DataFrame as ``pd.read_excel(path, engine='odf', sheet_name=...)`` with
+numeric columns built directly as typed NumPy arrays.
+"""
+
+import zipfile
+import logging
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# OpenDocument namespaces
+TABLE_NS = 'urn:oasis:names:tc:opendocument:xmlns:table:1.0'
+OFFICE_NS = 'urn:oasis:names:tc:opendocument:xmlns:office:1.0'
+TEXT_NS = 'urn:oasis:names:tc:opendocument:xmlns:text:1.0'
+
+_TABLE = f'{{{TABLE_NS}}}table'
+_ROW = f'{{{TABLE_NS}}}table-row'
+_CELL = f'{{{TABLE_NS}}}table-cell'
+_COVERED = f'{{{TABLE_NS}}}covered-table-cell'
+_NAME = f'{{{TABLE_NS}}}name'
+_COLS_REPEATED = f'{{{TABLE_NS}}}number-columns-repeated'
+_ROWS_REPEATED = f'{{{TABLE_NS}}}number-rows-repeated'
+_VALUE_TYPE = f'{{{OFFICE_NS}}}value-type'
+_VALUE = f'{{{OFFICE_NS}}}value'
+_DATE_VALUE = f'{{{OFFICE_NS}}}date-value'
+_ANNOTATION = f'{{{OFFICE_NS}}}annotation'
+_TEXT_P = f'{{{TEXT_NS}}}p'
+_TEXT_S = f'{{{TEXT_NS}}}s'
+_TEXT_C = f'{{{TEXT_NS}}}c'
+
+# Blank cell marker, same as pandas' odf reader
+EMPTY = ''
+
+# Integers outside this range are left to pandas' own type inference
+_INT64_MIN, _INT64_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+def _cell_string(elem) -> str:
+    """String value of a cell: text runs with ``text:s`` expanded, annotations skipped."""
+    parts = []
+    if elem.text:
+        parts.append(elem.text.strip('\n'))
+    for child in elem:
+        tag = child.tag
+        if tag == _TEXT_S:
+            parts.append(' ' * int(child.get(_TEXT_C, 1)))
+        elif isinstance(tag, str) and tag != _ANNOTATION:
+            parts.append(_cell_string(child))
+        if child.tail:
+            parts.append(child.tail.strip('\n'))
+    return ''.join(parts)
+
+
+def _cell_value(cell):
+    """Typed value of a ``table:table-cell`` as pandas' odf reader returns it."""
+    if len(cell) and ''.join(cell.itertext()) == '#N/A':
+        return np.nan
+    value_type = cell.get(_VALUE_TYPE)
+    if value_type is None:
+        return EMPTY
+    if value_type == 'float':
+        value = float(cell.get(_VALUE))
+        as_int = int(value)
+        return as_int if as_int == value else value
+    if value_type == 'string':
+        return _cell_string(cell)
+    if value_type == 'boolean':
+        return ''.join(cell.itertext()) == 'TRUE'
+    if value_type in ('percentage', 'currency'):
+        return float(cell.get(_VALUE))
+    if value_type == 'date':
+        return pd.Timestamp(cell.get(_DATE_VALUE))
+    if value_type == 'time':
+        return pd.Timestamp(''.join(cell.itertext())).time()
+    raise ValueError(f"Unrecognized type {value_type}")
+
+
+def _cell_text(cell) -> str:
+    """Displayed text of a cell's first paragraph (what a user sees in Calc)."""
+    for child in cell:
+        if child.tag == _TEXT_P:
+            return ''.join(child.itertext()).strip()
+    return EMPTY
+
+
+def _open_content(ods_path: str):
+    archive = zipfile.ZipFile(ods_path)
+    try:
+        return archive, archive.open('content.xml')
+    except KeyError:
+        archive.close()
+        raise ValueError(f"{ods_path} is not an OpenDocument spreadsheet (no content.xml)")
+
+
+def _release(elem) -> None:
+    """Free a parsed element and any already-processed siblings before it."""
+    elem.clear()
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def ods_sheet_names(ods_path: str) -> List[str]:
+    """Return the sheet names of an .ods file in document order."""
+    if not LXML_AVAILABLE:
+        return pd.ExcelFile(ods_path, engine='odf').sheet_names
+
+    names = []
+    archive, stream = _open_content(ods_path)
+    try:
+        for event, elem in etree.iterparse(stream, events=('start', 'end'), tag=(_TABLE, _ROW)):
+            if event == 'start':
+                if elem.tag == _TABLE:
+                    names.append(elem.get(_NAME, ''))
+            else:
+                _release(elem)
+    finally:
+        stream.close()
+        archive.close()
+    return names
+
+
+def iter_ods_rows(ods_path: str, sheet_name: Union[int, str] = 0,
+                  as_text: bool = False) -> Iterator[List]:
+    """Yield the rows of one sheet, expanding repeated cells and rows.
+
+    Blank cells at the end of a row and blank rows at the end of the sheet
+    are dropped (blank runs are only expanded when content follows them),
+    so the thousands of formatted-but-empty cells Calc writes cost nothing.
+
+    Args:
+        ods_path: Path to the .ods file
+        sheet_name: Sheet name, or 0-based sheet index
+        as_text: Yield each cell's displayed text instead of its typed value
+
+    Yields:
+        One list per row; blank cells are ``''``
+
+    Raises:
+        ValueError: If the sheet does not exist
+    """
+    if not LXML_AVAILABLE:
+        raise ImportError("lxml is required for streaming ODS reads. Install with: pip install lxml")
+
+    archive, stream = _open_content(ods_path)
+    try:
+        table_index = -1
+        in_target = False
+        found = False
+        pending_rows = 0
+        row: List = []
+        pending_cells = 0
+
+        for event, elem in etree.iterparse(stream, events=('start', 'end'),
+                                           tag=(_TABLE, _ROW, _CELL, _COVERED)):
+            tag = elem.tag
+            if event == 'start':
+                if tag == _TABLE:
+                    table_index += 1
+                    in_target = (table_index == sheet_name if isinstance(sheet_name, int)
+                                 else elem.get(_NAME) == sheet_name)
+                    found = found or in_target
+                elif tag == _ROW and in_target:
+                    row = []
+                    pending_cells = 0
+                continue
+
+            if tag == _TABLE:
+                if in_target:
+                    break
+                _release(elem)
+            elif not in_target:
+                if tag == _ROW:
+                    _release(elem)
+            elif tag == _ROW:
+                repeat = int(elem.get(_ROWS_REPEATED, 1))
+                _release(elem)
+                if not row:
+                    pending_rows += repeat
+                    continue
+                for _ in range(pending_rows):
+                    yield [EMPTY]
+                pending_rows = 0
+                for _ in range(repeat):
+                    yield list(row)
+            else:
+                if tag == _CELL:
+                    value = _cell_text(elem) if as_text else _cell_value(elem)
+                else:
+                    value = EMPTY
+                repeat = int(elem.get(_COLS_REPEATED, 1))
+                # Queue blank cells; only write them if content follows
+                if isinstance(value, str) and value == EMPTY:
+                    pending_cells += repeat
+                else:
+                    if pending_cells:
+                        row.extend([EMPTY] * pending_cells)
+                        pending_cells = 0
+                    row.extend([value] * repeat)
+
+        if not found:
+            if isinstance(sheet_name, int):
+                raise ValueError(f"Worksheet index {sheet_name} is invalid, "
+                                 f"{table_index + 1} worksheets found")
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    finally:
+        stream.close()
+        archive.close()
+
+
+def read_ods_table(ods_path: str, sheet_name: Union[int, str] = 0,
+                   as_text: bool = False) -> List[List]:
+    """Read one sheet as a rectangular list of rows (padded with ``''``)."""
+    table = list(iter_ods_rows(ods_path, sheet_name, as_text=as_text))
+    width = max((len(r) for r in table), default=0)
+    for r in table:
+        if len(r) < width:
+            r.extend([EMPTY] * (width - len(r)))
+    return table
+
+
+def _numeric_column(values: List) -> Optional[np.ndarray]:
+    """Build a typed array for an all-numeric/blank column, or None if it isn't one."""
+    if not values:
+        return None
+    has_blank = False
+    all_int = True
+    for v in values:
+        t = type(v)
+        if t is int:
+            if v < _INT64_MIN or v > _INT64_MAX:
+                return None
+        elif t is float:
+            all_int = False
+        elif t is str and v == EMPTY:
+            has_blank = True
+        else:
+            return None
+    if all_int and not has_blank:
+        return np.array(values, dtype=np.int64)
+    if has_blank:
+        values = [np.nan if type(v) is str else v for v in values]
+    return np.array(values, dtype=np.float64)
+
+
+def read_ods_columns(ods_path: str, sheet_name: Union[int, str] = 0
+                     ) -> Tuple[pd.Index, List[Union[np.ndarray, pd.Series]]]:
+    """Read one sheet as typed columns.
+
+    The first row is the header. Numeric columns come back as int64 /
+    float64 NumPy arrays (blanks -> NaN); any other column is typed by
+    pandas' own parser so strings, dates and mixed columns match read_excel.
+
+    Returns:
+        (column labels, list of column arrays)
+    """
+    from pandas.io.parsers import TextParser
+
+    table = read_ods_table(ods_path, sheet_name)
+    if not table:
+        return pd.Index([]), []
+
+    # Same parser options as read_excel (GH 39808: blank rows are kept)
+    columns = TextParser([table[0]], header=0, skip_blank_lines=False).read().columns
+    body = table[1:]
+    arrays: List[Union[np.ndarray, pd.Series]] = []
+    for i in range(len(columns)):
+        values = [r[i] for r in body]
+        array = _numeric_column(values)
+        if array is None:
+            array = TextParser([['_']] + [[v] for v in values], header=0,
+                               skip_blank_lines=False).read().iloc[:, 0]
+        arrays.append(array)
+    return columns, arrays
+
+
+def read_ods(ods_path: str, sheet_name: Union[int, str, None] = 0) -> pd.DataFrame:
+    """Drop-in replacement for ``pd.read_excel(ods_path, engine='odf', sheet_name=...)``.
+
+    Falls back to pandas when lxml is not installed.
+    """
+    if sheet_name is None:
+        sheet_name = 0
+    if not LXML_AVAILABLE:
+        return pd.read_excel(ods_path, engine='odf', sheet_name=sheet_name)
+
+    columns, arrays = read_ods_columns(ods_path, sheet_name)
+    if not arrays:
+        return pd.DataFrame(columns=columns) if len(columns) else pd.DataFrame()
+    df = pd.DataFrame(dict(enumerate(arrays)))
+    df.columns = columns
+    return df
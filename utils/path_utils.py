@@ -82,6 +82,24 @@ def get_calibration_profiles_dir() -> str:
     """
     return os.path.join(get_calibration_dir(), "profiles")
 
+def get_calibration_lut_cache_dir() -> str:
+    """
+    Get the compiled scanner-calibration LUT cache directory.
+    
+    Returns:
+        str: Path to the calibration LUT cache directory
+    """
+    return os.path.join(get_calibration_dir(), "lut_cache")
+
+def get_alignment_cache_dir() -> str:
+    """
+    Get the alignment reference descriptor cache directory.
+    
+    Returns:
+        str: Path to the alignment cache directory
+    """
+    return os.path.join(get_base_data_dir(), "alignment_cache")
+
 def ensure_data_directories() -> None:
     """
     Ensure all required data directories exist.
@@ -92,7 +110,9 @@ def ensure_data_directories() -> None:
         get_color_libraries_dir(),
         get_templates_dir(),
         get_calibration_dir(),
-        get_calibration_profiles_dir()
+        get_calibration_profiles_dir(),
+        get_calibration_lut_cache_dir(),
+        get_alignment_cache_dir()
     ]
     
     for directory in directories:
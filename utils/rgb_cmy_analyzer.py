@@ -38,6 +38,9 @@ class RGBCMYAnalyzer:
         self.results = []
         self.masks = {}
         self.source_image = None
+        # When True, masked pixels are scanner-calibrated (compiled LUT)
+        # before RGB/CMY statistics are taken
+        self.apply_calibration = False
         self.analysis_data = {
             'metadata': {},
             'rgb_data': [],
@@ -150,6 +153,9 @@ class RGBCMYAnalyzer:
             
             # Extract RGB values for masked pixels
             masked_rgb = image_array[mask_pixels]  # Shape: (n_pixels, 3)
+            if self.apply_calibration:
+                from .scanner_calibration import apply_calibration_to_array
+                masked_rgb = apply_calibration_to_array(masked_rgb)
             
             # Compile results based on mode
             result = {
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Vectorised sample-window search for StampZ.
+
+Computes the mean RGB of *every* candidate position of a sample marker in
+one shot, instead of re-sampling each offset through
+``ColorAnalyzer._sample_area_color`` (a per-pixel ``getpixel`` loop).
+
+* Rectangles use a summed-area table (integral image) over a small ROI that
+  covers the whole search window, so each candidate costs four lookups.
+* Circles use the fixed disk mask of an unclipped marker, correlated with
+  every candidate window via a strided view. Candidates whose footprint is
+  clipped by the image border (where ``ColorAnalyzer`` shrinks the circle)
+  are evaluated individually with the exact same rule.
+
+Bounds, rounding, the Cartesian→PIL y flip, circle membership and the
+"skip fully transparent pixels" rule all mirror ``ColorAnalyzer`` so the
+winning position samples to the same colour the Results panel will show.
+
+Usage:
+    arr = image_to_sampling_array(pil_image)
+    best_xy, best_de = optimize_window_position(arr, marker, target_lab, 5)
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    from colorspacious import cspace_convert, deltaE
+    HAS_COLORSPACIOUS = True
+except ImportError:
+    HAS_COLORSPACIOUS = False
+
+
+# --------------------------------------------------------------------------- #
+# Image preparation
+# --------------------------------------------------------------------------- #
+
+def image_to_sampling_array(image: Image.Image) -> np.ndarray:
+    """Return an ``(H, W, 4)`` uint8 RGBA array as ``ColorAnalyzer`` sees it.
+
+    Non-RGB(A) modes are converted to RGB first (as the analyzer does);
+    images without alpha get a fully opaque alpha channel.
+    """
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB')
+    if image.mode == 'RGBA':
+        return np.asarray(image)
+    rgb = np.asarray(image)
+    out = np.empty(rgb.shape[:2] + (4,), dtype=np.uint8)
+    out[..., :3] = rgb
+    out[..., 3] = 255
+    return out
+
+
+# --------------------------------------------------------------------------- #
+# Candidate bounds (vectorised mirror of ColorAnalyzer._get_*_bounds)
+# --------------------------------------------------------------------------- #
+
+def _candidate_bounds(
+    xs: np.ndarray, ys: np.ndarray, img_w: int, img_h: int,
+    sample_type: str, width: float, height: float, anchor: str,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Clamped ``(left, top, right, bottom)`` arrays for Cartesian centres."""
+    x = np.round(xs)
+    pil_y = img_h - np.round(ys)
+    if sample_type == 'circle':
+        r = width / 2.0
+        left, top = np.trunc(x - r), np.trunc(pil_y - r)
+        right, bottom = np.trunc(x + r), np.trunc(pil_y + r)
+    elif anchor == 'center':
+        left, top = np.trunc(x - width / 2), np.trunc(pil_y - height / 2)
+        right, bottom = np.trunc(x + width / 2), np.trunc(pil_y + height / 2)
+    elif anchor == 'top_left':
+        left, top = np.trunc(x), np.trunc(pil_y - height)
+        right, bottom = np.trunc(x + width), np.trunc(pil_y)
+    elif anchor == 'top_right':
+        left, top = np.trunc(x - width), np.trunc(pil_y - height)
+        right, bottom = np.trunc(x), np.trunc(pil_y)
+    elif anchor == 'bottom_left':
+        left, top = np.trunc(x), np.trunc(pil_y)
+        right, bottom = np.trunc(x + width), np.trunc(pil_y + height)
+    else:  # bottom_right
+        left, top = np.trunc(x - width), np.trunc(pil_y)
+        right, bottom = np.trunc(x), np.trunc(pil_y + height)
+
+    left = np.clip(left, 0, img_w).astype(np.int64)
+    top = np.clip(top, 0, img_h).astype(np.int64)
+    right = np.clip(right, 0, img_w).astype(np.int64)
+    bottom = np.clip(bottom, 0, img_h).astype(np.int64)
+    return left, top, right, bottom
+
+
+def _circle_mask(left: int, top: int, right: int, bottom: int) -> np.ndarray:
+    """Boolean disk mask for clamped bounds, same rule as the analyzer."""
+    cx = (left + right) / 2.0
+    cy = (top + bottom) / 2.0
+    radius = min(right - left, bottom - top) / 2.0
+    yy = np.arange(top, bottom)[:, None]
+    xx = np.arange(left, right)[None, :]
+    return (xx - cx) ** 2 + (yy - cy) ** 2 <= radius * radius
+
+
+# --------------------------------------------------------------------------- #
+# Window means
+# --------------------------------------------------------------------------- #
+
+def window_mean_rgbs(
+    arr: np.ndarray,
+    centers: Sequence[Tuple[float, float]],
+    sample_type: str = 'rectangle',
+    width: float = 10,
+    height: float = 10,
+    anchor: str = 'center',
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean RGB of the sample window at each Cartesian centre.
+
+    Args:
+        arr: ``(H, W, 4)`` array from :func:`image_to_sampling_array`.
+        centers: ``(x, y)`` marker positions (Cartesian, y up).
+        sample_type, width, height, anchor: marker geometry.
+
+    Returns:
+        ``(means, counts)`` — ``(N, 3)`` float64 mean RGB (NaN where the
+        window has no opaque pixels) and ``(N,)`` opaque pixel counts.
+    """
+    img_h, img_w = arr.shape[:2]
+    pts = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    n = len(pts)
+    is_circle = str(sample_type).lower() == 'circle'
+    left, top, right, bottom = _candidate_bounds(
+        pts[:, 0], pts[:, 1], img_w, img_h,
+        'circle' if is_circle else 'rectangle',
+        float(width), float(height), anchor,
+    )
+    sums = np.zeros((n, 3), dtype=np.float64)
+    counts = np.zeros(n, dtype=np.int64)
+    valid = (right > left) & (bottom > top)
+    if not np.any(valid):
+        return np.full((n, 3), np.nan), counts
+
+    # Local ROI covering every candidate footprint
+    x0, x1 = int(left[valid].min()), int(right[valid].max())
+    y0, y1 = int(top[valid].min()), int(bottom[valid].max())
+    roi = arr[y0:y1, x0:x1]
+    opaque = (roi[..., 3] != 0).astype(np.float64)
+    weighted = roi[..., :3].astype(np.float64) * opaque[..., None]
+
+    if not is_circle:
+        # Summed-area tables with a zero row/column for exclusive lookups
+        sat = np.zeros((y1 - y0 + 1, x1 - x0 + 1, 4), dtype=np.float64)
+        sat[1:, 1:, :3] = weighted.cumsum(0).cumsum(1)
+        sat[1:, 1:, 3] = opaque.cumsum(0).cumsum(1)
+        l, t = left - x0, top - y0
+        r, b = right - x0, bottom - y0
+        box = sat[b, r] - sat[t, r] - sat[b, l] + sat[t, l]
+        sums[valid] = box[valid, :3]
+        counts[valid] = np.rint(box[valid, 3]).astype(np.int64)
+    else:
+        # All unclipped candidates share one disk mask: correlate it with
+        # every window of the ROI at once.
+        sizes_w, sizes_h = right - left, bottom - top
+        ref_w, ref_h = int(sizes_w[valid].max()), int(sizes_h[valid].max())
+        full = valid & (sizes_w == ref_w) & (sizes_h == ref_h)
+        if np.any(full):
+            kernel = _circle_mask(0, 0, ref_w, ref_h).astype(np.float64)
+            stack = np.concatenate([weighted, opaque[..., None]], axis=2)
+            views = np.lib.stride_tricks.sliding_window_view(
+                stack, (ref_h, ref_w), axis=(0, 1))  # (Y, X, 4, kh, kw)
+            idx = np.nonzero(full)[0]
+            picked = views[top[idx] - y0, left[idx] - x0]  # (k, 4, kh, kw)
+            acc = np.einsum('nchw,hw->nc', picked, kernel)
+            sums[idx] = acc[:, :3]
+            counts[idx] = np.rint(acc[:, 3]).astype(np.int64)
+        for i in np.nonzero(valid & ~full)[0]:
+            mask = _circle_mask(left[i], top[i], right[i], bottom[i])
+            sl = (slice(top[i] - y0, bottom[i] - y0), slice(left[i] - x0, right[i] - x0))
+            m = mask * opaque[sl]
+            sums[i] = np.einsum('hwc,hw->c', weighted[sl], mask)
+            counts[i] = int(m.sum())
+
+    means = np.full((n, 3), np.nan)
+    has = counts > 0
+    means[has] = sums[has] / counts[has, None]
+    return means, counts
+
+
+# --------------------------------------------------------------------------- #
+# Colour maths on candidate batches
+# --------------------------------------------------------------------------- #
+
+def _apply_calibration_rows(rgbs: np.ndarray) -> np.ndarray:
+    """Apply the active scanner calibration (if any) to each RGB row."""
+    try:
+        from utils.scanner_calibration import get_active_calibration
+        cal = get_active_calibration()
+    except Exception:
+        return rgbs
+    if not cal or not cal.is_valid:
+        return rgbs
+    # NaN rows (empty candidates) stay NaN through the vectorized correction
+    return cal.apply_correction_array(rgbs)
+
+
+def rgbs_to_lab(rgbs: np.ndarray, analyzer=None) -> np.ndarray:
+    """``(N, 3)`` RGB (0-255) → ``(N, 3)`` CIELab, like ``ColorAnalyzer.rgb_to_lab``."""
+    if HAS_COLORSPACIOUS:
+        return np.asarray(cspace_convert(rgbs / 255.0, "sRGB1", "CIELab"))
+    if analyzer is None:
+        from utils.color_analyzer import ColorAnalyzer
+        analyzer = ColorAnalyzer()
+    return np.array([analyzer.rgb_to_lab(tuple(row)) for row in rgbs])
+
+
+def delta_e_to_target(labs: np.ndarray, target_lab: Sequence[float]) -> np.ndarray:
+    """ΔE of each Lab row to ``target_lab`` (CAM02-UCS, else CIE76).
+
+    Same metric choice as ``ColorAnalyzer.calculate_delta_e``.
+    """
+    target = np.asarray(target_lab, dtype=np.float64)
+    if HAS_COLORSPACIOUS:
+        return np.asarray(deltaE(labs, target, input_space="CIELab",
+                                 uniform_space="CAM02-UCS"))
+    return np.sqrt(np.sum((labs - target) ** 2, axis=-1))
+
+
+# --------------------------------------------------------------------------- #
+# Search
+# --------------------------------------------------------------------------- #
+
+def optimize_window_position(
+    arr: np.ndarray,
+    marker: dict,
+    target_lab: Sequence[float],
+    radius_px: int,
+    step_px: int = 1,
+    analyzer=None,
+) -> Tuple[Optional[Tuple[float, float]], float]:
+    """Return the ΔE-minimising marker position within a square search window.
+
+    Args:
+        arr: ``(H, W, 4)`` array from :func:`image_to_sampling_array`.
+        marker: canvas marker dict (``image_pos``, ``sample_type``,
+            ``sample_width``, ``sample_height``, ``anchor``).
+        target_lab: Lab the sample should match (e.g. group mean).
+        radius_px: search half-width in pixels.
+        step_px: grid step.
+
+    Returns:
+        ``(best_xy, best_delta_e)``; ``(None, inf)`` if no candidate has
+        any opaque pixel. Ties go to the first candidate in row-major
+        ``(dy, dx)`` order, matching the original nested-loop search.
+    """
+    x0, y0 = marker["image_pos"]
+    radius = max(0, int(radius_px))
+    step = max(1, int(step_px))
+    offsets = np.arange(-radius, radius + 1, step)
+    dy, dx = np.meshgrid(offsets, offsets, indexing='ij')
+    centers = np.stack([x0 + dx.ravel(), y0 + dy.ravel()], axis=1)
+
+    means, counts = window_mean_rgbs(
+        arr, centers,
+        sample_type=marker.get("sample_type", "rectangle"),
+        width=marker.get("sample_width", 10),
+        height=marker.get("sample_height", 10),
+        anchor=marker.get("anchor", "center"),
+    )
+    ok = counts > 0
+    if not np.any(ok):
+        return None, float("inf")
+
+    rgbs = _apply_calibration_rows(means[ok])
+    des = np.full(len(centers), np.inf)
+    des[ok] = delta_e_to_target(rgbs_to_lab(rgbs, analyzer), target_lab)
+    best = int(np.argmin(des))
+    return (x0 + int(dx.ravel()[best]), y0 + int(dy.ravel()[best])), float(des[best])
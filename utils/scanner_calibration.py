@@ -16,6 +16,7 @@ Correction model: per-channel linear fit from in-gamut patches
 import json
 import os
 import math
+import hashlib
 import logging
 import numpy as np
 from PIL import Image
@@ -58,6 +59,45 @@ def apply_calibration_to_rgb(rgb: Tuple[float, float, float]) -> Tuple[float, fl
     return rgb
 
 
+def apply_calibration_to_array(arr: np.ndarray) -> np.ndarray:
+    """Apply active calibration to an image or pixel batch.
+
+    Integer arrays (uint8/uint16) go through the compiled per-channel LUTs;
+    float arrays are treated as 0-255 RGB and corrected directly. Extra
+    channels (e.g. alpha) are passed through untouched.
+
+    Args:
+        arr: Array of shape (..., 3) or (..., 4)
+
+    Returns:
+        Corrected array with the same shape and dtype, or ``arr`` itself
+        if no calibration is active
+    """
+    if _active_calibration and _active_calibration.is_valid:
+        return _active_calibration.apply_to_array(arr)
+    return arr
+
+
+def apply_calibration_to_image(image: Image.Image) -> Image.Image:
+    """Apply active calibration to a PIL image (RGB or RGBA).
+
+    Returns the image unchanged if no calibration is active or the mode
+    has no RGB channels to correct.
+    """
+    if not (_active_calibration and _active_calibration.is_valid):
+        return image
+    if image.mode not in ('RGB', 'RGBA'):
+        return image
+    return Image.fromarray(_active_calibration.apply_to_array(np.asarray(image)), image.mode)
+
+
+# Bit depths compiled into per-channel 1-D LUTs (and cached on disk)
+LUT_BIT_DEPTHS = (8, 16)
+
+# Default edge length of exported 3D LUTs (.cube)
+LUT_3D_SIZE = 33
+
+
 # Patch layout for the StampZ calibration target (v2.0 — 3×4 grid)
 # Maps grid position (row, col) in the scanned image to (name, digital_rgb)
 # Target is oriented with Black at top-left when scanned
@@ -128,6 +168,10 @@ class ScannerCalibration:
         self.profile_name: str = ""
         self.created_date: str = ""
         self.scanner_info: str = ""
+        self.profile_path: str = ""
+        # Compiled 1-D LUTs keyed by bit depth, valid for _luts_key only
+        self._luts: Dict[int, np.ndarray] = {}
+        self._luts_key: str = ""
     
     def load_reference(self, reference_path: Optional[str] = None) -> bool:
         """Load reference values from JSON file.
@@ -389,6 +433,187 @@ class ScannerCalibration:
         
         return (corrected[0], corrected[1], corrected[2])
     
+    # ---- Array / LUT application ----
+    
+    def _coefficient_matrix(self) -> np.ndarray:
+        """Return correction coefficients as a (3, 3) [a, b, c] matrix.
+        
+        Linear profiles are padded with a zero quadratic term, so one
+        expression covers both profile versions.
+        """
+        rows = []
+        for ch_name in ('R', 'G', 'B'):
+            coeffs = [float(c) for c in self.correction_coefficients[ch_name]]
+            if len(coeffs) == 2:
+                coeffs = [0.0] + coeffs
+            rows.append(coeffs)
+        return np.array(rows, dtype=np.float64)
+    
+    def _coefficient_key(self) -> str:
+        """Hash of the correction coefficients, used to validate cached LUTs."""
+        payload = json.dumps(self.correction_coefficients, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def apply_correction_array(self, rgb: np.ndarray) -> np.ndarray:
+        """Apply correction to an array of RGB values.
+        
+        Vectorized equivalent of :meth:`apply_correction` for any number of
+        pixels. NaN entries stay NaN.
+        
+        Args:
+            rgb: Array of shape (..., 3), floats 0-255
+            
+        Returns:
+            Corrected float64 array of the same shape, clamped to 0-255
+        """
+        rgb = np.asarray(rgb, dtype=np.float64)
+        if not self.correction_coefficients:
+            return rgb.copy()
+        m = self._coefficient_matrix()
+        x = rgb[..., :3]
+        y = m[:, 0] * x * x + m[:, 1] * x + m[:, 2]
+        out = rgb.copy()
+        out[..., :3] = np.clip(y, 0.0, 255.0)
+        return out
+    
+    def compile_lut(self, bits: int = 8) -> np.ndarray:
+        """Compile the correction into per-channel 1-D lookup tables.
+        
+        Input codes are scaled to 0-255, corrected, and scaled back to the
+        same bit depth, so a uint16 image stays uint16 with full precision.
+        Tables are cached on the instance until the coefficients change.
+        
+        Args:
+            bits: Bit depth of the input codes (8 → 256 entries, 16 → 65536)
+            
+        Returns:
+            Array of shape (3, 2**bits) with dtype uint8 or uint16
+        """
+        if bits not in LUT_BIT_DEPTHS:
+            raise ValueError(f"Unsupported LUT bit depth: {bits}")
+        key = self._coefficient_key()
+        if key != self._luts_key:
+            self._luts = {}
+            self._luts_key = key
+        if bits not in self._luts:
+            max_code = (1 << bits) - 1
+            codes = np.arange(max_code + 1, dtype=np.float64) * (255.0 / max_code)
+            corrected = self.apply_correction_array(np.repeat(codes[:, None], 3, axis=1))
+            dtype = np.uint8 if bits == 8 else np.uint16
+            lut = np.rint(corrected.T * (max_code / 255.0)).astype(dtype)
+            self._luts[bits] = lut
+        return self._luts[bits]
+    
+    def apply_to_array(self, arr: np.ndarray) -> np.ndarray:
+        """Apply correction to an image or pixel batch.
+        
+        uint8 and uint16 arrays are corrected with the compiled 1-D LUTs
+        (one fancy-index per channel); anything else is treated as 0-255
+        floats and goes through :meth:`apply_correction_array`.
+        
+        Args:
+            arr: Array of shape (..., 3) or (..., 4); channels beyond the
+                first three are copied unchanged
+            
+        Returns:
+            Corrected array with the same shape and dtype as ``arr``
+        """
+        arr = np.asarray(arr)
+        if not self.correction_coefficients:
+            return arr
+        if arr.dtype == np.uint8 or arr.dtype == np.uint16:
+            lut = self.compile_lut(8 if arr.dtype == np.uint8 else 16)
+            out = arr.copy()
+            for ch in range(3):
+                out[..., ch] = lut[ch][arr[..., ch]]
+            return out
+        return self.apply_correction_array(arr).astype(arr.dtype, copy=False)
+    
+    def compile_lut_3d(self, size: int = LUT_3D_SIZE) -> np.ndarray:
+        """Sample the correction on a regular RGB lattice.
+        
+        Args:
+            size: Number of lattice points per axis
+            
+        Returns:
+            Float32 array of shape (size, size, size, 3) indexed [r, g, b],
+            with corrected values normalized to 0-1
+        """
+        axis = np.linspace(0.0, 255.0, size)
+        r, g, b = np.meshgrid(axis, axis, axis, indexing='ij')
+        grid = np.stack([r, g, b], axis=-1)
+        return (self.apply_correction_array(grid) / 255.0).astype(np.float32)
+    
+    def export_cube_lut(self, path: str, size: int = LUT_3D_SIZE) -> bool:
+        """Export the correction as a 3D LUT in Adobe/Resolve .cube format.
+        
+        Args:
+            path: Output .cube file path
+            size: Number of lattice points per axis
+            
+        Returns:
+            True if exported successfully
+        """
+        if not self.is_valid:
+            logger.error("Cannot export LUT from invalid calibration profile")
+            return False
+        
+        lut = self.compile_lut_3d(size)
+        # .cube lists entries with red varying fastest, then green, then blue
+        rows = lut.transpose(2, 1, 0, 3).reshape(-1, 3)
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(f'TITLE "{self.profile_name or "StampZ Scanner Calibration"}"\n')
+                f.write(f'# Created by StampZ from profile dated {self.created_date}\n')
+                f.write(f'LUT_3D_SIZE {size}\n')
+                f.write('DOMAIN_MIN 0.0 0.0 0.0\n')
+                f.write('DOMAIN_MAX 1.0 1.0 1.0\n')
+                np.savetxt(f, rows, fmt='%.6f')
+            logger.info(f"Exported {size}³ LUT to {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to export LUT: {e}")
+            return False
+    
+    @staticmethod
+    def _lut_cache_path(key: str) -> str:
+        """Path of the compiled-LUT cache for a coefficient hash."""
+        from .path_utils import get_calibration_lut_cache_dir
+        return os.path.join(get_calibration_lut_cache_dir(), f"{key}.npz")
+    
+    def _save_lut_cache(self) -> None:
+        """Compile all LUT bit depths and write them to the app's LUT cache."""
+        try:
+            arrays = {f'lut{bits}': self.compile_lut(bits) for bits in LUT_BIT_DEPTHS}
+            path = self._lut_cache_path(self._luts_key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp.npz'
+            np.savez_compressed(tmp_path, key=np.array(self._luts_key), **arrays)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache compiled LUTs: {e}")
+    
+    def _load_lut_cache(self) -> bool:
+        """Load compiled LUTs for the current coefficients if they are cached."""
+        key = self._coefficient_key()
+        cache_path = self._lut_cache_path(key)
+        if not os.path.exists(cache_path):
+            return False
+        try:
+            with np.load(cache_path) as data:
+                if str(data['key']) != key:
+                    return False
+                luts = {bits: data[f'lut{bits}'] for bits in LUT_BIT_DEPTHS}
+            self._luts = luts
+            self._luts_key = key
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable LUT cache {cache_path}: {e}")
+            return False
+    
     def save_profile(self, path: str, name: str = "", scanner_info: str = "") -> bool:
         """Save calibration profile to JSON file.
         
@@ -433,6 +658,9 @@ class ScannerCalibration:
             os.makedirs(os.path.dirname(path), exist_ok=True)
             with open(path, 'w') as f:
                 json.dump(profile, f, indent=2)
+            self.profile_path = path
+            if not self._load_lut_cache():
+                self._save_lut_cache()
             logger.info(f"Saved calibration profile to {path}")
             return True
         except Exception as e:
@@ -472,6 +700,10 @@ class ScannerCalibration:
                 self.patch_results.append(result)
             
             self.is_valid = True
+            self.profile_path = path
+            if not self._load_lut_cache():
+                # First load of these coefficients on this machine
+                self._save_lut_cache()
             logger.info(f"Loaded calibration profile from {path}: {self.profile_name}")
             return True
             
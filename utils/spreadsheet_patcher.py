@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Batched in-place cell patching for .ods and .xlsx workbooks.
+
+K-means cluster/centroid saves, ΔE writes, reference-point ΔE and the
+realtime sheet merge all change a handful of cells in an existing workbook
+and must leave everything else (styles, validation, formulas, other sheets)
+untouched. This module applies a whole batch of edits in one pass:
+
+- the sheet XML is parsed once; rows and cells are located with a single
+  merge walk over the sorted edits, splitting ``number-rows-repeated`` /
+  ``number-columns-repeated`` runs only where an edit lands
+- the archive is written once; every other zip member is stream-copied
+  with its original compression (so an .ods ``mimetype`` stays stored first)
+
+Edits are ``(sheet, row, column, value)`` with 0-based sheet coordinates
+(row 0 is the header row). ``sheet`` is a sheet name or index, None for the
+first sheet. ``value`` is a number, a string, or None/NaN to clear the cell.
+
+Locking, backups and retrying the final replace stay with the callers; pass
+``output_path`` to write the patched copy somewhere other than ``file_path``.
+"""
+
+import os
+import re
+import bisect
+import math
+import shutil
+import zipfile
+import logging
+from collections import defaultdict
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class CellEdit(NamedTuple):
+    """One cell change; row/column are 0-based sheet coordinates."""
+    sheet: Union[int, str, None]
+    row: int
+    column: int
+    value: Any
+
+
+# ----------------------------------------------------------------------------
+# Shared helpers
+# ----------------------------------------------------------------------------
+
+def _normalize_value(value):
+    """Return an int/float/bool/str, or None for blank/NaN/inf."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _group_edits(edits: Iterable) -> Dict[Any, Dict[int, Dict[int, Any]]]:
+    """sheet -> row -> column -> value (later edits to the same cell win)."""
+    grouped: Dict[Any, Dict[int, Dict[int, Any]]] = defaultdict(lambda: defaultdict(dict))
+    for sheet, row, column, value in edits:
+        if row < 0 or column < 0:
+            raise ValueError(f"Negative cell coordinates ({row}, {column})")
+        grouped[0 if sheet is None else sheet][int(row)][int(column)] = _normalize_value(value)
+    return grouped
+
+
+def _write_archive(src_path: str, dst_path: str, replaced: Dict[str, bytes],
+                   removed: Iterable[str] = ()) -> None:
+    """Rewrite a zip with some members replaced; the rest are stream-copied."""
+    removed = set(removed)
+    temp_path = f"{dst_path}.patch-tmp"
+    try:
+        with zipfile.ZipFile(src_path, 'r') as zin, zipfile.ZipFile(temp_path, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in removed:
+                    continue
+                out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                out_info.compress_type = info.compress_type
+                out_info.external_attr = info.external_attr
+                out_info.create_system = info.create_system
+                if info.filename in replaced:
+                    zout.writestr(out_info, replaced[info.filename])
+                else:
+                    with zin.open(info) as src, zout.open(out_info, 'w') as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(temp_path, dst_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# ----------------------------------------------------------------------------
+# ODS
+# ----------------------------------------------------------------------------
+
+OFFICE = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+CALCEXT = '{urn:org:documentfoundation:names:experimental:calc:xmlns:calcext:1.0}'
+
+_ODS_TABLE = f'{TABLE}table'
+_ODS_ROW = f'{TABLE}table-row'
+_ODS_CELL = f'{TABLE}table-cell'
+_ODS_COVERED = f'{TABLE}covered-table-cell'
+_ODS_ROW_CONTAINERS = {f'{TABLE}table-header-rows', f'{TABLE}table-row-group', f'{TABLE}table-rows'}
+_ROWS_REPEATED = f'{TABLE}number-rows-repeated'
+_COLS_REPEATED = f'{TABLE}number-columns-repeated'
+
+# Value attributes that must not survive a rewrite. office:string-value in
+# particular is left behind when a cell was previously stored as text (e.g.
+# a pandas/ezodf export of str() values); next to office:value-type="float"
+# it makes Calc show the number with its forced-text apostrophe and breaks
+# formulas that use it.
+_ODS_VALUE_ATTRS = (
+    f'{OFFICE}value-type', f'{OFFICE}value', f'{OFFICE}string-value',
+    f'{OFFICE}date-value', f'{OFFICE}time-value', f'{OFFICE}boolean-value',
+    f'{OFFICE}currency', f'{TABLE}formula', f'{CALCEXT}value-type',
+)
+
+
+def _ods_rows(container):
+    """Yield the table-row elements of a table in order (through row groups)."""
+    for child in container:
+        if child.tag == _ODS_ROW:
+            yield child
+        elif child.tag in _ODS_ROW_CONTAINERS:
+            yield from _ods_rows(child)
+
+
+def _ods_find_table(root, sheet):
+    tables = list(root.iter(_ODS_TABLE))
+    if isinstance(sheet, int):
+        if sheet >= len(tables):
+            raise ValueError(f"Worksheet index {sheet} is invalid, {len(tables)} worksheets found")
+        return tables[sheet]
+    for table in tables:
+        if table.get(f'{TABLE}name') == sheet:
+            return table
+    raise ValueError(f"Worksheet named '{sheet}' not found")
+
+
+def _split_repeated(elem, attr: str, start: int, hits: List[int]) -> Dict[int, Any]:
+    """Split a repeated row/cell so each position in ``hits`` is its own element.
+
+    The pieces are copies of ``elem`` (content included), so the runs between
+    hits keep whatever the repeated element held.
+
+    Returns:
+        position -> element for every hit
+    """
+    repeat = int(elem.get(attr, 1))
+    if repeat == 1:
+        return {hits[0]: elem}
+
+    def piece(count):
+        copy = deepcopy(elem)
+        if count > 1:
+            copy.set(attr, str(count))
+        elif attr in copy.attrib:
+            del copy.attrib[attr]
+        return copy
+
+    parent = elem.getparent()
+    index = parent.index(elem)
+    pieces = []
+    found = {}
+    pos = start
+    for hit in hits:
+        if hit > pos:
+            pieces.append(piece(hit - pos))
+        found[hit] = piece(1)
+        pieces.append(found[hit])
+        pos = hit + 1
+    if pos < start + repeat:
+        pieces.append(piece(start + repeat - pos))
+
+    # Tail text (whitespace) stays with the last piece
+    pieces[-1].tail = elem.tail
+    parent.remove(elem)
+    for offset, p in enumerate(pieces):
+        if offset < len(pieces) - 1:
+            p.tail = None
+        parent.insert(index + offset, p)
+    return found
+
+
+def _ods_append_text(cell, text: str) -> None:
+    """Add ``text`` as text:p paragraphs, encoding space runs as text:s.
+
+    ODF collapses runs of spaces and drops them at paragraph edges, so those
+    are written as ``<text:s text:c="n"/>`` to survive a round trip.
+    """
+    for line in text.split('\n'):
+        p = etree.SubElement(cell, f'{TEXT}p')
+        holder = None  # last text:s; following text goes in its tail
+        parts = re.split(r'( +)', line)
+        for i, part in enumerate(parts):
+            if not part:
+                continue
+            at_edge = (p.text is None and holder is None) or not any(parts[i + 1:])
+            if part[0] == ' ' and (len(part) > 1 or at_edge):
+                holder = etree.SubElement(p, f'{TEXT}s')
+                if len(part) > 1:
+                    holder.set(f'{TEXT}c', str(len(part)))
+            elif holder is None:
+                p.text = (p.text or '') + part
+            else:
+                holder.tail = (holder.tail or '') + part
+
+
+def _ods_set_cell(cell, value) -> None:
+    """Replace a cell's value and text, keeping its style and annotations."""
+    for attr in _ODS_VALUE_ATTRS:
+        if attr in cell.attrib:
+            del cell.attrib[attr]
+    for p in cell.findall(f'{TEXT}p'):
+        cell.remove(p)
+    if value is None:
+        return
+    if isinstance(value, bool):
+        cell.set(f'{OFFICE}value-type', 'boolean')
+        cell.set(f'{OFFICE}boolean-value', 'true' if value else 'false')
+        _ods_append_text(cell, 'TRUE' if value else 'FALSE')
+    elif isinstance(value, (int, float)):
+        cell.set(f'{OFFICE}value-type', 'float')
+        cell.set(f'{OFFICE}value', str(value))
+        _ods_append_text(cell, str(value))
+    else:
+        cell.set(f'{OFFICE}value-type', 'string')
+        _ods_append_text(cell, value)
+
+
+def _ods_patch_row(row, columns: Dict[int, Any]) -> None:
+    targets = sorted(columns)
+    ti = 0
+    pos = 0
+    for cell in list(row):
+        if ti == len(targets):
+            return
+        if cell.tag not in (_ODS_CELL, _ODS_COVERED):
+            continue
+        end = pos + int(cell.get(_COLS_REPEATED, 1))
+        hits = []
+        while ti < len(targets) and targets[ti] < end:
+            hits.append(targets[ti])
+            ti += 1
+        if hits:
+            for col, piece in _split_repeated(cell, _COLS_REPEATED, pos, hits).items():
+                _ods_set_cell(piece, columns[col])
+        pos = end
+
+    # Columns past the end of the row
+    for col in targets[ti:]:
+        if col > pos:
+            filler = etree.SubElement(row, _ODS_CELL)
+            if col - pos > 1:
+                filler.set(_COLS_REPEATED, str(col - pos))
+        _ods_set_cell(etree.SubElement(row, _ODS_CELL), columns[col])
+        pos = col + 1
+
+
+def _ods_patch_table(table, rows: Dict[int, Dict[int, Any]]) -> None:
+    targets = sorted(rows)
+    ti = 0
+    pos = 0
+    for row in list(_ods_rows(table)):
+        if ti == len(targets):
+            return
+        end = pos + int(row.get(_ROWS_REPEATED, 1))
+        hits = []
+        while ti < len(targets) and targets[ti] < end:
+            hits.append(targets[ti])
+            ti += 1
+        if hits:
+            for r, piece in _split_repeated(row, _ROWS_REPEATED, pos, hits).items():
+                _ods_patch_row(piece, rows[r])
+        pos = end
+
+    # Rows past the end of the table go right after its last row
+    if ti < len(targets):
+        last = None
+        for last in _ods_rows(table):
+            pass
+        if last is None:
+            raise ValueError(f"Sheet '{table.get(f'{TABLE}name')}' has no rows to extend")
+        parent = last.getparent()
+        index = parent.index(last) + 1
+        for r in targets[ti:]:
+            if r > pos:
+                filler = etree.Element(_ODS_ROW)
+                if r - pos > 1:
+                    filler.set(_ROWS_REPEATED, str(r - pos))
+                etree.SubElement(filler, _ODS_CELL)
+                parent.insert(index, filler)
+                index += 1
+            new_row = etree.Element(_ODS_ROW)
+            _ods_patch_row(new_row, rows[r])
+            parent.insert(index, new_row)
+            index += 1
+            pos = r + 1
+
+
+def _patch_ods(file_path: str, grouped, output_path: str) -> None:
+    with zipfile.ZipFile(file_path, 'r') as zf:
+        with zf.open('content.xml') as f:
+            tree = etree.parse(f)
+    root = tree.getroot()
+    for sheet, rows in grouped.items():
+        _ods_patch_table(_ods_find_table(root, sheet), rows)
+    content = etree.tostring(tree, xml_declaration=True, encoding='UTF-8')
+    _write_archive(file_path, output_path, {'content.xml': content})
+
+
+# ----------------------------------------------------------------------------
+# XLSX
+# ----------------------------------------------------------------------------
+
+MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+CONTENT_TYPES = '{http://schemas.openxmlformats.org/package/2006/content-types}'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+_CELL_REF = re.compile(r'^([A-Z]+)(\d+)$')
+
+
+def column_letter(col: int) -> str:
+    """0-based column index -> Excel letters (0 -> 'A', 26 -> 'AA')."""
+    letters = ''
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _column_index(letters: str) -> int:
+    col = 0
+    for ch in letters:
+        col = col * 26 + (ord(ch) - 64)
+    return col - 1
+
+
+def _xlsx_sheet_parts(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """(sheet name, zip member) in workbook order."""
+    workbook = etree.fromstring(zf.read('xl/workbook.xml'))
+    rels = etree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{PKG_REL}Relationship')}
+    parts = []
+    for sheet in workbook.iter(f'{MAIN}sheet'):
+        target = targets[sheet.get(f'{REL}id')]
+        member = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+        parts.append((sheet.get('name'), os.path.normpath(member).replace(os.sep, '/')))
+    return parts
+
+
+def _xlsx_set_cell(cell, value) -> bool:
+    """Replace a <c>'s value, keeping its style. Returns True if a formula was removed."""
+    had_formula = False
+    for child in list(cell):
+        if child.tag == f'{MAIN}f':
+            had_formula = True
+        if child.tag in (f'{MAIN}f', f'{MAIN}v', f'{MAIN}is'):
+            cell.remove(child)
+    if 't' in cell.attrib:
+        del cell.attrib['t']
+    if value is None:
+        return had_formula
+    if isinstance(value, bool):
+        cell.set('t', 'b')
+        etree.SubElement(cell, f'{MAIN}v').text = '1' if value else '0'
+    elif isinstance(value, (int, float)):
+        etree.SubElement(cell, f'{MAIN}v').text = repr(value) if isinstance(value, float) else str(value)
+    else:
+        cell.set('t', 'inlineStr')
+        t = etree.SubElement(etree.SubElement(cell, f'{MAIN}is'), f'{MAIN}t')
+        t.text = value
+        if value != value.strip():
+            t.set(XML_SPACE, 'preserve')
+    return had_formula
+
+
+def _xlsx_patch_sheet(root, rows: Dict[int, Dict[int, Any]]) -> Tuple[bool, int, int]:
+    """Apply edits to a worksheet tree; returns (formula_removed, max_row, max_col)."""
+    sheet_data = root.find(f'{MAIN}sheetData')
+    existing = {}
+    implied = 0
+    for row in sheet_data.iter(f'{MAIN}row'):
+        # r is optional; without it a row follows the previous one
+        implied = int(row.get('r', implied + 1))
+        existing[implied - 1] = row
+
+    row_keys = sorted(existing)
+    formula_removed = False
+    max_row = max_col = 0
+    for r in sorted(rows):
+        row = existing.get(r)
+        if row is None:
+            row = etree.Element(f'{MAIN}row', r=str(r + 1))
+            at = bisect.bisect_right(row_keys, r)
+            if at < len(row_keys):
+                existing[row_keys[at]].addprevious(row)
+            else:
+                sheet_data.append(row)
+            row_keys.insert(at, r)
+            existing[r] = row
+        elif 'spans' in row.attrib:
+            # spans is only an optimisation hint and may no longer cover the row
+            del row.attrib['spans']
+
+        cells = {}
+        implied_col = -1
+        for cell in row.iter(f'{MAIN}c'):
+            ref = cell.get('r')
+            match = _CELL_REF.match(ref) if ref else None
+            implied_col = _column_index(match.group(1)) if match else implied_col + 1
+            cells[implied_col] = cell
+        for col in sorted(rows[r]):
+            cell = cells.get(col)
+            if cell is None:
+                cell = etree.Element(f'{MAIN}c', r=f'{column_letter(col)}{r + 1}')
+                following = [k for k in cells if k > col]
+                if following:
+                    cells[min(following)].addprevious(cell)
+                else:
+                    row.append(cell)
+                cells[col] = cell
+            formula_removed |= _xlsx_set_cell(cell, rows[r][col])
+            max_col = max(max_col, col)
+        max_row = max(max_row, r)
+
+    dimension = root.find(f'{MAIN}dimension')
+    if dimension is not None:
+        ref = dimension.get('ref', 'A1')
+        last = ref.split(':')[-1]
+        match = _CELL_REF.match(last)
+        if match:
+            end_col = max(_column_index(match.group(1)), max_col)
+            end_row = max(int(match.group(2)), max_row + 1)
+            start = ref.split(':')[0]
+            dimension.set('ref', f'{start}:{column_letter(end_col)}{end_row}')
+    return formula_removed, max_row, max_col
+
+
+def _xlsx_force_recalc(workbook_xml: bytes) -> bytes:
+    """Ask Excel to recalculate on open (cached results of dependents are stale)."""
+    root = etree.fromstring(workbook_xml)
+    calc = root.find(f'{MAIN}calcPr')
+    if calc is None:
+        calc = etree.Element(f'{MAIN}calcPr')
+        anchor = None
+        for name in ('sheets', 'functionGroups', 'externalReferences', 'definedNames'):
+            found = root.find(f'{MAIN}{name}')
+            if found is not None:
+                anchor = found
+        anchor.addnext(calc)
+    calc.set('fullCalcOnLoad', '1')
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _drop_calc_chain(zf: zipfile.ZipFile, replaced: Dict[str, bytes]) -> List[str]:
+    """Remove xl/calcChain.xml and its references; it may list removed formulas."""
+    if 'xl/calcChain.xml' not in zf.namelist():
+        return []
+    rels = etree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in list(rels):
+        if rel.get('Target', '').endswith('calcChain.xml'):
+            rels.remove(rel)
+    replaced['xl/_rels/workbook.xml.rels'] = etree.tostring(
+        rels, xml_declaration=True, encoding='UTF-8', standalone=True)
+    types = etree.fromstring(zf.read('[Content_Types].xml'))
+    for override in list(types):
+        if override.get('PartName') == '/xl/calcChain.xml':
+            types.remove(override)
+    replaced['[Content_Types].xml'] = etree.tostring(
+        types, xml_declaration=True, encoding='UTF-8', standalone=True)
+    return ['xl/calcChain.xml']
+
+
+def _xlsx_sheet_member(parts: List[Tuple[str, str]], sheet) -> str:
+    """Zip member of a worksheet given by index or name."""
+    if isinstance(sheet, int):
+        if sheet >= len(parts):
+            raise ValueError(f"Worksheet index {sheet} is invalid, {len(parts)} worksheets found")
+        return parts[sheet][1]
+    member = next((m for name, m in parts if name == sheet), None)
+    if member is None:
+        raise ValueError(f"Worksheet named '{sheet}' not found")
+    return member
+
+
+def _patch_xlsx(file_path: str, grouped, output_path: str) -> None:
+    replaced: Dict[str, bytes] = {}
+    removed: List[str] = []
+    with zipfile.ZipFile(file_path, 'r') as zf:
+        parts = _xlsx_sheet_parts(zf)
+        # One sheet may be named both by index and by name; merge its edits
+        # so each member is parsed and serialised once
+        by_member: Dict[str, Dict[int, Dict[int, Any]]] = {}
+        for sheet, rows in grouped.items():
+            merged = by_member.setdefault(_xlsx_sheet_member(parts, sheet), {})
+            for r, cols in rows.items():
+                merged.setdefault(r, {}).update(cols)
+        formula_removed = False
+        for member, rows in by_member.items():
+            root = etree.fromstring(zf.read(member))
+            removed_here, _, _ = _xlsx_patch_sheet(root, rows)
+            formula_removed |= removed_here
+            replaced[member] = etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+        replaced['xl/workbook.xml'] = _xlsx_force_recalc(zf.read('xl/workbook.xml'))
+        if formula_removed:
+            removed = _drop_calc_chain(zf, replaced)
+    _write_archive(file_path, output_path, replaced, removed)
+
+
+# ----------------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------------
+
+def patch_workbook(file_path: str, edits: Iterable, output_path: Optional[str] = None) -> int:
+    """Apply a batch of cell edits to an .ods or .xlsx file in one pass.
+
+    Args:
+        file_path: Workbook to patch
+        edits: ``(sheet, row, column, value)`` tuples or ``CellEdit``s
+        output_path: Where to write the result (default: replace ``file_path``)
+
+    Returns:
+        Number of distinct cells written
+
+    Raises:
+        ValueError: For an unsupported format or a missing sheet
+    """
+    if not LXML_AVAILABLE:
+        raise ImportError("lxml is required for patching workbooks. Install with: pip install lxml")
+
+    grouped = _group_edits(edits)
+    count = sum(len(cols) for rows in grouped.values() for cols in rows.values())
+    output_path = output_path or file_path
+    if not count:
+        if output_path != file_path:
+            shutil.copy2(file_path, output_path)
+        return 0
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.ods':
+        _patch_ods(file_path, grouped, output_path)
+    elif ext == '.xlsx':
+        _patch_xlsx(file_path, grouped, output_path)
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+    logger.debug(f"Patched {count} cells in {file_path} -> {output_path}")
+    return count
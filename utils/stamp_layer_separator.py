@@ -18,6 +18,8 @@ Usage from StampZ:
     ink_lab = result['ink_aggregate_lab']              # the "whole stamp" color
 """
 
+import threading
+
 import numpy as np
 from PIL import Image
 from typing import Dict, Optional, Tuple
@@ -64,15 +66,31 @@ class LayerResult:
 class StampLayerSeparator:
     """Separates a stamp image into background, paper, ink, and cancellation layers."""
 
-    def __init__(self, image: Image.Image):
+    def __init__(self, image: Image.Image, calibrate: bool = False):
         """
         Args:
             image: PIL Image (RGB mode)
+            calibrate: Apply the active scanner calibration to every pixel
+                up front (via its compiled LUT), so thresholds, masks and
+                layer images all see calibrated colour.  When False only
+                the final aggregates are corrected.
         """
         self._original = image.convert('RGB')
+        self._calibrated = False
+        if calibrate:
+            from utils.scanner_calibration import apply_calibration_to_image
+            calibrated = apply_calibration_to_image(self._original)
+            self._calibrated = calibrated is not self._original
+            self._original = calibrated
         self._arr = np.array(self._original, dtype=np.float32)
         self._bg_rgb: Optional[Tuple[float, float, float]] = None
 
+        # Image-wide Lab plane, built lazily on first use and shared by
+        # every stage (and every threshold change) for the life of the
+        # separator.  See the ``lab`` property.
+        self._lab: Optional[np.ndarray] = None
+        self._plane_lock = threading.Lock()  # full-res passes may run on a worker
+
         # Tunable thresholds
         self.background_delta_e_threshold = 12.0   # ΔE tolerance for background removal
         self.cancellation_brightness_max = 60       # Max brightness for cancellation ink
@@ -80,6 +98,63 @@ class StampLayerSeparator:
         self.ink_outlier_delta_e = 0.0              # ΔE filter for ink outliers (0 = off)
         self.num_ink_colors: int = 1               # set to 2 for bicolor stamps
 
+    # ------------------------------------------------------------------ #
+    # Precomputed colour plane
+    # ------------------------------------------------------------------ #
+
+    # Rows converted per cspace_convert call.  colorspacious works in
+    # float64, so converting in strips keeps its temporaries to a few MB
+    # instead of several full-frame copies on large scans.
+    LAB_CHUNK_ROWS = 256
+
+    # Above this many ink pixels, bicolor k-means is fitted on a seeded
+    # subsample with MiniBatchKMeans and every pixel labelled afterwards.
+    KMEANS_MAX_SAMPLES = 50_000
+
+    @property
+    def lab(self) -> np.ndarray:
+        """CIELab plane of the whole image (H×W×3 float32), computed once."""
+        if self._lab is None:
+            with self._plane_lock:
+                if self._lab is None:
+                    self._lab = self._rgb_to_lab_plane(self._arr)
+        return self._lab
+
+    @classmethod
+    def _rgb_to_lab_plane(cls, arr: np.ndarray) -> np.ndarray:
+        """Convert an H×W×3 0-255 RGB array to a float32 Lab plane in row strips."""
+        h, w = arr.shape[:2]
+        lab = np.empty((h, w, 3), dtype=np.float32)
+        step = max(1, int(cls.LAB_CHUNK_ROWS))
+        for y0 in range(0, h, step):
+            y1 = min(h, y0 + step)
+            strip = arr[y0:y1].reshape(-1, 3) / 255.0
+            lab[y0:y1] = cspace_convert(strip, 'sRGB1', 'CIELab').reshape(y1 - y0, w, 3)
+        return lab
+
+    def make_proxy(self, max_pixels: int = 1_000_000) -> 'StampLayerSeparator':
+        """Return a separator over a downsampled copy with the same settings.
+
+        Used for interactive previews: masks from the proxy are cheap to
+        compute and can be upscaled with
+        ``utils.two_tier_preview.upscale_mask``.  Returns ``self`` when the
+        image is already within ``max_pixels``.
+        """
+        from utils.two_tier_preview import make_proxy_image
+
+        proxy_img, scale = make_proxy_image(self._original, max_pixels)
+        if scale >= 1.0:
+            return self
+        proxy = StampLayerSeparator(proxy_img)
+        proxy._calibrated = self._calibrated  # pixels already corrected
+        proxy._bg_rgb = self._bg_rgb
+        proxy.background_delta_e_threshold = self.background_delta_e_threshold
+        proxy.cancellation_brightness_max = self.cancellation_brightness_max
+        proxy.cancellation_saturation_max = self.cancellation_saturation_max
+        proxy.ink_outlier_delta_e = self.ink_outlier_delta_e
+        proxy.num_ink_colors = self.num_ink_colors
+        return proxy
+
     # ------------------------------------------------------------------ #
     # Configuration
     # ------------------------------------------------------------------ #
@@ -88,9 +163,14 @@ class StampLayerSeparator:
         """Set the sampled background color (from user click).
 
         Args:
-            r, g, b: Background color in 0-255 range
+            r, g, b: Background color in 0-255 range, as sampled from the
+                uncorrected image
         """
         self._bg_rgb = (float(r), float(g), float(b))
+        if self._calibrated:
+            # Compare like with like once the pixels themselves are corrected
+            from utils.scanner_calibration import apply_calibration_to_rgb
+            self._bg_rgb = tuple(float(c) for c in apply_calibration_to_rgb(self._bg_rgb))
 
     def set_thresholds(
         self,
@@ -160,39 +240,57 @@ class StampLayerSeparator:
     # Layer extraction helpers
     # ------------------------------------------------------------------ #
 
-    def _mask_background(self) -> np.ndarray:
-        """Create a boolean mask of background pixels using ΔE from sampled color."""
-        bg = np.array(self._bg_rgb) / 255.0
-        bg_lab = cspace_convert(bg, 'sRGB1', 'CIELab')
-
-        # Convert entire image to Lab
-        img_norm = self._arr / 255.0
-        # Reshape for batch conversion: (H*W, 3)
-        flat = img_norm.reshape(-1, 3)
-        flat_lab = cspace_convert(flat, 'sRGB1', 'CIELab')
-
-        # ΔE (Euclidean in Lab space — fast approximation)
-        diff = flat_lab - bg_lab
-        delta_e = np.sqrt(np.sum(diff ** 2, axis=1))
-
-        mask = delta_e < self.background_delta_e_threshold
-        return mask.reshape(img_norm.shape[:2])
-
-    def _mask_cancellation(self, background_mask: np.ndarray) -> np.ndarray:
+    def _mask_background(
+        self,
+        bg_rgb: Optional[Tuple[float, float, float]] = None,
+        delta_e_threshold: Optional[float] = None,
+    ) -> np.ndarray:
+        """Create a boolean mask of background pixels using ΔE from sampled color.
+
+        ``bg_rgb`` / ``delta_e_threshold`` override the configured values, so
+        worker-thread previews don't depend on attributes the UI may be
+        changing concurrently.
+        """
+        if bg_rgb is None:
+            bg_rgb = self._bg_rgb
+        if delta_e_threshold is None:
+            delta_e_threshold = self.background_delta_e_threshold
+        bg = np.array(bg_rgb) / 255.0
+        bg_lab = cspace_convert(bg, 'sRGB1', 'CIELab').astype(np.float32)
+
+        # ΔE (Euclidean in Lab space — fast approximation).  Compare squared
+        # distances so no square root is taken over the full frame.
+        diff = self.lab - bg_lab
+        dist_sq = np.einsum('ijk,ijk->ij', diff, diff)
+
+        threshold = float(delta_e_threshold)
+        return dist_sq < threshold * threshold
+
+    def _mask_cancellation(
+        self,
+        background_mask: np.ndarray,
+        brightness_max: Optional[float] = None,
+        saturation_max: Optional[float] = None,
+    ) -> np.ndarray:
         """Identify cancellation (dark, low-saturation) pixels outside background.
 
-        Uses the user-adjustable brightness and saturation thresholds.
+        Uses the user-adjustable brightness and saturation thresholds
+        (or the explicit overrides).
         Pixels must be BOTH darker than brightness_max AND less saturated
         than saturation_max to be classified as cancellation.
         """
+        if brightness_max is None:
+            brightness_max = self.cancellation_brightness_max
+        if saturation_max is None:
+            saturation_max = self.cancellation_saturation_max
         r, g, b = self._arr[:, :, 0], self._arr[:, :, 1], self._arr[:, :, 2]
         brightness = (r + g + b) / 3.0
         max_ch = np.maximum(np.maximum(r, g), b)
         min_ch = np.minimum(np.minimum(r, g), b)
         saturation = max_ch - min_ch
 
-        is_dark = brightness < self.cancellation_brightness_max
-        is_neutral = saturation < self.cancellation_saturation_max
+        is_dark = brightness < brightness_max
+        is_neutral = saturation < saturation_max
         is_cancel = is_dark & is_neutral & ~background_mask
 
         return is_cancel
@@ -211,19 +309,16 @@ class StampLayerSeparator:
         """
         h, w = stamp_area.shape
 
-        # Convert to L* for lightness-based separation
-        img_norm = self._arr / 255.0
-        flat = img_norm.reshape(-1, 3)
-        flat_lab = cspace_convert(flat, 'sRGB1', 'CIELab')
-        l_channel = flat_lab[:, 0].reshape(h, w)
+        # L* for lightness-based separation (shared precomputed plane)
+        l_channel = self.lab[:, :, 0]
 
         # Extract L* values within the stamp area only
         stamp_l = l_channel[stamp_area]
         if len(stamp_l) == 0:
             return np.zeros((h, w), dtype=bool), np.zeros((h, w), dtype=bool)
 
-        # Otsu's threshold on L* values
-        threshold = self._otsu_threshold(stamp_l)
+        # Otsu's threshold from a fixed-bin L* histogram (0.2 L* resolution)
+        threshold = self._otsu_threshold(stamp_l, bins=500, value_range=(0.0, 100.0))
 
         # Paper = high L* (light), Ink = low L* (dark)
         ink_mask = stamp_area & (l_channel <= threshold)
@@ -255,65 +350,87 @@ class StampLayerSeparator:
         if int(np.sum(ink_mask)) < 20:
             return ink_mask, np.zeros((h, w), dtype=bool)
 
-        # Convert ink pixels to L*a*b*
-        img_norm = self._arr / 255.0
-        flat_lab = cspace_convert(img_norm.reshape(-1, 3), 'sRGB1', 'CIELab')
-        lab_image = flat_lab.reshape(h, w, 3)
-        ink_pixels_lab = lab_image[ink_mask]  # shape (N, 3)
+        # Ink pixels in L*a*b* (shared precomputed plane)
+        ink_pixels_lab = self.lab[ink_mask]  # shape (N, 3)
+
+        # Fit on a seeded subsample: two ink clusters are well determined by
+        # a few tens of thousands of points, and fitting on every pixel of a
+        # large scan takes tens of seconds.
+        n_ink = len(ink_pixels_lab)
+        if n_ink > self.KMEANS_MAX_SAMPLES:
+            from sklearn.cluster import MiniBatchKMeans
+            rng = np.random.default_rng(42)
+            sample = ink_pixels_lab[rng.choice(n_ink, self.KMEANS_MAX_SAMPLES, replace=False)]
+            km = MiniBatchKMeans(n_clusters=2, n_init=3, random_state=42,
+                                 batch_size=4096)
+        else:
+            sample = ink_pixels_lab
+            # K-means (k=2) with k-means++ initialisation for stability
+            km = KMeans(n_clusters=2, n_init=10, random_state=42)
+        km.fit(sample)
 
-        # K-means (k=2) with k-means++ initialisation for stability
-        km = KMeans(n_clusters=2, n_init=10, random_state=42)
-        labels = km.fit_predict(ink_pixels_lab)
+        # Label every ink pixel against the two centres in one pass
+        centers = km.cluster_centers_.astype(np.float32)
+        d0 = np.sum((ink_pixels_lab - centers[0]) ** 2, axis=1)
+        d1 = np.sum((ink_pixels_lab - centers[1]) ** 2, axis=1)
+        labels = (d1 < d0).astype(np.int8)
 
         # Map cluster labels back onto the full image grid
         label_image = np.full((h, w), -1, dtype=np.int8)
         label_image[ink_mask] = labels
 
         # ink1 = dominant (more pixels), ink2 = secondary
-        count = [int(np.sum(labels == k)) for k in range(2)]
-        dominant = 0 if count[0] >= count[1] else 1
+        n_second = int(np.count_nonzero(labels))
+        dominant = 0 if (n_ink - n_second) >= n_second else 1
         secondary = 1 - dominant
 
         return (label_image == dominant), (label_image == secondary)
 
     @staticmethod
-    def _otsu_threshold(values: np.ndarray) -> float:
+    def _otsu_threshold(
+        values: np.ndarray,
+        bins: int = 256,
+        value_range: Optional[Tuple[float, float]] = None,
+    ) -> float:
         """Compute Otsu's optimal threshold for a 1D array of values.
 
-        Pure numpy implementation — no OpenCV dependency.
+        Pure numpy implementation — no OpenCV dependency.  The values are
+        binned once (``value_range`` fixes the bin edges, e.g. ``(0, 100)``
+        for L*; by default they span the data) and the between-class
+        variance is evaluated for every bin with cumulative sums.
         """
-        # Histogram with 256 bins spanning the data range
-        hist, bin_edges = np.histogram(values, bins=256)
-        bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2.0
+        if value_range is None:
+            lo, hi = float(np.min(values)), float(np.max(values))
+        else:
+            lo, hi = float(value_range[0]), float(value_range[1])
+        if hi <= lo:
+            return float(np.median(values))
+
+        # Quantise + bincount is much cheaper than np.histogram on
+        # tens of millions of floats.
+        width = (hi - lo) / bins
+        idx = ((values - lo) / width).astype(np.int64)
+        np.clip(idx, 0, bins - 1, out=idx)
+        hist = np.bincount(idx, minlength=bins).astype(np.float64)
+        bin_centers = lo + (np.arange(bins) + 0.5) * width
 
         total = hist.sum()
         if total == 0:
             return float(np.median(values))
 
-        sum_total = np.sum(bin_centers * hist)
-        sum_bg = 0.0
-        weight_bg = 0.0
-        max_variance = 0.0
-        best_threshold = bin_centers[0]
+        weight_bg = np.cumsum(hist)
+        weight_fg = total - weight_bg
+        sum_bg = np.cumsum(bin_centers * hist)
+        sum_total = sum_bg[-1]
 
-        for i in range(len(hist)):
-            weight_bg += hist[i]
-            if weight_bg == 0:
-                continue
-            weight_fg = total - weight_bg
-            if weight_fg == 0:
-                break
+        valid = (weight_bg > 0) & (weight_fg > 0)
+        if not np.any(valid):
+            return float(bin_centers[0])
+        mean_bg = np.divide(sum_bg, weight_bg, out=np.zeros(bins), where=valid)
+        mean_fg = np.divide(sum_total - sum_bg, weight_fg, out=np.zeros(bins), where=valid)
+        variance = np.where(valid, weight_bg * weight_fg * (mean_bg - mean_fg) ** 2, 0.0)
 
-            sum_bg += bin_centers[i] * hist[i]
-            mean_bg = sum_bg / weight_bg
-            mean_fg = (sum_total - sum_bg) / weight_fg
-
-            variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
-            if variance > max_variance:
-                max_variance = variance
-                best_threshold = bin_centers[i]
-
-        return best_threshold
+        return float(bin_centers[int(np.argmax(variance))])
 
     # ------------------------------------------------------------------ #
     # Aggregate color computation
@@ -334,7 +451,8 @@ class StampLayerSeparator:
             # ΔE-based outlier rejection (iterative)
             if self.ink_outlier_delta_e > 0 and len(ink_pixels) > 20:
                 clean_ink = self._filter_ink_outliers(
-                    ink_pixels, self.ink_outlier_delta_e
+                    ink_pixels, self.ink_outlier_delta_e,
+                    pixels_lab=self.lab[result.ink_mask],
                 )
             else:
                 clean_ink = ink_pixels
@@ -389,24 +507,29 @@ class StampLayerSeparator:
                 cspace_convert(median2_norm, 'sRGB1', 'CIELab').tolist()
             )
 
-    def _filter_ink_outliers(self, pixels: np.ndarray, max_delta_e: float) -> np.ndarray:
+    def _filter_ink_outliers(
+        self, pixels: np.ndarray, max_delta_e: float,
+        pixels_lab: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
         """Remove ink pixels farther than max_delta_e from the median.
 
         Uses the median as the anchor (robust to outliers), converts
         each pixel to L*a*b*, computes ΔE, and keeps only those within
         the threshold. One pass is usually enough; a second pass refines
         after the first round of outliers is removed.
+
+        ``pixels_lab`` may carry the matching rows of the precomputed Lab
+        plane so the pixels are not converted again.
         """
+        if pixels_lab is None:
+            pixels_lab = cspace_convert(pixels / 255.0, 'sRGB1', 'CIELab')
+
         for _ in range(2):  # two passes for refinement
             # Compute median in RGB, convert to Lab
             median_rgb = np.median(pixels, axis=0)
             median_norm = median_rgb / 255.0
             median_lab = cspace_convert(median_norm, 'sRGB1', 'CIELab')
 
-            # Convert all pixels to Lab
-            pixels_norm = pixels / 255.0
-            pixels_lab = cspace_convert(pixels_norm, 'sRGB1', 'CIELab')
-
             # ΔE from median
             diff = pixels_lab - median_lab
             delta_e = np.sqrt(np.sum(diff ** 2, axis=1))
@@ -415,11 +538,13 @@ class StampLayerSeparator:
             if np.sum(keep) < 10:
                 break  # don't over-filter
             pixels = pixels[keep]
+            pixels_lab = pixels_lab[keep]
 
         return pixels
-    @staticmethod
-    def _apply_calibration(rgb):
+    def _apply_calibration(self, rgb):
         """Apply active scanner calibration to an RGB tuple, if available."""
+        if self._calibrated:
+            return rgb
         try:
             from utils.scanner_calibration import get_active_calibration
             cal = get_active_calibration()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Streaming spreadsheet writers for StampZ exports.
+
+Building an odfpy document (or a pandas DataFrame for openpyxl) holds one
+Python object per cell until the file is saved, so exporting a large
+collection runs out of memory long before it finishes. The writers here
+take rows from any iterable and write them out as they arrive:
+
+- CSV through a large write buffer
+- XLSX through an openpyxl write-only workbook
+- ODS by generating ``content.xml`` text straight into the zip stream
+
+Memory use stays flat regardless of the number of rows. The ODS output
+matches what the odfpy-based exporter produced cell for cell.
+"""
+
+import os
+import csv
+import zipfile
+import logging
+from typing import Container, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+logger = logging.getLogger(__name__)
+
+# Write buffer for CSV output
+CSV_BUFFER_SIZE = 1 << 20
+
+# Rows of content.xml joined into one write on the zip stream
+ODS_ROWS_PER_CHUNK = 500
+
+# Column width cap used by the XLSX exports (characters)
+MAX_COLUMN_WIDTH = 50
+
+ODS_MIMETYPE = 'application/vnd.oasis.opendocument.spreadsheet'
+
+_XML_HEADER = "<?xml version='1.0' encoding='UTF-8'?>\n"
+
+_ODS_NAMESPACES = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:meta="urn:oasis:names:tc:opendocument:xmlns:meta:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0"'
+)
+
+_ODS_STYLES = (
+    f'{_XML_HEADER}<office:document-styles {_ODS_NAMESPACES} office:version="1.2">'
+    '<office:styles/><office:automatic-styles/></office:document-styles>'
+)
+
+_ODS_META = (
+    f'{_XML_HEADER}<office:document-meta {_ODS_NAMESPACES} office:version="1.2">'
+    '<office:meta><meta:generator>StampZ</meta:generator></office:meta></office:document-meta>'
+)
+
+_ODS_MANIFEST = (
+    f'{_XML_HEADER}<manifest:manifest {_ODS_NAMESPACES}>'
+    f'<manifest:file-entry manifest:full-path="/" manifest:media-type="{ODS_MIMETYPE}"/>'
+    '<manifest:file-entry manifest:full-path="styles.xml" manifest:media-type="text/xml"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    '<manifest:file-entry manifest:full-path="meta.xml" manifest:media-type="text/xml"/>'
+    '</manifest:manifest>'
+)
+
+
+def _remove_partial(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def write_csv(output_path: str, headers: Sequence, rows: Iterable[Sequence]) -> int:
+    """Write a header and rows to a CSV file.
+
+    Returns:
+        Number of data rows written
+    """
+    count = 0
+    with open(output_path, 'w', newline='', encoding='utf-8',
+              buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def column_widths(headers: Sequence, rows: Iterable[Sequence],
+                  max_width: int = MAX_COLUMN_WIDTH) -> List[int]:
+    """Auto-fit widths (longest value + 2, capped) without keeping the rows."""
+    lengths = [len(str(h)) for h in headers]
+    for row in rows:
+        for i, value in enumerate(row):
+            n = len(str(value))
+            if i >= len(lengths):
+                lengths.append(n)
+            elif n > lengths[i]:
+                lengths[i] = n
+    return [min(n + 2, max_width) for n in lengths]
+
+
+def write_xlsx(output_path: str, sheet_name: str, headers: Sequence,
+               rows: Iterable[Sequence], widths: Optional[Sequence[float]] = None) -> int:
+    """Write a header and rows to an .xlsx file with a write-only workbook.
+
+    Args:
+        output_path: Destination .xlsx path
+        sheet_name: Worksheet title
+        headers: Header row (plain cells, as pandas' to_excel writes them)
+        rows: Data rows; consumed once
+        widths: Optional column widths; write-only sheets need them up front,
+            see ``column_widths()``
+
+    Returns:
+        Number of data rows written
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_name)
+    if widths:
+        for i, width in enumerate(widths, start=1):
+            worksheet.column_dimensions[get_column_letter(i)].width = width
+
+    worksheet.append(list(headers))
+
+    count = 0
+    try:
+        for row in rows:
+            worksheet.append(list(row))
+            count += 1
+        workbook.save(output_path)
+    except Exception:
+        _remove_partial(output_path)
+        raise
+    return count
+
+
+def _ods_cell(value, numeric: bool) -> str:
+    text = str(value)
+    if numeric and value and value != "":
+        try:
+            number = float(value)
+        except (ValueError, TypeError):
+            pass
+        else:
+            return (f'<table:table-cell office:value-type="float" office:value="{number}">'
+                    f'<text:p>{escape(text)}</text:p></table:table-cell>')
+    if not text:
+        return '<table:table-cell><text:p/></table:table-cell>'
+    return f'<table:table-cell><text:p>{escape(text)}</text:p></table:table-cell>'
+
+
+def iter_ods_content(sheet_name: str, header_rows: Iterable[Sequence],
+                     rows: Iterable[Sequence],
+                     numeric_columns: Container[int] = ()) -> Iterator[str]:
+    """Generate ``content.xml`` for a single-sheet document in chunks.
+
+    Header rows are written as text. In data rows, non-empty values in
+    ``numeric_columns`` that parse as numbers become float cells that keep
+    their formatted text for display; anything else is a text cell.
+    """
+    yield (f'{_XML_HEADER}<office:document-content {_ODS_NAMESPACES} office:version="1.2">'
+           f'<office:automatic-styles/><office:body><office:spreadsheet>'
+           f'<table:table table:name={quoteattr(sheet_name)}>')
+
+    for row in header_rows:
+        yield ('<table:table-row>' + ''.join(_ods_cell(v, False) for v in row)
+               + '</table:table-row>')
+
+    chunk = []
+    for row in rows:
+        chunk.append('<table:table-row>'
+                     + ''.join(_ods_cell(v, i in numeric_columns) for i, v in enumerate(row))
+                     + '</table:table-row>')
+        if len(chunk) >= ODS_ROWS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+    yield '</table:table></office:spreadsheet></office:body></office:document-content>'
+
+
+def write_ods(output_path: str, sheet_name: str, header_rows: Iterable[Sequence],
+              rows: Iterable[Sequence], numeric_columns: Container[int] = ()) -> None:
+    """Write a single-sheet .ods file, streaming ``content.xml`` into the zip.
+
+    See ``iter_ods_content()`` for how cells are typed.
+    """
+    try:
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            # The mimetype must be the first member and stored uncompressed
+            archive.writestr('mimetype', ODS_MIMETYPE, compress_type=zipfile.ZIP_STORED)
+            archive.writestr('styles.xml', _ODS_STYLES)
+            with archive.open('content.xml', 'w') as content:
+                for chunk in iter_ods_content(sheet_name, header_rows, rows, numeric_columns):
+                    content.write(chunk.encode('utf-8'))
+            archive.writestr('meta.xml', _ODS_META)
+            archive.writestr('META-INF/manifest.xml', _ODS_MANIFEST)
+    except Exception:
+        _remove_partial(output_path)
+        raise
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Two-tier (proxy + full resolution) preview engine for StampZ dialogs.
+
+Threshold-driven dialogs (layer separator, coverage analysis) used to run
+the full-resolution pipeline on every change. This engine splits that into
+two tiers:
+
+  1. A *preview* pass on a downsampled proxy image runs synchronously on
+     every request so the user gets instant feedback.
+  2. A *full-resolution* pass is debounced and run on a single long-lived
+     worker thread; when it finishes it replaces the preview, provided the
+     user has not moved on to other settings in the meantime. The worker
+     holds one pending request at a time, so while it is busy newer
+     requests replace older ones and only the latest is computed next.
+
+Full-resolution results are cached per threshold key (any hashable, usually
+a tuple of the threshold values) so jumping back to a previous setting is
+instant.
+
+The engine stays UI-agnostic: the caller passes a ``schedule`` callable with
+Tk's ``after(ms, func, *args)`` / ``after_cancel(id)`` semantics (any Tk
+widget works), and results are always delivered on that scheduler's thread.
+
+Usage:
+    engine = TwoTierPreviewEngine(
+        preview_fn=lambda key: run_on_proxy(*key),
+        full_fn=lambda key: run_full(*key),
+        on_result=lambda key, value, is_full: show(value),
+        scheduler=dialog_root,
+    )
+    engine.request((threshold_a, threshold_b))
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+logger = logging.getLogger(__name__)
+
+# Proxy size used for interactive previews (pixels, not a side length).
+DEFAULT_PROXY_MAX_PIXELS = 1_000_000
+
+
+def make_proxy_image(image: Image.Image,
+                     max_pixels: int = DEFAULT_PROXY_MAX_PIXELS) -> Tuple[Image.Image, float]:
+    """Return ``(proxy, scale)`` where ``proxy`` has at most ``max_pixels`` pixels.
+
+    ``scale`` is proxy size / original size (1.0 when the image is already
+    small enough, in which case the original image is returned unchanged).
+    Box filtering averages the source pixels so proxy colours match the
+    full-resolution statistics closely.
+    """
+    w, h = image.size
+    total = w * h
+    if total <= max_pixels or total == 0:
+        return image, 1.0
+    scale = (max_pixels / float(total)) ** 0.5
+    size = (max(1, int(w * scale)), max(1, int(h * scale)))
+    return image.resize(size, Image.BOX), scale
+
+
+def upscale_mask(mask: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """Nearest-neighbour resize of a boolean proxy mask to ``size`` = (W, H)."""
+    if mask.shape[1] == size[0] and mask.shape[0] == size[1]:
+        return mask
+    img = Image.fromarray(mask.astype(np.uint8) * 255)
+    return np.asarray(img.resize(size, Image.NEAREST)) > 127
+
+
+class TwoTierPreviewEngine:
+    """Instant proxy previews plus debounced, cached full-resolution passes."""
+
+    def __init__(
+        self,
+        preview_fn: Callable[[Hashable], Any],
+        full_fn: Callable[[Hashable], Any],
+        on_result: Callable[[Hashable, Any, bool], None],
+        scheduler,
+        debounce_ms: int = 350,
+        cache_size: int = 16,
+        on_error: Optional[Callable[[Hashable, Exception], None]] = None,
+    ):
+        """
+        Args:
+            preview_fn: Cheap computation on the proxy; called on the UI thread.
+            full_fn: Full-resolution computation; called on a worker thread.
+            on_result: ``(key, value, is_full)`` callback, always on the UI thread.
+            scheduler: Object with Tk-style ``after`` / ``after_cancel``.
+            debounce_ms: Quiet period before the full-resolution pass starts.
+            cache_size: Number of full-resolution results kept (LRU).
+            on_error: Optional ``(key, exc)`` callback for full-pass failures.
+        """
+        self._preview_fn = preview_fn
+        self._full_fn = full_fn
+        self._on_result = on_result
+        self._on_error = on_error
+        self._scheduler = scheduler
+        self.debounce_ms = int(debounce_ms)
+        self.cache_size = int(cache_size)
+
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending_after = None
+        self._latest_key: Optional[Hashable] = None
+        self._generation = 0
+        self._closed = False
+
+        # Single-slot hand-off to the worker: (generation, key) or None
+        self._slot: Optional[Tuple[int, Hashable]] = None
+        self._slot_cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def request(self, key: Hashable) -> None:
+        """Show the result for ``key``: cached full result, else preview + full pass."""
+        if self._closed:
+            return
+        self._latest_key = key
+        self._cancel_pending()
+
+        cached = self.get_cached(key)
+        if cached is not None:
+            self._on_result(key, cached, True)
+            return
+
+        self._on_result(key, self._preview_fn(key), False)
+        self._pending_after = self._scheduler.after(
+            self.debounce_ms, self._launch_full, key)
+
+    def compute_full(self, key: Hashable) -> Any:
+        """Synchronously return the full-resolution result for ``key`` (cached)."""
+        cached = self.get_cached(key)
+        if cached is not None:
+            return cached
+        value = self._full_fn(key)
+        self._store(key, value)
+        return value
+
+    def get_cached(self, key: Hashable) -> Any:
+        """Return the cached full-resolution result for ``key``, or ``None``."""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def clear_cache(self) -> None:
+        """Drop every cached result (call when the inputs behind the keys change)."""
+        with self._cache_lock:
+            self._cache.clear()
+        self._generation += 1
+
+    def close(self) -> None:
+        """Cancel pending work and stop the worker; late results are discarded."""
+        self._closed = True
+        self._cancel_pending()
+        self._generation += 1
+        with self._slot_cond:
+            self._slot = None
+            self._slot_cond.notify()
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+
+    def _cancel_pending(self) -> None:
+        if self._pending_after is not None:
+            try:
+                self._scheduler.after_cancel(self._pending_after)
+            except Exception:
+                pass
+            self._pending_after = None
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _launch_full(self, key: Hashable) -> None:
+        self._pending_after = None
+        if self._closed:
+            return
+        self._generation += 1
+        with self._slot_cond:
+            # Replaces any request the worker has not started yet
+            self._slot = (self._generation, key)
+            self._slot_cond.notify()
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._worker.start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._slot_cond:
+                while self._slot is None and not self._closed:
+                    self._slot_cond.wait()
+                if self._closed:
+                    return
+                generation, key = self._slot
+                self._slot = None
+            if generation != self._generation:
+                continue  # superseded (e.g. cache cleared) before it started
+            value = self.get_cached(key)
+            if value is None:
+                try:
+                    value = self._full_fn(key)
+                except Exception as exc:  # surfaced on the UI thread
+                    self._post(self._deliver_error, generation, key, exc)
+                    continue
+                self._store(key, value)
+            self._post(self._deliver, generation, key, value)
+
+    def _post(self, func, *args) -> None:
+        try:
+            self._scheduler.after(0, func, *args)
+        except Exception:
+            pass  # scheduler (window) already destroyed
+
+    def _deliver(self, generation: int, key: Hashable, value: Any) -> None:
+        if self._closed or generation != self._generation or key != self._latest_key:
+            return  # superseded by a newer request; result stays cached
+        self._on_result(key, value, True)
+
+    def _deliver_error(self, generation: int, key: Hashable, exc: Exception) -> None:
+        if self._closed or generation != self._generation:
+            return
+        if self._on_error is not None:
+            self._on_error(key, exc)
+        else:
+            logger.error(f"Full-resolution preview failed for {key}: {exc}")